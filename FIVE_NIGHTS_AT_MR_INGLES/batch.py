@@ -0,0 +1,956 @@
+#!/usr/bin/env python3
+"""
+Vectorized batch night engine for Five Nights at Mr Ingles's.
+
+Runs thousands of nights in lockstep with NumPy. Every night is one row of a
+set of arrays (power, door flags and health, each animatronic's room index,
+cooldowns, mood code, ...) and one step advances all of them with array
+operations. Rooms are integer indexes into the room graph, so chasing the
+player is a lookup in the next-hop table and retreats index padded neighbor
+tables.
+
+Nights start from real Simulation objects seeded exactly like balance.py, so
+rosters, patrol routes, personalities and start delays are the scalar ones.
+The per-tick rules mirror Simulation.step for everything the scripted
+balance policies (and the per-row INPUTS of env.py's agents) can reach:
+power, time, the animatronic update / coordinate / door passes, the
+special-ability effect tick, environmental events and the office fairness
+caps. Things no scripted player touches (barricades, noise makers, safe
+spots) are left out, and so are the abilities that only change what the
+camera feed shows (camera jammer, mimic). Randomness during the night
+(environmental events, erratic moods) comes from one NumPy generator per
+batch, so a batch is reproducible as a whole but a single night is not the
+same night balance.py would play.
+Cooldowns the sim keeps on its timer wheel (door jams, entry cooldowns,
+grace periods, backup power) are arrays of deadlines here: a timer is
+running while its deadline is later than now.
+
+--cross-check N plays N nights in both engines tick by tick (environmental
+events off and nights with an erratic animatronic skipped - the two places
+the engines draw different random numbers) and reports the first tick where
+they disagree.
+
+Results use the balance.py record format (kernel "batch"), so the usual
+summary works on them:
+
+    python batch.py --nights 1-5 --difficulty 1.0,1.2,1.6 --policy doors --runs 5000
+    python batch.py --cross-check 50 --policy watcher
+    python balance.py --summary-only --out balance_batch.jsonl
+
+Needs numpy (pip install -r requirements-tools.txt); the game itself does not.
+"""
+
+import sys
+import json
+import argparse
+
+try:
+    import numpy as np
+except ImportError:  # Only this tool needs numpy
+    np = None
+
+import balance
+from simulation import (Simulation, room_graph, EFFECT_TICK, POWER_DRAINER_RATE, DOOR_BREAKER_DAMAGE,
+                        SPEED_DEMON_DASH, ABILITY_CODES, ABILITY_COOLDOWN_TICKS, ABILITY_DURATIONS, ABILITY_HOPS,
+                        DOOR_JAM_SECONDS, DOOR_JAM_TIMERS, ENTRY_COOLDOWN_TIMERS)
+from mood_schedule import MOODS, SCHEDULE as MOOD_SCHEDULE
+
+DT = balance.DT
+REACTION_TICKS = balance.REACTION_TICKS
+REFLEX_SECONDS = balance.REFLEX_SECONDS
+NIGHT_MINUTES = MOOD_SCHEDULE.minutes
+
+NEUTRAL, CAUTIOUS, AGGRESSIVE, HUNTING, RETREATING = range(len(MOODS))
+SIDES = ("left", "right", "vent")  # Block memories store "both" (the vent) as VENT
+LEFT, RIGHT, VENT = range(len(SIDES))
+
+PLAYING, WIN, JUMPSCARE, ANTI_CHEAT = range(4)
+END_STATES = ("playing", "win", "jumpscare", "jumpscare")  # Anti-cheat always ends in Mr Hall's jumpscare
+ANTI_CHEAT_SECONDS = 2.0  # Warning shown before Mr Hall's jumpscare
+
+BLOCK_MEMORY = 5  # coordinate_animatronics only reads the latest 5 blocks
+TOGGLE_MEMORY = 7  # toggle_door only needs to know if there were more than 6 in 5 seconds
+BASE_EVENTS = 8  # trigger_random_event list: 8 events, +2 from night 3, +2 more from night 4
+TEMPERATURE_DROP, VENTILATION_BLOCK, POWER_SURGE, DOOR_MALFUNCTION, POWER_DRAIN, ANIMATRONIC_RUSH = 1, 4, 5, 7, 8, 11
+
+# Player inputs a row can be given on a step (BatchNights.step inputs are indexes into this)
+INPUTS = (None, ("toggle_door", "left"), ("toggle_door", "right"), ("toggle_cameras",), ("toggle_flashlight",))
+NO_INPUT, DOOR_LEFT_INPUT, DOOR_RIGHT_INPUT, CAMERAS_INPUT, LIGHT_INPUT = range(len(INPUTS))
+
+
+# =====================================================
+# ROOM GRAPH AS TABLES
+# =====================================================
+
+class RoomTables:
+    """Room graph, next hops toward the Office and retreat choices as integer arrays"""
+    def __init__(self):
+        graph = room_graph()
+        self.rooms = list(graph.rooms)
+        self.index = {room: i for i, room in enumerate(self.rooms)}
+        self.office = self.index[graph.office]
+        count = len(self.rooms)
+
+        self.adjacency = np.zeros((count, count), dtype=bool)
+        for room, neighbors in graph.neighbors.items():
+            for neighbor in neighbors:
+                self.adjacency[self.index[room], self.index[neighbor]] = True
+
+        self.next_hop = np.arange(count)
+        self.distance = np.array([graph.distance_to_office(room) for room in self.rooms])
+        self.door_side = np.full(count, -1)
+        for room, i in self.index.items():
+            hop = graph.next_hop(room, graph.office)
+            if hop:
+                self.next_hop[i] = self.index[hop]
+            side = graph.office_door_side(room)
+            if side:
+                self.door_side[i] = SIDES.index(side)
+
+        # Retreat picks neighbors[block_count % len] in graph order, so keep the order
+        width = int(self.adjacency.sum(axis=1).max())
+        self.door_retreat = np.zeros((count, width), dtype=int)
+        self.door_retreat_count = np.ones(count, dtype=int)
+        for room, i in self.index.items():
+            away = [self.index[r] for r in graph.neighbors[room] if r != graph.office]
+            self.door_retreat[i, :len(away)] = away
+            self.door_retreat_count[i] = max(1, len(away))
+        self.office_retreat = np.array([self.index[r] for r in graph.neighbors[graph.office]])
+
+        self.moods = mood_table()
+
+
+def mood_table(schedule=MOOD_SCHEDULE):
+    """The compiled mood schedule as one [night, block row, minute] array of mood codes"""
+    return np.array([[list(row) for row in rows] for rows in schedule.tables], dtype=int)
+
+
+# =====================================================
+# BATCH STATE
+# =====================================================
+
+def start_night(night, difficulty, seconds_per_hour, seed):
+    """A scalar Simulation at the start of a night, set up the way balance.run_night does"""
+    sim = Simulation(run_seed=seed, difficulty=difficulty)
+    sim.game_state.seconds_per_hour = seconds_per_hour
+    sim.start_night(night)
+    sim.begin_playing()
+    return sim
+
+
+class BatchNights:
+    """K nights as arrays (one row per night), stepped together under one scripted policy"""
+    def __init__(self, sims, policy="doors", labels=None, events=True, rng=None):
+        if np is None:
+            raise RuntimeError("batch nights need numpy (pip install -r requirements-tools.txt)")
+        self.tables = tables = RoomTables()
+        self.policy = policy
+        self.events = events
+        self.compact_finished = True
+        self.rng = rng if rng is not None else np.random.default_rng([sim.run_seed for sim in sims])
+        self.labels = labels or [{"seed": sim.run_seed} for sim in sims]
+        self.names = [anim.name for anim in sims[0].animatronics]  # Same roster every night
+        self.results = []
+        self.tick = 0
+        self.now = sims[0].clock.now
+        power = sims[0].power
+        self.power_max, self.door_drain, self.light_drain, self.cam_drain = (
+            power.max, power.door_drain, power.light_drain, power.cam_drain)
+
+        def nights(get, dtype=float):
+            return np.array([get(sim) for sim in sims], dtype=dtype)
+
+        def anims(get, dtype=float):
+            return np.array([[get(anim) for anim in sim.animatronics] for sim in sims], dtype=dtype)
+
+        # Per night
+        self.row_id = np.arange(len(sims))
+        self.night = nights(lambda s: s.game_state.night, int)
+        self.difficulty = nights(lambda s: s.difficulty)
+        self.seconds_per_hour = nights(lambda s: s.game_state.seconds_per_hour)
+        self.max_ticks = ((6 * self.seconds_per_hour + balance.NIGHT_SLACK_SECONDS) / DT).astype(int)
+        self.minutes = nights(lambda s: s.game_state.minutes_elapsed, int)
+        self.hour_timer = nights(lambda s: s.game_state.hour_timer)
+        self.state = np.full(len(sims), PLAYING)
+        self.done = np.zeros(len(sims), dtype=bool)
+        self.killer = np.full(len(sims), -1)
+        self.score = np.zeros(len(sims), dtype=int)
+
+        self.power = nights(lambda s: s.power.current)
+        self.base_drain = nights(lambda s: s.power.base_drain)
+        self.outage = nights(lambda s: s.power.outage, bool)
+        self.emergency = np.zeros(len(sims), dtype=bool)
+        self.emergency_until = np.zeros(len(sims))
+        self.spam_penalty = nights(lambda s: s.door_spam_penalty)
+        self.light_on = nights(lambda s: s.office.light_on, bool)
+        self.cams_open = nights(lambda s: s.office.cams_open, bool)
+        self.door_closed = nights(lambda s: (s.office.door_left_closed, s.office.door_right_closed), bool)
+        self.door_health = nights(lambda s: (s.office.door_left_health, s.office.door_right_health))
+        self.jam_until = nights(lambda s: [s.timers.deadline(DOOR_JAM_TIMERS[side]) for side in SIDES[:2]])
+        self.toggle_times = np.full((len(sims), 2, TOGGLE_MEMORY), -np.inf)
+        self.toggle_pos = np.zeros((len(sims), 2), dtype=int)
+        self.door_closes = nights(lambda s: s.total_door_closes, int)
+        self.camera_checks = nights(lambda s: s.total_camera_checks, int)
+        self.perfect_blocks = nights(lambda s: s.perfect_blocks, int)
+
+        self.side_cooldown_until = nights(lambda s: [s.timers.deadline(ENTRY_COOLDOWN_TIMERS[side]) for side in SIDES])
+        self.last_entry = nights(lambda s: [s.last_office_entry_time[side] for side in SIDES])
+        self.entry_cooldown = nights(lambda s: s.entry_cooldown_seconds)
+        self.max_attackers = nights(lambda s: s.max_office_attackers, int)
+        self.jam_grace_until = nights(lambda s: s.timers.deadline("jam_grace"))
+        self.overload_grace_until = nights(lambda s: s.timers.deadline("overload_grace"))
+        self.coordination_until = nights(lambda s: s.timers.deadline("coordination"))
+        self.effect_timer = nights(lambda s: s.effect_timer)
+        self.lights_out = nights(lambda s: s.office.lights_out_timer)
+
+        self.event_timer = nights(lambda s: s.environmental_event_timer)
+        self.next_event = nights(lambda s: s.next_event_time)
+        self.temperature = nights(lambda s: s.game_state.temperature)
+        self.ventilation_blocked = nights(lambda s: s.game_state.ventilation_blocked, bool)
+
+        # Per animatronic
+        route_length = max(len(anim.patrol_route) for sim in sims for anim in sim.animatronics)
+        self.route = anims(lambda a: [tables.index[r] for r in a.patrol_route] +
+                           [0] * (route_length - len(a.patrol_route)), int)
+        self.route_len = anims(lambda a: len(a.patrol_route), int)
+        self.patrol_index = anims(lambda a: a.patrol_index, int)
+        self.room = anims(lambda a: tables.index[a.room], int)
+        self.move_cooldown = anims(lambda a: a.move_cooldown)
+        self.move_interval = anims(lambda a: a.move_interval)
+        self.base_interval = anims(lambda a: a.base_interval)
+        self.base_aggro = anims(lambda a: a.base_aggro)
+        self.aggression_ramp = anims(lambda a: a.aggression_ramp)
+        self.start_delay = anims(lambda a: a.start_delay_minutes, int)
+        self.entry_delay = anims(lambda a: a.hallway_entry_delay)
+        self.attack_side = anims(lambda a: SIDES.index(a.attack_side), int)
+        self.patient = anims(lambda a: a.personality == "patient", bool)
+        self.erratic = anims(lambda a: a.personality == "erratic", bool)
+        self.patience = anims(lambda a: a.patience)
+        self.mood = anims(lambda a: a.mood_code, int)
+        self.mood_timer = anims(lambda a: a.mood_timer)
+        self.hunting_timer = anims(lambda a: a.hunting_timer)
+        self.hunting_mode = anims(lambda a: a.hunting_mode, bool)
+        self.communication_cooldown = anims(lambda a: a.communication_cooldown)
+        self.retreat_timer = anims(lambda a: a.retreat_timer)
+        self.hallway_timer = anims(lambda a: a.hallway_timer)
+        self.hallway_block_timer = anims(lambda a: a.hallway_block_timer)
+        self.attack_windup = anims(lambda a: a.attack_windup)
+        self.windup_required = anims(lambda a: a.attack_windup_required)
+        self.block_count = anims(lambda a: a.block_count, int)
+        self.ability = anims(lambda a: a.ability_code, int)
+        self.ability_cooldown = anims(lambda a: a.ability_cooldown, int)
+        self.memory_time = np.full(self.room.shape + (BLOCK_MEMORY,), -np.inf)
+        self.memory_side = np.zeros(self.room.shape + (BLOCK_MEMORY,), dtype=int)
+        self.memory_pos = np.zeros(self.room.shape, dtype=int)
+
+        # Everything with one row per night, so finished rows can be dropped together
+        self._row_fields = [name for name, value in vars(self).items()
+                            if isinstance(value, np.ndarray) and value.shape[:1] == (len(sims),)]
+
+    def __len__(self):
+        return len(self.power)
+
+    def playing(self):
+        """Rows whose night is still being played"""
+        return (self.state == PLAYING) & ~self.done
+
+    # =====================================================
+    # STEP
+    # =====================================================
+
+    def step(self, dt=DT, inputs=None):
+        """Advance every night by dt with this tick's policy inputs (Simulation.step order)
+
+        inputs optionally gives each row one more input for this tick, as an
+        index into INPUTS (NO_INPUT for none).
+        """
+        decided_at = self.now  # Scalar policies pick inputs before the step, from last tick's state
+        self.now += dt
+        self.apply_policy(self.tick, decided_at)
+        if inputs is not None:
+            self.apply_inputs(inputs)
+        self.tick += 1
+        self.update_power(dt)
+        self.update_time(dt)
+        self.update_animatronics(dt)
+        self.update_abilities(dt)
+        if self.events:
+            self.update_environmental_events(dt)
+        self.update_office_effects(dt)
+
+        ended = ~self.done & ((self.state != PLAYING) | (self.tick >= self.max_ticks))
+        if ended.any():
+            self.finish(np.nonzero(ended)[0], self.now)
+        if self.compact_finished and self.done.sum() * 4 > len(self):
+            self.compact()
+
+    def run(self):
+        """Step until every night has ended; returns the result records"""
+        while len(self) and not self.done.all():
+            self.step()
+        return self.results
+
+    def replace_rows(self, rows, sims, labels=None):
+        """Start new nights (same roster) in finished rows, so a fixed number keep running
+
+        Their timers move onto this batch's clock, so one running out exactly
+        on a tick can land a tick away from where Simulation has it.
+        """
+        fresh = BatchNights(sims, self.policy, labels, self.events, self.rng)
+        # The new nights' clocks start at fresh.now; every absolute time moves onto this batch's clock
+        shift = self.now - fresh.now
+        for name in ("jam_until", "side_cooldown_until", "jam_grace_until", "overload_grace_until",
+                     "coordination_until", "emergency_until", "toggle_times", "memory_time"):
+            setattr(fresh, name, getattr(fresh, name) + shift)
+        fresh.last_entry = np.where(fresh.last_entry > 0, fresh.last_entry + shift, fresh.last_entry)
+        fresh.max_ticks += self.tick
+        width = max(self.route.shape[2], fresh.route.shape[2])
+        for batch in (self, fresh):
+            batch.route = np.pad(batch.route, ((0, 0), (0, 0), (0, width - batch.route.shape[2])))
+        for name in self._row_fields:
+            if name != "row_id":
+                getattr(self, name)[rows] = getattr(fresh, name)
+        for row, label in zip(rows, fresh.labels):
+            self.labels[self.row_id[row]] = label
+
+    def compact(self):
+        """Drop finished rows so later ticks only pay for nights still running"""
+        keep = ~self.done
+        for name in self._row_fields:
+            setattr(self, name, getattr(self, name)[keep])
+
+    def finish(self, rows, sim_seconds):
+        """Record balance.py-style results for rows that just ended"""
+        for row in rows:
+            state = self.state[row]
+            survived = state == WIN
+            score = self.score[row] if survived else self.performance_score(np.array([row]))[0]
+            if state == ANTI_CHEAT:
+                killer = "Mr Hall"
+            else:
+                killer = self.names[self.killer[row]] if self.killer[row] >= 0 else None
+            self.results.append(dict(
+                self.labels[self.row_id[row]],
+                survived=bool(survived),
+                end_state=END_STATES[state],
+                death_minute=None if survived else int(self.minutes[row]),
+                killer=None if survived else killer,
+                power_left=round(float(self.power[row]), 2),
+                performance_score=int(score),
+                sim_seconds=round(sim_seconds, 2),
+                kernel="batch",
+            ))
+        self.done[rows] = True
+
+    def performance_score(self, rows):
+        """calculate_performance_score for the given rows"""
+        efficiency = (self.power[rows] / self.power_max) * 100
+        score = 1000 + (efficiency * 2).astype(int)
+        score -= self.door_closes[rows] * 5
+        score += np.minimum(self.camera_checks[rows] * 10, 300)
+        score += self.perfect_blocks[rows] * 50
+        score = (score * (1.0 + (self.night[rows] - 1) * 0.25)).astype(int)
+        score = (score * self.difficulty[rows]).astype(int)
+        return np.maximum(0, score)
+
+    # =====================================================
+    # PLAYER POLICIES
+    # =====================================================
+
+    def apply_policy(self, tick, decided_at):
+        """balance.py's scripted players, decided for every row at once (from the state at decided_at)"""
+        if self.policy == "idle" or tick % REACTION_TICKS:
+            return
+        # Like _door_inputs, decide both doors from the state before either is touched
+        # (never slamming a door within REFLEX_SECONDS of an entry through it, and shutting both for the vent)
+        side_of_room = self.tables.door_side[self.room]
+        entered = np.take_along_axis(self.last_entry, self.attack_side, axis=1)
+        settled = (self.room == self.tables.office) & (decided_at - entered >= REFLEX_SECONDS)
+        threatened = np.stack([((side_of_room == side) |
+                                (settled & ((self.attack_side == side) | (self.attack_side == VENT)))).any(axis=1)
+                               for side in (LEFT, RIGHT)], axis=1)
+        too_soon = decided_at - self.last_entry[:, :2] < REFLEX_SECONDS
+        toggle = (threatened != self.door_closed) & ~(threatened & ((self.jam_until > decided_at) | too_soon))
+        cams_open = self.cams_open.copy()
+        for side in (LEFT, RIGHT):
+            self.toggle_door(side, toggle[:, side])
+        if self.policy == "watcher":
+            glance = (tick // REACTION_TICKS) % 40
+            if glance == 0:
+                self.toggle_cameras(~cams_open)
+            elif glance == 4:
+                self.toggle_cameras(cams_open)
+
+    def apply_inputs(self, inputs):
+        """Each row's input from INPUTS, where Simulation.step applies its inputs"""
+        self.toggle_door(LEFT, inputs == DOOR_LEFT_INPUT)
+        self.toggle_door(RIGHT, inputs == DOOR_RIGHT_INPUT)
+        self.toggle_cameras(inputs == CAMERAS_INPUT)
+        self.toggle_flashlight(inputs == LIGHT_INPUT)
+
+    def toggle_door(self, side, mask):
+        """Simulation.toggle_door for the masked rows"""
+        rows = np.nonzero(mask & self.playing() & ~self.outage)[0]
+        if not rows.size:
+            return
+        pos = self.toggle_pos[rows, side]
+        self.toggle_times[rows, side, pos] = self.now
+        self.toggle_pos[rows, side] = (pos + 1) % TOGGLE_MEMORY
+        spam = rows[(self.now - self.toggle_times[rows, side] < 5.0).sum(axis=1) > 6]
+        self.spam_penalty[spam] += 8.0
+        self.door_health[spam, side] = np.maximum(0, self.door_health[spam, side] - 15)
+
+        was_closed = self.door_closed[rows, side]
+        self.door_closed[rows[was_closed], side] = False
+        closing = rows[~was_closed & (self.jam_until[rows, side] <= self.now) & (self.door_health[rows, side] > 0)]
+        self.door_closed[closing, side] = True
+        self.door_health[closing, side] = np.maximum(0, self.door_health[closing, side] - 6)
+        self.door_closes[closing] += 1
+        # Perfect block: an animatronic attacking through this door stands in a doorway room
+        doorway = self.tables.adjacency[self.room[closing], self.tables.office]
+        self.perfect_blocks[closing[(doorway & (self.attack_side[closing] == side)).any(axis=1)]] += 1
+
+        # Reflex slam right after an entry through this door
+        entry = self.last_entry[closing, side]
+        cheats = closing[(entry > 0) & (self.now - entry <= 1.2)]
+        if cheats.size:
+            self.state[cheats] = ANTI_CHEAT
+            self.finish(cheats, self.now + ANTI_CHEAT_SECONDS)
+
+    def toggle_cameras(self, mask):
+        """Simulation.toggle_cameras for the masked rows"""
+        rows = mask & self.playing() & ~self.outage
+        self.cams_open[rows] = ~self.cams_open[rows]
+        self.camera_checks[rows & self.cams_open] += 1
+
+    def toggle_flashlight(self, mask):
+        """Simulation.toggle_flashlight for the masked rows"""
+        rows = mask & self.playing() & ~self.outage & ~((self.lights_out > 0) & ~self.light_on)
+        self.light_on[rows] = ~self.light_on[rows]
+
+    # =====================================================
+    # POWER AND TIME
+    # =====================================================
+
+    def update_power(self, dt):
+        """Simulation.update_power, after Simulation.backup_power_depleted"""
+        depleted = self.outage & self.emergency & (self.emergency_until <= self.now)
+        if depleted.any():
+            self.emergency[depleted] = False
+            self.mood[depleted] = AGGRESSIVE
+            self.hunting_mode[depleted] = False
+            self.hunting_timer[depleted] = 0
+
+        empty = self.power <= 0
+        self.power[empty] = 0.0
+        outage = empty & ~self.outage
+        if outage.any():
+            self.outage[outage] = True
+            self.emergency[outage] = True
+            self.emergency_until[outage] = self.now + 45.0
+            self.door_closed[outage] = False
+            self.light_on[outage] = False
+            self.cams_open[outage] = False
+
+        emergency = self.outage & self.emergency
+        drain = self.power_drain_rate()
+        penalty = ~emergency & (self.spam_penalty > 0)
+        drain = np.where(penalty, drain + self.spam_penalty * dt, drain)
+        self.spam_penalty = np.where(penalty, np.maximum(0, self.spam_penalty - dt * 2.0), self.spam_penalty)
+        self.power = np.where(emergency, self.power, np.maximum(self.power - drain * dt, 0))
+
+    def power_drain_rate(self):
+        """Simulation.power_drain_rate, term by term in the same order"""
+        speed = 0.5 + (self.seconds_per_hour / 60.0 * 0.5)
+        minute = self.minutes % 60
+        surge = np.where(((15 <= minute) & (minute <= 17)) | ((30 <= minute) & (minute <= 32)) |
+                         ((45 <= minute) & (minute <= 47)), 1.35, 1.0)
+        drain = self.base_drain * speed * surge * self.difficulty
+        drain = drain + np.where(self.door_closed.any(axis=1), self.door_drain * speed * surge * self.difficulty, 0.0)
+        drain = drain + np.where(self.light_on, self.light_drain * speed * surge * self.difficulty, 0.0)
+        drain = drain + np.where(self.cams_open, self.cam_drain * speed * surge * self.difficulty, 0.0)
+        return drain
+
+    def update_time(self, dt):
+        """Simulation.update_time"""
+        seconds_per_minute = np.maximum(0.01, self.seconds_per_hour / 60.0)
+        self.hour_timer += dt
+        ticking = self.playing() & (self.hour_timer >= seconds_per_minute)
+        while ticking.any():
+            self.hour_timer[ticking] -= seconds_per_minute[ticking]
+            self.minutes[ticking] += 1
+            won = ticking & (self.minutes >= NIGHT_MINUTES)
+            if won.any():
+                self.score[won] = self.performance_score(won)
+                self.state[won] = WIN
+            ticking &= ~won & (self.hour_timer >= seconds_per_minute)
+
+    # =====================================================
+    # ANIMATRONICS
+    # =====================================================
+
+    def update_animatronics(self, dt):
+        """Simulation.update_animatronics: update, coordinate, then the door/attack pass"""
+        self.update_each(dt)
+        self.coordinate(dt)
+        self.door_pass(dt)
+
+    def update_each(self, dt):
+        """Animatronic.update for every animatronic of every night"""
+        tables = self.tables
+        minutes = self.minutes[:, None]
+        night = self.night[:, None]
+        difficulty = self.difficulty[:, None]
+
+        self.mood_timer += dt
+        awake = minutes >= self.start_delay
+        retreating = awake & (self.retreat_timer > 0)
+        self.retreat_timer = np.where(retreating, np.maximum(0.0, self.retreat_timer - dt), self.retreat_timer)
+        active = awake & ~retreating
+
+        hunting = active & (self.hunting_timer > 0)
+        self.hunting_timer = np.where(hunting, self.hunting_timer - dt, self.hunting_timer)
+        self.hunting_mode = np.where(active, hunting, self.hunting_mode)
+
+        rethink = active & (self.mood_timer >= 2.0)
+        if rethink.any():
+            top, period = MOOD_SCHEDULE.top_block, MOOD_SCHEDULE.top_period
+            block_row = np.where(self.block_count >= top, top + (self.block_count - top) % period, self.block_count)
+            night_row = np.clip(night, 1, tables.moods.shape[0]) - 1
+            scheduled = tables.moods[night_row, block_row, np.clip(minutes, 0, MOOD_SCHEDULE.minutes)]
+            mood = np.where(self.hunting_mode, HUNTING, scheduled)
+            self.mood = np.where(rethink, mood, self.mood)
+            self.mood_timer = np.where(rethink, 0.0, self.mood_timer)
+
+        adaptive_aggro = np.minimum((self.base_aggro * difficulty) + (self.block_count * 0.05) +
+                                    (minutes / 360.0) * self.aggression_ramp + (night - 1) * 0.12, 2.0)
+        interval = np.maximum(0.7, (self.move_interval / np.maximum(0.6, difficulty)) / (1.0 + adaptive_aggro * 0.6))
+        self.move_cooldown = np.where(active, self.move_cooldown - dt, self.move_cooldown)
+        moving = active & (self.move_cooldown <= 0)
+        if moving.any():
+            self.move_cooldown = np.where(moving, self.move_cooldown + interval, self.move_cooldown)
+            chasing = moving & (self.hunting_mode | (self.mood == AGGRESSIVE) | (self.mood == HUNTING))
+            patrolling = moving & ~chasing
+            self.patrol_index = np.where(patrolling, (self.patrol_index + 1) % self.route_len, self.patrol_index)
+            patrol_room = np.take_along_axis(self.route, self.patrol_index[..., None], axis=2)[..., 0]
+            self.room = np.where(chasing, tables.next_hop[self.room], np.where(patrolling, patrol_room, self.room))
+
+        talking = active & (self.communication_cooldown > 0)
+        self.communication_cooldown = np.where(talking, self.communication_cooldown - dt, self.communication_cooldown)
+
+        # Personalities that change the rules (the rest are cosmetic or recomputed every tick)
+        patient = active & self.patient
+        self.move_interval = np.where(patient, self.base_interval * (1.5 * self.patience), self.move_interval)
+        erratic = active & self.erratic
+        if erratic.any():
+            flip = erratic & (self.rng.random(erratic.shape) < 1.0 - 0.95 ** (dt * 60))
+            choice = np.array([AGGRESSIVE, CAUTIOUS, NEUTRAL])[self.rng.integers(0, 3, erratic.shape)]
+            self.mood = np.where(flip, choice, self.mood)
+
+    def coordinate(self, dt):
+        """Simulation.coordinate_animatronics"""
+        if self.room.shape[1] < 2:
+            return
+        joining = (self.hunting_mode.any(axis=1)[:, None] & ~self.hunting_mode &
+                   (self.communication_cooldown <= 0) & ((self.block_count + int(self.now)) % 2 == 0))
+        if joining.any():
+            self.hunting_mode |= joining
+            self.mood[joining] = CAUTIOUS
+            self.hunting_timer[joining] = 6.0
+            self.communication_cooldown[joining] = 6.0
+
+        # Attack from the other side if the player keeps blocking one
+        recent = self.now - self.memory_time < 60.0
+        remembers = (recent.sum(axis=2) > 2) & (self.attack_side != VENT)
+        if remembers.any():
+            lefts = (recent & (self.memory_side == LEFT)).sum(axis=2)
+            rights = (recent & (self.memory_side == RIGHT)).sum(axis=2)
+            self.attack_side = np.where(remembers & (lefts > rights), RIGHT,
+                                        np.where(remembers & (rights > lefts), LEFT, self.attack_side))
+
+        # Pack hunting
+        at_office = self.room == self.tables.office
+        pack = (at_office.sum(axis=1) >= 2) & (self.coordination_until <= self.now) & (self.minutes >= 60)
+        if pack.any():
+            joined = pack[:, None] & at_office
+            self.mood[joined] = AGGRESSIVE
+            self.block_count[joined] += 1
+            self.coordination_until[pack] = self.now + 12.0
+
+    def door_pass(self, dt):
+        """Third pass of update_animatronics: door pressure, entering, blocks and attacks
+
+        Animatronics go one at a time (later ones see earlier ones' moves), each
+        one for all nights at once, and a night stops at its first jumpscare.
+        """
+        tables = self.tables
+        rows = np.arange(len(self))
+        struck = np.zeros(len(self), dtype=bool)
+        required = np.maximum(0.45, (self.windup_required / np.maximum(0.8, self.difficulty[:, None])) -
+                              (self.night[:, None] - 1) * 0.1)
+        for a in range(self.room.shape[1]):
+            side_of_room = tables.door_side[self.room[:, a]]
+            door = np.maximum(side_of_room, 0)
+            at_door = ~struck & (side_of_room >= 0)
+            door_closed = self.door_closed[rows, door]
+
+            held = rows[at_door & door_closed]
+            if held.size:
+                side = door[held]
+                self.hallway_timer[held, a] = 0.0
+                self.hallway_block_timer[held, a] += dt
+                self.door_health[held, side] = np.maximum(0.0, self.door_health[held, side] -
+                                                          (3.2 * self.difficulty[held]) * dt)
+                broken = (self.door_health[held, side] <= 0) & (self.jam_until[held, side] <= self.now)
+                self.break_door(held[broken], side[broken])
+                # Frustrated at a closed door: back off for a while
+                leaving = held[self.hallway_block_timer[held, a] >= 3.0]
+                room = self.room[leaving, a]
+                pick = self.block_count[leaving, a] % tables.door_retreat_count[room]
+                self.room[leaving, a] = tables.door_retreat[room, pick]
+                self.retreat_timer[leaving, a] = 8.0
+                self.hallway_block_timer[leaving, a] = 0.0
+
+            waiting = rows[at_door & ~door_closed]
+            if waiting.size:
+                self.hallway_timer[waiting, a] += dt
+                self.hallway_block_timer[waiting, a] = 0.0
+                side = self.attack_side[waiting, a]
+                in_office = self.room[waiting] == tables.office
+                same_side = (in_office & (self.attack_side[waiting] == side[:, None])).any(axis=1)
+                can_enter = ((self.hallway_timer[waiting, a] >= self.entry_delay[waiting, a]) &
+                             (self.side_cooldown_until[waiting, side] <= self.now) & ~same_side &
+                             (in_office.sum(axis=1) < self.max_attackers[waiting]) &
+                             (self.jam_grace_until[waiting] <= self.now) &
+                             (self.overload_grace_until[waiting] <= self.now))
+                entering, side = waiting[can_enter], side[can_enter]
+                self.room[entering, a] = tables.office
+                self.hallway_timer[entering, a] = 0.0
+                self.attack_windup[entering, a] = 0.0
+                self.side_cooldown_until[entering, side] = self.now + self.entry_cooldown[entering]
+                self.last_entry[entering, side] = self.now
+
+            away = ~struck & (side_of_room < 0)
+            self.hallway_timer[away, a] = 0.0
+            self.hallway_block_timer[away, a] = 0.0
+
+            in_office = ~struck & (self.room[:, a] == tables.office)
+            side = self.attack_side[:, a]
+            left, right = self.door_closed[:, LEFT], self.door_closed[:, RIGHT]
+            shut = np.where(side == LEFT, left, np.where(side == RIGHT, right, left & right))
+            blocked = rows[in_office & shut]
+            if blocked.size:
+                self.handle_blocked(blocked, a)
+
+            attacking = in_office & ~shut
+            self.attack_windup[:, a] = np.where(attacking, self.attack_windup[:, a] + dt,
+                                                np.where(struck, self.attack_windup[:, a], 0.0))
+            killed = attacking & (self.attack_windup[:, a] >= required[:, a])
+            if killed.any():
+                self.state[killed] = JUMPSCARE
+                self.killer[killed] = a
+                struck |= killed
+
+    def handle_blocked(self, rows, a):
+        """Animatronic.handle_blocked: learn, change mood and retreat from the Office"""
+        tables = self.tables
+        self.block_count[rows, a] += 1
+        blocks = self.block_count[rows, a]
+        self.hunting_timer[rows, a] = np.where(blocks >= 3, 15.0, np.where(blocks >= 2, 8.0, 0.0))
+        self.mood[rows, a] = np.where(blocks >= 3, AGGRESSIVE, CAUTIOUS)
+        self.room[rows, a] = tables.office_retreat[blocks % len(tables.office_retreat)]
+        self.retreat_timer[rows, a] = 4.0
+        pos = self.memory_pos[rows, a]
+        self.memory_time[rows, a, pos] = self.now
+        self.memory_side[rows, a, pos] = self.attack_side[rows, a]
+        self.memory_pos[rows, a] = (pos + 1) % BLOCK_MEMORY
+
+    def break_door(self, rows, sides):
+        """Simulation.break_door for (row, side) pairs"""
+        self.door_closed[rows, sides] = False
+        self.jam_until[rows, sides] = self.now + DOOR_JAM_SECONDS
+        self.jam_grace_until[rows] = np.maximum(self.jam_grace_until[rows], self.now + 3.0)
+
+    # =====================================================
+    # SPECIAL ABILITIES
+    # =====================================================
+
+    def update_abilities(self, dt):
+        """Simulation.update_abilities: the effect tick every EFFECT_TICK seconds"""
+        self.effect_timer += dt
+        due = self.effect_timer >= EFFECT_TICK
+        while due.any():
+            self.effect_timer[due] -= EFFECT_TICK
+            self.ability_tick(due)
+            due = self.effect_timer >= EFFECT_TICK
+
+    def ability_tick(self, due):
+        """Simulation.ability_tick for the due rows (the abilities that change the rules)"""
+        tables = self.tables
+        lights = due & (self.lights_out > 0)
+        self.lights_out[lights] = np.maximum(0.0, self.lights_out[lights] - EFFECT_TICK)
+        self.light_on[lights & (self.lights_out <= 0) & ~self.outage] = True
+
+        counting = due[:, None] & (self.ability_cooldown > 0)
+        self.ability_cooldown[counting] -= 1
+        ready = (due[:, None] & (self.ability_cooldown == 0) & (self.minutes[:, None] >= self.start_delay) &
+                 (self.retreat_timer <= 0))
+        distance = tables.distance[self.room]
+
+        def using(name, condition=True):
+            code = ABILITY_CODES[name]
+            low, high = ABILITY_HOPS[code]
+            return ready & (self.ability == code) & (low <= distance) & (distance <= high) & condition
+
+        side_of_room = tables.door_side[self.room]
+        door = np.maximum(side_of_room, 0)
+        killers = using("light_killer", (self.light_on & ~self.outage)[:, None])
+        drainers = using("power_drainer", ~self.outage[:, None])
+        breakers = using("door_breaker", (side_of_room >= 0) & np.take_along_axis(self.door_closed, door, axis=1))
+        dashers = using("speed_demon")
+        jumpers = using("teleporter")
+
+        # Effects on the animatronic itself happen right away
+        self.move_cooldown[dashers] -= SPEED_DEMON_DASH
+        self.room[jumpers] = tables.next_hop[tables.next_hop[self.room[jumpers]]]
+        fired = killers | drainers | breakers | dashers | jumpers
+        self.ability_cooldown = np.where(fired, np.array(ABILITY_COOLDOWN_TICKS)[self.ability], self.ability_cooldown)
+
+        # The rest is summed per night in animatronic order, then applied once
+        drain = np.zeros(len(self))
+        damage = np.zeros((len(self), 2))
+        for a in range(self.room.shape[1]):
+            drain += np.where(drainers[:, a], POWER_DRAINER_RATE * EFFECT_TICK, 0.0)
+            hit = breakers[:, a]
+            damage[hit, door[hit, a]] += DOOR_BREAKER_DAMAGE * EFFECT_TICK
+
+        drained = (drain > 0) & ~self.outage
+        self.power[drained] = np.maximum(0, self.power[drained] - drain[drained])
+        for side in (LEFT, RIGHT):
+            rows = np.nonzero(damage[:, side])[0]
+            self.door_health[rows, side] = np.maximum(0.0, self.door_health[rows, side] - damage[rows, side])
+            broken = rows[(self.door_health[rows, side] <= 0) & (self.jam_until[rows, side] <= self.now)]
+            if broken.size:
+                self.break_door(broken, side)
+        out = killers.any(axis=1)
+        self.light_on[out] = False
+        self.lights_out[out] = np.maximum(self.lights_out[out], ABILITY_DURATIONS[ABILITY_CODES["light_killer"]])
+
+    # =====================================================
+    # WORLD
+    # =====================================================
+
+    def update_environmental_events(self, dt):
+        """Simulation.update_environmental_events (only the events that change the rules)"""
+        self.event_timer += dt
+        rows = np.nonzero(self.event_timer >= self.next_event)[0]
+        if not rows.size:
+            return
+        night = self.night[rows]
+        choices = BASE_EVENTS + 2 * (night >= 3) + 2 * (night >= 4)
+        event = (self.rng.random(rows.size) * choices).astype(int)
+
+        hit = rows[event == TEMPERATURE_DROP]
+        self.temperature[hit] -= self.rng.integers(5, 16, hit.size)
+        cold = hit[self.temperature[hit] < 50]
+        self.move_interval[cold] *= 1.2
+
+        hit = rows[(event == VENTILATION_BLOCK) & ~self.ventilation_blocked[rows]]
+        self.ventilation_blocked[hit] = True
+        self.base_drain[hit] *= 1.3
+
+        hit = rows[event == POWER_SURGE]
+        self.power[hit] = np.maximum(0, self.power[hit] - self.rng.uniform(5, 15, hit.size))
+
+        hit = rows[event == DOOR_MALFUNCTION]
+        side = np.where(self.rng.random(hit.size) < 0.5, LEFT, RIGHT)
+        self.door_health[hit, side] = np.maximum(20, self.door_health[hit, side] - 25)
+
+        hit = rows[event == POWER_DRAIN]
+        self.power[hit] = np.maximum(0, self.power[hit] - self.rng.uniform(2, 5, hit.size))
+
+        hit = rows[event == ANIMATRONIC_RUSH]
+        if hit.size:
+            affected = np.arange(self.room.shape[1])[None, :] < self.rng.integers(1, 4, hit.size)[:, None]
+            self.mood[hit] = np.where(affected, CAUTIOUS, self.mood[hit])
+            self.hunting_mode[hit] &= ~affected
+
+        self.event_timer[rows] = 0
+        self.next_event[rows] = self.rng.uniform(20, 45, rows.size)
+
+    def update_office_effects(self, dt):
+        """The rule parts of Simulation.update_office_effects and update_fairness_caps"""
+        wear = (1.2 * self.difficulty[:, None]) * dt
+        self.door_health = np.where(self.door_closed, np.maximum(0, self.door_health - wear), 100.0)
+        broken = self.door_closed & (self.door_health <= 0) & (self.jam_until <= self.now)
+        for side in (LEFT, RIGHT):
+            rows = np.nonzero(broken[:, side])[0]
+            if rows.size:
+                self.break_door(rows, side)
+
+        doors_open = (~self.door_closed).sum(axis=1)
+        avg_health = (self.door_health[:, LEFT] + self.door_health[:, RIGHT]) / 2.0
+        low_power = self.power < 20
+        weak = ((doors_open >= 2) | low_power | self.outage | (avg_health < 30) |
+                (self.jam_until > self.now).any(axis=1) | (self.jam_grace_until > self.now) |
+                (self.overload_grace_until > self.now))
+        self.max_attackers = np.where(weak, 1, 2)
+        cooldown = (6.0 + np.where(low_power, 2.0, 0.0) + np.where(self.outage, 1.5, 0.0) +
+                    np.where(avg_health < 30, 2.0, 0.0) + np.where(doors_open >= 2, 1.0, 0.0))
+        self.entry_cooldown = np.maximum(6.0, np.minimum(12.0, cooldown))
+
+
+# =====================================================
+# RUNNING AND CROSS-CHECKING
+# =====================================================
+
+def run_jobs(jobs, policy, events=True):
+    """Play (night, difficulty, seconds_per_hour, index, seed) jobs as one batch; returns records"""
+    sims = [start_night(night, difficulty, sph, seed) for night, difficulty, sph, index, seed in jobs]
+    labels = [{"night": night, "difficulty": difficulty, "seconds_per_hour": sph, "policy": policy,
+               "index": index, "seed": seed} for night, difficulty, sph, index, seed in jobs]
+    return BatchNights(sims, policy, labels, events=events).run()
+
+
+def _scalar_snapshot(sim, tables):
+    """What the cross-check compares, read from a scalar Simulation"""
+    state = sim.game_state.state
+    code = {"playing": PLAYING, "win": WIN, "jumpscare": JUMPSCARE, "anti_cheat": ANTI_CHEAT}[state]
+    rooms = mood = ()
+    if code == PLAYING:
+        rooms = tuple(tables.index[anim.room] for anim in sim.animatronics)
+        mood = tuple(anim.mood_code for anim in sim.animatronics)
+    return {"state": code, "rooms": rooms, "moods": mood, "power": sim.power.current,
+            "doors": (sim.office.door_left_closed, sim.office.door_right_closed),
+            "minutes": sim.game_state.minutes_elapsed,
+            "score_counts": (sim.total_door_closes, sim.total_camera_checks, sim.perfect_blocks),
+            "score": sim.performance_score if code == WIN else 0}
+
+
+def _batch_snapshot(batch, row):
+    """The same fields for one row of a BatchNights"""
+    playing = batch.state[row] == PLAYING
+    return {"state": int(batch.state[row]),
+            "rooms": tuple(int(r) for r in batch.room[row]) if playing else (),
+            "moods": tuple(int(m) for m in batch.mood[row]) if playing else (),
+            "power": float(batch.power[row]),
+            "doors": tuple(bool(d) for d in batch.door_closed[row]),
+            "minutes": int(batch.minutes[row]),
+            "score_counts": (int(batch.door_closes[row]), int(batch.camera_checks[row]),
+                             int(batch.perfect_blocks[row])),
+            "score": int(batch.score[row]) if batch.state[row] == WIN else 0}
+
+
+def cross_check(count, night, difficulty, seconds_per_hour, policy, base_seed=0):
+    """Play nights in both engines tick by tick; returns [(seed, None or first difference)]"""
+    jobs = []
+    index = 0
+    while len(jobs) < count:
+        seed = balance.run_seed_for(base_seed, night, difficulty, seconds_per_hour, policy, index)
+        sim = start_night(night, difficulty, seconds_per_hour, seed)
+        if not any(anim.personality == "erratic" for anim in sim.animatronics):
+            jobs.append(seed)
+        index += 1
+
+    batch = BatchNights([start_night(night, difficulty, seconds_per_hour, seed) for seed in jobs],
+                        policy, events=False)
+    batch.compact_finished = False  # Keep row i lined up with scalar night i
+    scalars = []
+    for seed in jobs:
+        sim = start_night(night, difficulty, seconds_per_hour, seed)
+        sim.ai_lod_interval = 1  # Every animatronic thinks every tick, like the batch
+        sim.next_event_time = float("inf")
+        scalars.append(sim)
+
+    act = balance.POLICIES[policy]
+    differences = [None] * len(jobs)
+    open_rows = set(range(len(jobs)))
+    tick = 0
+    while open_rows and tick < batch.max_ticks.max():
+        for row in open_rows:
+            scalars[row].step(DT, act(scalars[row], tick))
+        batch.step(DT)
+        tick += 1
+        for row in sorted(open_rows):
+            expected = _scalar_snapshot(scalars[row], batch.tables)
+            got = _batch_snapshot(batch, row)
+            for field, value in expected.items():
+                if expected["state"] == ANTI_CHEAT and field != "state":
+                    continue  # The scalar night stopped mid-tick; the rest of the row is not compared
+                same = abs(value - got[field]) <= 1e-9 if field == "power" else value == got[field]
+                if not same:
+                    differences[row] = f"tick {tick}: {field} scalar {value!r}, batch {got[field]!r}"
+                    break
+            if differences[row] or expected["state"] != PLAYING:
+                open_rows.discard(row)
+    return list(zip(jobs, differences))
+
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+def main(argv=None):
+    """Run the missing nights of the grid in batches (or cross-check against the scalar sim)"""
+    parser = argparse.ArgumentParser(description="NumPy batch night engine")
+    parser.add_argument("--nights", type=balance._int_range, default=[1, 2, 3, 4, 5], help="e.g. 1-5 or 1,3")
+    parser.add_argument("--difficulty", type=balance._float_list, default=[1.2], help="comma-separated")
+    parser.add_argument("--sph", type=balance._float_list, default=[60.0], help="seconds per in-game hour")
+    parser.add_argument("--policy", default="doors", help=f"comma-separated, any of: {', '.join(balance.POLICIES)}")
+    parser.add_argument("--runs", type=int, default=1000, help="nights per cell")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for the whole grid")
+    parser.add_argument("--batch-size", type=int, default=4096, help="nights stepped together")
+    parser.add_argument("--no-events", action="store_true", help="turn environmental events off")
+    parser.add_argument("--out", default="balance_batch.jsonl", help="results file (appended, resumable)")
+    parser.add_argument("--cross-check", type=int, default=0, metavar="N",
+                        help="compare N nights per cell tick by tick against the scalar simulation")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("batch.py needs numpy: pip install -r requirements-tools.txt")
+        return 1
+    policies = [p for p in args.policy.split(",") if p]
+    unknown = [p for p in policies if p not in balance.POLICIES]
+    if unknown:
+        parser.error(f"unknown policy: {', '.join(unknown)}")
+
+    cells = [(night, difficulty, sph, policy) for night in args.nights for difficulty in args.difficulty
+             for sph in args.sph for policy in policies]
+
+    if args.cross_check:
+        failures = 0
+        for night, difficulty, sph, policy in cells:
+            results = cross_check(args.cross_check, night, difficulty, sph, policy, args.seed)
+            bad = [(seed, diff) for seed, diff in results if diff]
+            failures += len(bad)
+            print(f"night {night} diff {difficulty:.2f} s/hr {sph:.0f} {policy}: "
+                  f"{len(results) - len(bad)}/{len(results)} nights identical")
+            for seed, diff in bad[:5]:
+                print(f"  seed {seed}: {diff}")
+        return 1 if failures else 0
+
+    records = balance.load_results(args.out)
+    done = {balance.run_key(r) for r in records}
+    print("Five Nights at Mr Ingles's - Batch Night Engine")
+    for policy in policies:
+        jobs = [(night, difficulty, sph, index, seed)
+                for night, difficulty, sph, cell_policy in cells if cell_policy == policy
+                for index in range(args.runs)
+                for seed in (balance.run_seed_for(args.seed, night, difficulty, sph, policy, index),)
+                if (night, float(difficulty), float(sph), policy, index, "batch", seed) not in done]
+        print(f"  {policy}: {len(jobs)} nights to go")
+        with open(args.out, "a", encoding="utf-8") as out:
+            for start in range(0, len(jobs), args.batch_size):
+                chunk = jobs[start:start + args.batch_size]
+                for record in run_jobs(chunk, policy, events=not args.no_events):
+                    out.write(json.dumps(record) + "\n")
+                print(f"\r  {start + len(chunk)}/{len(jobs)} nights simulated", end="", flush=True)
+        if jobs:
+            print()
+
+    balance.print_summary(balance.summarize(balance.load_results(args.out)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
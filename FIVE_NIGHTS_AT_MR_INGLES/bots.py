@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Bot players for Five Nights at Mr Ingles's.
+
+A bot plays a night with the same actions the keyboard queues in
+Game.handle_input (("toggle_door", "left"), ("switch_camera", 2), ...), so
+they go through Simulation.apply_input like a human's: they are recorded in
+replays, count for the anti-cheat and run every bit of the real gameplay
+code. It only gets to see what a player at the desk could - an Observation
+with the power, the time, what the current camera feed (or the office, with
+the cameras down) shows, door health, threat_level and the knocks and
+footsteps the night has made audible - never the animatronics themselves.
+
+    sim = Simulation(run_seed=42)
+    sim.start_night(3)
+    sim.begin_playing()
+    play_night(BOTS["expert"](seed=1), sim)
+    sim.game_state.state          # "win", "jumpscare", ...
+
+A bot is a Bot subclass with act(obs) returning a list of actions; it is
+asked every reaction_ticks ticks (4 times a second by default). The
+reference bots are "random", "door-camper", "camera-watcher" and "expert";
+balance.py takes any of them as a --policy.
+
+Play every bot through nights 1-5 and compare (add --record to keep replays):
+
+    python bots.py --bots random,door-camper,camera-watcher,expert --runs 20
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+from simulation import Simulation, room_graph, current_map
+
+BOT_DT = 1 / 60  # Same step the game runs at
+BOT_REACTION_TICKS = 15  # Bots look at the office 4 times a second
+FOOTSTEP_RANGE = 2  # Footsteps this many rooms from the office or closer are heard (and logged)
+
+
+# =====================================================
+# OBSERVATIONS
+# =====================================================
+
+class Observation:
+    """What a player at the desk knows at one moment of the night"""
+    __slots__ = (
+        "night", "minute", "seconds", "power", "outage", "threat_level",
+        "door_left_closed", "door_right_closed", "door_left_health", "door_right_health",
+        "door_left_jammed", "door_right_jammed", "light_on", "cams_open", "camera", "camera_room",
+        "camera_contents", "office_contents", "knocks", "footsteps", "noise_maker_charges", "hiding",
+    )
+
+    def door_closed(self, side):
+        return self.door_left_closed if side == "left" else self.door_right_closed
+
+    def door_health(self, side):
+        return self.door_left_health if side == "left" else self.door_right_health
+
+    def door_jammed(self, side):
+        return self.door_left_jammed if side == "left" else self.door_right_jammed
+
+
+def camera_contents(sim):
+    """(name, attack_side) of every animatronic the current feed shows, as Game.draw_camera_view draws it"""
+    cameras = sim.cameras
+    if not sim.office.cams_open or cameras.jam_timer > 0:
+        return ()
+    room = cameras.current_camera()
+    shown = [(anim.name, anim.attack_side) for anim in sim.occupancy.occupants(room)]
+    if cameras.mimic_room == room:
+        # Mimic: a convincing copy of an animatronic that is really somewhere else
+        mimic = next((anim for anim in sim.animatronics if anim.name == cameras.mimic_name), None)
+        if mimic is not None:
+            shown.append((mimic.name, mimic.attack_side))
+    return tuple(shown)
+
+
+def office_contents(sim):
+    """(name, attack_side) of every animatronic in the office, which Game.draw_office_view shows with the cameras down"""
+    if sim.office.cams_open:
+        return ()
+    return tuple((anim.name, anim.attack_side) for anim in sim.occupancy.occupants("Office"))
+
+
+class PlayerView:
+    """Simulation observer that turns the night into Observations for a bot"""
+    def __init__(self, sim):
+        self.sim = sim
+        self.knocks = 0  # door_knock sounds since the last observation
+        sim.add_observer(self)
+
+    def __call__(self, event, data):
+        if event == "sound" and data["name"] == "door_knock":
+            self.knocks += 1
+
+    def observe(self):
+        """The night as the player sees it right now"""
+        sim = self.sim
+        office = sim.office
+        graph = room_graph()
+        obs = Observation()
+        obs.night = sim.game_state.night
+        obs.minute = sim.game_state.minutes_elapsed
+        obs.seconds = sim.clock.now
+        obs.power = sim.power.current
+        obs.outage = sim.power.outage
+        obs.threat_level = sim.threat_level
+        obs.door_left_closed = office.door_left_closed
+        obs.door_right_closed = office.door_right_closed
+        obs.door_left_health = office.door_left_health
+        obs.door_right_health = office.door_right_health
+        obs.door_left_jammed = sim.door_jammed("left")
+        obs.door_right_jammed = sim.door_jammed("right")
+        obs.light_on = office.light_on
+        obs.cams_open = office.cams_open
+        obs.camera = sim.cameras.current_index
+        obs.camera_room = sim.cameras.current_camera()
+        obs.camera_contents = camera_contents(sim)
+        obs.office_contents = office_contents(sim)
+        obs.knocks = self.knocks
+        obs.footsteps = tuple(step["location"] for step in sim.footstep_sounds
+                              if graph.distance_to_office(step["location"]) <= FOOTSTEP_RANGE)
+        obs.noise_maker_charges = office.noise_maker_charges
+        obs.hiding = sim.current_safe_spot is not None
+        self.knocks = 0
+        return obs
+
+
+def player_actions(sim):
+    """Every action a player can take on this map, in handle_input's terms"""
+    actions = [("toggle_door", "left"), ("toggle_door", "right"), ("toggle_flashlight",), ("toggle_cameras",)]
+    actions += [("switch_camera", index) for index in range(len(sim.cameras.cameras))]
+    actions += [("use_barricade",), ("toggle_vent_system",), ("use_safe_spot",)]
+    actions += [("deploy_noise_maker", room) for room in sim.noise_maker_rooms]
+    return actions
+
+
+# =====================================================
+# BOTS
+# =====================================================
+
+class Bot:
+    """A player policy: act(obs) returns the actions to take (possibly none)"""
+    REFLEX_SECONDS = 1.25  # Slamming a door sooner than this after an entry sets off the anti-cheat
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.actions = []
+        self.entered = {}
+        self.seen_in_office = set()
+
+    def reset(self, sim):
+        """Start of a night; sim is only for what the player knows up front (the map)"""
+        self.actions = player_actions(sim)
+        self.entered = {"left": float("-inf"), "right": float("-inf")}  # door -> latest entry seen through it
+        self.seen_in_office = set()
+
+    def act(self, obs):
+        return []
+
+    def door_inputs(self, obs, wanted):
+        """Toggles that get each door to closed (side in wanted) or open, where it can be
+
+        An open door is never slammed within REFLEX_SECONDS of an entry seen
+        through it, whatever the reason for wanting it shut.
+        """
+        if not obs.cams_open:
+            for name, attack_side in obs.office_contents:
+                if name not in self.seen_in_office and attack_side in self.entered:
+                    self.entered[attack_side] = obs.seconds
+            self.seen_in_office = {name for name, _ in obs.office_contents}
+        inputs = []
+        for side in ("left", "right"):
+            want_closed = side in wanted
+            if want_closed == obs.door_closed(side):
+                continue
+            if want_closed and (obs.door_jammed(side) or obs.door_health(side) <= 0):
+                continue
+            if want_closed and obs.seconds - self.entered[side] < self.REFLEX_SECONDS:
+                continue
+            inputs.append(("toggle_door", side))
+        return inputs
+
+
+class RandomBot(Bot):
+    """Mashes a random button now and then - a floor for every other bot"""
+    ACTION_CHANCE = 0.25  # Chance of pressing something at each reaction
+
+    def act(self, obs):
+        if self.rng.random() < self.ACTION_CHANCE:
+            return [self.rng.choice(self.actions)]
+        return []
+
+
+class DoorCamperBot(Bot):
+    """Keeps both doors shut all night and never looks at anything"""
+    def act(self, obs):
+        if obs.outage:
+            return []
+        return self.door_inputs(obs, ("left", "right"))
+
+
+class SightingsBot(Bot):
+    """A bot that remembers where it last saw each animatronic on camera"""
+    def reset(self, sim):
+        super().reset(sim)
+        building = current_map()
+        self.graph = room_graph()
+        self.seen = {}  # name -> (room, attack_side) of its last sighting
+        self.cameras = list(building.cameras)
+        # Cameras that look into each doorway (a vent crawler in either is a threat to both doors)
+        self.doorway_cameras = [building.camera_index[room] for side in ("left", "right")
+                                for room in building.doorways[side] if room in building.camera_index]
+
+    def look(self, obs):
+        """Update sightings from the camera feed"""
+        if not obs.cams_open:
+            return
+        shown = dict(obs.camera_contents)
+        for name, (room, _) in list(self.seen.items()):
+            if room == obs.camera_room and name not in shown:
+                del self.seen[name]  # Not where it was last seen any more
+        for name, side in shown.items():
+            self.seen[name] = (obs.camera_room, side)
+
+    def sighted_sides(self):
+        """Doors with an animatronic last seen in a doorway (its own door, and the doorway's)"""
+        sides = set()
+        for room, attack_side in self.seen.values():
+            side = self.graph.office_door_side(room)
+            if side:
+                sides.update(("left", "right") if attack_side == "vent" else (side, attack_side))
+        return sides
+
+
+class CameraWatcherBot(SightingsBot):
+    """Lives on the cameras, flicking through every feed, and shuts whichever door it sees something at"""
+    CAMERA_SECONDS = 1.0  # Time on each feed
+
+    def reset(self, sim):
+        super().reset(sim)
+        self.next_switch = 0.0
+
+    def act(self, obs):
+        if obs.outage:
+            return []
+        self.look(obs)
+        inputs = self.door_inputs(obs, self.sighted_sides())
+        if not obs.cams_open:
+            inputs.append(("toggle_cameras",))
+        elif obs.seconds >= self.next_switch:
+            inputs.append(("switch_camera", (obs.camera + 1) % len(self.cameras)))
+            self.next_switch = obs.seconds + self.CAMERA_SECONDS
+        return inputs
+
+
+class ExpertBot(SightingsBot):
+    """Listens for footsteps and knocks, glances at the doorways, and spends power and gadgets carefully"""
+    DANGER_SECONDS = 2.0  # A door stays shut this long after the last sign of something outside it
+    GLANCE_SECONDS = 2.0  # Time between camera glances at the doorways
+    LOW_POWER = 30.0  # Below this the cameras stay down
+    BARRICADE_HEALTH = 35.0  # Barricade a shut door weaker than this...
+    BARRICADE_POWER = 35.0  # ...if there is this much power to spare
+    HIDE_THREAT = 70  # Hide when the threat level is this high and a door can't be shut
+
+    def reset(self, sim):
+        super().reset(sim)
+        self.noise_rooms = sorted(sim.noise_maker_rooms, key=self.graph.distance_to_office, reverse=True)
+        self.danger = {"left": 0.0, "right": 0.0}  # side -> time the door can open again
+        self.next_glance = self.GLANCE_SECONDS
+        self.glance = []  # Doorway cameras still to look at in the current glance
+        self.in_office = {}  # name -> when it was first seen in the office
+
+    def act(self, obs):
+        if obs.outage or obs.hiding:
+            return []
+        now = obs.seconds
+        self.look(obs)
+        if obs.cams_open:
+            # Doorway seen empty: nothing there to shut out (unless it is knocking right now)
+            side = self.graph.office_door_side(obs.camera_room)
+            if side and not obs.knocks and not any(room == obs.camera_room for room, _ in self.seen.values()):
+                self.danger[side] = min(self.danger[side], now)
+
+        warned = set(self.sighted_sides())
+        inputs = []
+        if not obs.cams_open:
+            self.in_office = {name: self.in_office.get(name, now) for name, _ in obs.office_contents}
+        if self.in_office:
+            # Too late for a slam (the anti-cheat calls that a reflex): hide, and shut the door once it's safe to
+            if obs.threat_level >= 50:
+                inputs.append(("use_safe_spot",))
+            for name, attack_side in obs.office_contents:
+                if now - self.in_office[name] >= self.REFLEX_SECONDS:
+                    warned.update(("left", "right") if attack_side == "vent" else (attack_side,))
+        for room in obs.footsteps:
+            side = self.graph.office_door_side(room)
+            if side:
+                warned.add(side)
+        if obs.knocks:
+            # Something is being held off by a shut door - keep them shut
+            warned.update(side for side in ("left", "right") if obs.door_closed(side))
+        for side in warned:
+            self.danger[side] = now + self.DANGER_SECONDS
+        wanted = {side for side, until in self.danger.items() if now < until}
+
+        inputs.extend(self.door_inputs(obs, wanted))
+        if obs.light_on:
+            inputs.append(("toggle_flashlight",))  # Costs as much as a door, and light killers need it
+        exposed = [side for side in wanted if obs.door_jammed(side) or obs.door_health(side) <= 0]
+        if exposed and not self.in_office:
+            if obs.threat_level >= self.HIDE_THREAT:
+                inputs.append(("use_safe_spot",))
+            elif obs.noise_maker_charges and self.noise_rooms:
+                inputs.append(("deploy_noise_maker", self.noise_rooms[0]))
+        weakest = min(obs.door_left_health, obs.door_right_health)
+        if wanted and weakest < self.BARRICADE_HEALTH and obs.power > self.BARRICADE_POWER:
+            inputs.append(("use_barricade",))
+        inputs.extend(self.camera_inputs(obs))
+        return inputs
+
+    def camera_inputs(self, obs):
+        """Glance at each doorway camera in turn every GLANCE_SECONDS, then put the cameras down"""
+        if self.in_office:
+            self.glance = []
+        if self.glance:
+            index = self.glance.pop(0)
+            if not obs.cams_open:
+                return [("toggle_cameras",), ("switch_camera", index)]
+            return [("switch_camera", index)]
+        if obs.cams_open:
+            return [("toggle_cameras",)]
+        if obs.seconds >= self.next_glance and obs.power > self.LOW_POWER and self.doorway_cameras:
+            self.next_glance = obs.seconds + self.GLANCE_SECONDS
+            self.glance = list(self.doorway_cameras)
+            return self.camera_inputs(obs)
+        return []
+
+
+BOTS = {
+    "random": RandomBot,
+    "door-camper": DoorCamperBot,
+    "camera-watcher": CameraWatcherBot,
+    "expert": ExpertBot,
+}
+
+
+# =====================================================
+# PLAYING
+# =====================================================
+
+def play_night(bot, sim, dt=BOT_DT, reaction_ticks=BOT_REACTION_TICKS, max_seconds=None, fast=False):
+    """Let a bot play a started night until it ends (or max_seconds); returns the ticks played
+
+    With fast, the sim jumps from one of the bot's reactions to the next with
+    fast_forward instead of ticking (see balance.py --fast). Its steps vary in
+    length, so a night played that way can't be recorded as a replay.
+    """
+    view = PlayerView(sim)
+    bot.reset(sim)
+    max_ticks = None if max_seconds is None else int(max_seconds / dt)
+    tick = 0
+    try:
+        while sim.game_state.state == "playing" and (max_ticks is None or tick < max_ticks):
+            inputs = bot.act(view.observe())
+            if fast:
+                sim.fast_forward(reaction_ticks * dt, inputs)
+                tick += reaction_ticks
+                continue
+            sim.step(dt, inputs)
+            tick += 1
+            for _ in range(reaction_ticks - 1):
+                if sim.game_state.state != "playing":
+                    break
+                sim.step(dt)
+                tick += 1
+    finally:
+        sim.observers.remove(view)
+    return tick
+
+
+def main(argv=None):
+    """Play nights with each bot and report how they did, and how fast"""
+    from balance import _int_range, NIGHT_SLACK_SECONDS
+    from replay import ReplayRecorder
+
+    parser = argparse.ArgumentParser(description="Play nights with bot players")
+    parser.add_argument("--bots", default=",".join(BOTS), help=f"comma-separated, any of: {', '.join(BOTS)}")
+    parser.add_argument("--nights", type=_int_range, default=[1, 2, 3, 4, 5], help="e.g. 1-5 or 1,3")
+    parser.add_argument("--runs", type=int, default=10, help="nights per bot and night number")
+    parser.add_argument("--difficulty", type=float, default=1.2)
+    parser.add_argument("--sph", type=float, default=60.0, help="seconds per in-game hour")
+    parser.add_argument("--seed", type=int, default=0, help="first run_seed (run i uses seed + i)")
+    parser.add_argument("--fast", action="store_true",
+                        help="jump between reactions with fast_forward (steps of varying length, so no --record)")
+    parser.add_argument("--record", default=None, help="directory to save every night's replay in")
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.bots.split(",") if name]
+    unknown = [name for name in names if name not in BOTS]
+    if unknown:
+        parser.error(f"unknown bot: {', '.join(unknown)}")
+    if args.record and args.fast:
+        parser.error("--record needs fixed-length ticks to replay; it can't be combined with --fast")
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+
+    print(f"{'bot':>14} {'night':>5} {'runs':>5} {'surv%':>6} {'minute':>7} {'power':>6} {'ticks/s':>9}")
+    for name in names:
+        for night in args.nights:
+            wins = minutes = power = ticks = 0
+            started = time.perf_counter()
+            for run in range(args.runs):
+                sim = Simulation(run_seed=args.seed + run, difficulty=args.difficulty)
+                sim.game_state.seconds_per_hour = args.sph
+                recorder = None
+                if args.record:
+                    recorder = ReplayRecorder()
+                    sim.add_observer(recorder)
+                sim.start_night(night)
+                sim.begin_playing()
+                ticks += play_night(BOTS[name](seed=args.seed + run), sim,
+                                    max_seconds=6 * args.sph + NIGHT_SLACK_SECONDS, fast=args.fast)
+                wins += sim.game_state.state == "win"
+                minutes += sim.game_state.minutes_elapsed
+                power += sim.power.current
+                if recorder is not None:
+                    recorder.finish(sim).save(os.path.join(args.record, f"{name}_n{night}_{args.seed + run}.fnr"))
+            elapsed = max(1e-9, time.perf_counter() - started)
+            print(f"{name:>14} {night:>5} {args.runs:>5} {100.0 * wins / args.runs:>5.1f}% "
+                  f"{minutes / args.runs:>7.1f} {power / args.runs:>6.1f} {ticks / elapsed:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
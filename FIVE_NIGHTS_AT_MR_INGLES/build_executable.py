@@ -148,6 +148,8 @@ def main():
             "--workpath", build_dir,         # Keep build artifacts in build/
             "--specpath", spec_dir,          # Keep .spec files in build/
             "--add-data", f"assets{data_sep}assets",  # Include assets folder
+            "--add-data", f"maps{data_sep}maps",  # Include building maps
+            "--add-data", f"roster.json{data_sep}.",  # Include the animatronic roster
             "--icon", icon_path,            # Use title.png as icon
             "--clean",                      # Clean PyInstaller cache
             # Fix for pygame ordinal 380 error - ensure all pygame modules are included
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Building maps for Five Nights at Mr Ingles's.
+
+The rooms, how they connect, where they sit on the minimap, which ones have
+cameras and where noise makers can be thrown all live in a JSON file in
+maps/ rather than in code:
+
+    {
+      "name": "Science Block",
+      "rooms": {
+        "Office": {"position": [0.5, 0.85], "exits": ["West Hall", ...]},
+        ...
+      },
+      "cameras": ["Stage", ...],            (order = camera keys 1, 2, 3, ...)
+      "noise_maker_rooms": ["Cafeteria", ...],
+      "phantom_sound_rooms": ["Cafeteria", ...]
+    }
+
+Room order in the file is the order the AI scans rooms in, so keep it stable
+once replays have been recorded on a map. Replays and snapshots store the
+map's name and checksum (a CRC of its contents, in file order) and refuse
+to play back on a map that differs.
+
+load_map() checks the whole file before the game uses it and reports every
+problem at once: exits that lead nowhere or only one way, rooms that cannot
+reach the Office, an Office without a door on each side, positions off the
+minimap, missing camera images. Everything derived from the layout - the
+distance and next-hop tables, which office door each doorway leads to, the
+minimap edge list - is built once at load, so nothing that runs per frame
+grows with the number of rooms.
+
+Check maps without starting the game:
+
+    python building_map.py maps/science_block.json
+"""
+
+import os
+import sys
+import json
+import zlib
+import argparse
+
+from navigation import OFFICE, RoomTable, UNREACHABLE, analyze_room_graph
+
+MAPS_DIR = os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "maps")
+DEFAULT_MAP_FILE = os.path.join(MAPS_DIR, "science_block.json")
+ASSETS_DIR = os.path.join(os.path.dirname(MAPS_DIR), "assets")
+
+SIDES = ("left", "right")
+MAX_NOISE_MAKER_ROOMS = 9  # Picked with the number keys 1-9
+
+
+class MapError(ValueError):
+    """Raised for map files that cannot be played"""
+
+
+def camera_image_key(room):
+    """Asset name of a room's camera feed image ("West Hall" -> "cam_west_hall")"""
+    return f"cam_{room.lower().replace(' ', '_')}"
+
+
+def camera_image_path(room):
+    """Camera feed image, relative to the assets folder"""
+    return os.path.join("img", camera_image_key(room) + ".png")
+
+
+class BuildingMap:
+    """A validated map and the tables derived from it"""
+    def __init__(self, data, source="<map>", assets_dir=None):
+        self.source = source
+        self._fail(self._check_data(data, assets_dir))
+
+        self.name = data.get("name", os.path.splitext(os.path.basename(source))[0])
+        self.checksum = map_checksum(data)
+        self.office = OFFICE
+        rooms = data["rooms"]
+        self.rooms = tuple(rooms)
+        self.graph = RoomTable({room: spec["exits"] for room, spec in rooms.items()})
+        self.positions = RoomTable({room: spec["position"] for room, spec in rooms.items()})
+        self.cameras = tuple(data["cameras"])
+        self.camera_index = {room: i for i, room in enumerate(self.cameras)}
+        self.noise_maker_rooms = tuple(data.get("noise_maker_rooms", ()))
+        self.phantom_sound_rooms = tuple(data.get("phantom_sound_rooms", ())) or self.cameras
+
+        # Derived once: navigation tables, doorways by side, spawn rooms, minimap edges
+        self.analysis = analyze_room_graph(self.graph, self.positions)
+        self._fail(self._check_layout())
+        self.doorways = {side: tuple(room for room in self.graph[self.office]
+                                     if self.analysis.office_door_side(room) == side)
+                         for side in SIDES}
+        self.spawn_rooms = tuple(room for room in self.rooms
+                                 if room != self.office and room not in self.graph[self.office])
+        self.edges = tuple((room, exit_room) for room, exits in self.graph.items()
+                           for exit_room in exits if room < exit_room)
+
+    def _fail(self, problems):
+        if problems:
+            raise MapError(f"{self.source}: " + "; ".join(problems))
+
+    def _check_data(self, data, assets_dir):
+        """Problems with the file's contents, as a list of messages"""
+        if not isinstance(data, dict) or not isinstance(data.get("rooms"), dict) or not data["rooms"]:
+            return ["needs a non-empty \"rooms\" object"]
+        rooms = data["rooms"]
+        office = OFFICE
+        problems = []
+        if office not in rooms:
+            problems.append(f"needs a room called {office!r} (where the player sits)")
+
+        for room, spec in rooms.items():
+            exits = spec.get("exits") if isinstance(spec, dict) else None
+            position = spec.get("position") if isinstance(spec, dict) else None
+            if not isinstance(exits, list) or not exits:
+                problems.append(f"{room}: needs a non-empty \"exits\" list")
+                exits = []
+            for exit_room in exits:
+                if exit_room == room:
+                    problems.append(f"{room}: exits into itself")
+                elif exit_room not in rooms:
+                    problems.append(f"{room}: exit to unknown room {exit_room!r}")
+                elif not isinstance(rooms[exit_room], dict) or room not in (rooms[exit_room].get("exits") or ()):
+                    problems.append(f"{room}: exit to {exit_room} has no way back")
+            if len(set(exits)) != len(exits):
+                problems.append(f"{room}: duplicate exits")
+            if (not isinstance(position, list) or len(position) != 2
+                    or not all(isinstance(v, (int, float)) and 0.0 <= v <= 1.0 for v in position)):
+                problems.append(f"{room}: \"position\" must be [x, y] between 0 and 1")
+
+        for key in ("cameras", "noise_maker_rooms", "phantom_sound_rooms"):
+            listed = data.get(key, [])
+            if not isinstance(listed, list) or (key == "cameras" and not listed):
+                problems.append(f"\"{key}\" must be a list of rooms")
+                continue
+            for room in listed:
+                if room not in rooms:
+                    problems.append(f"{key}: unknown room {room!r}")
+                elif room == office:
+                    problems.append(f"{key}: the office cannot be listed")
+            if len(set(listed)) != len(listed):
+                problems.append(f"{key}: rooms listed twice")
+            if key == "noise_maker_rooms" and len(listed) > MAX_NOISE_MAKER_ROOMS:
+                problems.append(f"{key}: at most {MAX_NOISE_MAKER_ROOMS} (picked with the number keys)")
+            if key == "cameras" and assets_dir is not None:
+                for room in listed:
+                    if not os.path.exists(os.path.join(assets_dir, camera_image_path(room))):
+                        problems.append(f"camera {room}: missing image {camera_image_path(room)}")
+        return problems
+
+    def _check_layout(self):
+        """Problems with the graph as a whole: reachability and office doors"""
+        problems = []
+        unreachable = [room for room in self.rooms if self.analysis.distance_to_office(room) >= UNREACHABLE]
+        if unreachable:
+            problems.append(f"cannot reach the office from {', '.join(unreachable)}")
+        for side in SIDES:
+            if not any(self.analysis.office_door_side(room) == side for room in self.graph[self.office]):
+                problems.append(f"office has no {side} door (no exit positioned to its {side})")
+        return problems
+
+    def minimap_layout(self, x, y, width, height):
+        """Room -> pixel center for a minimap panel at (x, y, width, height)"""
+        return {room: (x + 20 + int(pos[0] * (width - 40)), y + 30 + int(pos[1] * (height - 50)))
+                for room, pos in self.positions.items()}
+
+
+def map_checksum(data):
+    """CRC32 of a map's contents; key order counts, whitespace and formatting don't"""
+    return zlib.crc32(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def find_map(checksum, folder=MAPS_DIR):
+    """The valid map in folder with this checksum, or None"""
+    try:
+        names = sorted(os.listdir(folder))
+    except OSError:
+        return None
+    for name in names:
+        if name.endswith(".json"):
+            try:
+                building_map = load_map(os.path.join(folder, name))
+            except MapError:
+                continue
+            if building_map.checksum == checksum:
+                return building_map
+    return None
+
+
+def load_map(path=DEFAULT_MAP_FILE, assets_dir=None):
+    """Read and validate a map file; pass assets_dir to also check camera images"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise MapError(f"{path}: {e}") from e
+    return BuildingMap(data, source=path, assets_dir=assets_dir)
+
+
+def main(argv=None):
+    """Validate map files and print what was derived from them"""
+    parser = argparse.ArgumentParser(description="Check building map files")
+    parser.add_argument("files", nargs="*", default=[DEFAULT_MAP_FILE], help="map files (.json)")
+    parser.add_argument("--assets", default=ASSETS_DIR, help="assets folder to check camera images in")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in args.files:
+        try:
+            building = load_map(path, assets_dir=args.assets)
+        except MapError as e:
+            print(f"INVALID {e}")
+            failures += 1
+            continue
+        farthest = max(building.analysis.distance_to_office(room) for room in building.rooms)
+        print(f"{path}: {building.name} - {len(building.rooms)} rooms, {len(building.edges)} connections, "
+              f"{len(building.cameras)} cameras, doors left {list(building.doorways['left'])} "
+              f"right {list(building.doorways['right'])}, farthest room {farthest} hops, "
+              f"checksum {building.checksum:08x}  OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
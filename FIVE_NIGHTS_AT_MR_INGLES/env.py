@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Gym-style environments for Five Nights at Mr Ingles's.
+
+For training and evaluating automated players without pygame. Both follow
+the Gymnasium API without depending on it - reset(seed) returns
+(obs, info) and step(action) returns (obs, reward, terminated, truncated,
+info) - with a fixed-size float32 observation (OBS_FIELDS) and the discrete
+actions in ACTIONS: nothing, either door, the cameras or the light (the
+inputs batch.py's engine takes). A step is FRAME_SKIP ticks with the action
+applied on the first one, so an agent decides 15 times a game second.
+
+    NightEnv        one night at a time on the real Simulation: the game's
+                    own rules, around ten thousand steps a second
+    VectorNightEnv  many nights at once on batch.py's NumPy engine, with
+                    batched observations and every finished night replaced
+                    by a new one in place: hundreds of thousands of steps
+                    a second
+
+The reward is the share of the night survived during the step, plus
+WIN_REWARD for reaching 6 AM, minus DEATH_PENALTY for a jumpscare. The
+observation is what the scripted balance policies read (what stands in each
+doorway and in the office), not just the player's view - bots.py has that.
+
+The batch engine mirrors Simulation's rules (update_mood's schedule,
+coordinate_animatronics, the door pass, ...). After changing them, check
+that the two environments still agree step for step (a night restarted in
+place runs on the batch's older clock, where a timer can round onto the
+next tick, so only first nights are compared):
+
+    python env.py --cross-check 20
+    python env.py --envs 4096 --steps 200     # steps per second
+"""
+
+import sys
+import time
+import random
+import argparse
+
+import balance
+from batch import (np, BatchNights, start_night, INPUTS, NO_INPUT, PLAYING, WIN, LEFT, RIGHT, VENT,
+                   NIGHT_MINUTES, DT)
+from simulation import room_graph
+
+FRAME_SKIP = 4  # Ticks per step
+WIN_REWARD = 1.0
+DEATH_PENALTY = 1.0
+ACTIONS = INPUTS  # Action i is player input INPUTS[i] (0: do nothing)
+OBS_FIELDS = (
+    "power", "minute", "door_left_closed", "door_right_closed", "door_left_health", "door_right_health",
+    "door_left_jammed", "door_right_jammed", "light_on", "cams_open", "outage",
+    "doorway_left", "doorway_right", "office_left", "office_right", "office_vent", "night",
+)
+OBS_SIZE = len(OBS_FIELDS)
+ENV_POLICY = "env"  # Policy name in run seeds (balance.run_seed_for)
+
+
+# =====================================================
+# OBSERVATIONS
+# =====================================================
+
+def observe_sim(sim):
+    """OBS_FIELDS for a scalar Simulation"""
+    graph = room_graph()
+    office = sim.office
+    obs = np.zeros(OBS_SIZE, dtype=np.float32)
+    obs[:11] = (sim.power.current / sim.power.max, sim.game_state.minutes_elapsed / NIGHT_MINUTES,
+                office.door_left_closed, office.door_right_closed,
+                office.door_left_health / 100.0, office.door_right_health / 100.0,
+                sim.door_jammed("left"), sim.door_jammed("right"),
+                office.light_on, office.cams_open, sim.power.outage)
+    for anim in sim.animatronics:
+        side = graph.office_door_side(anim.room)
+        if side:
+            obs[11 if side == "left" else 12] += 1
+        elif anim.room == graph.office:
+            obs[13 + ("left", "right", "vent").index(anim.attack_side)] += 1
+    obs[16] = sim.game_state.night
+    return obs
+
+
+def observe_batch(batch):
+    """OBS_FIELDS for every row of a BatchNights, as one (rows, OBS_SIZE) array"""
+    tables = batch.tables
+    obs = np.empty((len(batch), OBS_SIZE), dtype=np.float32)
+    obs[:, 0] = batch.power / batch.power_max
+    obs[:, 1] = batch.minutes / NIGHT_MINUTES
+    obs[:, 2:4] = batch.door_closed
+    obs[:, 4:6] = batch.door_health / 100.0
+    obs[:, 6:8] = batch.jam_until > batch.now
+    obs[:, 8] = batch.light_on
+    obs[:, 9] = batch.cams_open
+    obs[:, 10] = batch.outage
+    side = tables.door_side[batch.room]
+    obs[:, 11] = (side == LEFT).sum(axis=1)
+    obs[:, 12] = (side == RIGHT).sum(axis=1)
+    in_office = batch.room == tables.office
+    for i, attack_side in enumerate((LEFT, RIGHT, VENT)):
+        obs[:, 13 + i] = (in_office & (batch.attack_side == attack_side)).sum(axis=1)
+    obs[:, 16] = batch.night
+    return obs
+
+
+# =====================================================
+# ENVIRONMENTS
+# =====================================================
+
+class NightEnv:
+    """One night at a time on the scalar Simulation"""
+    def __init__(self, nights=(1, 2, 3, 4, 5), difficulty=1.2, seconds_per_hour=60.0, frame_skip=FRAME_SKIP):
+        if np is None:
+            raise RuntimeError("the environments need numpy (pip install -r requirements-tools.txt)")
+        self.nights = tuple(nights)
+        self.difficulty = difficulty
+        self.seconds_per_hour = seconds_per_hour
+        self.frame_skip = frame_skip
+        self.rng = random.Random()
+        self.base_seed = 0
+        self.episode = 0
+        self.sim = None
+        self.ticks = 0
+        self.max_ticks = 0
+
+    def reset(self, seed=None):
+        """Start a new night (seed makes this and every later night reproducible)"""
+        if seed is not None:
+            self.rng.seed(seed)
+            self.base_seed = seed
+            self.episode = 0
+        night = self.rng.choice(self.nights)
+        run_seed = balance.run_seed_for(self.base_seed, night, self.difficulty, self.seconds_per_hour,
+                                        ENV_POLICY, self.episode)
+        self.episode += 1
+        self.sim = start_night(night, self.difficulty, self.seconds_per_hour, run_seed)
+        self.ticks = 0
+        self.max_ticks = int((6 * self.seconds_per_hour + balance.NIGHT_SLACK_SECONDS) / DT)
+        return observe_sim(self.sim), {"night": night, "seed": run_seed}
+
+    def step(self, action):
+        """Apply one action from ACTIONS; returns (obs, reward, terminated, truncated, info)"""
+        sim = self.sim
+        minutes = sim.game_state.minutes_elapsed
+        inputs = () if action == NO_INPUT else (ACTIONS[action],)
+        for _ in range(self.frame_skip):
+            if sim.game_state.state != "playing":
+                break
+            sim.step(DT, inputs)
+            inputs = ()
+            self.ticks += 1
+        state = sim.game_state.state
+        terminated = state != "playing"  # An anti-cheat warning always ends in Mr Hall's jumpscare
+        truncated = not terminated and self.ticks >= self.max_ticks
+        reward = (sim.game_state.minutes_elapsed - minutes) / NIGHT_MINUTES
+        if terminated:
+            reward += WIN_REWARD if state == "win" else -DEATH_PENALTY
+        return observe_sim(sim), reward, terminated, truncated, {"state": state}
+
+
+class VectorNightEnv:
+    """num_envs nights stepped together on the batch engine; finished ones restart in place"""
+    def __init__(self, num_envs, nights=(1, 2, 3, 4, 5), difficulty=1.2, seconds_per_hour=60.0,
+                 frame_skip=FRAME_SKIP, events=True):
+        if np is None:
+            raise RuntimeError("the environments need numpy (pip install -r requirements-tools.txt)")
+        self.num_envs = num_envs
+        self.nights = tuple(nights)
+        self.difficulty = difficulty
+        self.seconds_per_hour = seconds_per_hour
+        self.frame_skip = frame_skip
+        self.events = events
+        self.rng = np.random.default_rng()
+        self.base_seed = 0
+        self.episode = 0
+        self.batch = None
+
+    def new_night(self):
+        """A scalar Simulation at the start of the next episode's night"""
+        night = self.nights[self.rng.integers(len(self.nights))]
+        run_seed = balance.run_seed_for(self.base_seed, night, self.difficulty, self.seconds_per_hour,
+                                        ENV_POLICY, self.episode)
+        self.episode += 1
+        return start_night(night, self.difficulty, self.seconds_per_hour, run_seed)
+
+    def reset(self, seed=None):
+        """Start num_envs new nights; returns (observations, info)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+            self.base_seed = seed
+            self.episode = 0
+        sims = [self.new_night() for _ in range(self.num_envs)]
+        self.batch = BatchNights(sims, "idle", events=self.events, rng=self.rng)
+        self.batch.compact_finished = False  # Row i is always env i
+        return observe_batch(self.batch), {"night": self.batch.night.copy()}
+
+    def step(self, actions):
+        """Apply one action per env; returns batched (obs, reward, terminated, truncated, info)
+
+        Envs whose night ended come back already reset: obs is the new
+        night's, and info["final_observation"] holds the last one of the old
+        night for those rows (info["results"] has their balance.py records).
+        """
+        batch = self.batch
+        minutes = batch.minutes.copy()
+        final = np.zeros((len(batch), OBS_SIZE), dtype=np.float32)
+        ended = np.zeros(len(batch), dtype=bool)
+        inputs = np.asarray(actions)
+        for _ in range(self.frame_skip):
+            batch.step(DT, inputs)
+            inputs = None
+            ending = batch.done & ~ended
+            if ending.any():
+                # Rows that end mid-step still tick to its end; keep what they looked like as they ended
+                final[ending] = observe_batch(batch)[ending]
+                ended |= ending
+
+        terminated = ended & (batch.state != PLAYING)
+        truncated = ended & ~terminated
+        reward = (batch.minutes - minutes) / NIGHT_MINUTES
+        reward += np.where(terminated, np.where(batch.state == WIN, WIN_REWARD, -DEATH_PENALTY), 0.0)
+        info = {"results": batch.results[:]}
+        batch.results.clear()
+
+        if ended.any():
+            rows = np.nonzero(ended)[0]
+            info["final_observation"] = final[rows]
+            batch.replace_rows(rows, [self.new_night() for _ in rows])
+        return observe_batch(batch), reward, terminated, truncated, info
+
+
+# =====================================================
+# CROSS-CHECK AND BENCHMARK
+# =====================================================
+
+def cross_check(count, night, difficulty, seconds_per_hour, base_seed=0, frame_skip=FRAME_SKIP):
+    """Step count nights through both environments with the same random actions;
+    returns [(seed, None or the first difference)]
+
+    Like batch.py --cross-check: environmental events off, nights with an
+    erratic animatronic skipped, and every animatronic thinking every tick.
+    """
+    seeds = []
+    index = 0
+    while len(seeds) < count:
+        seed = balance.run_seed_for(base_seed, night, difficulty, seconds_per_hour, ENV_POLICY, index)
+        if not any(anim.personality == "erratic"
+                   for anim in start_night(night, difficulty, seconds_per_hour, seed).animatronics):
+            seeds.append(seed)
+        index += 1
+
+    envs = []
+    for seed in seeds:
+        env = NightEnv((night,), difficulty, seconds_per_hour, frame_skip)
+        env.sim = start_night(night, difficulty, seconds_per_hour, seed)
+        env.sim.ai_lod_interval = 1
+        env.sim.next_event_time = float("inf")
+        env.max_ticks = int((6 * seconds_per_hour + balance.NIGHT_SLACK_SECONDS) / DT)
+        envs.append(env)
+    vector = VectorNightEnv(count, (night,), difficulty, seconds_per_hour, frame_skip, events=False)
+    vector.batch = BatchNights([start_night(night, difficulty, seconds_per_hour, seed) for seed in seeds],
+                               "idle", events=False)
+    vector.batch.compact_finished = False
+    vector.new_night = lambda: start_night(night, difficulty, seconds_per_hour, seeds[0])  # Replaced rows aren't checked
+
+    rng = np.random.default_rng(base_seed)
+    differences = [None] * count
+    open_rows = set(range(count))
+    step = 0
+    while open_rows:
+        actions = rng.integers(len(ACTIONS), size=count)
+        actions[rng.random(count) < 0.7] = NO_INPUT  # Mostly waiting, like a player
+        obs, reward, terminated, truncated, info = vector.step(actions)
+        final = dict(zip(np.nonzero(terminated | truncated)[0].tolist(), info.get("final_observation", ())))
+        step += 1
+        for row in sorted(open_rows):
+            expected = envs[row].step(actions[row])
+            checks = [("reward", expected[1], reward[row]), ("terminated", expected[2], terminated[row]),
+                      ("truncated", expected[3], truncated[row])]
+            # trigger_anti_cheat hides everything as the night ends; the batch row just stops
+            if expected[4]["state"] != "anti_cheat":
+                checks.insert(0, ("obs", expected[0], final.get(row, obs[row])))
+            for field, scalar, batched in checks:
+                mismatch = np.abs(np.asarray(scalar, dtype=float) - np.asarray(batched, dtype=float)) > 1e-5
+                if np.any(mismatch):
+                    where = ""
+                    if field == "obs":
+                        where = " " + ", ".join(f"{OBS_FIELDS[i]} {scalar[i]:g}/{batched[i]:g}"
+                                                for i in np.nonzero(mismatch)[0])
+                    differences[row] = f"step {step}: {field} scalar/batch differ{where}"
+                    break
+            if differences[row] or expected[2] or expected[3]:
+                open_rows.discard(row)
+    return list(zip(seeds, differences))
+
+
+def benchmark(num_envs, steps, nights=(1, 2, 3, 4, 5), difficulty=1.2, seconds_per_hour=60.0,
+              frame_skip=FRAME_SKIP, seed=0):
+    """Steps per second of a VectorNightEnv under random actions; returns (rate, nights finished)"""
+    env = VectorNightEnv(num_envs, nights, difficulty, seconds_per_hour, frame_skip)
+    env.reset(seed)
+    rng = np.random.default_rng(seed)
+    episodes = 0
+    started = time.perf_counter()
+    for _ in range(steps):
+        actions = np.where(rng.random(num_envs) < 0.9, NO_INPUT, rng.integers(len(ACTIONS), size=num_envs))
+        _, _, terminated, truncated, _ = env.step(actions)
+        episodes += int((terminated | truncated).sum())
+    elapsed = time.perf_counter() - started
+    return num_envs * steps / elapsed, episodes
+
+
+def main(argv=None):
+    """Benchmark the vector environment, or cross-check it against the scalar one"""
+    parser = argparse.ArgumentParser(description="Gym-style night environments")
+    parser.add_argument("--envs", type=int, default=4096, help="nights stepped together")
+    parser.add_argument("--steps", type=int, default=200, help="vector steps to time")
+    parser.add_argument("--frame-skip", type=int, default=FRAME_SKIP, help="ticks per step")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cross-check", type=int, default=0, metavar="N",
+                        help="step N nights per night number through both environments and compare")
+    parser.add_argument("--nights", type=balance._int_range, default=[1, 2, 3, 4, 5], help="e.g. 1-5 or 1,3")
+    parser.add_argument("--difficulty", type=float, default=1.2)
+    parser.add_argument("--sph", type=float, default=60.0, help="seconds per in-game hour")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("env.py needs numpy: pip install -r requirements-tools.txt")
+        return 1
+    if args.cross_check:
+        failures = 0
+        for night in args.nights:
+            results = cross_check(args.cross_check, night, args.difficulty, args.sph, args.seed, args.frame_skip)
+            bad = [(seed, diff) for seed, diff in results if diff]
+            failures += len(bad)
+            print(f"night {night} diff {args.difficulty:.2f} s/hr {args.sph:.0f}: "
+                  f"{len(results) - len(bad)}/{len(results)} nights identical")
+            for seed, diff in bad[:5]:
+                print(f"  seed {seed}: {diff}")
+        return 1 if failures else 0
+
+    rate, episodes = benchmark(args.envs, args.steps, args.nights, args.difficulty, args.sph,
+                               args.frame_skip, args.seed)
+    print(f"{args.envs} envs x {args.steps} steps ({args.frame_skip} ticks each): "
+          f"{rate:,.0f} steps/s, {episodes} nights finished")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Danger forecasts for Five Nights at Mr Ingles's.
+
+An assist mode for learning the AI. Every so often the game snapshots the
+live night and a background worker plays the next FORECAST_SECONDS out
+FORECAST_ROLLOUTS times from there: the player's doors, light and cameras
+stay exactly as they are and the AI's and world's dice are rerolled for
+every branch. The share of branches that end in an attack through each
+side goes on the HUD - "if you do nothing, 40% right".
+
+    forecaster = DangerForecaster()
+    forecaster.submit(sim)        # snapshots the night; whenever a fresh forecast is wanted
+    ...
+    forecast = forecaster.poll()  # never blocks: the newest finished forecast, or None
+    forecast.chance("right")
+    forecaster.close()
+
+The worker is a separate process (a thread if one cannot be started), so
+Game.run never waits on it. Every snapshot gets a serial number: the worker
+drops a forecast in progress as soon as a newer snapshot is waiting, and
+poll() ignores anything that comes back for an older one. Branches use
+fast_forward, so they jump from event to event instead of ticking.
+
+Forecast from a point in a recorded night without starting the game:
+
+    python forecast.py replays/last_night.fnr --at 90
+"""
+
+import sys
+import argparse
+import threading
+import multiprocessing
+
+import snapshot
+from simulation import Simulation, current_map, use_map
+from building_map import MapError, load_map
+
+FORECAST_SECONDS = 30.0  # How far ahead each branch plays
+FORECAST_ROLLOUTS = 200  # Branches per forecast
+FORECAST_INTERVAL = 2.0  # Game seconds between snapshots while nothing changes
+SIDES = ("left", "right", "vent")
+
+
+class Forecast:
+    """How many of a forecast's branches ended in an attack through each side"""
+    __slots__ = ("serial", "start", "seconds", "rollouts", "attacks")
+
+    def __init__(self, serial, start, seconds):
+        self.serial = serial  # Serial number of the snapshot it was made from
+        self.start = start  # Sim clock when that snapshot was taken
+        self.seconds = seconds
+        self.rollouts = 0
+        self.attacks = dict.fromkeys(SIDES, 0)
+
+    def chance(self, side):
+        """Share of branches attacked through `side` (0.0-1.0)"""
+        return self.attacks[side] / self.rollouts if self.rollouts else 0.0
+
+
+def forecast(data, rollouts=FORECAST_ROLLOUTS, seconds=FORECAST_SECONDS, serial=0, stale=None, sim=None):
+    """Play `rollouts` randomized branches of a snapshot; None if stale() turned true first"""
+    sim = sim or Simulation(run_seed=0)
+    result = None
+    for branch in range(rollouts):
+        if stale is not None and stale():
+            return None
+        snapshot.restore(sim, data)
+        if result is None:
+            result = Forecast(serial, sim.clock.now, seconds)
+        # New dice for the AI and the world; string seeds keep every branch reproducible
+        sim.ai_rng.seed(f"forecast:{serial}:{branch}:ai")
+        sim.event_rng.seed(f"forecast:{serial}:{branch}:events")
+        sim.fast_forward(seconds)
+        result.rollouts += 1
+        if sim.game_state.state == "jumpscare":
+            killer = next((anim for anim in sim.animatronics if anim.name == sim.jumpscare.killer), None)
+            if killer is not None:  # Mr Hall's anti-cheat jumpscare comes through no door
+                result.attacks[killer.attack_side] += 1
+    return result
+
+
+def _serve(conn, rollouts, seconds, map_source):
+    """Worker loop: forecast the newest snapshot waiting on conn until sent None"""
+    if map_source != current_map().source:
+        use_map(load_map(map_source))
+    sim = Simulation(run_seed=0)
+    job = conn.recv()
+    while job is not None:
+        while conn.poll():
+            job = conn.recv()  # Only the newest snapshot is worth forecasting
+            if job is None:
+                return
+        serial, data = job
+        result = forecast(data, rollouts, seconds, serial, stale=conn.poll, sim=sim)
+        if result is not None:
+            conn.send(result)
+        job = conn.recv()
+
+
+# =====================================================
+# BACKGROUND FORECASTER
+# =====================================================
+
+class DangerForecaster:
+    """Runs forecasts of the live night in a background worker"""
+    def __init__(self, rollouts=FORECAST_ROLLOUTS, seconds=FORECAST_SECONDS):
+        self.serial = 0  # Of the last snapshot submitted
+        self.answered = 0  # Of the last snapshot a forecast came back for
+        self.latest = None
+        args = (rollouts, seconds, current_map().source)
+        # spawn: the worker must not inherit the game's window or audio device
+        context = multiprocessing.get_context("spawn")
+        self._conn, child = context.Pipe()
+        try:
+            self._worker = context.Process(target=_serve, args=(child,) + args, daemon=True)
+            self._worker.start()
+        except (OSError, RuntimeError) as e:
+            print(f"⚠️  Warning: Forecast worker process failed to start, using a thread: {e}")
+            self._worker = threading.Thread(target=_serve, args=(child,) + args, daemon=True)
+            self._worker.start()
+
+    @property
+    def busy(self):
+        """True while the worker is still on the last snapshot submitted"""
+        return self.answered < self.serial
+
+    def submit(self, sim):
+        """Snapshot the night and queue it for forecasting (any older one is dropped)"""
+        self.serial += 1
+        self._conn.send((self.serial, snapshot.take(sim)))
+
+    def poll(self):
+        """Collect finished forecasts without waiting; returns the newest one (or None)"""
+        while self._conn.poll():
+            result = self._conn.recv()
+            if result.serial == self.serial:
+                self.latest = result
+                self.answered = result.serial
+        return self.latest
+
+    def discard(self):
+        """Forget the current forecast (a new night, or a retried hour)"""
+        self.latest = None
+        self.answered = self.serial
+
+    def close(self):
+        """Stop the worker"""
+        try:
+            self._conn.send(None)
+        except OSError:
+            pass
+        self._worker.join(timeout=1.0)
+
+
+def main(argv=None):
+    """Forecast from a point in a recorded night"""
+    from replay import Replay, ReplayError, start_playback, use_replay_map
+
+    parser = argparse.ArgumentParser(description="Danger forecast from a replay")
+    parser.add_argument("replay", help="replay file (.fnr)")
+    parser.add_argument("--at", type=float, default=60.0, help="game seconds into the night to forecast from")
+    parser.add_argument("--rollouts", type=int, default=FORECAST_ROLLOUTS, help="branches to play")
+    parser.add_argument("--seconds", type=float, default=FORECAST_SECONDS, help="how far ahead each branch plays")
+    parser.add_argument("--map", help="building map the night was played on (default: found in maps/)")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay)
+    try:
+        use_replay_map(replay, args.map)
+    except (ReplayError, MapError) as e:
+        parser.error(str(e))
+    sim = start_playback(replay)
+    inputs = replay.inputs_by_tick()
+    while sim.game_state.state == "playing" and sim.clock.now < args.at:
+        sim.step(replay.dt, inputs.get(sim.tick_count + 1, ()))
+    if sim.game_state.state != "playing":
+        print(f"the night was already over ({sim.game_state.state}) at {sim.clock.now:.1f}s")
+        return 1
+
+    result = forecast(snapshot.take(sim), args.rollouts, args.seconds)
+    print(f"{args.replay} at {result.start:.1f}s (night {sim.game_state.night}, "
+          f"minute {sim.game_state.minutes_elapsed}), {result.rollouts} branches of {result.seconds:g}s:")
+    for side in SIDES:
+        print(f"  attacked through {side:<5} {result.chance(side):6.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
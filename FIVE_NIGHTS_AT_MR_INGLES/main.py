@@ -75,25 +75,42 @@ install_required_packages()
 
 import json
 import math
+import argparse
 import time
-import random
 import pygame
 import webbrowser
+import multiprocessing
 from collections import deque
 
+from simulation import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, Simulation, new_run_seed, room_graph, room_position, current_map, use_map,
+    STORY_LEVEL, CUSTOM_LEVEL_MAX, MAX_CUSTOM_ANIMATRONICS,
+)
+from building_map import MapError, camera_image_key, camera_image_path, load_map
+from roster import ROSTER
+from replay import Replay, ReplayError, ReplayRecorder, check_map, check_rules, use_replay_map
+from snapshot import HourCheckpoints
+from timer_wheel import TimerWheel
+from planner import DEFAULT_LOOKAHEAD, LOOKAHEAD_NIGHT
+from forecast import DangerForecaster, FORECAST_INTERVAL, FORECAST_SECONDS
+
 # =====================================================
 # CONSTANTS
 # =====================================================
 
-WINDOW_WIDTH = 1280
-WINDOW_HEIGHT = 720
 WINDOW_TITLE = "Five Nights at Mr Ingles's - Ali Imran (2025)"
 FPS = 60
+SIM_DT = 1.0 / 60  # Fixed simulation tick - gameplay is identical at any render rate
+MAX_CATCHUP_STEPS = 8  # Most sim ticks run in one frame before the backlog is dropped
+MAX_FRAME_TIME = 0.25  # Longer frames (window drags, breakpoints) count as this much
 SAVE_FILE = os.path.join(BASE_DIR, "mr_ingles_save.json")
+REPLAY_FILE = os.path.join(BASE_DIR, "replays", "last_night.fnr")  # Overwritten at the end of every night
 
 # Performance optimization constants - OPTIMIZED FOR 60 FPS
 MAX_PARTICLE_CACHE_SIZE = 100  # Max cached particle/glow surfaces
 MAX_OVERLAY_CACHE_SIZE = 200  # Max cached overlay surfaces
+MAX_ANIM_SPRITE_CACHE_SIZE = 48  # Max cached scaled animatronic sprites (archetypes x sizes)
+CAMERA_MAX_SPRITES = 6  # Animatronics drawn per camera feed; the rest show as "+N"
 MIN_CHROMATIC_ABERRATION = 0.5  # Skip chromatic aberration below this (higher = more skipping)
 SCREEN_GLOW_CIRCLE_INTERVAL = 60  # Pixels between glow circles (higher = less circles = faster)
 VHS_GLITCH_FREQUENCY = 0.02  # Random VHS glitch probability (lower = less frequent = faster)
@@ -104,670 +121,18 @@ MAX_PARTICLES = 100  # Maximum particles allowed (prevents particle spam)
 PARTICLE_UPDATE_SKIP = 1  # Update every N particles (1 = all, 2 = every other)
 EFFECTS_QUALITY = 0.6  # Global effects multiplier (0.5 = half intensity, faster)
 
-# =====================================================
-# GAME STATE
-# =====================================================
-
-class GameState:
-    """Main game state container"""
-    def __init__(self):
-        self.state = "splash"  # "splash", "menu", "playing", "paused", "jumpscare", "win", "anti_cheat", "anti_cheat_message"
-        self.night = 1
-        self.max_night_unlocked = 1
-        self.hour = 12
-        self.hour_timer = 0
-        self.seconds_per_hour = 60
-        self.minutes_elapsed = 0  # minutes since 12:00 for current night
-        self.width = WINDOW_WIDTH
-        self.height = WINDOW_HEIGHT
-        self.status = ""
-        self.start_time = time.time()
-        
-        # Environmental Events
-        self.active_events = []
-        self.event_cooldown = 0
-        self.lights_flickering = False
-        self.flicker_timer = 0
-        self.hallway_darkness = 0
-        self.temperature = 70  # Room temperature affects mechanics
-        self.ventilation_blocked = False
-        self.phantom_sounds = []
-        
-        # Visual Effects
-        self.chromatic_aberration = 0.0  # RGB split effect
-        self.screen_distortion = 0.0  # Wave distortion
-        self.vhs_effect = 0.0  # VHS tracking lines
-        self.glow_intensity = 0.0  # Dynamic bloom/glow
-        self.scan_line_offset = 0.0  # Animated scanlines
-
-    def elapsed_time(self):
-        """Get elapsed time since game start"""
-        return time.time() - self.start_time
-
-
-class PowerSystem:
-    """Power management system"""
-    def __init__(self):
-        self.max = 100
-        self.current = 100
-        self.base_drain = 0.16  # higher baseline drain
-        self.door_drain = 0.24  # higher door drain
-        self.light_drain = 0.24  # higher light drain
-        self.cam_drain = 0.32   # higher camera drain
-        self.outage = False
-
-    def reset(self):
-        self.current = self.max
-        self.outage = False
-        self.emergency_mode = False
-        self.emergency_timer = 0
-        self.reserve_power = 0  # Hidden reserve for emergencies
-
-
-class Office:
-    """Office state and controls"""
-    def __init__(self):
-        self.door_left_closed = False
-        self.door_right_closed = False
-        self.light_on = True
-        self.cams_open = False
-        self.door_left_progress = 0.0   # 0 = open, 1 = closed
-        self.door_right_progress = 0.0
-        self.light_dim = 0.0             # darkness overlay
-        self.cam_flash = 0.0             # static flash
-        self.door_left_health = 100.0
-        self.door_right_health = 100.0
-        self.door_left_jam_timer = 0.0
-        self.door_right_jam_timer = 0.0
-        self.door_left_open_timer = 0.0
-        self.door_right_open_timer = 0.0
-        
-        # New features
-        self.flashlight_battery = 100.0
-        self.vent_system_active = True
-        self.barricade_left = 0  # 0-3 levels
-        self.barricade_right = 0
-        self.noise_maker_charges = 3
-        self.safe_mode_timer = 0.0
-        self.movement_noise_level = 0.0
-
-    def reset(self):
-        self.door_left_closed = False
-        self.door_right_closed = False
-        self.light_on = True
-        self.cams_open = False
-        self.door_left_progress = 0.0
-        self.door_right_progress = 0.0
-        self.light_dim = 0.0
-        self.cam_flash = 0.0
-        self.door_left_health = 100.0
-        self.door_right_health = 100.0
-        self.door_left_jam_timer = 0.0
-        self.door_right_jam_timer = 0.0
-        self.door_left_open_timer = 0.0
-        self.door_right_open_timer = 0.0
-
-
-class CameraSystem:
-    """Camera switching system"""
-    def __init__(self):
-        self.cameras = [
-            "Stage", "Dining Area", "Backstage", "Kitchen",
-            "West Hall", "East Hall", "Cafeteria", "Gym",
-            "Library", "Bathrooms", "Vent", "Supply Closet", "Restrooms"
-        ]
-        self.current_index = 0
-
-    def switch(self, index):
-        if 0 <= index < len(self.cameras):
-            self.current_index = index
-
-    def current_camera(self):
-        return self.cameras[self.current_index]
-
-
-class Jumpscare:
-    """Jumpscare event"""
-    def __init__(self):
-        self.active = False
-        self.timer = 0
-        self.duration = 2.0
-        self.killer = "Mr Ingles"
-        self.zoom = 0.0
-        self.fly_duration = 0.6
-
-    def reset(self):
-        self.active = False
-        self.timer = 0
-        self.zoom = 0.0
-
-
-# =====================================================
-# ROOM GRAPH AND NAVIGATION
-# =====================================================
-
-# Static room graph showing connections between rooms
-ROOM_GRAPH = {
-    "Office": ["West Hall", "East Hall", "Supply Closet", "Restrooms"],
-    "West Hall": ["Office", "Cafeteria", "Dining Area", "Supply Closet"],
-    "East Hall": ["Office", "Gym", "Backstage", "Restrooms"],
-    "Stage": ["Dining Area", "Backstage"],
-    "Dining Area": ["Stage", "West Hall", "Kitchen"],
-    "Backstage": ["Stage", "East Hall", "Kitchen"],
-    "Kitchen": ["Dining Area", "Backstage", "Cafeteria"],
-    "Cafeteria": ["West Hall", "Kitchen", "Library"],
-    "Gym": ["East Hall", "Bathrooms"],
-    "Library": ["Cafeteria", "Bathrooms"],
-    "Bathrooms": ["Gym", "Library", "Vent"],
-    "Vent": ["Bathrooms", "Supply Closet", "Restrooms"],
-    "Supply Closet": ["Office", "West Hall", "Vent"],
-    "Restrooms": ["Office", "East Hall", "Vent"]
-}
+# HUD names for the parts of the threat level (ThreatAssessment.breakdown())
+THREAT_SOURCE_LABELS = {"animatronics": "nearby", "power": "low power", "doors": "weak doors",
+                        "open_doors": "doors open", "emergency": "backup power"}
 
-# Static room positions for minimap (x, y as percentages) - SPACED OUT
-ROOM_POSITIONS = {
-    "Office": [0.5, 0.85],           # Bottom center
-    "West Hall": [0.25, 0.65],       # Mid-left, closer to office
-    "East Hall": [0.75, 0.65],       # Mid-right, closer to office
-    "Stage": [0.5, 0.1],             # Top center
-    "Dining Area": [0.3, 0.25],      # Upper-left quadrant
-    "Backstage": [0.7, 0.25],        # Upper-right quadrant
-    "Kitchen": [0.5, 0.35],          # Upper-middle
-    "Cafeteria": [0.12, 0.45],       # Far left
-    "Gym": [0.88, 0.45],             # Far right
-    "Library": [0.12, 0.65],         # Left side
-    "Bathrooms": [0.88, 0.65],       # Right side
-    "Vent": [0.82, 0.78],            # Lower-right
-    "Supply Closet": [0.18, 0.78],   # Lower-left
-    "Restrooms": [0.68, 0.52]        # Mid-right area
+# Door particle bursts: kind -> (count, vx range, vy range, color, size, life)
+DOOR_PARTICLES = {
+    "open": (8, (-3, 3), (-2, 2), (150, 150, 200, 255), 3, 0.8),
+    "jammed": (15, (-5, 5), (-5, 5), (255, 50, 50, 255), 4, 0.6),
+    "slam": (12, (-4, 4), (-3, 1), (200, 200, 255, 255), 5, 1.0),
+    "perfect": (20, (-6, 6), (-6, 2), (100, 255, 100, 255), 6, 1.2),
 }
 
-
-def room_position(room, width, height):
-    """Get the visual position of a room"""
-    if room in ROOM_POSITIONS:
-        return (width * ROOM_POSITIONS[room][0], height * ROOM_POSITIONS[room][1])
-    # Fallback to center if room not found
-    return (width * 0.5, height * 0.5)
-
-
-def get_neighbors(room):
-    """Get adjacent rooms"""
-    return ROOM_GRAPH.get(room, [])
-
-
-# =====================================================
-# ANIMATRONIC
-# =====================================================
-
-class Animatronic:
-    """Animatronic character with deterministic AI"""
-    def __init__(self, name, start_room, base_aggro, base_interval, style="teleport",
-                 attack_side="left", patrol_route=None, start_delay_minutes=0,
-                 hallway_entry_delay=2.0, aggression_ramp=0.25, rng=None, size_multiplier=1.0,
-                 display_width=1280, display_height=720):
-        self.name = name
-        self.room = start_room
-        self.base_aggro = base_aggro
-        self.base_interval = base_interval
-        self.aggro = base_aggro
-        self.move_interval = base_interval
-        self.timer = 0
-        self.style = style
-        self.attack_side = attack_side
-        self.rng = rng
-        self.size_multiplier = size_multiplier
-        self.display_width = display_width
-        self.display_height = display_height
-        route = patrol_route or [start_room]
-        if self.rng and len(route) > 1:
-            # Rotate route per run to keep patterns unique without breaking graph
-            offset = self.rng.randint(0, len(route) - 1)
-            route = route[offset:] + route[:offset]
-        self.patrol_route = route
-        self.patrol_index = 0
-        self.move_cooldown = base_interval
-        self.hallway_timer = 0.0
-        self.attack_windup = 0.0
-        self.attack_windup_required = 1.2
-        self.start_delay_minutes = start_delay_minutes
-        self.hallway_entry_delay = hallway_entry_delay
-        self.aggression_ramp = aggression_ramp
-        self.x, self.y = room_position(start_room, self.display_width, self.display_height)
-        self.target_x = self.x
-        self.target_y = self.y
-        self.visible_on_cam = True
-        
-        # Advanced AI features (deterministic)
-        self.mood = "neutral"  # neutral, aggressive, cautious, hunting, retreating
-        self.mood_timer = 0
-        self.player_action_memory = []  # remember recent player actions
-        self.target_player_room = None  # predicted player location
-        self.communication_cooldown = 0
-        self.hunting_mode = False
-        self.hunting_timer = 0.0
-        self.hunt_target_room = None
-        self.investigating = False  # Track if reached investigation target
-        self.investigation_timer = 0.0  # Time spent investigating
-        self.adaptive_aggro = base_aggro  # adjusts based on learning
-        self.last_blocked_time = 0
-        self.block_count = 0
-        self.retreat_timer = 0.0
-        self.retreat_target = None
-        self.last_room = start_room
-        self.hallway_block_timer = 0.0
-        
-        # AI Personality System (randomized each night)
-        self.personality = self.assign_personality(rng)
-        self.patience = rng.uniform(0.5, 2.0)  # How long they wait before moving
-        self.curiosity = rng.uniform(0.3, 1.5)  # How likely to investigate player actions
-        self.persistence = rng.uniform(0.4, 1.8)  # How often they retry after being blocked
-        self.teamwork = rng.uniform(0.2, 1.3)  # How well they coordinate with others
-        self.deception = rng.uniform(0.1, 1.2)  # How likely to fake movements
-        self.sound_sensitivity = rng.uniform(0.5, 1.5)  # How much they react to sounds
-        self.camera_awareness = rng.uniform(0.3, 1.4)  # How they react to being watched
-        
-        # Behavior state
-        self.is_decoy = False
-        self.decoy_timer = 0.0
-        self.last_player_action_time = 0
-        self.stalking_mode = False
-        self.ambush_position = None
-        self.fake_movement_cooldown = 0.0
-        
-        # Special abilities
-        self.special_ability = self.assign_special_ability(rng)
-        self.ability_cooldown = 0.0
-        self.ability_active = False
-        self.can_disable_lights = False
-        self.can_jam_cameras = False
-        self.can_drain_power = False
-        self.speed_boost_active = False
-    
-    def assign_special_ability(self, rng):
-        """Assign a unique special ability"""
-        abilities = [
-            "light_killer",     # Can disable lights temporarily
-            "camera_jammer",    # Can jam cameras
-            "power_drainer",    # Extra power drain
-            "speed_demon",      # Periodic speed boosts
-            "door_breaker",     # Extra damage to doors
-            "silent_stalker",   # Makes no sound when moving
-            "mimic",            # Can appear in multiple cameras
-            "teleporter"        # Can skip rooms
-        ]
-        return rng.choice(abilities) if rng else "speed_demon"
-    
-    def assign_personality(self, rng):
-        """Assign a random personality archetype"""
-        personalities = [
-            "aggressive",    # Moves fast, attacks often
-            "patient",       # Waits for perfect opportunity
-            "erratic",       # Unpredictable movements
-            "stalker",       # Follows player patterns
-            "team_player",   # Coordinates with others
-            "trickster",     # Uses fake movements
-            "cautious",      # Retreats often, slow approach
-            "relentless"     # Never gives up, constant pressure
-        ]
-        return rng.choice(personalities) if rng else "aggressive"
-
-    def update(self, dt, game_state=None, difficulty=1.0):
-        """Update animatronic with deterministic AI"""
-        self.timer += dt
-        self.mood_timer += dt
-
-        # Staggered activation to avoid instant dogpiles
-        minutes = game_state.minutes_elapsed if game_state else 0
-        if minutes < self.start_delay_minutes:
-            return
-
-        if self.retreat_timer > 0:
-            self.retreat_timer = max(0.0, self.retreat_timer - dt)
-            return
-        
-        # Handle investigation behavior (for noisemakers)
-        if self.investigating:
-            self.investigation_timer += dt
-            # Investigate for 2-4 seconds, then leave and return to patrol
-            investigation_duration = 2.0 + (self.curiosity * 1.5)  # 2-4 seconds based on curiosity
-            if self.investigation_timer >= investigation_duration:
-                self.investigating = False
-                self.investigation_timer = 0.0
-                self.hunting_mode = False
-                self.hunting_timer = 0.0
-                self.hunt_target_room = None
-                if self.mood == "hunting":
-                    self.mood = "neutral"
-                # Resume patrol - find nearest patrol point
-                min_dist = 999
-                best_idx = 0
-                for i, patrol_room in enumerate(self.patrol_route):
-                    dist = self._distance_to_room(self.room, patrol_room)
-                    if dist < min_dist:
-                        min_dist = dist
-                        best_idx = i
-                self.patrol_index = best_idx
-            return  # Don't move while investigating
-
-        if self.hunting_timer > 0:
-            self.hunting_timer -= dt
-            self.hunting_mode = True
-        else:
-            self.hunting_mode = False
-            # Clear temporary lure targets so they don't stick forever
-            if self.hunt_target_room and self.hunt_target_room != "Office":
-                self.hunt_target_room = None
-                if self.mood == "hunting":
-                    self.mood = "neutral"
-                # Resume patrol route when hunt expires
-                # This prevents getting stuck at noise maker locations
-                if self.room != self.patrol_route[self.patrol_index]:
-                    # Find closest patrol point and resume from there
-                    min_dist = 999
-                    best_idx = self.patrol_index
-                    for i, patrol_room in enumerate(self.patrol_route):
-                        dist = self._distance_to_room(self.room, patrol_room)
-                        if dist < min_dist:
-                            min_dist = dist
-                            best_idx = i
-                    self.patrol_index = best_idx
-
-        # Update mood state (affects behavior)
-        if self.mood_timer >= 2.0:
-            self.update_mood(game_state)
-            self.mood_timer = 0
-
-        # Adaptive aggression based on learning and time
-        night = game_state.night if game_state else 1
-        time_factor = (minutes / 360.0) * self.aggression_ramp
-        night_factor = (night - 1) * 0.12
-        self.adaptive_aggro = (self.base_aggro * difficulty) + (self.block_count * 0.05) + time_factor + night_factor
-        self.adaptive_aggro = min(self.adaptive_aggro, 2.0)
-        interval = max(0.7, (self.move_interval / max(0.6, difficulty)) / (1.0 + self.adaptive_aggro * 0.6))
-        self.move_cooldown -= dt
-
-        if self.move_cooldown <= 0:
-            self.move_cooldown += interval
-            if self.hunting_mode or self.mood in ("aggressive", "hunting"):
-                self.move_toward_target(self.hunt_target_room or "Office")
-            else:
-                self.move_patrol()
-
-        # Smooth position toward target
-        speed = 4 * dt
-        self.x += (self.target_x - self.x) * speed
-        self.y += (self.target_y - self.y) * speed
-        
-        # Communication cooldown
-        if self.communication_cooldown > 0:
-            self.communication_cooldown -= dt
-        
-        # Execute personality-specific behaviors
-        self.update_personality_behavior(dt, game_state)
-
-    def update_personality_behavior(self, dt, game_state=None):
-        """Execute personality-specific behaviors"""
-        if not game_state:
-            return
-        
-        # Update decoy status
-        if self.decoy_timer > 0:
-            self.decoy_timer -= dt
-            if self.decoy_timer <= 0:
-                self.is_decoy = False
-        
-        if self.fake_movement_cooldown > 0:
-            self.fake_movement_cooldown -= dt
-        
-        # Personality-specific behaviors
-        if self.personality == "trickster" and self.fake_movement_cooldown <= 0:
-            if self.rng and self.rng.random() < (0.1 * self.deception * dt):
-                self.create_fake_movement(game_state)
-                self.fake_movement_cooldown = self.rng.uniform(8, 15)
-        
-        elif self.personality == "stalker":
-            # Track player patterns and predict movements
-            if len(self.player_action_memory) > 3:
-                self.stalking_mode = True
-                self.ambush_position = self.predict_player_weakness()
-        
-        elif self.personality == "patient":
-            # Wait longer before moving, but move with purpose
-            self.move_interval = self.base_interval * (1.5 * self.patience)
-        
-        elif self.personality == "aggressive":
-            # Increase move speed and aggression
-            self.adaptive_aggro = min(2.5, self.adaptive_aggro * 1.1)
-        
-        elif self.personality == "erratic":
-            # Randomize behavior to be unpredictable
-            if self.rng and self.rng.random() < 0.05:
-                self.mood = self.rng.choice(["aggressive", "cautious", "neutral"])
-    
-    def create_fake_movement(self, game_state):
-        """Create a fake movement sound/event"""
-        if hasattr(game_state, 'phantom_sounds'):
-            fake_location = self.rng.choice(list(ROOM_GRAPH.keys()))
-            game_state.phantom_sounds.append({
-                'location': fake_location,
-                'time': time.time(),
-                'type': 'fake_movement'
-            })
-    
-    def predict_player_weakness(self):
-        """Analyze player patterns to find weaknesses"""
-        if not self.player_action_memory:
-            return None
-        
-        # Count door usage patterns
-        left_blocks = sum(1 for action in self.player_action_memory if action.get('side') == 'left')
-        right_blocks = sum(1 for action in self.player_action_memory if action.get('side') == 'right')
-        
-        # Attack the less-defended side
-        if left_blocks < right_blocks:
-            return "left"
-        elif right_blocks < left_blocks:
-            return "right"
-        return None
-    
-    def update_mood(self, game_state=None):
-        """Update mood based on situation - progressive hunting that scales with time and night"""
-        minutes = game_state.minutes_elapsed if game_state else 0
-        night = game_state.night if game_state else 1
-        
-        if self.hunting_mode:
-            self.mood = "hunting"
-        elif self.block_count >= 5:  # Very frustrated - aggressive hunting
-            self.mood = "aggressive"
-        elif self.block_count >= 3:  # Frustrated - increased hunting chance
-            # 60% chance to hunt, 40% patrol
-            self.mood = "hunting" if (minutes + self.block_count) % 5 < 3 else "cautious"
-        
-        # Progressive behavior based on night and time
-        elif night >= 5:  # Night 5 - extremely aggressive
-            if minutes < 5:
-                self.mood = "cautious"  # Brief calm
-            elif minutes % 3 < 2:  # 67% hunting
-                self.mood = "aggressive" if minutes % 6 < 3 else "hunting"
-            else:
-                self.mood = "cautious"
-        
-        elif night >= 4:  # Night 4 - very aggressive
-            if minutes < 10:
-                self.mood = "neutral"  # Short patrol period
-            elif minutes % 4 < 3:  # 75% hunting/aggressive
-                self.mood = "aggressive" if minutes % 8 < 4 else "hunting"
-            else:
-                self.mood = "cautious"
-        
-        elif night >= 3:  # Night 3 - getting serious
-            if minutes < 15:
-                self.mood = "neutral" if minutes % 2 == 0 else "cautious"
-            elif minutes >= 180:  # After 3 hours
-                self.mood = "aggressive" if minutes % 3 < 2 else "hunting"  # 67% aggressive
-            elif minutes >= 60:  # After 1 hour
-                self.mood = "hunting" if minutes % 2 == 0 else "cautious"  # 50% hunting
-            else:
-                self.mood = "cautious" if minutes % 3 < 2 else "hunting"  # 33% hunting
-        
-        elif night >= 2:  # Night 2 - moderate difficulty
-            if minutes < 20:
-                self.mood = "neutral"  # Patrol phase
-            elif minutes >= 150:  # After 2.5 hours
-                self.mood = "hunting" if minutes % 3 < 2 else "cautious"  # 67% hunting
-            elif minutes >= 60:  # After 1 hour
-                self.mood = "hunting" if minutes % 5 < 2 else "neutral"  # 40% hunting
-            else:
-                self.mood = "hunting" if minutes % 7 < 2 else "neutral"  # 29% hunting
-        
-        else:  # Night 1 - tutorial difficulty
-            if minutes < 15:
-                self.mood = "neutral"  # Learn the game
-            elif minutes >= 240:  # After 4 hours (late game)
-                self.mood = "hunting" if minutes % 3 < 2 else "neutral"  # 67% hunting
-            elif minutes >= 120:  # After 2 hours (mid-late)
-                self.mood = "hunting" if minutes % 2 == 0 else "neutral"  # 50% hunting
-            elif minutes >= 60:  # After 1 hour (mid)
-                self.mood = "hunting" if minutes % 5 < 2 else "neutral"  # 40% hunting
-            elif minutes >= 30:  # After 30 minutes (early-mid)
-                self.mood = "hunting" if minutes % 7 < 2 else "neutral"  # 29% hunting
-            else:  # 15-30 minutes (very early)
-                self.mood = "hunting" if minutes % 10 < 2 else "neutral"  # 20% hunting
-
-    def get_mood_multiplier(self):
-        """Get aggression multiplier based on mood"""
-        mood_map = {
-            "neutral": 0.9,      # Slower, calm patrol
-            "cautious": 0.7,     # Very slow, careful
-            "aggressive": 1.3,   # Faster movement
-            "hunting": 1.5,      # Actively seeking player (reduced from 1.6)
-            "retreating": 0.4    # Very slow, backing off
-        }
-        return mood_map.get(self.mood, 0.9)
-
-    def move_patrol(self):
-        """Move along a fixed patrol route"""
-        if not self.patrol_route:
-            return
-        self.patrol_index = (self.patrol_index + 1) % len(self.patrol_route)
-        next_room = self.patrol_route[self.patrol_index]
-        if next_room != self.room:
-            self.last_room = self.room
-            self.room = next_room
-            self.target_x, self.target_y = room_position(self.room, self.display_width, self.display_height)
-
-    def move_toward_target(self, target_room):
-        """Move toward a specific target room"""
-        if not target_room or target_room == self.room:
-            # Reached target - if it's not Office, start investigating (noisemaker)
-            if target_room and target_room != "Office" and self.hunt_target_room == target_room:
-                self.investigating = True
-                self.investigation_timer = 0.0
-            return
-        
-        neighbors = get_neighbors(self.room)
-        if not neighbors:
-            return
-        
-        # Simple pathfinding: move toward target
-        best_room = self.room
-        if target_room in neighbors:
-            best_room = target_room
-        else:
-            # Move closer to target (greedy pathfinding)
-            for neighbor in neighbors:
-                if self._distance_to_room(neighbor, target_room) < self._distance_to_room(best_room, target_room):
-                    best_room = neighbor
-        
-        if best_room != self.room:
-            self.last_room = self.room
-            self.room = best_room
-            self.target_x, self.target_y = room_position(self.room, self.display_width, self.display_height)
-
-    def _distance_to_room(self, from_room, to_room):
-        """Estimate distance between rooms"""
-        if from_room == to_room:
-            return 0
-        # Simple heuristic: count edges to target
-        visited = {from_room}
-        queue = [(from_room, 0)]
-        while queue:
-            current, dist = queue.pop(0)
-            if current == to_room:
-                return dist
-            for neighbor in get_neighbors(current):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, dist + 1))
-        return 999
-
-    def try_attack(self, office):
-        """Try to attack if in office"""
-        if self.room == "Office":
-            if self.attack_side == "left":
-                return not office.door_left_closed
-            if self.attack_side == "right":
-                return not office.door_right_closed
-            if self.attack_side == "vent":
-                # Vent crawler only succeeds if at least one door is open
-                return not (office.door_left_closed and office.door_right_closed)
-        return False
-    
-    def get_blocked_side(self, office):
-        """Check which door is blocking this animatronic (if any)"""
-        if self.room == "Office":
-            if self.attack_side == "left" and office.door_left_closed:
-                self.handle_blocked("left")
-                return "left"
-            if self.attack_side == "right" and office.door_right_closed:
-                self.handle_blocked("right")
-                return "right"
-            if self.attack_side == "vent" and (office.door_left_closed and office.door_right_closed):
-                self.handle_blocked("both")
-                return "both"
-        return None
-
-    def handle_blocked(self, side):
-        """Handle being blocked - learning and mood change (more gradual)"""
-        self.block_count += 1
-        self.last_blocked_time = time.time()
-        
-        # Only become aggressive after multiple blocks
-        if self.block_count >= 3:
-            # Very frustrated - hunt for longer
-            self.hunting_timer = 15.0
-            self.hunt_target_room = "Office"
-            self.mood = "aggressive"
-        elif self.block_count >= 2:
-            # Getting frustrated - short hunt
-            self.hunting_timer = 8.0
-            self.hunt_target_room = "Office"
-            self.mood = "cautious"
-        else:
-            # First block - just retreat, stay in patrol mode
-            self.hunting_timer = 0.0  # Don't hunt on first block
-            self.mood = "cautious"  # Just be cautious
-        
-        # MUST leave the office - find a neighboring room and move there immediately
-        if self.room == "Office":
-            neighbors = get_neighbors(self.room)
-            if neighbors:
-                # Pick a deterministic neighbor, avoid immediate hallway if possible
-                retreat_candidates = [r for r in neighbors if r != "Hallway"]
-                if not retreat_candidates:
-                    retreat_candidates = neighbors
-                self.last_room = self.room
-                self.room = retreat_candidates[self.block_count % len(retreat_candidates)]
-                self.target_x, self.target_y = room_position(self.room, 1280, 720)
-                self.x = self.target_x
-                self.y = self.target_y
-                self.retreat_timer = 4.0
-                self.retreat_target = self.room
-        # Record this memory for future behavior
-        self.player_action_memory.append({"action": "blocked", "side": side, "time": time.time()})
-
-
 # =====================================================
 # ASSET MANAGER
 # =====================================================
@@ -843,20 +208,9 @@ class AssetManager:
         self.load_image("office", "assets/img/office.png")
         self.load_image("door_left", "assets/img/office_door_left.png")
         self.load_image("door_right", "assets/img/office_door_right.png")
-        # Room cameras
-        self.load_image("cam_stage", "assets/img/cam_stage.png")
-        self.load_image("cam_dining_area", "assets/img/cam_dining_area.png")
-        self.load_image("cam_backstage", "assets/img/cam_backstage.png")
-        self.load_image("cam_kitchen", "assets/img/cam_kitchen.png")
-        self.load_image("cam_west_hall", "assets/img/cam_west_hall.png")
-        self.load_image("cam_east_hall", "assets/img/cam_east_hall.png")
-        self.load_image("cam_cafeteria", "assets/img/cam_cafeteria.png")
-        self.load_image("cam_gym", "assets/img/cam_gym.png")
-        self.load_image("cam_library", "assets/img/cam_library.png")
-        self.load_image("cam_bathrooms", "assets/img/cam_bathrooms.png")
-        self.load_image("cam_vent", "assets/img/cam_vent.png")
-        self.load_image("cam_supply_closet", "assets/img/cam_supply_closet.png")
-        self.load_image("cam_restrooms", "assets/img/cam_restrooms.png")
+        # Room cameras (whichever rooms the map puts cameras in)
+        for room in current_map().cameras:
+            self.load_image(camera_image_key(room), os.path.join("assets", camera_image_path(room)))
         self.load_image("title", "assets/img/title.png")
         self.load_image("menu_background", "assets/img/menu_background.png")
         self.load_image("intro_splash", "assets/img/intro_splashscreen.png")
@@ -866,10 +220,9 @@ class AssetManager:
         # Animatronics
         self.load_image("anim_mr_ingles", "assets/img/anim_mr_ingles.png")
         self.load_image("anim_scary_ingles", "assets/img/anim_scary_ingles.png")  # Optional
-        self.load_image("anim_guard_ingles", "assets/img/anim_guard_ingles.png")  # Optional
-        self.load_image("anim_temi", "assets/img/anim_temi.png")
-        self.load_image("anim_librarian", "assets/img/anim_librarian.png")
-        self.load_image("anim_vent_crawler", "assets/img/anim_vent.png")  # Using existing anim_vent.png
+        for code, sprite in enumerate(ROSTER.sprite):  # Every roster archetype's sprite (roster.json)
+            if ROSTER.sprite_key[code] not in self.images:
+                self.load_image(ROSTER.sprite_key[code], os.path.join("assets", "img", sprite))
         self.load_image("mr_ingles_office", "assets/img/mr_ingles_office.png")
         self.load_image("mr_hall_anti_cheater", "assets/img/mr_hall_anti_cheater.png")
 
@@ -960,8 +313,33 @@ class AssetManager:
 # GAME ENGINE
 # =====================================================
 
+def _sim_attr(name):
+    """Property that reads/writes the attribute of the same name on self.sim"""
+    return property(lambda self: getattr(self.sim, name),
+                    lambda self, value: setattr(self.sim, name, value))
+
+
 class Game:
     """Main game engine"""
+    # Game logic state lives on the Simulation; these keep the renderer's view of it short
+    game_state = _sim_attr("game_state")
+    power = _sim_attr("power")
+    office = _sim_attr("office")
+    cameras = _sim_attr("cameras")
+    jumpscare = _sim_attr("jumpscare")
+    animatronics = _sim_attr("animatronics")
+    difficulty = _sim_attr("difficulty")
+    threat_level = _sim_attr("threat_level")
+    power_usage = _sim_attr("power_usage")
+    performance_score = _sim_attr("performance_score")
+    hallucination_mode = _sim_attr("hallucination_mode")
+    combo_blocks = _sim_attr("combo_blocks")
+    current_safe_spot = _sim_attr("current_safe_spot")
+    noise_maker_rooms = _sim_attr("noise_maker_rooms")
+    anti_cheat_active = _sim_attr("anti_cheat_active")
+    anti_cheat_pending = _sim_attr("anti_cheat_pending")
+    anti_cheat_timer = _sim_attr("anti_cheat_timer")
+
     def __init__(self):
         pygame.init()
         try:
@@ -998,16 +376,20 @@ class Game:
         _sh = int(WINDOW_HEIGHT * self.scale_factor)
         self._scaled_display_buf = pygame.Surface((_sw, _sh))
 
-        # Game components
-        self.game_state = GameState()
-        # Keep game state at 720p for perfect asset rendering
-        self.game_state.width = WINDOW_WIDTH
-        self.game_state.height = WINDOW_HEIGHT
-        
-        self.power = PowerSystem()
-        self.office = Office()
-        self.cameras = CameraSystem()
-        self.jumpscare = Jumpscare()
+        # Game components - all game logic lives in the headless simulation,
+        # this class only renders it and turns its events into sound/effects
+        self.sim = Simulation()
+        self.sim.add_observer(self.on_sim_event)
+        self.pending_inputs = []  # Player actions queued for the next sim step
+        self.replay_recorder = ReplayRecorder()  # Records every night as run_seed + (tick, action) inputs
+        self.replay_recorder.set_dt(SIM_DT)
+        self.sim.add_observer(self.replay_recorder)
+        self.replay_playback = None  # tick -> [actions] while a replay is driving the sim
+        self.replay_speed = 1.0
+        self.hour_checkpoints = HourCheckpoints()  # Snapshot at each in-game hour for "retry this hour"
+        self.sim_accumulator = 0.0  # Real time not yet simulated (always < SIM_DT after a frame)
+        self.render_alpha = 1.0  # How far between the last two ticks this frame is drawn
+        self._prev_render = {"anims": {}, "doors": (0.0, 0.0), "pan": (0.0, 0.0)}
         self.assets = AssetManager()
 
         # Runtime safety logging
@@ -1015,9 +397,6 @@ class Game:
         self.runtime_error_count = 0
         self.last_error_time = 0.0
 
-        # Animatronics list
-        self.animatronics = []
-
         # Fonts (scaled from 720p base to native resolution)
         self.font_small = pygame.font.Font(None, int(20 * self.scale_factor))
         self.font_medium = pygame.font.Font(None, int(32 * self.scale_factor))
@@ -1030,48 +409,28 @@ class Game:
         self.flicker_timer = 0
         self.static_intensity = 1
         self.noise_phase = 0.0
-        self.flicker_phase = 0.0
-        self.run_seed = int(time.time() * 1000) % 1000000
-        self.rng = random.Random(self.run_seed)
+        self.rng = self.sim.fx_rng  # Cosmetic stream: drawing from it never changes the night
         
         # FPS optimization tracking
         self.fps_samples = deque([60.0] * 10, maxlen=10)  # Ring buffer, no slicing needed
         self.current_fps = 60
-        self.quality_scale = 1.0  # Dynamic quality (1.0 = full, 0.5 = half)
+        self.quality_scale = 1.0  # Dynamic render quality (1.0 = full, 0.5 = half) - never affects gameplay
         self.frame_count = 0
-        self.side_entry_cooldown = {"left": 0.0, "right": 0.0, "vent": 0.0}
-        self.entry_cooldown_seconds = 6.0
-        self.max_office_attackers = 2
-        self.jam_grace_timer = 0.0
-        self.overload_grace_timer = 0.0
-        self.door_open_limit = 7.0
-        self.power_usage = {"base": 0.0, "doors": 0.0, "lights": 0.0, "cams": 0.0, "surge": 1.0}
         self.show_controls = True
-        
-        # Environmental event system
-        self.phantom_sound_cooldown = 0
-        self.environmental_event_timer = 0
-        self.next_event_time = 30  # First event after 30 seconds
-        self.hallucination_mode = False
-        self.hallucination_timer = 0
-        
-        # Animatronic coordination
-        self.coordinated_attack_cooldown = 0
-        self.active_coordination = None
-        
-        # Dynamic stats tracking
-        self.total_door_closes = 0
-        self.total_camera_checks = 0
-        self.perfect_blocks = 0
-        self.failed_blocks = 0
-        self.performance_score = 0
+        self.forecaster = None  # DangerForecaster while the danger forecast is on (G)
+        self.forecast_due = 0.0  # Sim time the next periodic forecast snapshot is sent
         self.high_scores = {}  # Night -> score mapping
-        
-        # Screen effects
+        self.custom_roster = self.default_custom_roster()  # [[archetype, count, level], ...] for custom nights
+        self.custom_cursor = 0  # Selected row on the custom night screen
+        
+        # Screen effects and sound scheduling count down on a timer wheel of their own
+        self.effect_timers = TimerWheel()
+        self.effect_timers.on_expire("screen_shake", self.end_screen_shake)
+        self.effect_timers.on_expire("color_overlay", self.clear_color_overlay)
+        self.effect_timers.on_expire("random_static", self.play_random_static)
+        self.effect_timers.on_expire("ambient_sound", self.play_random_ambient_sound)
         self.screen_shake_intensity = 0
-        self.screen_shake_duration = 0
         self.color_overlay = None  # (r, g, b, alpha) or None
-        self.color_overlay_timer = 0
         self.particles = []  # List of particle effects
         
         # Office camera panning (FNAF-style)
@@ -1083,53 +442,31 @@ class Game:
         self.office_pan_epsilon = 0.01  # Epsilon for division by zero protection
         
         # Amazing new features
-        self.threat_level = 0  # Real-time threat assessment 0-100
-        self.audio_distraction_cooldown = 0
         self.generator_minigame_active = False
         self.generator_progress = 0
         self.generator_target_keys = []
         self.nightmare_mode = False
-        self.safe_spots_available = ["Cupboard", "Under Desk", "Vent"]
-        self.current_safe_spot = None
-        self.safe_spot_duration = 0
-        self.footstep_sounds = []  # Track animatronic movements
         self.breathing_intensity = 0  # Increases with danger
         self.heartbeat_active = False
         self.last_noise_time = 0
-        self.combo_blocks = 0  # Consecutive perfect blocks
-        self.combo_timer = 0
         
         # Camera static sound system
         self.static_loop_playing = False  # Track if static_loop is currently playing
-        self.random_static_timer = 0.0  # Timer for random static playback
-        self.next_random_static_time = self.rng.uniform(20, 40)  # Next random static event (seconds)
+        self.effect_timers.start("random_static", self.rng.uniform(20, 40))  # Next random static burst
         
         # Random ambient sound system (for suspense)
-        self.ambient_sound_timer = 0.0
-        self.next_ambient_sound_time = self.rng.uniform(12, 18)  # ~15 second intervals (12-18 seconds)
+        self.effect_timers.start("ambient_sound", self.rng.uniform(12, 18))  # ~15 second intervals (12-18 seconds)
         self.ambient_sounds = ["door_knock", "vent_crawl", "faaah", "hour_chime"]  # Sounds to play randomly
         
         # Noise maker menu state
         self.noise_maker_menu_active = False
-        self.noise_maker_rooms = ["Cafeteria", "Gym", "Library", "Bathrooms", "Dining Area", "Kitchen", "Vent"]
         self.noise_maker_buttons = {}  # Room index -> button rect
         self.night_buttons = {}  # Night number -> button rect
 
-        # Anti-cheat: reflex door spam detection
-        self.reflex_blocks = 0
-        self.last_reflex_time = 0.0
-        self.last_office_entry_time = {"left": -999.0, "right": -999.0, "vent": -999.0}
-        self.anti_cheat_active = False
-        self.anti_cheat_timer = 0.0
-        self.anti_cheat_pending = False
-        
-        # Door spam prevention
-        self.door_toggle_history = {"left": [], "right": []}  # Track recent toggles
-        self.door_spam_penalty = 0.0  # Accumulated penalty for spamming
-        
         # Minimap data
         self.minimap_room_positions = {}
-        self.coordination_timer = 0.0
+        self._minimap_layer = None  # Static map drawing, rebuilt only if the map or panel moves
+        self._minimap_layer_key = None
 
         # Menu slider (night length)
         self.slider_min = 15.0   # seconds per in-game hour (fast)
@@ -1139,7 +476,6 @@ class Game:
         # Difficulty slider
         self.difficulty_min = 0.8
         self.difficulty_max = 2.0
-        self.difficulty = 1.2
         self.dragging_difficulty = False
 
         # Menu functional toggles (non-visual)
@@ -1318,64 +654,8 @@ class Game:
     
     def set_status(self, msg=""):
         """Set status message"""
-        self.game_state.status = msg or ""
-
-    def log_event(self, msg, add_personality_hint=False):
-        """Event log disabled"""
-        pass
-
-    def break_door(self, side):
-        """Force a door to jam open when its health is depleted"""
-        # Play door damage/break sound
-        self.assets.play_sound("door_damage")
-        
-        if side == "left":
-            self.office.door_left_closed = False
-            self.office.door_left_jam_timer = 4.5
-            self.set_status("Left door jammed open!")
-            self.log_event("Left door jammed")
-        elif side == "right":
-            self.office.door_right_closed = False
-            self.office.door_right_jam_timer = 4.5
-            self.set_status("Right door jammed open!")
-            self.log_event("Right door jammed")
-        self.jam_grace_timer = max(self.jam_grace_timer, 3.0)
-
-    def check_reflex_cheat(self, side):
-        """Detect reflex door slams right after an animatronic enters."""
-        if self.anti_cheat_active:
-            return
-        entry_time = self.last_office_entry_time.get(side, -999.0)
-        if entry_time <= 0:
-            return
-        now = time.time()
-        # If the door is slammed within a very short window, count it
-        if now - entry_time <= 1.2:
-            # Decay the counter if it's been a while
-            if now - self.last_reflex_time > 20.0:
-                self.reflex_blocks = 0
-            self.reflex_blocks += 1
-            self.last_reflex_time = now
-            if self.reflex_blocks >= 1:
-                self.trigger_anti_cheat()
-
-    def trigger_anti_cheat(self):
-        """Trigger anti-cheat punishment sequence."""
-        if self.anti_cheat_active:
-            return
-        self.anti_cheat_active = True
-        self.anti_cheat_timer = 0.0
-        self.anti_cheat_pending = False
-        # Force office view and hide animatronics during the warning
-        self.office.cams_open = False
-        self.office.light_on = False
-        for anim in self.animatronics:
-            anim.room = "Hidden"
-        self.assets.stop_music()
-        self.assets.play_sound("nice_try")
-        self.set_status("")
-        self.game_state.state = "anti_cheat"
-    
+        self.sim.set_status(msg)
+
     def apply_creepy_static(self, intensity=0.3):
         """Apply creepy static/noise overlay (optimized with quality scaling)"""
         # Skip if quality is very low
@@ -1428,44 +708,37 @@ class Game:
         # Border
         pygame.draw.rect(self.screen, (100, 150, 200), (minimap_x, minimap_y, minimap_width, minimap_height), 2)
         
-        # Title
-        map_title = self.font_small.render("CAMERA MAP", True, (100, 200, 255))
-        self.screen.blit(map_title, (minimap_x + 10, minimap_y + 5))
-        
-        # Scale and position for minimap rooms using dynamic positions
-        room_positions = {}
-        for room, normalized_pos in ROOM_POSITIONS.items():
-            # Scale normalized positions (0-1) to minimap coordinates
-            # Leave padding on edges
-            x = minimap_x + 20 + int(normalized_pos[0] * (minimap_width - 40))
-            y = minimap_y + 30 + int(normalized_pos[1] * (minimap_height - 50))
-            room_positions[room] = (x, y)
-        
-        # Store positions for click detection
-        self.minimap_room_positions = room_positions
-        
-        # Draw room connections
-        for room, neighbors in ROOM_GRAPH.items():
-            if room in room_positions:
-                for neighbor in neighbors:
-                    if neighbor in room_positions:
-                        pygame.draw.line(self.screen, (60, 100, 150), 
-                                       room_positions[room], room_positions[neighbor], 1)
-        
-        # Draw rooms
-        for room, pos in room_positions.items():
-            # Highlight current camera room
-            is_current_room = room == self.cameras.current_camera()
-            room_color = (50, 255, 100) if is_current_room else (60, 120, 180)
-            pygame.draw.circle(self.screen, room_color, pos, 12)
-            pygame.draw.circle(self.screen, (100, 200, 255), pos, 12, 2)
-            
-            # Room label (abbreviated)
-            label = room[:3].upper()
-            label_text = self.font_small.render(label, True, (200, 200, 200))
-            label_rect = label_text.get_rect(center=pos)
-            self.screen.blit(label_text, (label_rect.x - 2, label_rect.y - 3))
-        
+        # Title, connections, rooms and labels only change with the map - draw them once
+        building = current_map()
+        layer_key = (id(building), minimap_x, minimap_y, minimap_width, minimap_height)
+        if self._minimap_layer_key != layer_key:
+            self.build_minimap_layer(building, minimap_x, minimap_y, minimap_width, minimap_height)
+            self._minimap_layer_key = layer_key
+        self.screen.blit(self._minimap_layer, (minimap_x, minimap_y))
+        room_positions = self.minimap_room_positions
+
+        # Highlight current camera room
+        current_pos = room_positions.get(self.cameras.current_camera())
+        if current_pos:
+            pygame.draw.circle(self.screen, (50, 255, 100), current_pos, 12)
+            pygame.draw.circle(self.screen, (100, 200, 255), current_pos, 12, 2)
+            label = self.font_small.render(self.cameras.current_camera()[:3].upper(), True, (200, 200, 200))
+            label_rect = label.get_rect(center=current_pos)
+            self.screen.blit(label, (label_rect.x - 2, label_rect.y - 3))
+
+        # Animatronic dots - one per occupied room, with a count when crowded
+        if self._minimap_dot_orange is None:
+            self._minimap_dot_orange = pygame.Surface((6, 6))
+            self._minimap_dot_orange.fill((255, 150, 50))
+        for room, occupants in self.sim.occupancy.rooms.items():
+            pos = room_positions.get(room)
+            if pos is None or not occupants:
+                continue
+            self.screen.blit(self._minimap_dot_orange, (pos[0] + 8, pos[1] - 14))
+            if len(occupants) > 1:
+                count_text = self.font_small.render(str(len(occupants)), True, (255, 180, 100))
+                self.screen.blit(count_text, (pos[0] + 16, pos[1] - 18))
+
         # Legend (optimized with cached surfaces)
         legend_y = minimap_y + minimap_height - 25
         
@@ -1478,15 +751,34 @@ class Game:
         legend_text = self.font_small.render("Current Cam", True, (150, 200, 150))
         self.screen.blit(legend_text, (minimap_x + 20, legend_y - 2))
         
-        # Create and cache orange dot
-        if self._minimap_dot_orange is None:
-            self._minimap_dot_orange = pygame.Surface((6, 6))
-            self._minimap_dot_orange.fill((255, 150, 50))
-        
         self.screen.blit(self._minimap_dot_orange, (minimap_x + 150, legend_y))
         anim_text = self.font_small.render("Animatronic", True, (255, 180, 100))
         self.screen.blit(anim_text, (minimap_x + 160, legend_y - 2))
     
+    def build_minimap_layer(self, building, minimap_x, minimap_y, minimap_width, minimap_height):
+        """Pre-render the minimap's static parts and store room positions for click detection"""
+        self.minimap_room_positions = building.minimap_layout(minimap_x, minimap_y, minimap_width, minimap_height)
+        layer = pygame.Surface((minimap_width, minimap_height), pygame.SRCALPHA)
+        local = {room: (x - minimap_x, y - minimap_y) for room, (x, y) in self.minimap_room_positions.items()}
+
+        map_title = self.font_small.render("CAMERA MAP", True, (100, 200, 255))
+        layer.blit(map_title, (10, 5))
+
+        # Draw room connections
+        for room, neighbor in building.edges:
+            pygame.draw.line(layer, (60, 100, 150), local[room], local[neighbor], 1)
+
+        # Draw rooms
+        for room, pos in local.items():
+            pygame.draw.circle(layer, (60, 120, 180), pos, 12)
+            pygame.draw.circle(layer, (100, 200, 255), pos, 12, 2)
+
+            # Room label (abbreviated)
+            label_text = self.font_small.render(room[:3].upper(), True, (200, 200, 200))
+            label_rect = label_text.get_rect(center=pos)
+            layer.blit(label_text, (label_rect.x - 2, label_rect.y - 3))
+        self._minimap_layer = layer
+
     def get_clicked_room(self, mouse_pos):
         """Check if a room was clicked on the minimap"""
         for room, pos in self.minimap_room_positions.items():
@@ -1515,6 +807,14 @@ class Game:
                         self.skip_tutorial = bool(data.get("skip_tutorial"))
                     if "fps_cap_enabled" in data:
                         self.fps_cap_enabled = bool(data.get("fps_cap_enabled"))
+                    if "custom_roster" in data:
+                        saved = {name: (count, level) for name, count, level in data["custom_roster"]}
+                        for entry in self.custom_roster:
+                            count, level = saved.get(entry[0], entry[1:])
+                            entry[1] = self.clamp(int(count), 0, MAX_CUSTOM_ANIMATRONICS)
+                            entry[2] = self.clamp(int(level), 0, CUSTOM_LEVEL_MAX)
+                        if self.custom_active_count() > MAX_CUSTOM_ANIMATRONICS:
+                            self.custom_roster = self.default_custom_roster()
             except:
                 self.game_state.max_night_unlocked = 1
         else:
@@ -1530,6 +830,7 @@ class Game:
             "sfx_muted": self.assets.sfx_muted,
             "skip_tutorial": self.skip_tutorial,
             "fps_cap_enabled": self.fps_cap_enabled,
+            "custom_roster": self.custom_roster,
         }
         try:
             with open(SAVE_FILE, 'w') as f:
@@ -1537,140 +838,23 @@ class Game:
         except:
             pass
 
-    def reset_animatronics(self):
-        """Reset animatronics to starting positions"""
-        def jitter(base, spread):
-            return base + self.rng.uniform(-spread, spread)
-        
-        # Get available rooms for animatronic starting positions
-        # Exclude Office and its immediate neighbors from starting positions
-        office_neighbors_set = set(get_neighbors("Office"))
-        available_rooms = [room for room in ROOM_GRAPH.keys() 
-                          if room != "Office" and room not in office_neighbors_set]
-        
-        # Ensure we have enough rooms
-        if len(available_rooms) < 4:
-            available_rooms = list(ROOM_GRAPH.keys())
-        
-        # Randomly select starting rooms for each animatronic
-        start_rooms = self.rng.sample(available_rooms, min(4, len(available_rooms)))
-        # Allow duplicates if we don't have enough unique rooms - animatronics can start in same location
-        if len(start_rooms) < 4:
-            start_rooms.extend(self.rng.choices(available_rooms, k=4-len(start_rooms)))
-        
-        # Generate patrol routes for each animatronic
-        def generate_patrol_route(start_room, length=4):
-            """Generate a patrol route starting from a room"""
-            route = [start_room]
-            current = start_room
-            visited = set([start_room])
-            
-            for _ in range(length - 1):
-                neighbors = [n for n in get_neighbors(current) if n not in ["Office"]]
-                if not neighbors:
-                    break
-                
-                # Prefer unvisited rooms
-                unvisited = [n for n in neighbors if n not in visited]
-                if unvisited:
-                    next_room = self.rng.choice(unvisited)
-                else:
-                    next_room = self.rng.choice(neighbors)
-                
-                route.append(next_room)
-                visited.add(next_room)
-                current = next_room
-            
-            # Add office-adjacent rooms to make them approach the office
-            office_adjacent = set(get_neighbors("Office"))
-            route_set = set(route)
-            for adj_room in office_adjacent:
-                if adj_room not in route_set and self.rng.random() < 0.6:
-                    route.append(adj_room)
-                    route_set.add(adj_room)
-            
-            return route
-
-        self.animatronics = [
-            Animatronic("Scary Mr Ingles", start_rooms[0], jitter(0.52, 0.08), jitter(5.0, 0.5), "normal",
-                        attack_side="right",
-                        patrol_route=generate_patrol_route(start_rooms[0], 5),
-                        start_delay_minutes=self.rng.randint(2, 5),
-                        hallway_entry_delay=jitter(2.2, 0.4),
-                        aggression_ramp=jitter(0.25, 0.06),
-                        rng=self.rng,
-                        display_width=WINDOW_WIDTH,
-                        display_height=WINDOW_HEIGHT),
-            Animatronic("Freaky Temi", start_rooms[1], jitter(0.34, 0.05), jitter(6.5, 0.7), "teleport",
-                        attack_side="right",
-                        patrol_route=generate_patrol_route(start_rooms[1], 4),
-                        start_delay_minutes=self.rng.randint(5, 10),
-                        hallway_entry_delay=jitter(2.6, 0.4),
-                        aggression_ramp=jitter(0.22, 0.06),
-                        rng=self.rng,
-                        size_multiplier=0.45,
-                        display_width=WINDOW_WIDTH,
-                        display_height=WINDOW_HEIGHT),
-            Animatronic("Librarian", start_rooms[2], jitter(0.32, 0.05), jitter(6.8, 0.6), "teleport",
-                        attack_side="left",
-                        patrol_route=generate_patrol_route(start_rooms[2], 4),
-                        start_delay_minutes=self.rng.randint(6, 11),
-                        hallway_entry_delay=jitter(2.4, 0.4),
-                        aggression_ramp=jitter(0.24, 0.06),
-                        rng=self.rng,
-                        display_width=WINDOW_WIDTH,
-                        display_height=WINDOW_HEIGHT),
-            Animatronic("Vent Crawler", start_rooms[3], jitter(0.38, 0.05), jitter(5.8, 0.6), "vent",
-                        attack_side="vent",
-                        patrol_route=generate_patrol_route(start_rooms[3], 4),
-                        start_delay_minutes=self.rng.randint(15, 21),
-                        hallway_entry_delay=jitter(2.0, 0.3),
-                        aggression_ramp=jitter(0.28, 0.06),
-                        rng=self.rng,
-                        display_width=WINDOW_WIDTH,
-                        display_height=WINDOW_HEIGHT),
-        ]
-
-    def start_night(self, night):
-        """Start a new night"""
+    def start_night(self, night, roster=None):
+        """Start a new night (roster: custom night [(archetype, count, level), ...])"""
         self.assets.stop_music()
-        self.game_state.night = self.clamp(night, 1, 5)
-        self.set_status("")
-        
-        self.power.reset()
-        self.office.reset()
-        self.reset_animatronics()
-        self.jumpscare.reset()
-        self.cameras.current_index = 0
-        # Reset time counters
-        self.game_state.hour = 12
-        self.game_state.hour_timer = 0
-        self.game_state.minutes_elapsed = 0
-        # Reset safe spot state for new night
-        self.current_safe_spot = None
-        self.safe_spot_duration = 0
-        self.safe_spots_available = ["Closet", "Under Desk", "Vent"]
-
-        # Reset anti-cheat state
-        self.reflex_blocks = 0
-        self.last_reflex_time = 0.0
-        self.last_office_entry_time = {"left": -999.0, "right": -999.0, "vent": -999.0}
-        self.anti_cheat_active = False
-        self.anti_cheat_timer = 0.0
-        self.anti_cheat_pending = False
+        self.sim.start_night(night, run_seed=new_run_seed(), roster=roster)
+        self.pending_inputs = []
+        self.replay_playback = None
+        self.replay_speed = 1.0
+        self.hour_checkpoints.clear()
+        self.capture_render_state()
         
         # Reset camera static sound state
         self.assets.stop_sound("static_loop")
         self.static_loop_playing = False
-        self.random_static_timer = 0.0
-        self.next_random_static_time = self.rng.uniform(20, 40)
+        self.effect_timers.start("random_static", self.rng.uniform(20, 40))
         
         # Reset ambient sound state
-        self.ambient_sound_timer = 0.0
-        self.next_ambient_sound_time = self.rng.uniform(12, 18)
-        
-        # Apply adaptive difficulty based on previous performance
-        self.apply_adaptive_difficulty()
+        self.effect_timers.start("ambient_sound", self.rng.uniform(12, 18))
 
         # Intro sequence only for Night 1 AND only if not seen before
         if self.game_state.night == 1 and not self.intro_seen:
@@ -1709,40 +893,46 @@ class Game:
                 # Load and play night ambience
                 ambience_key = f"ambience_n{self.game_state.night}"
                 self.assets.play_music(ambience_key)
-                self.game_state.state = "playing"
-                self.game_state.start_time = time.time()
-                self.game_state.hour_timer = 0
-                self.game_state.minutes_elapsed = 0
+                self.sim.begin_playing()
                 self.start_fade_in()  # Fade back in
             
             self.start_fade_out(callback=start_playing_after_fade)
 
-    def apply_adaptive_difficulty(self):
-        """Adjust animatronic difficulty based on player performance"""
-        if self.game_state.night < 2:
-            return
-        
-        # Base difficulty increases per night
-        night_factor = 0.15 * (self.game_state.night - 1)
-        
-        # Analyze player performance from previous nights (use door usage patterns)
-        successful_defenses = sum([a.block_count for a in self.animatronics]) / max(1, len(self.animatronics))
-        
-        # If player was very successful at blocking, make animatronics more aggressive
-        if successful_defenses > 5:
-            difficulty_boost = 0.2
-        elif successful_defenses > 2:
-            difficulty_boost = 0.1
+    def start_custom_night(self):
+        """Start a custom night with the roster picked on the custom night screen"""
+        self.save_progress()
+        self.start_night(5, roster=[tuple(entry) for entry in self.custom_roster])
+
+    def restart_night(self, night):
+        """Restart after a loss: the same custom night, or the story from night"""
+        if self.sim.roster is not None:
+            self.start_custom_night()
         else:
-            difficulty_boost = 0.0
-        
-        # Apply difficulty adjustments to animatronics
-        for anim in self.animatronics:
-            anim.base_aggro = anim.base_aggro * (1.0 + night_factor + difficulty_boost)
-            anim.aggro = anim.base_aggro
-            # Reset learning for new night but keep personality
-            anim.block_count = max(0, anim.block_count - 3)
-            anim.player_action_memory.clear()
+            self.start_night(night)
+
+    def default_custom_roster(self):
+        """Each story animatronic once at the story level; the custom-only ones off"""
+        return [[name, 1 if code in ROSTER.story else 0, STORY_LEVEL] for code, name in enumerate(ROSTER.names)]
+
+    def custom_active_count(self):
+        """Animatronics the custom roster puts in the building (level 0 stays home)"""
+        return sum(count for _, count, level in self.custom_roster if level > 0)
+
+    def adjust_custom_roster(self, field, delta):
+        """Change the selected row's count (field 1) or AI level (field 2), keeping the total legal"""
+        entry = self.custom_roster[self.custom_cursor]
+        before = entry[field]
+        limit = MAX_CUSTOM_ANIMATRONICS if field == 1 else CUSTOM_LEVEL_MAX
+        entry[field] = self.clamp(before + delta, 0, limit)
+        if self.custom_active_count() > MAX_CUSTOM_ANIMATRONICS:
+            entry[field] = before
+
+    def set_horde_roster(self):
+        """Preset: MAX_CUSTOM_ANIMATRONICS split evenly across every archetype"""
+        share, extra = divmod(MAX_CUSTOM_ANIMATRONICS, len(self.custom_roster))
+        for i, entry in enumerate(self.custom_roster):
+            entry[1] = share + (1 if i < extra else 0)
+            entry[2] = STORY_LEVEL
 
     def restart_from_menu(self):
         """Return to menu"""
@@ -1838,15 +1028,102 @@ class Game:
     # UPDATE FUNCTIONS
     # =====================================================
     
+    def on_sim_event(self, event, data):
+        """Turn simulation events into sound, particles and save data"""
+        if event == "sound":
+            self.assets.play_sound(data["name"], loops=data.get("loops", 0))
+        elif event == "stop_sound":
+            self.assets.stop_sound(data["name"])
+        elif event == "stop_music":
+            self.assets.stop_music()
+        elif event == "screen_shake":
+            self.add_screen_shake(data["intensity"], data["duration"])
+        elif event == "color_overlay":
+            self.add_color_overlay(data["color"], data["duration"])
+        elif event == "particle_burst":
+            self.add_particle_burst(data["x"], data["y"], data["count"], data["color"], data["speed_range"])
+        elif event == "door_effect":
+            door_x = 100 if data["side"] == "left" else self.game_state.width - 100
+            count, vx, vy, color, size, life = DOOR_PARTICLES[data["kind"]]
+            for _ in range(count):
+                self.add_particle(door_x, self.game_state.height // 2,
+                                self.rng.uniform(*vx), self.rng.uniform(*vy),
+                                color, size, life)
+        elif event == "flashlight_on":
+            # Spawn light particles in center
+            for _ in range(15):
+                self.add_particle(self.game_state.width // 2, self.game_state.height // 2,
+                                self.rng.uniform(-8, 8), self.rng.uniform(-8, 8),
+                                (255, 255, 200, 255), 4, 0.7)
+        elif event == "cameras_toggled":
+            if data["opened"]:
+                self.assets.play_sound("camera_flash")
+                # Start looping static sound
+                if not self.static_loop_playing:
+                    self.assets.play_sound("static_loop", loops=-1)
+                    self.static_loop_playing = True
+                # Static burst effect
+                self.game_state.vhs_effect = min(2.0, self.game_state.vhs_effect + 0.5)
+            else:
+                # Closing cameras also triggers brief static
+                self.game_state.vhs_effect = min(2.0, self.game_state.vhs_effect + 0.3)
+                if self.static_loop_playing:
+                    self.assets.stop_sound("static_loop")
+                    self.static_loop_playing = False
+        elif event == "camera_switched":
+            # Brief VHS distortion spike
+            self.game_state.vhs_effect = min(2.0, self.game_state.vhs_effect + 0.2)
+        elif event == "power_outage":
+            self.static_intensity = 0.8
+            self.screen_shake = 3
+        elif event == "night_started":
+            if self.forecaster is not None:
+                self.forecaster.discard()
+            self.forecast_due = 0.0
+        elif event == "night_won":
+            # Custom nights are for fun - no high scores or unlocks
+            if self.sim.roster is not None:
+                return
+            # Save high score if it's better
+            night_key = data["night"]
+            if night_key not in self.high_scores or data["score"] > self.high_scores[night_key]:
+                self.high_scores[night_key] = data["score"]
+            if (self.game_state.night < 5 and
+                    self.game_state.night + 1 > self.game_state.max_night_unlocked):
+                self.game_state.max_night_unlocked = self.game_state.night + 1
+                self.save_progress()
+
+    def update_effect_decay(self):
+        """Low-power shake plus screen shake / static decay"""
+        # Screen shake on critical power
+        if self.game_state.state == "playing" and 0 < self.power.current < 10:
+            self.screen_shake = 1 + (10 - self.power.current) * 0.1
+
+        # Screen shake decay
+        if self.screen_shake > 0:
+            self.screen_shake *= 0.95
+        
+        # Static intensity decay (but stay high during outage)
+        if self.power.outage:
+            self.static_intensity = 0.6
+        elif self.static_intensity > 0:
+            self.static_intensity *= 0.98
+
     def add_screen_shake(self, intensity, duration):
         """Add screen shake effect"""
         self.screen_shake_intensity = max(self.screen_shake_intensity, intensity)
-        self.screen_shake_duration = max(self.screen_shake_duration, duration)
+        self.effect_timers.extend("screen_shake", duration)
+
+    def end_screen_shake(self):
+        self.screen_shake_intensity = 0
     
     def add_color_overlay(self, color, duration):
         """Add temporary color overlay (r, g, b, alpha)"""
         self.color_overlay = color
-        self.color_overlay_timer = duration
+        self.effect_timers.start("color_overlay", duration)
+
+    def clear_color_overlay(self):
+        self.color_overlay = None
     
     def add_particle(self, x, y, vx, vy, color, size, life):
         """Add a single particle with specified properties (with limit)"""
@@ -1883,17 +1160,8 @@ class Game:
     
     def update_screen_effects(self, dt):
         """Update all screen effects (optimized)"""
-        # Update screen shake
-        if self.screen_shake_duration > 0:
-            self.screen_shake_duration -= dt
-            if self.screen_shake_duration <= 0:
-                self.screen_shake_intensity = 0
-        
-        # Update color overlay
-        if self.color_overlay_timer > 0:
-            self.color_overlay_timer -= dt
-            if self.color_overlay_timer <= 0:
-                self.color_overlay = None
+        # Shake and overlay countdowns (and the random static/ambient sounds) run out here
+        self.effect_timers.advance(dt)
         
         # Update particles (optimized - batch processing)
         for i, particle in enumerate(self.particles):
@@ -1917,8 +1185,8 @@ class Game:
         if self.power.outage:
             stress_level += 0.5 * self.quality_scale
         # Check if any animatronics are adjacent to office
-        office_neighbors_set = set(get_neighbors("Office"))
-        if any(a.room in office_neighbors_set for a in self.animatronics):
+        graph = room_graph()
+        if any(self.sim.occupancy.occupied(room) for room in graph.door_side):
             stress_level += 0.2
         
         self.game_state.chromatic_aberration = stress_level
@@ -2144,62 +1412,6 @@ class Game:
         glow_surf.set_alpha(int(255 * intensity))
         self.screen.blit(glow_surf, (0, 0))
 
-    def update_office_effects(self, dt):
-        """Update office visual effects"""
-        # Door animations
-        door_speed = 5 * dt
-        left_target = 1 if self.office.door_left_closed else 0
-        right_target = 1 if self.office.door_right_closed else 0
-        self.office.door_left_progress += (left_target - self.office.door_left_progress) * door_speed
-        self.office.door_right_progress += (right_target - self.office.door_right_progress) * door_speed
-
-        # Light dimming
-        dim_target = 0 if self.office.light_on else 0.6
-        dim_speed = 3 * dt
-        self.office.light_dim += (dim_target - self.office.light_dim) * dim_speed
-
-        # Camera flash fade
-        if self.office.cam_flash > 0:
-            self.office.cam_flash = max(0, self.office.cam_flash - dt * 2.8)
-
-        # Door jam timers
-        if self.office.door_left_jam_timer > 0:
-            self.office.door_left_jam_timer = max(0, self.office.door_left_jam_timer - dt * 1.5)
-        if self.office.door_right_jam_timer > 0:
-            self.office.door_right_jam_timer = max(0, self.office.door_right_jam_timer - dt * 1.5)
-
-        # Doors stay open/closed until player toggles them - no auto-close
-        # This gives players full control
-
-        # Entry cooldown timers (fairness)
-        for side in self.side_entry_cooldown:
-            if self.side_entry_cooldown[side] > 0:
-                self.side_entry_cooldown[side] = max(0.0, self.side_entry_cooldown[side] - dt)
-
-        if self.jam_grace_timer > 0:
-            self.jam_grace_timer = max(0.0, self.jam_grace_timer - dt)
-        if self.overload_grace_timer > 0:
-            self.overload_grace_timer = max(0.0, self.overload_grace_timer - dt)
-
-        # Door wear and passive recovery
-        wear_rate = (1.2 * self.difficulty) * dt
-        recover_rate = (0.6 / max(0.8, self.difficulty)) * dt
-        if self.office.door_left_closed:
-            self.office.door_left_health = max(0, self.office.door_left_health - wear_rate)
-        else:
-            self.office.door_left_health = 100.0
-        if self.office.door_right_closed:
-            self.office.door_right_health = max(0, self.office.door_right_health - wear_rate)
-        else:
-            self.office.door_right_health = 100.0
-
-        if self.office.door_left_closed and self.office.door_left_health <= 0 and self.office.door_left_jam_timer <= 0:
-            self.break_door("left")
-        if self.office.door_right_closed and self.office.door_right_health <= 0 and self.office.door_right_jam_timer <= 0:
-            self.break_door("right")
-
-        self.update_fairness_caps()
-
     def update_office_camera_panning(self, dt):
         """Update office camera panning based on mouse position (FNAF-style)"""
         # Only pan when in office view (not looking at cameras)
@@ -2275,499 +1487,10 @@ class Game:
         self.office_camera_offset_x = max(-max_offset_x, min(0.0, self.office_camera_offset_x))
         self.office_camera_offset_y = max(-max_offset_y, min(0.0, self.office_camera_offset_y))
 
-    def update_fairness_caps(self):
-        """Compute real-time caps to prevent impossible states"""
-        doors_open = int(not self.office.door_left_closed) + int(not self.office.door_right_closed)
-        avg_health = (self.office.door_left_health + self.office.door_right_health) / 2.0
-        low_power = self.power.current < 20
-        cam_disabled = self.power.outage
-        jam_active = self.office.door_left_jam_timer > 0 or self.office.door_right_jam_timer > 0
-
-        cap = 2
-        if doors_open >= 2:
-            cap = 1
-        if low_power or cam_disabled or avg_health < 30 or jam_active:
-            cap = 1
-        if self.jam_grace_timer > 0 or self.overload_grace_timer > 0:
-            cap = 1
-
-        self.max_office_attackers = cap
-
-        # Entry cooldown scales with defensive weakness
-        cooldown = 6.0
-        if low_power:
-            cooldown += 2.0
-        if cam_disabled:
-            cooldown += 1.5
-        if avg_health < 30:
-            cooldown += 2.0
-        if doors_open >= 2:
-            cooldown += 1.0
-        self.entry_cooldown_seconds = max(6.0, min(12.0, cooldown))
-        
-        # Screen shake decay
-        if self.screen_shake > 0:
-            self.screen_shake *= 0.95
-        
-        # Static intensity decay (but stay high during outage)
-        if self.power.outage:
-            self.static_intensity = 0.6
-        elif self.static_intensity > 0:
-            self.static_intensity *= 0.98
-
-    def update_power(self, dt):
-        """Update power drain"""
-        if self.game_state.state != "playing":
-            return
-
-        # Creepy flickering when low power
-        if self.power.current < 30:
-            self.flicker_phase += dt * 6
-            flicker = (math.sin(self.flicker_phase * 3.0) * 0.5 + 0.5) * 0.3
-            self.office.light_dim += (flicker - 0.15)
-            self.office.light_dim = self.clamp(self.office.light_dim, 0, 0.8)
-
-        if self.power.current <= 0:
-            self.power.current = 0
-            if not self.power.outage:
-                # Play power outage sound
-                self.assets.play_sound("power_out")
-                
-                self.power.outage = True
-                self.power.emergency_mode = True
-                self.power.emergency_timer = 45  # 45 seconds of emergency power
-                self.power.reserve_power = 15  # Hidden reserve
-                self.office.door_left_closed = False
-                self.office.door_right_closed = False
-                self.office.light_on = False
-                self.office.cams_open = False
-                self.set_status("POWER OUTAGE - EMERGENCY MODE ACTIVE")
-                self.static_intensity = 0.8
-                self.screen_shake = 3
-                self.log_event("EMERGENCY: Backup power engaged!")
-        
-        # Emergency mode countdown
-        if self.power.outage and self.power.emergency_mode:
-            self.power.emergency_timer -= dt
-            if self.power.emergency_timer <= 0:
-                self.power.emergency_mode = False
-                self.set_status("BACKUP POWER DEPLETED")
-                # After emergency mode, animatronics get slightly more aggressive (not full hunt)
-                for anim in self.animatronics:
-                    anim.mood = "aggressive"  # Changed from hunting
-                    anim.hunting_mode = False  # Don't force hunting
-                    anim.hunting_timer = 0  # No forced hunt timer
-                    anim.adaptive_aggro += 0.2  # Slight boost (was 0.3)
-            return
-
-        # Camera power drain (no heat mechanic - cameras just drain power when open)
-        # Power drain happens in the power system update below
-
-        # Scale drain based on night length - gentler scaling
-        # Default is 60 seconds/hour, scale from 0.7 to 1.3 across the range
-        speed_ratio = self.game_state.seconds_per_hour / 60.0
-        speed_multiplier = 0.5 + (speed_ratio * 0.5)  # Ranges from 0.75 (at 15s) to 1.25 (at 180s)
-
-        # Deterministic power surges at fixed times
-        minute_in_hour = self.game_state.minutes_elapsed % 60
-        surge_active = (15 <= minute_in_hour <= 17) or (30 <= minute_in_hour <= 32) or (45 <= minute_in_hour <= 47)
-        surge_multiplier = 1.35 if surge_active else 1.0
-        self.power_usage["surge"] = surge_multiplier
-        
-        diff_multiplier = self.difficulty
-        drain_base = self.power.base_drain * speed_multiplier * surge_multiplier * diff_multiplier
-        drain_doors = 0.0
-        drain_lights = 0.0
-        drain_cams = 0.0
-        drain = drain_base
-        if self.office.door_left_closed or self.office.door_right_closed:
-            drain_doors = self.power.door_drain * speed_multiplier * surge_multiplier * diff_multiplier
-            drain += drain_doors
-        if self.office.light_on:
-            drain_lights = self.power.light_drain * speed_multiplier * surge_multiplier * diff_multiplier
-            drain += drain_lights
-        if self.office.cams_open:
-            drain_cams = self.power.cam_drain * speed_multiplier * surge_multiplier * diff_multiplier
-            drain += drain_cams
-
-        self.power_usage["base"] = drain_base
-        self.power_usage["doors"] = drain_doors
-        self.power_usage["lights"] = drain_lights
-        self.power_usage["cams"] = drain_cams
-        
-        # Apply door spam penalty
-        if self.door_spam_penalty > 0:
-            drain += self.door_spam_penalty * dt
-            self.door_spam_penalty = max(0, self.door_spam_penalty - dt * 2.0)  # Decay 2 per second
-
-        self.power.current -= drain * dt
-        if self.power.current < 0:
-            self.power.current = 0
-        
-        # Screen shake on critical power
-        if 0 < self.power.current < 10:
-            self.screen_shake = 1 + (10 - self.power.current) * 0.1
-
-    def update_time(self, dt):
-        """Update in-game time"""
-        if self.game_state.state != "playing":
-            return
-        # advance time by minutes using configured seconds_per_hour
-        seconds_per_minute = max(0.01, self.game_state.seconds_per_hour / 60.0)
-        self.game_state.hour_timer += dt
-        # increment minutes as many as passed
-        while self.game_state.hour_timer >= seconds_per_minute:
-            self.game_state.hour_timer -= seconds_per_minute
-            self.game_state.minutes_elapsed += 1
-            
-            # Play hour chime when a new hour starts (every 60 minutes)
-            if self.game_state.minutes_elapsed % 60 == 0 and self.game_state.minutes_elapsed < 6 * 60:
-                self.assets.play_sound("hour_chime")
-
-            # Win condition: reached 6 AM (6 hours after 12:00)
-            if self.game_state.minutes_elapsed >= 6 * 60:
-                self.calculate_performance_score()
-                self.game_state.state = "win"
-                self.determine_ending()
-                self.assets.play_sound("bell_6am")
-                self.assets.stop_music()
-
-                # Save high score if it's better
-                night_key = self.game_state.night
-                if night_key not in self.high_scores or self.performance_score > self.high_scores[night_key]:
-                    self.high_scores[night_key] = self.performance_score
-                
-                if (self.game_state.night < 5 and
-                        self.game_state.night + 1 > self.game_state.max_night_unlocked):
-                    self.game_state.max_night_unlocked = self.game_state.night + 1
-                    self.save_progress()
-                break
-
-    def update_animatronics(self, dt):
-        """Update all animatronics with advanced AI coordination (optimized)"""
-        # First pass: update each animatronic (skip some updates when quality is low for FPS)
-        for i, anim in enumerate(self.animatronics):
-            # When quality is low, update only half the animatronics each frame (alternating)
-            if self.quality_scale < 0.6 and i % 2 != self.frame_count % 2:
-                continue
-            anim.update(dt, self.game_state, self.difficulty)
-        
-        # Second pass: AI coordination and communication (skip when quality is very low)
-        if self.quality_scale > 0.4:
-            self.coordinate_animatronics(dt)
-        
-        # Third pass: check for attacks and blocked behaviors
-        for anim in self.animatronics:
-            # Check if animatronic is adjacent to office
-            is_adjacent_to_office = anim.room in get_neighbors("Office")
-            
-            if is_adjacent_to_office:
-                # Determine which door(s) they're trying to pressure based on their position
-                # Use room position to determine left vs right side
-                office_pos = ROOM_POSITIONS.get("Office", [0.5, 0.5])
-                anim_pos = ROOM_POSITIONS.get(anim.room, [0.5, 0.5])
-                
-                # Room is on the left if its x position is less than office
-                is_left_side = anim_pos[0] < office_pos[0]
-                
-                if is_left_side:
-                    door_closed = self.office.door_left_closed
-                    pressure_left = True
-                    pressure_right = False
-                else:
-                    door_closed = self.office.door_right_closed
-                    pressure_left = False
-                    pressure_right = True
-
-                if door_closed:
-                    anim.hallway_timer = 0.0
-                    anim.hallway_block_timer += dt
-                    pressure = 3.2 * self.difficulty
-                    
-                    if pressure_left:
-                        self.office.door_left_health = max(0.0, self.office.door_left_health - pressure * dt)
-                        if self.office.door_left_health <= 0 and self.office.door_left_jam_timer <= 0:
-                            self.break_door("left")
-                    if pressure_right:
-                        self.office.door_right_health = max(0.0, self.office.door_right_health - pressure * dt)
-                        if self.office.door_right_health <= 0 and self.office.door_right_jam_timer <= 0:
-                            self.break_door("right")
-                    
-                    # If blocked too long, they get frustrated and leave temporarily
-                    if anim.hallway_block_timer >= 3.0:
-                        neighbors = [r for r in get_neighbors(anim.room) if r != "Office"]
-                        if neighbors:
-                            anim.last_room = anim.room
-                            anim.room = neighbors[anim.block_count % len(neighbors)]
-                            anim.target_x, anim.target_y = room_position(anim.room, WINDOW_WIDTH, WINDOW_HEIGHT)
-                            anim.x = anim.target_x
-                            anim.y = anim.target_y
-                            anim.retreat_timer = 8.0  # Stay away for 8 seconds
-                            anim.retreat_target = anim.room
-                            anim.hallway_block_timer = 0.0
-                else:
-                    # Door is open, can try to enter
-                    anim.hallway_timer += dt
-                    anim.hallway_block_timer = 0.0
-                    side = anim.attack_side
-                    office_count = sum(1 for a in self.animatronics if a.room == "Office")
-                    same_side_in_office = any(a.room == "Office" and a.attack_side == side for a in self.animatronics)
-                    can_enter = (
-                        anim.hallway_timer >= anim.hallway_entry_delay and
-                        self.side_entry_cooldown.get(side, 0.0) <= 0.0 and
-                        not same_side_in_office and
-                        office_count < self.max_office_attackers and
-                        self.jam_grace_timer <= 0.0 and
-                        self.overload_grace_timer <= 0.0
-                    )
-                    if can_enter:
-                        anim.room = "Office"
-                        anim.target_x, anim.target_y = room_position("Office", WINDOW_WIDTH, WINDOW_HEIGHT)
-                        anim.hallway_timer = 0.0
-                        anim.attack_windup = 0.0
-                        self.side_entry_cooldown[side] = self.entry_cooldown_seconds
-                        self.last_office_entry_time[side] = time.time()
-                        self.log_event(f"{anim.name} entered Office")
-            else:
-                anim.hallway_timer = 0.0
-                anim.hallway_block_timer = 0.0
-
-            # Check if animatronic was blocked by a door
-            blocked_side = anim.get_blocked_side(self.office)
-            if blocked_side:
-                # Play door knock sound when animatronic is blocked
-                self.assets.play_sound("door_knock")
-            # Check if animatronic should attack (windup required)
-            # But only if player isn't hiding!
-            if anim.room == "Office" and anim.try_attack(self.office) and not self.current_safe_spot:
-                anim.attack_windup += dt
-                required = max(0.45, (anim.attack_windup_required / max(0.8, self.difficulty)) - (self.game_state.night - 1) * 0.1)
-                if anim.attack_windup >= required:
-                    self.jumpscare.killer = anim.name
-                    self.jumpscare.active = True
-                    self.jumpscare.timer = 0
-                    self.game_state.state = "jumpscare"
-                    self.add_screen_shake(15, 2.0)
-                    self.add_color_overlay((255, 0, 0, 150), 2.0)
-                    # Play different sound for Freaky Temi
-                    if anim.name == "Freaky Temi":
-                        self.assets.play_sound("faaah")
-                    else:
-                        self.assets.play_sound("jumpscare")
-                    self.assets.stop_music()
-                    self.log_event(f"{anim.name} attacked")
-                    break
-            else:
-                anim.attack_windup = 0.0
-
-    def coordinate_animatronics(self, dt):
-        """AI coordination: animatronics communicate and plan coordinated attacks"""
-        if len(self.animatronics) < 2:
-            return
-        
-        # Check if any animatronic is in hunting mode and communicate
-        hunters = [a for a in self.animatronics if a.hunting_mode]
-        
-        if hunters:
-            # Share intelligence: if one is hunting, spread the target
-            target_room = hunters[0].hunt_target_room
-            for anim in self.animatronics:
-                # Only 50% chance to join the coordination (not all will join)
-                if not anim.hunting_mode and anim.communication_cooldown <= 0:
-                    if (anim.block_count + int(time.time())) % 2 == 0:  # 50% chance
-                        anim.hunting_mode = True
-                        anim.hunt_target_room = target_room
-                        anim.mood = "cautious"  # Changed from hunting
-                        anim.hunting_timer = 6.0  # Reduced from 10.0
-                        anim.communication_cooldown = 6.0
-        
-        # Predict player door preference and adapt strategy
-        for anim in self.animatronics:
-            if anim.player_action_memory:
-                recent_actions = [a for a in anim.player_action_memory if time.time() - a["time"] < 60]
-                if len(recent_actions) > 2:
-                    # Player is blocking a specific side repeatedly
-                    blocked_sides = [a["side"] for a in recent_actions[-5:]]
-                    if blocked_sides.count("left") > blocked_sides.count("right"):
-                        if anim.attack_side != "vent":
-                            anim.attack_side = "right"  # Try to attack from other side
-                    elif blocked_sides.count("right") > blocked_sides.count("left"):
-                        if anim.attack_side != "vent":
-                            anim.attack_side = "left"
-        
-        # Pack hunting behavior: multiple animatronics moving together
-        if not hasattr(self, 'coordination_timer'):
-            self.coordination_timer = 0
-        at_office = [a for a in self.animatronics if a.room == "Office"]
-        if self.coordination_timer > 0:
-            self.coordination_timer -= dt
-        if len(at_office) >= 2 and self.coordination_timer <= 0 and self.game_state.minutes_elapsed >= 60:
-            # Increase mood and aggression for coordinated attack
-            for anim in at_office:
-                anim.mood = "aggressive"
-                anim.adaptive_aggro += 0.10
-                anim.block_count += 1  # simulate frustration from failed attacks
-            self.coordination_timer = 12.0
-    
-    def update_environmental_events(self, dt):
-        """Trigger random environmental events to add variety and tension"""
-        self.environmental_event_timer += dt
-        
-        # Trigger events at random intervals
-        if self.environmental_event_timer >= self.next_event_time:
-            self.trigger_random_event()
-            self.environmental_event_timer = 0
-            self.next_event_time = self.rng.uniform(20, 45)  # Next event in 20-45 seconds
-        
-        # Update light flickering
-        if self.game_state.lights_flickering:
-            self.game_state.flicker_timer += dt
-            if self.game_state.flicker_timer >= self.rng.uniform(2, 4):
-                self.game_state.lights_flickering = False
-                self.game_state.flicker_timer = 0
-        
-        # Update hallucination mode
-        if self.hallucination_timer > 0:
-            self.hallucination_timer -= dt
-            if self.hallucination_timer <= 0:
-                self.hallucination_mode = False
-    
-    def trigger_random_event(self):
-        """Trigger a random environmental event"""
-        events = [
-            "lights_flicker",
-            "temperature_drop",
-            "phantom_sound",
-            "camera_glitch",
-            "ventilation_block",
-            "power_surge",
-            "hallucination",
-            "door_malfunction"
-        ]
-        
-        # Weight events based on night and current situation
-        night = self.game_state.night
-        minutes = self.game_state.minutes_elapsed
-        
-        # More intense events on later nights
-        if night >= 3:
-            events.extend(["power_drain", "system_overload"])
-        if night >= 4:
-            events.extend(["blackout_threat", "animatronic_rush"])
-        
-        event = self.rng.choice(events)
-        
-        if event == "lights_flicker":
-            self.game_state.lights_flickering = True
-            self.game_state.flicker_timer = 0
-            self.add_screen_shake(3, 0.3)
-            self.add_color_overlay((255, 255, 200, 80), 0.5)
-            self.log_event("Lights flickering...")
-        
-        elif event == "temperature_drop":
-            self.game_state.temperature -= self.rng.randint(5, 15)
-            self.add_color_overlay((100, 150, 255, 60), 2.0)
-            if self.game_state.temperature < 50:
-                self.log_event("Temperature critical!")
-                # Cold affects animatronic behavior (slower but more aggressive)
-                for anim in self.animatronics:
-                    anim.move_interval *= 1.2
-                    anim.adaptive_aggro += 0.1
-            else:
-                self.log_event(f"Temperature dropped to {self.game_state.temperature}°F")
-        
-        elif event == "phantom_sound":
-            fake_rooms = ["Cafeteria", "Hallway", "Gym", "Library", "Bathrooms"]
-            fake_room = self.rng.choice(fake_rooms)
-            self.game_state.phantom_sounds.append({
-                'location': fake_room,
-                'time': time.time(),
-                'type': 'phantom'
-            })
-            self.log_event(f"Strange noise from {fake_room}")
-        
-        elif event == "camera_glitch":
-            if self.office.cams_open:
-                self.office.cam_flash = 1.5
-                self.add_screen_shake(5, 0.4)
-                # Create static particles
-                for _ in range(15):
-                    x = self.rng.randint(0, self.game_state.width)
-                    y = self.rng.randint(0, self.game_state.height)
-                    self.add_particle_burst(x, y, 3, (200, 200, 255), (0.5, 2))
-                self.log_event("Camera system glitching!")
-        
-        elif event == "ventilation_block":
-            if not self.game_state.ventilation_blocked:
-                self.game_state.ventilation_blocked = True
-                self.log_event("Ventilation blocked - power drain increased!")
-                self.power.base_drain *= 1.3
-        
-        elif event == "power_surge":
-            surge_amount = self.rng.uniform(5, 15)
-            self.power.current = max(0, self.power.current - surge_amount)
-            self.add_screen_shake(8, 0.5)
-            self.add_color_overlay((255, 255, 100, 120), 0.3)
-            # Electric sparks
-            for _ in range(20):
-                x = self.rng.randint(0, self.game_state.width)
-                y = self.rng.randint(0, 100)
-                self.add_particle_burst(x, y, 5, (255, 255, 100), (2, 5))
-            self.log_event(f"Power surge! Lost {int(surge_amount)}% power")
-        
-        elif event == "hallucination":
-            if night >= 3:
-                self.hallucination_mode = True
-                self.hallucination_timer = self.rng.uniform(10, 20)
-                self.add_color_overlay((180, 100, 255, 100), 15.0)
-                self.add_screen_shake(2, 15.0)
-                self.log_event("You feel disoriented...")
-        
-        elif event == "door_malfunction":
-            if self.rng.random() < 0.5:
-                self.office.door_left_health = max(20, self.office.door_left_health - 25)
-                self.log_event("Left door malfunctioning!")
-            else:
-                self.office.door_right_health = max(20, self.office.door_right_health - 25)
-                self.log_event("Right door malfunctioning!")
-        
-        elif event == "power_drain" and night >= 3:
-            # Gradual power drain over time
-            drain_amount = self.rng.uniform(2, 5)
-            self.power.current = max(0, self.power.current - drain_amount)
-            self.log_event("Unusual power drain detected")
-        
-        elif event == "animatronic_rush" and night >= 4:
-            # SOME animatronics become more active temporarily (not all)
-            affected = self.rng.randint(1, 3)  # Only 1-3 animatronics affected
-            for i, anim in enumerate(self.animatronics):
-                if i < affected:
-                    anim.mood = "cautious"  # Make them cautious, not hunting
-                    anim.hunting_mode = False  # Don't force hunt mode
-                    anim.adaptive_aggro += 0.15  # Just slightly more aggressive
-            self.add_screen_shake(4, 0.8)
-            self.add_color_overlay((255, 100, 50, 80), 1.5)
-            self.log_event("Unusual activity detected...")
-    
-    def update_phantom_sounds(self, dt):
-        """Update and clean up phantom sound events"""
-        current_time = time.time()
-        self.game_state.phantom_sounds = [
-            sound for sound in self.game_state.phantom_sounds
-            if current_time - sound['time'] < 5  # Remove after 5 seconds
-        ]
-    
-    def update_random_static(self, dt):
-        """Play random static bursts at intervals"""
+    def play_random_static(self):
+        """The "random_static" timer ran out: a static burst, then schedule the next one"""
         # Don't play random static if cameras are open (already looping)
-        if self.office.cams_open:
-            return
-        
-        # Update timer
-        self.random_static_timer += dt
-        
-        # Check if it's time for random static
-        if self.random_static_timer >= self.next_random_static_time:
+        if self.game_state.state == "playing" and not self.office.cams_open:
             # Check if static is already playing to avoid overlap
             static_playing = False
             if "static_loop" in self.assets.sounds:
@@ -2778,18 +1501,12 @@ class Game:
             if not static_playing:
                 # Play a short burst of static (not looping)
                 self.assets.play_sound("static_loop")
-            
-            # Reset timer and schedule next event
-            self.random_static_timer = 0.0
-            self.next_random_static_time = self.rng.uniform(20, 40)  # Random 20-40 seconds
-    
-    def update_random_ambient_sounds(self, dt):
-        """Play random ambient sounds at medium intervals for suspense"""
-        # Update timer
-        self.ambient_sound_timer += dt
         
-        # Check if it's time for a random ambient sound
-        if self.ambient_sound_timer >= self.next_ambient_sound_time:
+        self.effect_timers.start("random_static", self.rng.uniform(20, 40))  # Random 20-40 seconds
+    
+    def play_random_ambient_sound(self):
+        """The "ambient_sound" timer ran out: a random ambient sound for suspense"""
+        if self.game_state.state == "playing":
             # Check if any ambient sounds are currently playing to avoid overlap
             any_playing = False
             for sound_name in self.ambient_sounds:
@@ -2803,127 +1520,29 @@ class Game:
                 # Pick a random ambient sound
                 sound_choice = self.rng.choice(self.ambient_sounds)
                 self.assets.play_sound(sound_choice)
-            
-            # Reset timer and schedule next event with ~15 second interval
-            self.ambient_sound_timer = 0.0
-            self.next_ambient_sound_time = self.rng.uniform(12, 18)  # Random 12-18 seconds (~15 average)
-    
-    def calculate_performance_score(self):
-        """Calculate player performance score for the night"""
-        score = 1000  # Base score
-        
-        # Bonus for efficient power usage
-        power_efficiency = (self.power.current / self.power.max) * 100
-        score += int(power_efficiency * 2)
-        
-        # Penalty for excessive door usage
-        score -= (self.total_door_closes * 5)
-        
-        # Bonus for camera usage (awareness)
-        score += min(self.total_camera_checks * 10, 300)
-        
-        # Bonus for perfect blocks
-        score += (self.perfect_blocks * 50)
-        
-        # Penalty for failed blocks
-        score -= (self.failed_blocks * 30)
-        
-        # Night multiplier
-        score = int(score * (1.0 + (self.game_state.night - 1) * 0.25))
-        
-        # Difficulty multiplier
-        score = int(score * self.difficulty)
-        
-        self.performance_score = max(0, score)
-    
-    def determine_ending(self):
-        """Determine the ending based on performance and night"""
-        night = self.game_state.night
-        score = self.performance_score
-        power_left = self.power.current
-        
-        if night == 5 and score >= 2000:
-            self.set_status("6 AM! PERFECT NIGHT - You've mastered survival!")
-            self.game_state.ending_type = "perfect"
-        elif night == 5:
-            self.set_status("6 AM! You survived all nights - VICTORY!")
-            self.game_state.ending_type = "victory"
-        elif power_left > 50 and score >= 1500:
-            self.set_status(f"6 AM! Flawless performance on Night {night}!")
-            self.game_state.ending_type = "flawless"
-        elif power_left < 10:
-            self.set_status(f"6 AM! You barely made it through Night {night}...")
-            self.game_state.ending_type = "barely"
-        else:
-            self.set_status(f"6 AM! You survived Night {night}!")
-            self.game_state.ending_type = "standard"
-    
-
-    def update_threat_assessment(self, dt):
-        """Calculate real-time threat level 0-100"""
-        threat = 0
-        
-        # Animatronics in office or hallway = major threat
-        for anim in self.animatronics:
-            if anim.room == "Office":
-                threat += 30
-            elif anim.room == "Hallway":
-                threat += 15
-            elif anim._distance_to_room(anim.room, "Office") <= 2:
-                threat += 8
-        
-        # Low power = threat
-        if self.power.current < 20:
-            threat += 20
-        elif self.power.current < 50:
-            threat += 10
-        
-        # Door health = threat
-        avg_door_health = (self.office.door_left_health + self.office.door_right_health) / 2
-        if avg_door_health < 30:
-            threat += 15
-        
-        # Both doors open = vulnerability
-        if not self.office.door_left_closed and not self.office.door_right_closed:
-            threat += 10
-        
-        # Emergency mode = maximum threat
-        if self.power.outage and self.power.emergency_mode:
-            threat += 30
         
-        self.threat_level = min(100, threat)
+        # Schedule the next one with ~15 second interval
+        self.effect_timers.start("ambient_sound", self.rng.uniform(12, 18))  # Random 12-18 seconds (~15 average)
     
-    def update_audio_system(self, dt):
-        """Update footstep sounds and audio cues"""
-        current_time = time.time()
-        
-        # Clean up old footsteps
-        self.footstep_sounds = [
-            sound for sound in self.footstep_sounds
-            if current_time - sound['time'] < 3
-        ]
-        
-        # Add footsteps for moving animatronics
-        for anim in self.animatronics:
-            if anim.room != anim.last_room:
-                # Animatronic moved!
-                if anim.special_ability != "silent_stalker":
-                    self.footstep_sounds.append({
-                        'name': anim.name,
-                        'location': anim.room,
-                        'time': current_time,
-                        'intensity': anim.adaptive_aggro
-                    })
-                    
-                    # Log if close enough
-                    if anim._distance_to_room(anim.room, "Office") <= 2:
-                        direction = "nearby" if anim.room == "Hallway" else anim.room
-                        self.log_event(f"Footsteps from {direction}", True)
-
     def update(self, dt):
-        """Main update loop"""
+        """Run as many fixed ticks as real time dt covers, then set the render blend"""
         self.noise_phase += dt * 5.0
-        
+        self.sim_accumulator += min(dt, MAX_FRAME_TIME) * self.replay_speed
+        max_steps = int(MAX_CATCHUP_STEPS * max(1.0, self.replay_speed))
+
+        steps = 0
+        while self.sim_accumulator >= SIM_DT and steps < max_steps:
+            self.capture_render_state()
+            self.fixed_update(SIM_DT)
+            self.sim_accumulator -= SIM_DT
+            steps += 1
+        if self.sim_accumulator >= SIM_DT:
+            # Too far behind to catch up - drop the backlog instead of spiralling
+            self.sim_accumulator %= SIM_DT
+        self.render_alpha = self.sim_accumulator / SIM_DT
+
+    def fixed_update(self, dt):
+        """One fixed simulation tick (dt is always SIM_DT)"""
         # Update fade transitions (always active)
         self.update_fade(dt)
         
@@ -2932,68 +1551,150 @@ class Game:
             return
         if self.game_state.state == "paused":
             return
-        if self.game_state.state == "menu":
-            return
-
-        if self.game_state.state == "anti_cheat":
-            self.anti_cheat_timer += dt
-            if self.anti_cheat_timer >= 2.0 and not self.anti_cheat_pending:
-                self.jumpscare.killer = "Mr Hall"
-                self.jumpscare.active = True
-                self.jumpscare.timer = 0
-                self.game_state.state = "jumpscare"
-                self.assets.play_sound("jumpscare")
-                self.anti_cheat_pending = True
-            return
-
-        if self.game_state.state == "anti_cheat_message":
+        if self.game_state.state in ("menu", "custom_night"):
             return
 
         if self.game_state.state == "intro":
             self.update_intro(dt)
             # keep updating visual effects (optional)
-            self.update_office_effects(dt)
+            self.sim.update_office_effects(dt)
+            self.update_effect_decay()
             return
 
         if self.game_state.state == "tutorial":
             self.update_tutorial(dt)
             return
 
+        # Player actions only reach the simulation while a night is being played
+        was_playing = self.game_state.state == "playing"
+        inputs = self.pending_inputs if was_playing else []
+        self.pending_inputs = []
+        if self.replay_playback is not None:
+            inputs = self.replay_playback.get(self.sim.tick_count + 1, ())
+        self.sim.step(dt, inputs)
+        if was_playing and self.game_state.state in ("win", "jumpscare", "anti_cheat"):
+            self.on_night_over()
+        elif self.game_state.state == "playing" and self.replay_playback is None:
+            self.hour_checkpoints.update(self.sim)
+        if self.game_state.state == "playing" and self.forecaster is not None:
+            self.update_forecast(inputs)
+
         if self.game_state.state == "playing":
-            # Decrement safe spot protection timer
-            if self.current_safe_spot:
-                self.safe_spot_duration = max(0, self.safe_spot_duration - dt)
-                # Exit safe spot when timer runs out
-                if self.safe_spot_duration <= 0:
-                    self.current_safe_spot = None
-            
-            # Update combo timer
-            if self.combo_timer > 0:
-                self.combo_timer -= dt
-                if self.combo_timer <= 0:
-                    self.combo_timer = 0
-                    self.combo_blocks = 0  # Reset combo when timer runs out
-            
-            self.update_power(dt)
-            self.update_time(dt)
-            self.update_animatronics(dt)
-            self.update_environmental_events(dt)
-            self.update_phantom_sounds(dt)
-            self.update_random_static(dt)  # Random static playback
-            self.update_random_ambient_sounds(dt)  # Random ambient sounds for suspense
-            self.update_screen_effects(dt)
-            self.update_threat_assessment(dt)
-            self.update_audio_system(dt)
+            self.update_screen_effects(dt)  # Also plays the random static/ambient sounds
             self.update_office_camera_panning(dt)  # Update camera panning
         elif self.game_state.state == "jumpscare":
             self.update_screen_effects(dt)
-            self.jumpscare.timer += dt
-            if self.jumpscare.timer > self.jumpscare.duration:
-                self.jumpscare.timer = self.jumpscare.duration
-                if self.anti_cheat_pending:
-                    self.game_state.state = "anti_cheat_message"
+        if self.game_state.state not in ("anti_cheat", "anti_cheat_message"):
+            self.update_effect_decay()
+
+    def toggle_forecast(self):
+        """Switch the danger forecast (and its background worker) on or off"""
+        if self.forecaster is None:
+            self.forecaster = DangerForecaster()
+            self.forecast_due = 0.0
+        else:
+            self.forecaster.close()
+            self.forecaster = None
+
+    def update_forecast(self, inputs):
+        """Collect the newest forecast; send a fresh snapshot when the player acts or one is due"""
+        forecaster = self.forecaster
+        forecaster.poll()
+        if inputs:
+            forecaster.discard()  # Made for doors/cameras that are no longer how they were
+        elif forecaster.busy or self.sim.clock.now < self.forecast_due:
+            return
+        forecaster.submit(self.sim)
+        self.forecast_due = self.sim.clock.now + FORECAST_INTERVAL
+
+    def on_night_over(self):
+        """Keep the night that just ended as a replay (playbacks are not re-recorded)"""
+        if self.replay_playback is not None:
+            self.replay_playback = None
+            self.replay_speed = 1.0
+            return
+        replay = self.replay_recorder.finish(self.sim)
+        if replay is None:
+            return
+        try:
+            replay.save(REPLAY_FILE)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not save replay: {e}")
+
+    def start_replay(self, replay, speed=1.0):
+        """Play a recorded night back through the renderer at the given speed"""
+        check_map(replay)
+        check_rules(replay)
+        self.assets.stop_music()
+        self.difficulty = replay.difficulty
+        self.game_state.seconds_per_hour = replay.seconds_per_hour
+        self.sim.lookahead = replay.lookahead
+        self.sim.start_night(replay.night, run_seed=replay.run_seed, roster=replay.roster)
+        self.pending_inputs = []
+        self.replay_playback = replay.inputs_by_tick()
+        self.replay_speed = max(0.1, speed)
+        self.hour_checkpoints.clear()
+        self.capture_render_state()
+        self.assets.stop_sound("static_loop")
+        self.static_loop_playing = False
+        self.assets.play_music(f"ambience_n{self.game_state.night}")
+        self.sim.begin_playing()
+        self.set_status(f"REPLAY x{self.replay_speed:g}")
+
+    def can_retry_hour(self):
+        """True if the night can go back an hour: not after Mr Hall's anti-cheat jumpscare"""
+        return bool(self.hour_checkpoints.snapshots) and not self.sim.anti_cheat_active
+
+    def retry_hour(self):
+        """Go back to the start of the last in-game hour reached, instead of the whole night"""
+        if not self.can_retry_hour():
+            return
+        hour = self.hour_checkpoints.retry(self.sim)
+        if hour is None:
+            return
+        # The recording continues from the checkpoint, so it still replays from the start of the night
+        self.replay_recorder.rewind(self.sim.tick_count)
+        self.pending_inputs = []
+        if self.forecaster is not None:
+            self.forecaster.discard()
+        self.forecast_due = 0.0
+        self.sim_accumulator = 0.0
+        self.capture_render_state()
+        self.assets.stop_sound("static_loop")
+        self.static_loop_playing = False
+        self.assets.play_music(f"ambience_n{self.game_state.night}")
+        self.set_status(f"Retrying from {12 if hour == 0 else hour} AM")
+
+    def capture_render_state(self):
+        """Remember positions from before a tick so frames can be drawn between ticks"""
+        self._prev_render = {
+            "anims": {anim: (anim.room, anim.x, anim.y) for anim in self.animatronics},
+            "doors": (self.office.door_left_progress, self.office.door_right_progress),
+            "pan": (self.office_camera_offset_x, self.office_camera_offset_y),
+        }
 
-        self.update_office_effects(dt)
+    def lerp_anim_pos(self, anim):
+        """Animatronic x/y blended between the last two ticks"""
+        prev = self._prev_render["anims"].get(anim)
+        if prev is None or prev[0] != anim.room:
+            # New this tick or just changed rooms - don't slide across the screen
+            return anim.x, anim.y
+        a = self.render_alpha
+        return prev[1] + (anim.x - prev[1]) * a, prev[2] + (anim.y - prev[2]) * a
+
+    def lerp_door_progress(self):
+        """(left, right) door slide progress blended between the last two ticks"""
+        a = self.render_alpha
+        prev_left, prev_right = self._prev_render["doors"]
+        return (prev_left + (self.office.door_left_progress - prev_left) * a,
+                prev_right + (self.office.door_right_progress - prev_right) * a)
+
+    def lerp_pan_offset(self):
+        """Office panning offset blended between the last two ticks"""
+        a = self.render_alpha
+        prev_x, prev_y = self._prev_render["pan"]
+        return (prev_x + (self.office_camera_offset_x - prev_x) * a,
+                prev_y + (self.office_camera_offset_y - prev_y) * a)
 
     def update_splash(self, dt):
         """Update splash screen timing"""
@@ -3042,10 +1743,7 @@ class Game:
                 if self.skip_tutorial:
                     ambience_key = f"ambience_n{self.game_state.night}"
                     self.assets.play_music(ambience_key)
-                    self.game_state.state = "playing"
-                    self.game_state.start_time = time.time()
-                    self.game_state.hour_timer = 0
-                    self.game_state.minutes_elapsed = 0
+                    self.sim.begin_playing()
                 else:
                     # Show tutorial slideshow
                     self.game_state.state = "tutorial"
@@ -3055,10 +1753,7 @@ class Game:
                 # Skip tutorial on other nights, go straight to playing
                 ambience_key = f"ambience_n{self.game_state.night}"
                 self.assets.play_music(ambience_key)
-                self.game_state.state = "playing"
-                self.game_state.start_time = time.time()
-                self.game_state.hour_timer = 0
-                self.game_state.minutes_elapsed = 0
+                self.sim.begin_playing()
             # reset intro trackers
             self.intro_messages = []
             self.intro_index = 0
@@ -3199,10 +1894,7 @@ class Game:
         if self.tutorial_index >= len(self.tutorial_slides):
             ambience_key = f"ambience_n{self.game_state.night}"
             self.assets.play_music(ambience_key)
-            self.game_state.state = "playing"
-            self.game_state.start_time = time.time()
-            self.game_state.hour_timer = 0
-            self.game_state.minutes_elapsed = 0
+            self.sim.begin_playing()
             self.tutorial_index = 0
             self.tutorial_timer = 0.0
 
@@ -3326,8 +2018,8 @@ class Game:
                     self._overlay_surfaces[cache_key] = scaled
                 
                 # Apply camera offset (panning) - convert float offsets to int for blitting
-                self.screen.blit(self._overlay_surfaces[cache_key], 
-                                (int(self.office_camera_offset_x), int(self.office_camera_offset_y)))
+                pan_x, pan_y = self.lerp_pan_offset()
+                self.screen.blit(self._overlay_surfaces[cache_key], (int(pan_x), int(pan_y)))
             else:
                 # When cameras are open, show static office view
                 cache_key = f"office_bg_{self.game_state.width}_{self.game_state.height}"
@@ -3343,56 +2035,58 @@ class Game:
         """Get sprite for animatronic"""
         sprites = {
             "Mr Ingles": "anim_scary_ingles" if is_attacking else "anim_mr_ingles",
-            "Scary Mr Ingles": "anim_scary_ingles",
-            "Freaky Temi": "anim_temi",
-            "Librarian": "anim_librarian",
-            "Vent Crawler": "anim_vent_crawler",
             "Mr Hall": "mr_hall_anti_cheater",
         }
-        sprite_name = sprites.get(name, "mr_ingles_office")
+        code = ROSTER.code.get(name)
+        sprite_name = ROSTER.sprite_key[code] if code is not None else sprites.get(name, "mr_ingles_office")
         return self.assets.get_image(sprite_name)
 
+    def get_scaled_anim_sprite(self, anim, scale):
+        """Animatronic sprite at scale rounded to 0.05, cached per archetype and size"""
+        sprite = self.get_anim_sprite(anim.archetype)
+        if not sprite:
+            return None
+        scale_discretized = round(scale * 20) / 20
+        target_w = max(1, int(sprite.get_width() * scale_discretized))
+        target_h = max(1, int(sprite.get_height() * scale_discretized))
+
+        cache_key = f"anim_{anim.archetype}_{target_w}_{target_h}"
+        if cache_key not in self._overlay_surfaces:
+            self._overlay_surfaces[cache_key] = pygame.transform.scale(sprite, (target_w, target_h))
+            # Limit anim cache
+            anim_keys = [k for k in self._overlay_surfaces.keys() if k.startswith("anim_")]
+            if len(anim_keys) > MAX_ANIM_SPRITE_CACHE_SIZE:
+                del self._overlay_surfaces[anim_keys[0]]
+        return self._overlay_surfaces[cache_key]
+
     def draw_office_anim(self, anim, current_time):
         """Draw animatronic in office view"""
         # Only draw if actually in the office (not just hallway)
         if anim.room != "Office":
             return
 
-        sprite = self.get_anim_sprite(anim.name)
-        if sprite:
-            wobble = math.sin(current_time * 2 + anim.x * 0.01) * 0.02
-            scale = 0.4 * (self.game_state.width / 1280) * (1 + wobble) * anim.size_multiplier
-            
-            # OPTIMIZED: Cache scaled sprite at discrete scale values
-            scale_discretized = round(scale * 20) / 20  # Round to nearest 0.05
-            target_w = int(sprite.get_width() * scale_discretized)
-            target_h = int(sprite.get_height() * scale_discretized)
-            
-            cache_key = f"anim_{anim.name}_{target_w}_{target_h}"
-            if cache_key not in self._overlay_surfaces:
-                scaled = pygame.transform.scale(sprite, (target_w, target_h))
-                self._overlay_surfaces[cache_key] = scaled
-                # Limit anim cache
-                anim_keys = [k for k in self._overlay_surfaces.keys() if k.startswith("anim_")]
-                if len(anim_keys) > 20:
-                    del self._overlay_surfaces[anim_keys[0]]
-            
-            scaled = self._overlay_surfaces[cache_key]
+        x, y = self.lerp_anim_pos(anim)
+        pan_x, pan_y = self.lerp_pan_offset()
+        wobble = math.sin(current_time * 2 + x * 0.01) * 0.02
+        scale = 0.4 * (self.game_state.width / 1280) * (1 + wobble) * anim.size_multiplier
+        # OPTIMIZED: Cached at discrete scale values
+        scaled = self.get_scaled_anim_sprite(anim, scale)
+        if scaled:
             # Apply camera offset to animatronic position
-            anim_x = anim.x + self.office_camera_offset_x
-            anim_y = anim.y + self.office_camera_offset_y + wobble * 40
+            anim_x = x + pan_x
+            anim_y = y + pan_y + wobble * 40
             rect = scaled.get_rect(center=(anim_x, anim_y))
             self.screen.blit(scaled, rect)
         else:
             # Apply camera offset to debug circle as well
             pygame.draw.circle(self.screen, (255, 0, 0), 
-                             (int(anim.x + self.office_camera_offset_x), 
-                              int(anim.y + self.office_camera_offset_y)), 25)
+                             (int(x + pan_x), int(y + pan_y)), 25)
 
     def draw_office_overlays(self):
         """Draw door and light overlays (optimized with caching)"""
+        left_progress, right_progress = self.lerp_door_progress()
         # Left door
-        if (self.office.door_left_closed or self.office.door_left_progress > 0.01):
+        if (self.office.door_left_closed or left_progress > 0.01):
             door_img = self.assets.get_image("door_left")
             if door_img:
                 # Cache scaled door image
@@ -3405,11 +2099,11 @@ class Game:
                 
                 scaled = self._overlay_surfaces[cache_key]
                 # When progress=0 (open): x=-width, when progress=1 (closed): x=0
-                x = -scaled.get_width() + scaled.get_width() * self.office.door_left_progress
+                x = -scaled.get_width() + scaled.get_width() * left_progress
                 self.screen.blit(scaled, (int(x), 0))
 
         # Right door
-        if (self.office.door_right_closed or self.office.door_right_progress > 0.01):
+        if (self.office.door_right_closed or right_progress > 0.01):
             door_img = self.assets.get_image("door_right")
             if door_img:
                 # Cache scaled door image
@@ -3421,7 +2115,7 @@ class Game:
                     self._overlay_surfaces[cache_key] = scaled
                 
                 scaled = self._overlay_surfaces[cache_key]
-                slide = 1 - self.office.door_right_progress
+                slide = 1 - right_progress
                 x = self.game_state.width - scaled.get_width() + scaled.get_width() * slide
                 self.screen.blit(scaled, (int(x), 0))
 
@@ -3476,14 +2170,14 @@ class Game:
     def draw_office_view(self):
         """Draw office view with animatronics"""
         current_time = self.game_state.elapsed_time()
-        for anim in self.animatronics:
+        for anim in self.sim.occupancy.occupants("Office"):
             self.draw_office_anim(anim, current_time)
         self.draw_office_overlays()
 
     def draw_camera_feed(self):
         """Draw camera feed (optimized with caching)"""
         cam_name = self.cameras.current_camera()
-        cam_key = f"cam_{cam_name.lower().replace(' ', '_')}"
+        cam_key = camera_image_key(cam_name)
         cam_img = self.assets.get_image(cam_key)
 
         # Camera background (cached)
@@ -3499,18 +2193,35 @@ class Game:
 
         # Draw animatronics on this camera
         current_time = self.game_state.elapsed_time()
-        for anim in self.animatronics:
-            if anim.room == cam_name:
-                sprite = self.get_anim_sprite(anim.name)
-                if sprite:
-                    wobble = math.sin(current_time * 2 + anim.x * 0.01) * 0.02
-                    scale = 0.45 * (self.game_state.width / 1280) * (1 + wobble) * anim.size_multiplier
-                    scaled = pygame.transform.scale(sprite,
-                        (int(sprite.get_width() * scale), int(sprite.get_height() * scale)))
-                    rect = scaled.get_rect(center=(anim.x, anim.y + wobble * 40))
-                    self.screen.blit(scaled, rect)
-                else:
-                    pygame.draw.circle(self.screen, (178, 255, 255), (int(anim.x), int(anim.y)), 20)
+        occupants = self.sim.occupancy.occupants(cam_name)
+        if self.cameras.jam_timer > 0:
+            occupants = ()  # Camera jammer: the feed is all static (drawn below) until it wears off
+        shown = occupants[:CAMERA_MAX_SPRITES]
+        spacing = self.game_state.width * 0.12  # Side by side when several share a room
+        if self.cameras.mimic_room == cam_name and self.cameras.jam_timer <= 0:
+            # Mimic: a convincing copy of an animatronic that is really somewhere else
+            mimic = next((anim for anim in self.sim.animatronics if anim.name == self.cameras.mimic_name), None)
+            if mimic is not None:
+                scaled = self.get_scaled_anim_sprite(mimic, 0.45 * (self.game_state.width / 1280) * mimic.size_multiplier)
+                if scaled:
+                    x, y = room_position(cam_name, self.game_state.width, self.game_state.height)
+                    x += (len(shown) / 2 + 0.5) * spacing
+                    self.screen.blit(scaled, scaled.get_rect(center=(int(x), int(y))))
+        for i, anim in enumerate(shown):
+            x, y = self.lerp_anim_pos(anim)
+            x += (i - (len(shown) - 1) / 2) * spacing
+            wobble = math.sin(current_time * 2 + x * 0.01) * 0.02
+            scale = 0.45 * (self.game_state.width / 1280) * (1 + wobble) * anim.size_multiplier
+            scaled = self.get_scaled_anim_sprite(anim, scale)
+            if scaled:
+                rect = scaled.get_rect(center=(x, y + wobble * 40))
+                self.screen.blit(scaled, rect)
+            else:
+                pygame.draw.circle(self.screen, (178, 255, 255), (int(x), int(y)), 20)
+        # Custom night hordes: a crowded room shows its overflow as a count
+        if len(occupants) > CAMERA_MAX_SPRITES:
+            more_text = self.font_medium.render(f"+{len(occupants) - CAMERA_MAX_SPRITES} MORE", True, (255, 150, 50))
+            self.screen.blit(more_text, more_text.get_rect(center=(self.game_state.width // 2, int(self.game_state.height * 0.8))))
 
         # Camera UI text
         cam_text = self.font_medium.render(f"CAM: {cam_name}", True, (0, 255, 255))
@@ -3568,8 +2279,10 @@ class Game:
             darkness_surface.set_alpha(180)  # Very dark but not pitch black
             self.screen.blit(darkness_surface, (0, 0))
 
-        # Static flash overlay (optimized)
-        if self.office.cam_flash > 0:
+        # Static flash overlay (optimized); a jammed feed is solid static
+        jammed = self.cameras.jam_timer > 0
+        cam_flash = max(self.office.cam_flash, 0.9) if jammed else self.office.cam_flash
+        if cam_flash > 0:
             cache_key = f"flash_surface_{self.game_state.width}_{self.game_state.height}"
             if cache_key not in self._overlay_surfaces:
                 flash_surface = pygame.Surface((self.game_state.width, self.game_state.height))
@@ -3577,7 +2290,7 @@ class Game:
                 self._overlay_surfaces[cache_key] = flash_surface
             
             flash_surface = self._overlay_surfaces[cache_key]
-            flash_surface.set_alpha(int(255 * 0.8 * self.office.cam_flash))
+            flash_surface.set_alpha(int(255 * 0.8 * cam_flash))
             self.screen.blit(flash_surface, (0, 0))
 
             # Random noise (optimized)
@@ -3587,7 +2300,7 @@ class Game:
             
             noise_surface = self._overlay_surfaces[cache_key_noise]
             noise_surface.fill((0, 0, 0))  # Clear surface
-            noise_surface.set_alpha(int(255 * 0.4 * self.office.cam_flash))
+            noise_surface.set_alpha(int(255 * 0.4 * cam_flash))
             
             # Reduced noise particle count for better performance
             for i in range(CAMERA_NOISE_PARTICLE_COUNT):
@@ -3598,6 +2311,10 @@ class Game:
                 pygame.draw.rect(noise_surface, (0, 0, 51), (x, y, w, 2))
             self.screen.blit(noise_surface, (0, 0))
         
+        if jammed:
+            jam_text = self.font_medium.render("SIGNAL LOST", True, (255, 80, 80))
+            self.screen.blit(jam_text, jam_text.get_rect(center=(self.game_state.width // 2, self.game_state.height // 2)))
+
         # Draw faint minimap when viewing cameras
         self.draw_minimap(opacity=120)
 
@@ -3650,8 +2367,8 @@ class Game:
         # Door integrity + camera heat
         left_health = int(self.office.door_left_health + 0.5)
         right_health = int(self.office.door_right_health + 0.5)
-        left_jam = int(self.office.door_left_jam_timer + 0.5)
-        right_jam = int(self.office.door_right_jam_timer + 0.5)
+        left_jam = int(self.sim.timers.remaining("door_jam_left") + 0.5)
+        right_jam = int(self.sim.timers.remaining("door_jam_right") + 0.5)
         left_label = f"L-DOOR {left_health}%"
         right_label = f"R-DOOR {right_health}%"
         if left_jam > 0:
@@ -3689,7 +2406,8 @@ class Game:
         self.screen.blit(time_text, time_rect)
 
         # Night indicator with box
-        night_text = self.font_small.render(f"NIGHT {self.game_state.night}", True, (200, 100, 200))
+        night_label = "CUSTOM NIGHT" if self.sim.roster is not None else f"NIGHT {self.game_state.night}"
+        night_text = self.font_small.render(night_label, True, (200, 100, 200))
         night_rect = night_text.get_rect(topleft=(20, 20))
         pygame.draw.rect(self.screen, (40, 20, 40), (night_rect.x - 10, night_rect.y - 5,
                          night_rect.width + 20, night_rect.height + 10), 0)
@@ -3722,7 +2440,7 @@ class Game:
         
         # Emergency mode indicator
         if self.power.outage and self.power.emergency_mode:
-            emergency_time = int(self.power.emergency_timer)
+            emergency_time = int(self.sim.timers.remaining("backup_power"))
             emergency_text = self.font_large.render(f"BACKUP POWER: {emergency_time}s", True, (255, 150, 0))
             emergency_rect = emergency_text.get_rect(center=(self.game_state.width // 2, int(self.game_state.height * 0.15)))
             # Pulsing effect
@@ -3759,10 +2477,30 @@ class Game:
         battery_text = self.font_small.render(f"BATTERY: {battery}%", True, battery_color)
         self.screen.blit(battery_text, (30, self.game_state.height - 90))
         
-        # Threat level indicator
+        # Threat level indicator, with whatever contributes most to it
         threat_color = (255, 50, 50) if self.threat_level > 70 else (255, 200, 0) if self.threat_level > 40 else (100, 255, 100)
-        threat_text = self.font_small.render(f"THREAT: {int(self.threat_level)}%", True, threat_color)
-        self.screen.blit(threat_text, (self.game_state.width - 150, self.game_state.height - 160))
+        breakdown = self.sim.threat.breakdown()
+        source = max(breakdown, key=breakdown.get)
+        label = f"THREAT: {int(self.threat_level)}%"
+        if breakdown[source]:
+            label += f" ({THREAT_SOURCE_LABELS[source]})"
+        threat_text = self.font_small.render(label, True, threat_color)
+        threat_rect = threat_text.get_rect(topright=(self.game_state.width - 30, self.game_state.height - 160))
+        self.screen.blit(threat_text, threat_rect)
+
+        # Danger forecast: chance of an attack through each side if nothing changes
+        if self.forecaster is not None:
+            forecast = self.forecaster.latest
+            if forecast is None:
+                label, danger = "DANGER: forecasting...", 0.0
+            else:
+                label = (f"DANGER {FORECAST_SECONDS:g}s: L {forecast.chance('left'):.0%}  "
+                         f"R {forecast.chance('right'):.0%}  V {forecast.chance('vent'):.0%}")
+                danger = max(forecast.chance(side) for side in ("left", "right", "vent"))
+            danger_color = (255, 50, 50) if danger > 0.5 else (255, 200, 0) if danger > 0.2 else (100, 255, 100)
+            danger_text = self.font_small.render(label, True, danger_color)
+            danger_rect = danger_text.get_rect(topright=(self.game_state.width - 30, self.game_state.height - 140))
+            self.screen.blit(danger_text, danger_rect)
         
         # Noise makers
         noise_text = self.font_small.render(f"NOISE MAKERS: {self.office.noise_maker_charges}", True, (200, 200, 255))
@@ -3781,7 +2519,7 @@ class Game:
         
         # Safe spot indicator
         if self.current_safe_spot:
-            safe_time = int(self.safe_spot_duration)
+            safe_time = int(self.sim.timers.remaining("safe_spot"))
             safe_text = self.font_medium.render(f"HIDING: {self.current_safe_spot.upper()} - {safe_time}s", True, (100, 255, 100))
             safe_rect = safe_text.get_rect(center=(self.game_state.width // 2, int(self.game_state.height * 0.50)))
             self.screen.blit(safe_text, safe_rect)
@@ -3816,6 +2554,7 @@ class Game:
                 "N: Noise Maker",
                 "V: Ventilation",
                 "C: Safe Spot",
+                "G: Danger Forecast",
                 "H: Toggle Help",
                 "ESC/P: Pause",
             ]
@@ -3863,7 +2602,8 @@ class Game:
             self.screen.blit(room_text, text_rect)
         
         # Instructions
-        inst_text = self.font_small.render("Press 1-7, Click a room, or ESC to cancel", True, (200, 255, 200))
+        inst_text = self.font_small.render(f"Press 1-{len(self.noise_maker_rooms)}, Click a room, or ESC to cancel",
+                                           True, (200, 255, 200))
         inst_rect = inst_text.get_rect(center=(self.game_state.width // 2, int(self.game_state.height * 0.85)))
         self.screen.blit(inst_text, inst_rect)
         
@@ -3922,6 +2662,54 @@ class Game:
         # Draw fade overlay
         self.draw_fade_overlay()
 
+    def draw_custom_night(self):
+        """Draw the custom night roster screen"""
+        self.screen.fill((8, 8, 16))
+        width, height = self.game_state.width, self.game_state.height
+
+        title = self.font_title.render("CUSTOM NIGHT", True, (255, 150, 50))
+        self.screen.blit(title, title.get_rect(center=(width // 2, int(height * 0.12))))
+
+        name_x, count_x, level_x = width // 2 - int(width * 0.27), width // 2 + int(width * 0.07), width // 2 + int(width * 0.2)
+        header_y = int(height * 0.24)
+        header = self.font_small.render("ANIMATRONIC", True, (150, 180, 200))
+        self.screen.blit(header, header.get_rect(midleft=(name_x, header_y)))
+        header = self.font_small.render("COUNT", True, (150, 180, 200))
+        self.screen.blit(header, header.get_rect(center=(count_x, header_y)))
+        header = self.font_small.render("AI LEVEL", True, (150, 180, 200))
+        self.screen.blit(header, header.get_rect(center=(level_x, header_y)))
+
+        row_height = int(48 * height / 720)
+        for i, (name, count, level) in enumerate(self.custom_roster):
+            y = int(height * 0.30) + i * row_height
+            selected = i == self.custom_cursor
+            if selected:
+                pygame.draw.rect(self.screen, (60, 40, 20), (width // 2 - int(width * 0.3), y - row_height // 2 + 4,
+                                                             int(width * 0.6), row_height - 8))
+            color = (255, 220, 150) if selected else ((220, 220, 220) if level > 0 and count > 0 else (110, 110, 110))
+            name_text = self.font_medium.render(name, True, color)
+            self.screen.blit(name_text, name_text.get_rect(midleft=(name_x, y)))
+            count_text = self.font_medium.render(f"< {count} >", True, color)
+            self.screen.blit(count_text, count_text.get_rect(center=(count_x, y)))
+            level_text = self.font_medium.render(f"< {level} >" if level > 0 else "< OFF >", True, color)
+            self.screen.blit(level_text, level_text.get_rect(center=(level_x, y)))
+
+        active = self.custom_active_count()
+        total_color = (255, 100, 100) if active in (0, MAX_CUSTOM_ANIMATRONICS) else (100, 255, 150)
+        total = self.font_medium.render(f"ACTIVE: {active} / {MAX_CUSTOM_ANIMATRONICS}", True, total_color)
+        self.screen.blit(total, total.get_rect(center=(width // 2, int(height * 0.78))))
+
+        hints = [
+            "[UP/DOWN] Select  [LEFT/RIGHT] Count  [A/D] AI Level",
+            "[H] Horde Preset  [R] Reset  [ENTER] Start  [M] Menu",
+        ]
+        for i, hint in enumerate(hints):
+            hint_text = self.font_small.render(hint, True, (150, 180, 200))
+            self.screen.blit(hint_text, hint_text.get_rect(center=(width // 2, int(height * 0.86) + i * 26)))
+
+        # Draw fade overlay
+        self.draw_fade_overlay()
+
     def draw_menu(self):
         """Draw main menu (optimized with caching)"""
         # Clear screen first to prevent black screen issues
@@ -4109,7 +2897,7 @@ class Game:
         self.screen.blit(record, record_rect)
 
         # Key hint
-        hint_text = self.font_small.render("[1-5] Select  |  [X Button] Quit", True, (150, 180, 200))
+        hint_text = self.font_small.render("[1-5] Select  |  [C] Custom Night  |  [X Button] Quit", True, (150, 180, 200))
         hint_rect = hint_text.get_rect(center=(self.game_state.width // 2, int(self.game_state.height * 0.90)))
         self.screen.blit(hint_text, hint_rect)
 
@@ -4256,12 +3044,14 @@ class Game:
         
         # Find the animatronic causing the jumpscare to get its size multiplier
         killer_size_multiplier = 1.0
+        killer_archetype = self.jumpscare.killer
         for anim in self.animatronics:
             if anim.name == self.jumpscare.killer:
                 killer_size_multiplier = anim.size_multiplier
+                killer_archetype = anim.archetype
                 break
         
-        sprite = self.get_anim_sprite(self.jumpscare.killer, is_attacking=True)
+        sprite = self.get_anim_sprite(killer_archetype, is_attacking=True)
         if sprite:
             base_scale = 0.6 * (self.game_state.width / 1280) * killer_size_multiplier
             scale = base_scale * (1.0 + 2.2 * self.jumpscare.zoom)
@@ -4353,8 +3143,10 @@ class Game:
             self.apply_vhs_effect(1.5)
 
             # Restart instructions
-            restart_text = self.font_medium.render("Press [R] to restart  |  [M] for Menu",
-                True, (255, 255, 255))
+            restart_hint = "Press [R] to restart  |  [M] for Menu"
+            if self.can_retry_hour():
+                restart_hint = "Press [R] to restart  |  [H] to retry this hour  |  [M] for Menu"
+            restart_text = self.font_medium.render(restart_hint, True, (255, 255, 255))
             restart_rect = restart_text.get_rect(center=(self.game_state.width // 2,
                 int(self.game_state.height * 0.65)))
             self.screen.blit(restart_text, restart_rect)
@@ -4419,6 +3211,9 @@ class Game:
         if self.game_state.state == "menu":
             self.draw_menu()
             return
+        if self.game_state.state == "custom_night":
+            self.draw_custom_night()
+            return
 
         if self.game_state.state == "anti_cheat":
             self.draw_anti_cheat_warning()
@@ -4535,273 +3330,14 @@ class Game:
     # INPUT HANDLING
     # =====================================================
 
-    def toggle_door(self, side):
-        """Toggle a door with enhanced visual feedback"""
-        if self.power.outage:
-            return
-        
-        # Check for door spam (prevent rapid toggling exploit)
-        current_time = time.time()
-        self.door_toggle_history[side].append(current_time)
-        
-        # Keep only toggles from last 5 seconds
-        self.door_toggle_history[side] = [t for t in self.door_toggle_history[side] if current_time - t < 5.0]
-        
-        # If more than 6 toggles in 5 seconds, it's spam
-        if len(self.door_toggle_history[side]) > 6:
-            self.door_spam_penalty += 8.0  # Extra power drain
-            self.set_status(f"Door mechanism stressed! Extra power drain!")
-            # Damage door more from stress
-            if side == "left":
-                self.office.door_left_health = max(0, self.office.door_left_health - 15)
-            else:
-                self.office.door_right_health = max(0, self.office.door_right_health - 15)
-
-        if side == "left":
-            door_x = 100
-            if self.office.door_left_closed:
-                # Opening door
-                self.office.door_left_closed = False
-                sound = "door_open"
-                # Spawn particles when opening
-                for _ in range(8):
-                    self.add_particle(door_x, self.game_state.height // 2,
-                                    random.uniform(-3, 3), random.uniform(-2, 2),
-                                    (150, 150, 200, 255), 3, 0.8)
-            else:
-                # Closing door - requires health and no jam
-                if self.office.door_left_jam_timer > 0 or self.office.door_left_health <= 0:
-                    self.set_status("Left door jammed!")
-                    # Spawn red warning particles
-                    for _ in range(15):
-                        self.add_particle(door_x, self.game_state.height // 2,
-                                        random.uniform(-5, 5), random.uniform(-5, 5),
-                                        (255, 50, 50, 255), 4, 0.6)
-                    return
-                self.office.door_left_closed = True
-                self.office.door_left_health = max(0, self.office.door_left_health - 6)
-                sound = "door_close"
-                self.total_door_closes += 1
-                # Spawn slam particles
-                for _ in range(12):
-                    self.add_particle(door_x, self.game_state.height // 2,
-                                    random.uniform(-4, 4), random.uniform(-3, 1),
-                                    (200, 200, 255, 255), 5, 1.0)
-                # Check if this was a perfect block
-                if any(a.room == "Hallway" and a.attack_side == "left" for a in self.animatronics):
-                    self.perfect_blocks += 1
-                    self.combo_blocks += 1
-                    self.combo_timer = 5.0  # 5 seconds to chain
-                    self.add_screen_shake(2, 0.2)
-                    # Extra particles for successful block!
-                    for _ in range(20):
-                        self.add_particle(door_x, self.game_state.height // 2,
-                                        random.uniform(-6, 6), random.uniform(-6, 2),
-                                        (100, 255, 100, 255), 6, 1.2)
-                self.check_reflex_cheat("left")
-            self.assets.play_sound(sound)
-        elif side == "right":
-            door_x = self.game_state.width - 100
-            if self.office.door_right_closed:
-                # Opening door
-                self.office.door_right_closed = False
-                sound = "door_open"
-                # Spawn particles when opening
-                for _ in range(8):
-                    self.add_particle(door_x, self.game_state.height // 2,
-                                    random.uniform(-3, 3), random.uniform(-2, 2),
-                                    (150, 150, 200, 255), 3, 0.8)
-            else:
-                # Closing door - requires health and no jam
-                if self.office.door_right_jam_timer > 0 or self.office.door_right_health <= 0:
-                    self.set_status("Right door jammed!")
-                    # Spawn red warning particles
-                    for _ in range(15):
-                        self.add_particle(door_x, self.game_state.height // 2,
-                                        random.uniform(-5, 5), random.uniform(-5, 5),
-                                        (255, 50, 50, 255), 4, 0.6)
-                    return
-                self.office.door_right_closed = True
-                self.office.door_right_health = max(0, self.office.door_right_health - 6)
-                sound = "door_close"
-                self.total_door_closes += 1
-                # Spawn slam particles
-                for _ in range(12):
-                    self.add_particle(door_x, self.game_state.height // 2,
-                                    random.uniform(-4, 4), random.uniform(-3, 1),
-                                    (200, 200, 255, 255), 5, 1.0)
-                # Check if this was a perfect block
-                if any(a.room == "Hallway" and a.attack_side == "right" for a in self.animatronics):
-                    self.perfect_blocks += 1
-                    self.combo_blocks += 1
-                    self.combo_timer = 5.0  # 5 seconds to chain
-                    self.add_screen_shake(2, 0.2)
-                    # Extra particles for successful block!
-                    for _ in range(20):
-                        self.add_particle(door_x, self.game_state.height // 2,
-                                        random.uniform(-6, 6), random.uniform(-6, 2),
-                                        (100, 255, 100, 255), 6, 1.2)
-                self.check_reflex_cheat("right")
-            self.assets.play_sound(sound)
-
-    def toggle_flashlight(self):
-        """Toggle flashlight with particle effect"""
-        if self.power.outage:
-            return
-        self.office.light_on = not self.office.light_on
-        self.assets.play_sound("light_toggle")
-        
-        # Spawn light particles in center
-        if self.office.light_on:
-            for _ in range(15):
-                self.add_particle(self.game_state.width // 2, self.game_state.height // 2,
-                                random.uniform(-8, 8), random.uniform(-8, 8),
-                                (255, 255, 200, 255), 4, 0.7)
-
-    def toggle_cameras(self):
-        """Toggle camera view with enhanced effects"""
-        if self.power.outage:
-            return
-        self.office.cams_open = not self.office.cams_open
-        if self.office.cams_open:
-            self.office.cam_flash = 1.0
-            self.total_camera_checks += 1
-            # Play camera flash sound
-            self.assets.play_sound("camera_flash")
-            # Start looping static sound
-            if not self.static_loop_playing:
-                self.assets.play_sound("static_loop", loops=-1)
-                self.static_loop_playing = True
-            # Static burst effect
-            self.game_state.vhs_effect = min(2.0, self.game_state.vhs_effect + 0.5)
-        else:
-            # Closing cameras also triggers brief static
-            self.game_state.vhs_effect = min(2.0, self.game_state.vhs_effect + 0.3)
-            # Stop static loop
-            if self.static_loop_playing:
-                self.assets.stop_sound("static_loop")
-                self.static_loop_playing = False
-
-    def switch_camera(self, index):
-        """Switch to a specific camera with enhanced flash"""
-        if 0 <= index < len(self.cameras.cameras):
-            self.cameras.switch(index)
-            if self.office.cams_open:
-                self.office.cam_flash = 1.0
-                # Brief VHS distortion spike
-                self.game_state.vhs_effect = min(2.0, self.game_state.vhs_effect + 0.2)
-    
-    def use_barricade(self):
-        """Reinforce doors with barricades"""
-        if self.power.current < 15:
-            self.set_status("Not enough power for barricade!")
-            return
-        
-        # Toggle which side to barricade based on which door is weaker
-        if self.office.door_left_health < self.office.door_right_health:
-            if self.office.barricade_left < 3:
-                self.office.barricade_left += 1
-                self.office.door_left_health = min(100, self.office.door_left_health + 25)
-                self.power.current = max(0, self.power.current - 10)
-                self.log_event(f"Left door barricaded (Lvl {self.office.barricade_left})")
-                self.add_screen_shake(3, 0.3)
-            else:
-                self.set_status("Left door fully barricaded!")
-        else:
-            if self.office.barricade_right < 3:
-                self.office.barricade_right += 1
-                self.office.door_right_health = min(100, self.office.door_right_health + 25)
-                self.power.current = max(0, self.power.current - 10)
-                self.log_event(f"Right door barricaded (Lvl {self.office.barricade_right})")
-                self.add_screen_shake(3, 0.3)
-            else:
-                self.set_status("Right door fully barricaded!")
-    
-    def deploy_noise_maker(self, room):
-        """Deploy noise maker to specific room to lure animatronics"""
-        if self.office.noise_maker_charges <= 0:
-            self.set_status("No noise makers left!")
-            return
-        
-        if self.audio_distraction_cooldown > 0:
-            self.set_status(f"Noise maker cooling down: {int(self.audio_distraction_cooldown)}s")
-            return
-        
-        self.office.noise_maker_charges -= 1
-        self.audio_distraction_cooldown = 15
-        
-        # All animatronics head to the selected room thinking they heard something
-        lured = 0
-        for anim in self.animatronics:
-            # Set them to hunt the lure location
-            anim.hunt_target_room = room
-            # Each animatronic has different time based on their traits
-            # sound_sensitivity: 0.5-1.5, patience: 0.5-2.0 (from Animatronic.__init__)
-            # Formula: 6.0 + (sensitivity * 3.0) + (patience * 2.0) = 5.0-12.0 seconds
-            # More sensitive/patient animatronics stay distracted longer
-            base_duration = 6.0 + (anim.sound_sensitivity * 3.0) + (anim.patience * 2.0)
-            anim.hunting_timer = min(12.0, max(5.0, base_duration))
-            anim.hunting_mode = True
-            anim.mood = "hunting"
-            lured += 1
-        
-        if lured > 0:
-            self.set_status(f"Deployed noise maker in {room}! Lured {lured} animatronic(s)!")
-            self.add_screen_shake(3, 0.8)
-            self.add_color_overlay((100, 255, 100, 100), 1.2)
-            self.log_event(f"Noise maker deployed in {room}")
-        else:
-            self.set_status("No animatronics to lure!")
-    
     def use_noise_maker(self):
         """Legacy method - shows menu instead"""
         self.noise_maker_menu_active = True
-        self.set_status("Choose room (1-7) or ESC to cancel")
-    
-    def toggle_vent_system(self):
-        """Toggle ventilation to reduce camera heat"""
-        if self.power.current < 5:
-            self.set_status("Not enough power for ventilation!")
-            return
-        
-        self.office.vent_system_active = not self.office.vent_system_active
-        
-        if self.office.vent_system_active:
-            self.log_event("Ventilation system ON")
-            self.power.base_drain += 0.05  # Small power cost
-        else:
-            self.log_event("Ventilation system OFF")
-            self.power.base_drain = max(0.16, self.power.base_drain - 0.05)
+        self.set_status(f"Choose room (1-{len(self.noise_maker_rooms)}) or ESC to cancel")
     
-    def use_safe_spot(self):
-        """Hide in a safe spot temporarily"""
-        if self.current_safe_spot:
-            self.set_status("Already in safe spot!")
-            return
-        
-        if not self.safe_spots_available:
-            self.set_status("No safe spots available!")
-            return
-        
-        # Can only use if threat is high enough
-        if self.threat_level < 50:
-            self.set_status("Not dangerous enough to hide!")
-            return
-        
-        # Choose random safe spot
-        spot = self.rng.choice(self.safe_spots_available)
-        self.current_safe_spot = spot
-        self.safe_spot_duration = 8.0  # 8 seconds of safety
-        self.safe_spots_available.remove(spot)
-        
-        self.log_event(f"Hiding in {spot}!")
-        self.add_color_overlay((50, 50, 50, 200), 8.0)
-        
-        # Animatronics lose track temporarily
-        for anim in self.animatronics:
-            if anim.room == "Office":
-                anim.room = "Hallway"
-                anim.target_x, anim.target_y = room_position("Hallway", WINDOW_WIDTH, WINDOW_HEIGHT)
+    def queue_input(self, action, *args):
+        """Queue a player action for the next simulation step"""
+        self.pending_inputs.append((action,) + args)
 
     def handle_input(self):
         """Handle all input"""
@@ -4871,7 +3407,7 @@ class Game:
                     for i, button_rect in self.noise_maker_buttons.items():
                         if button_rect.collidepoint(mx, my):
                             selected_room = self.noise_maker_rooms[i]
-                            self.deploy_noise_maker(selected_room)
+                            self.queue_input("deploy_noise_maker", selected_room)
                             self.noise_maker_menu_active = False
                             break
 
@@ -4880,15 +3416,13 @@ class Game:
                     clicked_room = self.get_clicked_room(self.scale_mouse_pos(event.pos))
                     if clicked_room:
                         # Find camera index for this room
-                        try:
-                            cam_index = self.cameras.cameras.index(clicked_room)
+                        cam_index = current_map().camera_index.get(clicked_room)
+                        if cam_index is not None:
                             # If not viewing cameras, open them
                             if not self.office.cams_open:
-                                self.toggle_cameras()
+                                self.queue_input("toggle_cameras")
                             # Switch to the clicked camera
-                            self.switch_camera(cam_index)
-                        except ValueError:
-                            pass
+                            self.queue_input("switch_camera", cam_index)
             elif event.type == pygame.MOUSEBUTTONUP:
                 # stop dragging slider
                 if self.dragging_slider:
@@ -4930,6 +3464,8 @@ class Game:
                         self.start_night(4)
                     elif key == "5" and self.game_state.max_night_unlocked >= 5:
                         self.start_night(5)
+                    elif key == "c":
+                        self.game_state.state = "custom_night"
                     elif key == "left":
                         # decrease night length
                         step = 5.0
@@ -4969,36 +3505,38 @@ class Game:
 
                 elif self.game_state.state == "playing":
                     if key == "q":
-                        self.toggle_door("left")
+                        self.queue_input("toggle_door", "left")
                     elif key == "e":
-                        self.toggle_door("right")
+                        self.queue_input("toggle_door", "right")
                     elif key == "f":
-                        self.toggle_flashlight()
+                        self.queue_input("toggle_flashlight")
                     elif key == "tab":
-                        self.toggle_cameras()
+                        self.queue_input("toggle_cameras")
                     elif key == "h":
                         self.show_controls = not self.show_controls
+                    elif key == "g":
+                        self.toggle_forecast()
                     elif key == "1":
-                        self.switch_camera(0)
+                        self.queue_input("switch_camera", 0)
                     elif key == "2":
-                        self.switch_camera(1)
+                        self.queue_input("switch_camera", 1)
                     elif key == "3":
-                        self.switch_camera(2)
+                        self.queue_input("switch_camera", 2)
                     elif key == "4":
-                        self.switch_camera(3)
+                        self.queue_input("switch_camera", 3)
                     elif key == "5":
-                        self.switch_camera(4)
+                        self.queue_input("switch_camera", 4)
                     elif key == "6":
-                        self.switch_camera(5)
+                        self.queue_input("switch_camera", 5)
                     elif key == "b":
-                        self.use_barricade()
+                        self.queue_input("use_barricade")
                     elif key == "n":
                         self.noise_maker_menu_active = True
-                        self.set_status("Choose room (1-7) or ESC to cancel")
+                        self.set_status(f"Choose room (1-{len(self.noise_maker_rooms)}) or ESC to cancel")
                     elif key == "v":
-                        self.toggle_vent_system()
+                        self.queue_input("toggle_vent_system")
                     elif key == "c":
-                        self.use_safe_spot()
+                        self.queue_input("use_safe_spot")
                     elif key in ("escape", "p"):
                         if self.noise_maker_menu_active:
                             self.noise_maker_menu_active = False
@@ -5008,21 +3546,44 @@ class Game:
                 
                 elif self.game_state.state == "playing" and self.noise_maker_menu_active:
                     # Handle room selection for noise maker
-                    if key in ("1", "2", "3", "4", "5", "6", "7"):
+                    if len(key) == 1 and key in "123456789":
                         room_index = int(key) - 1
                         if room_index < len(self.noise_maker_rooms):
                             selected_room = self.noise_maker_rooms[room_index]
-                            self.deploy_noise_maker(selected_room)
+                            self.queue_input("deploy_noise_maker", selected_room)
                             self.noise_maker_menu_active = False
                     elif key == "escape":
                         self.noise_maker_menu_active = False
                         self.set_status("")
 
+                elif self.game_state.state == "custom_night":
+                    if key in ("up", "w"):
+                        self.custom_cursor = (self.custom_cursor - 1) % len(self.custom_roster)
+                    elif key in ("down", "s"):
+                        self.custom_cursor = (self.custom_cursor + 1) % len(self.custom_roster)
+                    elif key == "left":
+                        self.adjust_custom_roster(1, -1)
+                    elif key == "right":
+                        self.adjust_custom_roster(1, 1)
+                    elif key == "a":
+                        self.adjust_custom_roster(2, -1)
+                    elif key == "d":
+                        self.adjust_custom_roster(2, 1)
+                    elif key == "h":
+                        self.set_horde_roster()
+                    elif key == "r":
+                        self.custom_roster = self.default_custom_roster()
+                    elif key in ("return", "space") and self.custom_active_count() > 0:
+                        self.start_custom_night()
+                    elif key == "m":
+                        self.save_progress()
+                        self.enter_menu()
+
                 elif self.game_state.state == "paused":
                     if key in ("escape", "p"):
                         self.game_state.state = "playing"
                     elif key == "r":
-                        self.start_night(self.game_state.night)
+                        self.start_night(self.game_state.night, roster=self.sim.roster)
                     elif key == "m":
                         self.restart_from_menu()
                     elif key == "q":
@@ -5030,13 +3591,15 @@ class Game:
 
                 elif self.game_state.state == "jumpscare":
                     if key == "r":
-                        self.start_night(1)
+                        self.restart_night(1)
+                    elif key == "h":
+                        self.retry_hour()
                     elif key == "m":
                         self.restart_from_menu()
 
                 elif self.game_state.state == "win":
                     if key == "r":
-                        self.start_night(1)
+                        self.restart_night(1)
                     elif key == "m":
                         self.restart_from_menu()
 
@@ -5045,10 +3608,7 @@ class Game:
                         # Skip tutorial - go directly to playing
                         ambience_key = f"ambience_n{self.game_state.night}"
                         self.assets.play_music(ambience_key)
-                        self.game_state.state = "playing"
-                        self.game_state.start_time = time.time()
-                        self.game_state.hour_timer = 0
-                        self.game_state.minutes_elapsed = 0
+                        self.sim.begin_playing()
                         self.tutorial_index = 0
                         self.tutorial_timer = 0.0
 
@@ -5076,10 +3636,8 @@ class Game:
                         self.quality_scale = max(0.5, self.quality_scale - 0.05)
                     elif avg_fps > 58:  # Above 58 FPS, increase quality
                         self.quality_scale = min(1.0, self.quality_scale + 0.02)
-                
-                # Skip heavy updates if running slow (prevent death spiral)
-                if dt > 0.033:  # More than 30ms per frame
-                    dt = 0.033  # Cap dt to prevent spiral of death
+
+                # Slow frames are caught up in fixed ticks by update() (capped at MAX_CATCHUP_STEPS)
 
                 self.handle_input()
                 self.update(dt)
@@ -5091,6 +3649,8 @@ class Game:
             except Exception as err:
                 self.handle_runtime_error(err)
 
+        if self.forecaster is not None:
+            self.forecaster.close()
         pygame.quit()
         sys.exit()
 
@@ -5100,5 +3660,31 @@ class Game:
 # =====================================================
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # The danger forecast's worker process, in frozen builds
+    parser = argparse.ArgumentParser(description=WINDOW_TITLE)
+    parser.add_argument("--replay", help="play back a recorded night (.fnr)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--map", help="building map to play on (.json, see maps/)")
+    parser.add_argument("--lookahead", type=int, nargs="?", const=DEFAULT_LOOKAHEAD, default=0,
+                        help=f"animatronics plan ahead from night {LOOKAHEAD_NIGHT} (rollouts per tick)")
+    parser.add_argument("--forecast", action="store_true", help="start with the danger forecast on (G toggles it)")
+    args = parser.parse_args()
+    if args.map:
+        try:
+            use_map(load_map(args.map, assets_dir=os.path.join(BASE_DIR, "assets")))
+        except MapError as e:
+            parser.error(str(e))
+    replay = None
+    if args.replay:
+        try:
+            replay = Replay.load(args.replay)
+            use_replay_map(replay)
+        except (OSError, ReplayError) as e:
+            parser.error(f"{args.replay}: {e}")
     game = Game()
+    game.sim.lookahead = max(0, args.lookahead)
+    if args.forecast:
+        game.toggle_forecast()
+    if replay is not None:
+        game.start_replay(replay, args.speed)
     game.run()
@@ -0,0 +1,134 @@
+"""
+Animatronic mood schedule for Five Nights at Mr Ingles's.
+
+Which mood an animatronic settles into every 2 seconds depends only on the
+night, the in-game minute and how many times it has been blocked. That is
+written down here as data - per-night phases of repeating mood patterns,
+plus block-count overrides - and compiled once into byte tables of mood
+codes, so picking a mood is a single indexed read:
+
+    SCHEDULE.mood(night, minutes, block_count)
+
+To retune a night, edit NIGHT_MOODS / BLOCK_MOODS below. Each pattern
+repeats every len(pattern) minutes, e.g. ("hunting", "neutral") alternates
+minute by minute and ("hunting",) * 2 + ("neutral",) * 3 hunts 40% of the
+time. MoodSchedule checks the data when it is compiled, so a typo in a mood
+name or a phase that starts out of order fails at import, not mid-night.
+"""
+
+NIGHT_MINUTES = 6 * 60  # 12 AM to 6 AM
+
+# Mood codes, in table order
+MOODS = ("neutral", "cautious", "aggressive", "hunting", "retreating")
+
+# night -> phases of (first minute, pattern); the pattern in force is indexed
+# by minute % len(pattern). Nights past the last one listed use the last one.
+NIGHT_MOODS = {
+    1: (  # Tutorial difficulty
+        (0, ("neutral",)),                                  # Learn the game
+        (15, ("hunting",) * 2 + ("neutral",) * 8),          # 20% hunting
+        (30, ("hunting",) * 2 + ("neutral",) * 5),          # 29% hunting
+        (60, ("hunting",) * 2 + ("neutral",) * 3),          # 40% hunting
+        (120, ("hunting", "neutral")),                      # 50% hunting
+        (240, ("hunting", "hunting", "neutral")),           # 67% hunting
+    ),
+    2: (  # Moderate difficulty
+        (0, ("neutral",)),                                  # Patrol phase
+        (20, ("hunting",) * 2 + ("neutral",) * 5),          # 29% hunting
+        (60, ("hunting",) * 2 + ("neutral",) * 3),          # 40% hunting
+        (150, ("hunting", "hunting", "cautious")),          # 67% hunting
+    ),
+    3: (  # Getting serious
+        (0, ("neutral", "cautious")),
+        (15, ("cautious", "cautious", "hunting")),          # 33% hunting
+        (60, ("hunting", "cautious")),                      # 50% hunting
+        (180, ("aggressive", "aggressive", "hunting")),     # 67% aggressive
+    ),
+    4: (  # Very aggressive
+        (0, ("neutral",)),                                  # Short patrol period
+        (10, ("aggressive",) * 3 + ("cautious",) + ("hunting",) * 3 + ("cautious",)),  # 75% hunting/aggressive
+    ),
+    5: (  # Extremely aggressive
+        (0, ("cautious",)),                                 # Brief calm
+        (5, ("aggressive", "aggressive", "cautious", "hunting", "hunting", "cautious")),  # 67% hunting
+    ),
+}
+
+# Frustration overrides the night's schedule from this many blocks up (the
+# highest threshold reached wins); indexed by (minute + block_count) % len(pattern)
+BLOCK_MOODS = (
+    (3, ("hunting",) * 3 + ("cautious",) * 2),  # Frustrated - 60% hunting
+    (5, ("aggressive",)),                       # Very frustrated - aggressive hunting
+)
+
+
+class MoodSchedule:
+    """NIGHT_MOODS / BLOCK_MOODS compiled to [night][block row][minute] mood codes"""
+    def __init__(self, night_moods=None, block_moods=None, minutes=NIGHT_MINUTES):
+        night_moods = NIGHT_MOODS if night_moods is None else night_moods
+        block_moods = BLOCK_MOODS if block_moods is None else block_moods
+        self.minutes = minutes
+        self.nights = sorted(night_moods)
+        if not self.nights or self.nights[0] != 1 or self.nights != list(range(1, len(self.nights) + 1)):
+            raise ValueError(f"mood schedule needs nights 1..N, got {self.nights}")
+
+        thresholds = [threshold for threshold, _ in block_moods]
+        if thresholds != sorted(set(thresholds)) or (thresholds and thresholds[0] < 1):
+            raise ValueError(f"block overrides must have rising thresholds >= 1, got {thresholds}")
+        # Block counts past the top threshold repeat with its pattern's period
+        self.top_block = thresholds[-1] if thresholds else 0
+        self.top_period = len(block_moods[-1][1]) if block_moods else 1
+
+        self.tables = []  # night - 1 -> block row -> bytes of mood codes by minute
+        for night in self.nights:
+            schedule = self._compile_phases(night, night_moods[night])
+            rows = []
+            for block_count in range(self.top_block + self.top_period):
+                override = None
+                for threshold, pattern in block_moods:
+                    if block_count >= threshold:
+                        override = self._codes(pattern, f"block override {threshold}")
+                if override is None:
+                    rows.append(schedule)
+                else:
+                    rows.append(bytes(override[(minute + block_count) % len(override)]
+                                      for minute in range(minutes + 1)))
+            self.tables.append(rows)
+
+    def _codes(self, pattern, where):
+        if not pattern:
+            raise ValueError(f"{where}: empty mood pattern")
+        for mood in pattern:
+            if mood not in MOODS:
+                raise ValueError(f"{where}: unknown mood {mood!r} (expected one of {MOODS})")
+        return [MOODS.index(mood) for mood in pattern]
+
+    def _compile_phases(self, night, phases):
+        starts = [start for start, _ in phases]
+        if not starts or starts[0] != 0 or starts != sorted(set(starts)):
+            raise ValueError(f"night {night}: phases must start at minute 0 and rise, got {starts}")
+        table = bytearray(self.minutes + 1)
+        for i, (start, pattern) in enumerate(phases):
+            codes = self._codes(pattern, f"night {night} minute {start}")
+            end = phases[i + 1][0] if i + 1 < len(phases) else self.minutes + 1
+            for minute in range(start, min(end, self.minutes + 1)):
+                table[minute] = codes[minute % len(codes)]
+        return bytes(table)
+
+    def block_row(self, block_count):
+        """Row of a night's table that applies at this block count"""
+        if block_count >= self.top_block:
+            return self.top_block + (block_count - self.top_block) % self.top_period
+        return block_count
+
+    def code(self, night, minutes, block_count=0):
+        """Mood code for a calm (not hunting) animatronic"""
+        rows = self.tables[min(max(night, 1), len(self.tables)) - 1]
+        return rows[self.block_row(block_count)][min(max(minutes, 0), self.minutes)]
+
+    def mood(self, night, minutes, block_count=0):
+        """Mood name for a calm (not hunting) animatronic"""
+        return MOODS[self.code(night, minutes, block_count)]
+
+
+SCHEDULE = MoodSchedule()
@@ -0,0 +1,183 @@
+"""
+Room graph analysis for Five Nights at Mr Ingles's.
+
+Everything the AI asks about the map ("how far is X from Y", "which way do I
+step to reach Y", "which office door does this hallway lead to") is answered
+from tables that are built once when the graph is loaded. Queries are plain
+dict lookups, so pathing and threat checks cost the same no matter how many
+animatronics are active or how big the map gets.
+
+The tables are rebuilt automatically whenever the room graph (or the room
+positions used for door-side classification) is modified.
+"""
+
+from collections import deque
+
+OFFICE = "Office"
+UNREACHABLE = 999  # Same sentinel the old per-call BFS returned
+
+
+# =====================================================
+# VERSIONED ROOM DATA
+# =====================================================
+
+class RoomTable(dict):
+    """Dict of room -> data that bumps a version counter on every change.
+
+    Values are stored as tuples so they cannot be edited in place behind the
+    table's back; any change has to go through the dict and is tracked.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.version = 0
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, room, value):
+        super().__setitem__(room, tuple(value))
+        self.version += 1
+
+    def __delitem__(self, room):
+        super().__delitem__(room)
+        self.version += 1
+
+    def update(self, *args, **kwargs):
+        for room, value in dict(*args, **kwargs).items():
+            self[room] = value
+
+    def setdefault(self, room, value=()):
+        if room not in self:
+            self[room] = value
+        return self[room]
+
+    def pop(self, room, *default):
+        if room in self:
+            self.version += 1
+        return super().pop(room, *default)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+
+# =====================================================
+# GRAPH ANALYSIS
+# =====================================================
+
+class RoomGraphAnalysis:
+    """Precomputed distance, next-hop and office door-side tables"""
+    def __init__(self, graph, positions=None, office=OFFICE):
+        self.office = office
+        self.rooms = list(graph.keys())
+        self.neighbors = {room: tuple(graph.get(room, ())) for room in self.rooms}
+        self.distance_table = {}   # from_room -> {to_room: hops}
+        self.next_hop_table = {}   # from_room -> {to_room: first room to step into}
+        self.door_side = {}        # office-adjacent room -> "left" / "right"
+        self.side_distance = {"left": {}, "right": {}}  # side -> {room: hops to Office through that door}
+        self._build_distances()
+        self._build_door_sides(positions or {})
+
+    def _bfs(self, sources, blocked=None):
+        """Breadth-first hop counts from one or more (room, start_distance) sources"""
+        dist = {}
+        queue = deque()
+        for room, start in sources:
+            if room not in dist:
+                dist[room] = start
+                queue.append(room)
+        while queue:
+            current = queue.popleft()
+            next_dist = dist[current] + 1
+            for neighbor in self.neighbors.get(current, ()):
+                if neighbor not in dist and neighbor != blocked:
+                    dist[neighbor] = next_dist
+                    queue.append(neighbor)
+        return dist
+
+    def _build_distances(self):
+        # One BFS per room gives both the hop counts and the first step. The
+        # queue starts with the room's neighbors in graph order and every room
+        # inherits the first step of whichever room reached it first, which is
+        # the first neighbor (in graph order) one hop closer - exactly what the
+        # old greedy neighbor scan picked, including tie-breaks.
+        for room in self.rooms:
+            dist = {room: 0}
+            hops = {}
+            queue = deque()
+            for neighbor in self.neighbors[room]:
+                if neighbor not in dist:
+                    dist[neighbor] = 1
+                    hops[neighbor] = neighbor
+                    queue.append(neighbor)
+            while queue:
+                current = queue.popleft()
+                next_dist = dist[current] + 1
+                first_step = hops[current]
+                for neighbor in self.neighbors.get(current, ()):
+                    if neighbor not in dist:
+                        dist[neighbor] = next_dist
+                        hops[neighbor] = first_step
+                        queue.append(neighbor)
+            self.distance_table[room] = dist
+            self.next_hop_table[room] = hops
+
+    def _build_door_sides(self, positions):
+        office_pos = positions.get(self.office, (0.5, 0.5))
+        for room in self.neighbors.get(self.office, ()):
+            room_pos = positions.get(room, (0.5, 0.5))
+            # Room is on the left if its x position is less than the office's
+            self.door_side[room] = "left" if room_pos[0] < office_pos[0] else "right"
+        for side in ("left", "right"):
+            doorway = [(room, 1) for room, room_side in self.door_side.items() if room_side == side]
+            side_dist = self._bfs(doorway, blocked=self.office)
+            side_dist[self.office] = 0
+            self.side_distance[side] = side_dist
+
+    def distance(self, from_room, to_room):
+        """Hop count between two rooms (UNREACHABLE if there is no path)"""
+        if from_room == to_room:
+            return 0
+        return self.distance_table.get(from_room, {}).get(to_room, UNREACHABLE)
+
+    def next_hop(self, from_room, to_room):
+        """Room to step into to get one hop closer to to_room (None if there is no path)"""
+        return self.next_hop_table.get(from_room, {}).get(to_room)
+
+    def distance_to_office(self, room, side=None):
+        """Hops to the Office, optionally only through the given door side"""
+        if side is None:
+            return self.distance(room, self.office)
+        return self.side_distance.get(side, {}).get(room, UNREACHABLE)
+
+    def office_door_side(self, room):
+        """Door ("left"/"right") an office-adjacent room leads to, or None"""
+        return self.door_side.get(room)
+
+    def is_office_adjacent(self, room):
+        """True if the room connects directly to the Office"""
+        return room in self.door_side
+
+
+def _fingerprint(table):
+    """Cheap change marker: the version counter if tracked, else the full contents"""
+    if table is None:
+        return None
+    version = getattr(table, "version", None)
+    if version is not None:
+        return (id(table), version)
+    return tuple((room, tuple(value)) for room, value in table.items())
+
+
+_analysis_cache = {"key": None, "analysis": None}
+
+
+def analyze_room_graph(graph, positions=None):
+    """Return tables for the given graph, rebuilding only if it has changed"""
+    key = (_fingerprint(graph), _fingerprint(positions))
+    if _analysis_cache["key"] != key:
+        _analysis_cache["analysis"] = RoomGraphAnalysis(graph, positions)
+        _analysis_cache["key"] = key
+    return _analysis_cache["analysis"]
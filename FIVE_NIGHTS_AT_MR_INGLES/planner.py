@@ -0,0 +1,180 @@
+"""
+Look-ahead move planning for Five Nights at Mr Ingles's.
+
+A hunting animatronic normally takes the next hop on the shortest path to
+the Office. With look-ahead switched on (Simulation.lookahead > 0, nights
+LOOKAHEAD_NIGHT and up) it instead scores every room it could step into by
+rolling out short random futures from there against PlayerHabits - how
+often the player has had each door shut while something stood outside it,
+and which rooms they keep the cameras on - plus the doors as they are now
+(and any still jammed open), and steps wherever clearly more futures end
+with it getting in than on the shortest path.
+
+Rollouts are time-sliced. Each tick the sim hands the planner the hunters
+that are about to move and at most Simulation.lookahead rollouts to spend
+on them, round-robin. An animatronic's tallies (plan_room, plan_rollouts,
+plan_scores) live on it and keep growing until it moves, and a move that
+comes due before every candidate has PLAN_MIN_ROLLOUTS falls back to the
+shortest path. A small budget only makes the AI greedier, never the frame
+longer.
+
+Rollouts draw from their own stream, reseeded from (run_seed, tick) every
+tick, so planning never touches the AI's random stream and replays and
+snapshots stay exact.
+"""
+
+import random
+
+LOOKAHEAD_NIGHT = 4  # Planning only kicks in from this night on
+DEFAULT_LOOKAHEAD = 32  # Rollouts per tick when switched on without a budget
+PLAN_LEAD = 3.0  # Start planning this many seconds before a move is due
+PLAN_HORIZON = 8  # Moves per rollout
+PLAN_MIN_ROLLOUTS = 6  # Per candidate room before a plan is trusted
+PLAN_MAX_ROLLOUTS = 24  # Per candidate room; past this a plan stops taking budget
+PLAN_DISCOUNT = 0.9  # Getting in a move later is worth this much less
+PLAN_MARGIN = 0.15  # A detour has to beat the shortest path's score by this much
+PLAN_WANDER = 0.15  # Chance a rolled-out move strays off the shortest path
+PLAN_SEEN_CLOSE = 0.85  # Door-closed chance once the player has seen it coming
+PLAN_MOVE_SECONDS = 1.5  # Rough time a rolled-out move takes
+PLAN_MEMORY = 0.5  # How much the doors' state right now still counts each move later
+PLAN_SEED_STRIDE = 1000003  # Rollout stream seed = run_seed * stride + tick
+HABIT_SECONDS = 20.0  # Door habits forget over roughly this long
+HABIT_PRIOR = 0.5  # Door-shut chance assumed before the player has shown anything
+
+
+# =====================================================
+# PLAYER MODEL
+# =====================================================
+
+class PlayerHabits:
+    """What the player has been doing with the doors and cameras tonight"""
+    __slots__ = ("door_left", "door_right", "watch_time", "observed")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.door_left = HABIT_PRIOR  # Recent share of threatened time each door was shut
+        self.door_right = HABIT_PRIOR
+        self.watch_time = {}  # room -> seconds it has been on camera
+        self.observed = 0.0  # Seconds watched in total
+
+    def observe(self, office, cameras, threatened, dt):
+        """Fold one tick in; `threatened` holds the sides with something at their doorway"""
+        blend = min(1.0, dt / HABIT_SECONDS)
+        if "left" in threatened:
+            self.door_left += ((1.0 if office.door_left_closed else 0.0) - self.door_left) * blend
+        if "right" in threatened:
+            self.door_right += ((1.0 if office.door_right_closed else 0.0) - self.door_right) * blend
+        self.observed += dt
+        if office.cams_open:
+            room = cameras.current_camera()
+            self.watch_time[room] = self.watch_time.get(room, 0.0) + dt
+
+    def door_closed(self, side, office=None, weight=0.0):
+        """Chance the door on `side` is shut (vent: both of them), leaning `weight` on office's doors now"""
+        if side == "left":
+            habit = self.door_left
+            now = office is not None and office.door_left_closed
+        elif side == "right":
+            habit = self.door_right
+            now = office is not None and office.door_right_closed
+        else:
+            return self.door_closed("left", office, weight) * self.door_closed("right", office, weight)
+        return habit + ((1.0 if now else 0.0) - habit) * weight
+
+    def watch_share(self, room):
+        """Share of the night the player has had this room on camera"""
+        return self.watch_time.get(room, 0.0) / self.observed if self.observed else 0.0
+
+
+# =====================================================
+# PLANNER
+# =====================================================
+
+class LookaheadPlanner:
+    """Spends a per-tick rollout budget on the plans of hunting animatronics"""
+    __slots__ = ("habits", "rng")
+
+    def __init__(self):
+        self.habits = PlayerHabits()
+        self.rng = random.Random()
+
+    def plan(self, hunters, graph, office, jams, budget, seed):
+        """Run up to `budget` rollouts, shared round-robin between `hunters`"""
+        for anim in hunters:
+            if anim.plan_room != anim.room:
+                anim.plan_room = anim.room
+                anim.plan_rollouts = 0
+                anim.plan_scores = dict.fromkeys(graph.neighbors.get(anim.room, ()), 0.0)
+        hunters = [anim for anim in hunters
+                   if anim.plan_rollouts < PLAN_MAX_ROLLOUTS * len(anim.plan_scores)]
+        if not hunters:
+            return
+        self.rng.seed(seed)
+        for i in range(budget):
+            anim = hunters[i % len(hunters)]
+            scores = anim.plan_scores
+            first = list(scores)[anim.plan_rollouts % len(scores)]
+            scores[first] += self.rollout(anim, first, graph, office, jams)
+            anim.plan_rollouts += 1
+
+    def rollout(self, anim, room, graph, office, jams):
+        """One random future after stepping into `room`: discounted 1 if it gets in, else 0
+
+        Doors are drawn from the player's habits, leaning on how they stand
+        right now for the first moves.
+        """
+        rng = self.rng
+        habits = self.habits
+        side = anim.attack_side
+        seen = False
+        value = 1.0
+        weight = 1.0
+        arrival = anim.move_cooldown
+        for _ in range(PLAN_HORIZON):
+            if room == graph.office:
+                if jams.get(side, 0.0) > arrival:
+                    return value  # Its door is still jammed open when it gets there
+                closed = habits.door_closed(side, office, weight)
+                if seen:
+                    closed = max(PLAN_SEEN_CLOSE, closed)
+                return value if rng.random() >= closed else 0.0
+            door = graph.office_door_side(room)
+            if door is not None:
+                # A shut doorway sends it away; an open one lets it in (and past its own door)
+                closed = 0.0 if jams.get(door, 0.0) > arrival else habits.door_closed(door, office, weight)
+                if seen:
+                    closed = max(PLAN_SEEN_CLOSE, closed)
+                if rng.random() < closed:
+                    return 0.0
+                if door == side:
+                    return value * PLAN_DISCOUNT
+                room = graph.office
+            else:
+                seen = seen or rng.random() < habits.watch_share(room)
+                neighbors = graph.neighbors.get(room, ())
+                if neighbors and rng.random() < PLAN_WANDER:
+                    room = rng.choice(neighbors)
+                else:
+                    room = graph.next_hop(room, graph.office)
+                    if room is None:
+                        return 0.0
+            value *= PLAN_DISCOUNT
+            weight *= PLAN_MEMORY
+            arrival += PLAN_MOVE_SECONDS
+        return 0.0
+
+
+def planned_move(anim, greedy):
+    """Best first step of a finished plan (ties keep `greedy`), or None if it isn't ready"""
+    scores = anim.plan_scores
+    count = len(scores)
+    if not count or anim.plan_rollouts < PLAN_MIN_ROLLOUTS * count:
+        return None
+    rounds, extra = divmod(anim.plan_rollouts, count)
+    means = {room: total / (rounds + (i < extra)) for i, (room, total) in enumerate(scores.items())}
+    best = max(means, key=means.get)
+    if greedy in means and means[best] < means[greedy] + PLAN_MARGIN:
+        return greedy
+    return best
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Input replays for Five Nights at Mr Ingles's.
+
+A night is fully described by its run_seed, the night settings and the list
+of (tick, action) inputs the player made, so that is all a replay stores:
+
+    header   b"FNMIREP" + format version byte
+    settings varints run_seed and night, float64 difficulty and seconds_per_hour, varint tick rate (Hz)
+    rules    varint simulation.RULES_VERSION the night was played under
+    map      varint name length + UTF-8 name, varint checksum (building_map.map_checksum)
+    strings  varint count, then (varint length + UTF-8) for every string argument used
+    roster   varint count (0 = story roster), then per entry: archetype (string), count, AI level
+    planner  varint look-ahead rollouts per tick (0 = off)
+    events   varint count, then per event: tick delta, action code, arguments
+    outcome  varint end tick delta, end state, minutes survived, killer (string table indexes)
+
+Everything else is an unsigned LEB128 varint and ticks are stored as the gap
+since the previous event, so a whole night of play is usually a few hundred
+bytes.
+
+Playback re-runs the headless Simulation on the map the night was recorded
+on, either as fast as the CPU allows
+
+    python replay.py replays/last_night.fnr
+    python replay.py custom.fnr --map my_school.json   # a map from outside maps/
+
+or in the game with rendering at any speed (python main.py --replay FILE
+--speed 4, plus the same --map). A replay whose map is neither loaded nor in
+maps/ (matched by checksum), or that was played under other game rules, is
+refused instead of played into a false desync.
+"""
+
+import os
+import sys
+import struct
+import argparse
+
+from simulation import Simulation, current_map, use_map, RULES_VERSION
+from building_map import MapError, find_map, load_map
+
+MAGIC = b"FNMIREP"
+FORMAT_VERSION = 6
+# Version 1 had no roster section (story nights only), 2 no planner section,
+# 3 and older stored difficulty and seconds_per_hour x1000 as varints, 4 and older no map,
+# 5 and older no rules version
+READABLE_VERSIONS = (1, 2, 3, 4, 5, 6)
+# Rules the versions without a rules field were played under: 1 and 2 predate
+# AI level of detail and the special-ability effect tick, 3 to 5 play as rules 1
+LEGACY_RULES = {1: 0, 2: 0, 3: 1, 4: 1, 5: 1}
+SETTINGS = struct.Struct("<dd")  # difficulty, seconds_per_hour
+
+# Action name -> argument kinds, in the order the codes are written to disk.
+# Append new actions at the end so old replays keep decoding.
+ACTIONS = (
+    ("toggle_door", ("str",)),
+    ("toggle_flashlight", ()),
+    ("toggle_cameras", ()),
+    ("switch_camera", ("int",)),
+    ("use_barricade", ()),
+    ("deploy_noise_maker", ("str",)),
+    ("toggle_vent_system", ()),
+    ("use_safe_spot", ()),
+)
+ACTION_CODES = {name: code for code, (name, _) in enumerate(ACTIONS)}
+
+END_STATES = ("playing", "win", "jumpscare", "anti_cheat", "anti_cheat_message")
+
+
+class ReplayError(ValueError):
+    """Raised for files that are not replays or are damaged"""
+
+
+# =====================================================
+# VARINTS
+# =====================================================
+
+def write_varint(out, value):
+    """Append an unsigned LEB128 varint to a bytearray"""
+    if value < 0:
+        raise ReplayError(f"varints are unsigned, got {value}")
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data, pos):
+    """Read a varint at pos, returning (value, new_pos)"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("replay is truncated")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+# =====================================================
+# REPLAY DATA
+# =====================================================
+
+class Replay:
+    """run_seed + night settings + (tick, action) inputs, with the outcome it produced"""
+    def __init__(self, run_seed, night, difficulty, seconds_per_hour, dt=1 / 60, roster=None, lookahead=0,
+                 map_name=None, map_checksum=None, rules=RULES_VERSION):
+        self.run_seed = run_seed
+        self.night = night
+        self.difficulty = difficulty
+        self.seconds_per_hour = seconds_per_hour
+        self.dt = dt
+        self.roster = roster  # Custom night [(archetype, count, level), ...] or None
+        self.lookahead = lookahead  # Simulation.lookahead the night was played with
+        self.map_name = map_name  # Building map it was played on (None: unknown, an old replay)
+        self.map_checksum = map_checksum
+        self.rules = rules  # simulation.RULES_VERSION it was played under
+        self.events = []  # (tick, action tuple) in tick order
+        self.end_tick = 0
+        self.end_state = "playing"
+        self.minutes_elapsed = 0
+        self.killer = None
+
+    def inputs_by_tick(self):
+        """tick -> [actions] for feeding Simulation.step"""
+        by_tick = {}
+        for tick, action in self.events:
+            by_tick.setdefault(tick, []).append(action)
+        return by_tick
+
+    def to_bytes(self):
+        """Encode to the compact delta+varint file format"""
+        strings = []
+        string_index = {}
+
+        def intern(text):
+            if text not in string_index:
+                string_index[text] = len(strings)
+                strings.append(text)
+            return string_index[text]
+
+        body = bytearray()
+        roster = self.roster or ()
+        write_varint(body, len(roster))
+        for name, count, level in roster:
+            write_varint(body, intern(name))
+            write_varint(body, count)
+            write_varint(body, level)
+        write_varint(body, self.lookahead)
+        write_varint(body, len(self.events))
+        last_tick = 0
+        for tick, action in self.events:
+            name, args = action[0], action[1:]
+            write_varint(body, tick - last_tick)
+            write_varint(body, ACTION_CODES[name])
+            for kind, arg in zip(ACTIONS[ACTION_CODES[name]][1], args):
+                write_varint(body, intern(arg) if kind == "str" else int(arg))
+            last_tick = tick
+        write_varint(body, self.end_tick - last_tick)
+        write_varint(body, END_STATES.index(self.end_state))
+        write_varint(body, self.minutes_elapsed)
+        write_varint(body, 0 if self.killer is None else intern(self.killer) + 1)
+
+        out = bytearray(MAGIC)
+        out.append(FORMAT_VERSION)
+        write_varint(out, self.run_seed)
+        write_varint(out, self.night)
+        # Exact: the menu sliders set both to any float, and a rounded one can play a different night
+        out.extend(SETTINGS.pack(self.difficulty, self.seconds_per_hour))
+        write_varint(out, int(round(1.0 / self.dt)))
+        write_varint(out, self.rules)
+        raw = (self.map_name or "").encode("utf-8")
+        write_varint(out, len(raw))
+        out.extend(raw)
+        write_varint(out, self.map_checksum or 0)
+        write_varint(out, len(strings))
+        for text in strings:
+            raw = text.encode("utf-8")
+            write_varint(out, len(raw))
+            out.extend(raw)
+        return bytes(out + body)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode a replay written by to_bytes"""
+        if data[:len(MAGIC)] != MAGIC:
+            raise ReplayError("not a Mr Ingles replay file")
+        pos = len(MAGIC)
+        if pos >= len(data) or data[pos] not in READABLE_VERSIONS:
+            raise ReplayError("unsupported replay version")
+        version = data[pos]
+        pos += 1
+        run_seed, pos = read_varint(data, pos)
+        night, pos = read_varint(data, pos)
+        if version >= 4:
+            if pos + SETTINGS.size > len(data):
+                raise ReplayError("replay is truncated")
+            difficulty, sph = SETTINGS.unpack_from(data, pos)
+            pos += SETTINGS.size
+        else:
+            difficulty, pos = read_varint(data, pos)
+            sph, pos = read_varint(data, pos)
+            difficulty, sph = difficulty / 1000.0, sph / 1000.0
+        tick_rate, pos = read_varint(data, pos)
+        if version >= 6:
+            rules, pos = read_varint(data, pos)
+        else:
+            rules = LEGACY_RULES[version]
+        replay = cls(run_seed, night, difficulty, sph, 1.0 / max(1, tick_rate), rules=rules)
+        if version >= 5:
+            length, pos = read_varint(data, pos)
+            replay.map_name = bytes(data[pos:pos + length]).decode("utf-8")
+            pos += length
+            replay.map_checksum, pos = read_varint(data, pos)
+
+        count, pos = read_varint(data, pos)
+        strings = []
+        for _ in range(count):
+            length, pos = read_varint(data, pos)
+            strings.append(bytes(data[pos:pos + length]).decode("utf-8"))
+            pos += length
+
+        if version >= 2:
+            count, pos = read_varint(data, pos)
+            roster = []
+            for _ in range(count):
+                values = []
+                for _ in range(3):
+                    value, pos = read_varint(data, pos)
+                    values.append(value)
+                roster.append((strings[values[0]], values[1], values[2]))
+            replay.roster = roster or None
+        if version >= 3:
+            replay.lookahead, pos = read_varint(data, pos)
+
+        count, pos = read_varint(data, pos)
+        tick = 0
+        for _ in range(count):
+            delta, pos = read_varint(data, pos)
+            code, pos = read_varint(data, pos)
+            if code >= len(ACTIONS):
+                raise ReplayError(f"unknown action code {code}")
+            name, kinds = ACTIONS[code]
+            args = []
+            for kind in kinds:
+                value, pos = read_varint(data, pos)
+                args.append(strings[value] if kind == "str" else value)
+            tick += delta
+            replay.events.append((tick, (name,) + tuple(args)))
+
+        delta, pos = read_varint(data, pos)
+        replay.end_tick = tick + delta
+        state, pos = read_varint(data, pos)
+        replay.end_state = END_STATES[state]
+        replay.minutes_elapsed, pos = read_varint(data, pos)
+        killer, pos = read_varint(data, pos)
+        replay.killer = strings[killer - 1] if killer else None
+        return replay
+
+    def save(self, path):
+        """Write the replay file (creating its folder if needed)"""
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read a replay file"""
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+# =====================================================
+# RECORDING
+# =====================================================
+
+class ReplayRecorder:
+    """Simulation observer that records the current night as a Replay"""
+    def __init__(self):
+        self.replay = None
+        self._dt = 1 / 60
+
+    def __call__(self, event, data):
+        if event == "night_started":
+            building_map = current_map()
+            self.replay = Replay(data["run_seed"], data["night"], data["difficulty"],
+                                 data["seconds_per_hour"], self._dt, data.get("roster"), data.get("lookahead", 0),
+                                 building_map.name, building_map.checksum)
+        elif event == "input" and self.replay is not None:
+            self.replay.events.append((data["tick"], data["action"]))
+
+    def set_dt(self, dt):
+        """Tick length the recorded simulation is stepped with"""
+        self._dt = dt
+        if self.replay is not None:
+            self.replay.dt = dt
+
+    def rewind(self, tick):
+        """Forget inputs after tick, when the night is restored to that tick from a snapshot"""
+        if self.replay is not None:
+            self.replay.events = [event for event in self.replay.events if event[0] <= tick]
+
+    def finish(self, sim):
+        """Stamp the outcome onto the recording and return it (None if nothing was recorded)"""
+        replay = self.replay
+        if replay is None:
+            return None
+        replay.end_tick = max(sim.tick_count, replay.events[-1][0] if replay.events else 0)
+        replay.end_state = sim.game_state.state if sim.game_state.state in END_STATES else "playing"
+        replay.minutes_elapsed = sim.game_state.minutes_elapsed
+        replay.killer = sim.jumpscare.killer if replay.end_state != "win" else None
+        return replay
+
+
+# =====================================================
+# PLAYBACK
+# =====================================================
+
+def check_map(replay):
+    """Raise ReplayError unless the map being played is the one the replay was recorded on"""
+    building_map = current_map()
+    if replay.map_checksum is not None and building_map.checksum != replay.map_checksum:
+        raise ReplayError(f"recorded on map {replay.map_name!r} ({replay.map_checksum:08x}), not "
+                          f"{building_map.name!r} ({building_map.checksum:08x}); pass the map it was played on")
+
+
+def check_rules(replay):
+    """Raise ReplayError unless the replay was played under this build's game rules"""
+    if replay.rules != RULES_VERSION:
+        raise ReplayError(f"recorded under game rules {replay.rules}, this build plays rules {RULES_VERSION}; "
+                          f"the simulation changed since, so the night would not play out the same")
+
+
+def use_replay_map(replay, map_path=None):
+    """Switch to the replay's map: map_path if given, else the one in maps/ with its checksum"""
+    if map_path is not None:
+        use_map(load_map(map_path))
+    elif replay.map_checksum is not None and current_map().checksum != replay.map_checksum:
+        building_map = find_map(replay.map_checksum)
+        if building_map is not None:
+            use_map(building_map)
+    check_map(replay)
+    check_rules(replay)
+
+
+def start_playback(replay, sim=None):
+    """Set up a Simulation at the start of the replayed night (on the map it was recorded on)"""
+    check_map(replay)
+    check_rules(replay)
+    sim = sim or Simulation(run_seed=replay.run_seed, difficulty=replay.difficulty)
+    sim.difficulty = replay.difficulty
+    sim.game_state.seconds_per_hour = replay.seconds_per_hour
+    sim.lookahead = replay.lookahead
+    sim.start_night(replay.night, run_seed=replay.run_seed, roster=replay.roster)
+    sim.begin_playing()
+    return sim
+
+
+def play(replay, sim=None):
+    """Re-run a replay headlessly as fast as possible; returns the finished Simulation"""
+    sim = start_playback(replay, sim)
+    inputs = replay.inputs_by_tick()
+    while sim.game_state.state == "playing" and sim.tick_count < replay.end_tick:
+        sim.step(replay.dt, inputs.get(sim.tick_count + 1, ()))
+    # Let an anti-cheat warning run into its jumpscare, the same as it did live
+    while sim.game_state.state == "anti_cheat" and sim.tick_count < replay.end_tick:
+        sim.step(replay.dt)
+    return sim
+
+
+def verify(replay, sim):
+    """List of differences between a finished playback and the recorded outcome"""
+    problems = []
+    # The night's settings must survive saving exactly, or playback is a different night
+    saved = Replay.from_bytes(replay.to_bytes())
+    for name, played, recorded, kept in (
+            ("difficulty", sim.difficulty, replay.difficulty, saved.difficulty),
+            ("seconds_per_hour", sim.game_state.seconds_per_hour, replay.seconds_per_hour, saved.seconds_per_hour)):
+        if played != recorded:
+            problems.append(f"played at {name} {played!r}, recorded {recorded!r}")
+        if kept != recorded:
+            problems.append(f"{name} {recorded!r} is saved as {kept!r}")
+    if sim.game_state.state != replay.end_state:
+        problems.append(f"ended in {sim.game_state.state!r}, recorded {replay.end_state!r}")
+    if sim.game_state.minutes_elapsed != replay.minutes_elapsed:
+        problems.append(f"lasted {sim.game_state.minutes_elapsed} min, recorded {replay.minutes_elapsed}")
+    killer = sim.jumpscare.killer if sim.game_state.state != "win" else None
+    if replay.end_state != "playing" and killer != replay.killer:
+        problems.append(f"killed by {killer!r}, recorded {replay.killer!r}")
+    return problems
+
+
+def main(argv=None):
+    """Play replay files headlessly and check they still end the way they were recorded"""
+    parser = argparse.ArgumentParser(description="Headless replay playback")
+    parser.add_argument("files", nargs="+", help="replay files (.fnr)")
+    parser.add_argument("--map", help="building map the nights were played on (default: found in maps/)")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in args.files:
+        replay = Replay.load(path)
+        try:
+            use_replay_map(replay, args.map)
+        except (ReplayError, MapError) as e:
+            print(f"{path}: REFUSED {e}")
+            failures += 1
+            continue
+        sim = play(replay)
+        problems = verify(replay, sim)
+        status = "OK" if not problems else "MISMATCH: " + "; ".join(problems)
+        print(f"{path}: night {replay.night}, {len(replay.events)} inputs, "
+              f"{replay.end_tick} ticks -> {sim.game_state.state} at minute "
+              f"{sim.game_state.minutes_elapsed}  {status}")
+        failures += bool(problems)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Animatronic roster for Five Nights at Mr Ingles's.
+
+Every animatronic the game knows is defined in roster.json: its sprite,
+jumpscare sound, attack side, patrol length, size, and the per-night jitter
+ranges of its AI numbers. (base, spread) pairs are drawn as
+base +/- uniform(spread); start_delay is an inclusive (low, high) range of
+in-game minutes. "story" lists the four the story nights play; the rest are
+custom night only.
+
+load_roster() validates the file and compiles it into flat columns indexed
+by archetype code, so spawning reads table[code] instead of looking up
+nested dicts:
+
+    code = ROSTER.code["Librarian"]
+    ROSTER.aggro_base[code], ROSTER.aggro_spread[code], ROSTER.attack_side[code], ...
+
+Check the roster without starting the game:
+
+    python roster.py roster.json
+"""
+
+import os
+import sys
+import json
+import argparse
+
+GAME_DIR = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ROSTER_FILE = os.path.join(GAME_DIR, "roster.json")
+ASSETS_DIR = os.path.join(GAME_DIR, "assets")
+
+STYLES = ("normal", "teleport", "vent")
+ATTACK_SIDES = ("left", "right", "vent")
+RANGES = ("aggro", "interval", "hallway_delay", "ramp")  # (base, spread) pairs
+
+
+class RosterError(ValueError):
+    """Raised for roster files that cannot be played"""
+
+
+def sprite_key(sprite):
+    """Asset name of a sprite file ("anim_temi.png" -> "anim_temi")"""
+    return os.path.splitext(sprite)[0]
+
+
+class Roster:
+    """A validated roster compiled to per-archetype columns"""
+    def __init__(self, data, source="<roster>", assets_dir=None):
+        problems = self._check(data, assets_dir)
+        if problems:
+            raise RosterError(f"{source}: " + "; ".join(problems))
+
+        archetypes = data["archetypes"]
+        self.names = tuple(archetypes)
+        self.code = {name: code for code, name in enumerate(self.names)}
+        self.story = tuple(self.code[name] for name in data["story"])
+
+        specs = [archetypes[name] for name in self.names]
+
+        def column(field, i, kind=float):
+            return tuple(kind(spec[field][i]) for spec in specs)
+
+        self.aggro_base, self.aggro_spread = column("aggro", 0), column("aggro", 1)
+        self.interval_base, self.interval_spread = column("interval", 0), column("interval", 1)
+        self.hallway_delay_base, self.hallway_delay_spread = column("hallway_delay", 0), column("hallway_delay", 1)
+        self.ramp_base, self.ramp_spread = column("ramp", 0), column("ramp", 1)
+        self.start_delay_min = column("start_delay", 0, int)
+        self.start_delay_max = column("start_delay", 1, int)
+        self.route_length = tuple(int(spec["route"]) for spec in specs)
+        self.size = tuple(float(spec.get("size", 1.0)) for spec in specs)
+        self.style = tuple(spec["style"] for spec in specs)
+        self.attack_side = tuple(spec["attack_side"] for spec in specs)
+        self.sprite = tuple(spec["sprite"] for spec in specs)
+        self.sprite_key = tuple(sprite_key(spec["sprite"]) for spec in specs)
+        self.jumpscare_sound = tuple(spec.get("jumpscare_sound", "jumpscare") for spec in specs)
+
+    def _check(self, data, assets_dir):
+        """Every problem with the roster data, as a list of messages"""
+        if not isinstance(data, dict) or not isinstance(data.get("archetypes"), dict) or not data["archetypes"]:
+            return ["needs a non-empty \"archetypes\" object"]
+        archetypes = data["archetypes"]
+        problems = []
+
+        def number(value, low=0.0):
+            return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= low
+
+        for name, spec in archetypes.items():
+            if not isinstance(spec, dict):
+                problems.append(f"{name}: must be an object")
+                continue
+            for field in RANGES:
+                pair = spec.get(field)
+                if not (isinstance(pair, list) and len(pair) == 2 and number(pair[0]) and number(pair[1])):
+                    problems.append(f"{name}: \"{field}\" must be [base, spread] (both >= 0)")
+                elif field == "interval" and pair[1] >= pair[0]:
+                    problems.append(f"{name}: interval spread must stay below its base")
+            delay = spec.get("start_delay")
+            if not (isinstance(delay, list) and len(delay) == 2 and all(isinstance(v, int) and v >= 0 for v in delay)
+                    and delay[0] <= delay[1]):
+                problems.append(f"{name}: \"start_delay\" must be [low, high] whole minutes")
+            if not (isinstance(spec.get("route"), int) and spec["route"] >= 1):
+                problems.append(f"{name}: \"route\" must be a patrol length >= 1")
+            if not number(spec.get("size", 1.0), 0.01):
+                problems.append(f"{name}: \"size\" must be positive")
+            if spec.get("style") not in STYLES:
+                problems.append(f"{name}: \"style\" must be one of {STYLES}")
+            if spec.get("attack_side") not in ATTACK_SIDES:
+                problems.append(f"{name}: \"attack_side\" must be one of {ATTACK_SIDES}")
+            sprite = spec.get("sprite")
+            if not isinstance(sprite, str) or not sprite:
+                problems.append(f"{name}: needs a \"sprite\" image file")
+            elif assets_dir is not None and not os.path.exists(os.path.join(assets_dir, "img", sprite)):
+                problems.append(f"{name}: missing sprite img/{sprite}")
+
+        story = data.get("story")
+        if not isinstance(story, list) or not story:
+            problems.append("\"story\" must list the story night animatronics")
+        else:
+            for name in story:
+                if name not in archetypes:
+                    problems.append(f"story: unknown animatronic {name!r}")
+            if len(set(story)) != len(story):
+                problems.append("story: animatronics listed twice")
+        return problems
+
+
+def load_roster(path=DEFAULT_ROSTER_FILE, assets_dir=None):
+    """Read and validate a roster file; pass assets_dir to also check sprites"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RosterError(f"{path}: {e}") from e
+    return Roster(data, source=path, assets_dir=assets_dir)
+
+
+ROSTER = load_roster()
+
+
+def main(argv=None):
+    """Validate roster files and list the compiled archetypes"""
+    parser = argparse.ArgumentParser(description="Check animatronic roster files")
+    parser.add_argument("files", nargs="*", default=[DEFAULT_ROSTER_FILE], help="roster files (.json)")
+    parser.add_argument("--assets", default=ASSETS_DIR, help="assets folder to check sprites in")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in args.files:
+        try:
+            roster = load_roster(path, assets_dir=args.assets)
+        except RosterError as e:
+            print(f"INVALID {e}")
+            failures += 1
+            continue
+        print(f"{path}: {len(roster.names)} archetypes, story night: "
+              f"{', '.join(roster.names[code] for code in roster.story)}  OK")
+        for code, name in enumerate(roster.names):
+            print(f"  {code}  {name:<16} aggro {roster.aggro_base[code]:.2f}+/-{roster.aggro_spread[code]:.2f}  "
+                  f"interval {roster.interval_base[code]:.1f}s  attacks {roster.attack_side[code]:<5}  "
+                  f"starts {roster.start_delay_min[code]}-{roster.start_delay_max[code]} min")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
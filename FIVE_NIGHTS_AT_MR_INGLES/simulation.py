@@ -0,0 +1,2736 @@
+"""
+Headless simulation core for Five Nights at Mr Ingles's.
+
+Everything that decides whether you survive the night lives here: power,
+time, doors, animatronic AI, environmental events and scoring. Nothing in
+this module imports pygame, so a night can be played out with nothing but
+
+    sim = Simulation(run_seed=1234)
+    sim.start_night(1)
+    sim.begin_playing()
+    while sim.game_state.state == "playing":
+        sim.step(1 / 60, inputs=[("toggle_door", "left")])
+
+The pygame Game in main.py owns one of these and is just an observer: sounds,
+particles, screen shake and save data are all driven from the events the
+simulation emits through emit(), never called directly from game logic.
+"""
+
+import math
+import time
+import zlib
+import random
+from collections import deque
+from itertools import islice
+
+from navigation import UNREACHABLE, analyze_room_graph
+from building_map import load_map
+from roster import ROSTER
+from mood_schedule import MOODS, SCHEDULE as MOOD_SCHEDULE
+from timer_wheel import TimerWheel
+from planner import LookaheadPlanner, planned_move, LOOKAHEAD_NIGHT, PLAN_LEAD, PLAN_SEED_STRIDE
+
+# Logical resolution the game is laid out in (the renderer upscales from this)
+WINDOW_WIDTH = 1280
+WINDOW_HEIGHT = 720
+
+# Version of the game rules a ticked night is played under. Replays store it and
+# are refused under any other rules, so bump it with every change that makes
+# the same seed and inputs play out differently.
+#   0 - every animatronic thinks every tick, abilities roll per frame
+#   1 - AI level of detail (below) and special abilities on the EFFECT_TICK;
+#       the Office's doorway rooms stand in for the "Hallway" room the code used
+#       to check but the map never had (threat, perfect blocks, safe spot push)
+RULES_VERSION = 1
+
+# AI level of detail: animatronics more than AI_LOD_NEAR_DISTANCE hops from the
+# Office and not on the open camera think every AI_LOD_FAR_INTERVAL ticks,
+# integrating all the time they skipped when they do. This changes how a ticked
+# night plays out (ai_lod_interval = 1 gets the old behavior back), so nights
+# recorded before it are rules 0 and their replays are refused.
+AI_LOD_NEAR_DISTANCE = 2
+AI_LOD_FAR_INTERVAL = 4
+
+# Fast-forward kernel: the ordinary tick it falls back to around events, the
+# longest jump a ready trickster may take (its fake-movement roll is linear in
+# dt, so it must stay small) and how many 2 s mood checks ahead it looks for
+# one that changes a mood
+FAST_FORWARD_FINE_DT = 1 / 60
+TRICKSTER_MAX_JUMP = 0.5
+MOOD_LOOKAHEAD_CHECKS = 30
+
+# Special abilities act on their own effect tick rather than every frame; what
+# they do during one tick is gathered and applied to the office in one batch
+EFFECT_TICK = 0.2  # 5 Hz
+POWER_DRAINER_RATE = 0.12  # Extra power % per second while a power drainer is close
+DOOR_BREAKER_DAMAGE = 2.5  # Extra door health per second while a door breaker leans on it
+SPEED_DEMON_DASH = 1.5  # Seconds a speed demon's dash takes off its move timer
+
+# Cooldowns and countdowns are named timers on Simulation.timers (a TimerWheel
+# on the sim clock); these are the names that go with a side
+DOOR_JAM_SECONDS = 3.0  # A broken door is stuck open this long
+DOOR_JAM_TIMERS = {"left": "door_jam_left", "right": "door_jam_right"}
+ENTRY_COOLDOWN_TIMERS = {side: f"entry_cooldown_{side}" for side in ("left", "right", "vent")}
+
+
+def power_surge(minutes):
+    """True during the deterministic power surges (minutes 15-17, 30-32 and 45-47 of every hour)"""
+    minute_in_hour = minutes % 60
+    return (15 <= minute_in_hour <= 17) or (30 <= minute_in_hour <= 32) or (45 <= minute_in_hour <= 47)
+
+
+# =====================================================
+# GAME STATE
+# =====================================================
+
+class GameState:
+    """Main game state container"""
+    __slots__ = (
+        "state", "night", "max_night_unlocked", "hour", "hour_timer", "seconds_per_hour",
+        "minutes_elapsed", "width", "height", "status", "start_time", "ending_type",
+        "active_events", "event_cooldown", "lights_flickering", "flicker_timer", "hallway_darkness",
+        "temperature", "ventilation_blocked", "phantom_sounds", "chromatic_aberration",
+        "screen_distortion", "vhs_effect", "glow_intensity", "scan_line_offset"
+    )
+
+    def __init__(self):
+        self.state = "splash"  # "splash", "menu", "playing", "paused", "jumpscare", "win", "anti_cheat", "anti_cheat_message"
+        self.night = 1
+        self.max_night_unlocked = 1
+        self.hour = 12
+        self.hour_timer = 0
+        self.seconds_per_hour = 60
+        self.minutes_elapsed = 0  # minutes since 12:00 for current night
+        self.width = WINDOW_WIDTH
+        self.height = WINDOW_HEIGHT
+        self.status = ""
+        self.start_time = time.time()
+        self.ending_type = None  # Set by Simulation.determine_ending on a win
+        
+        # Environmental Events
+        self.active_events = []
+        self.event_cooldown = 0
+        self.lights_flickering = False
+        self.flicker_timer = 0
+        self.hallway_darkness = 0
+        self.temperature = 70  # Room temperature affects mechanics
+        self.ventilation_blocked = False
+        self.phantom_sounds = TimedWindow(5.0, 32)  # Fake noises, heard for 5 seconds
+        
+        # Visual Effects
+        self.chromatic_aberration = 0.0  # RGB split effect
+        self.screen_distortion = 0.0  # Wave distortion
+        self.vhs_effect = 0.0  # VHS tracking lines
+        self.glow_intensity = 0.0  # Dynamic bloom/glow
+        self.scan_line_offset = 0.0  # Animated scanlines
+
+    def reset_environment(self):
+        """Clear environmental event state left over from the previous night"""
+        self.active_events = []
+        self.event_cooldown = 0
+        self.lights_flickering = False
+        self.flicker_timer = 0
+        self.hallway_darkness = 0
+        self.temperature = 70
+        self.ventilation_blocked = False
+        self.phantom_sounds.clear()
+
+    def elapsed_time(self):
+        """Get elapsed time since game start"""
+        return time.time() - self.start_time
+
+
+class PowerSystem:
+    """Power management system"""
+    __slots__ = (
+        "max", "current", "base_drain", "door_drain", "light_drain", "cam_drain", "outage",
+        "emergency_mode", "reserve_power"
+    )
+
+    def __init__(self):
+        self.max = 100
+        self.current = 100
+        self.base_drain = 0.16  # higher baseline drain
+        self.door_drain = 0.24  # higher door drain
+        self.light_drain = 0.24  # higher light drain
+        self.cam_drain = 0.32   # higher camera drain
+        self.outage = False
+        self.emergency_mode = False  # Backup power, until the sim's "backup_power" timer runs out
+        self.reserve_power = 0
+
+    def reset(self):
+        self.current = self.max
+        self.base_drain = 0.16
+        self.outage = False
+        self.emergency_mode = False
+        self.reserve_power = 0  # Hidden reserve for emergencies
+
+
+class Office:
+    """Office state and controls"""
+    __slots__ = (
+        "door_left_closed", "door_right_closed", "light_on", "cams_open", "door_left_progress",
+        "door_right_progress", "light_dim", "cam_flash", "door_left_health", "door_right_health",
+        "door_left_open_timer", "door_right_open_timer", "flashlight_battery", "vent_system_active",
+        "barricade_left", "barricade_right", "noise_maker_charges", "safe_mode_timer", "movement_noise_level",
+        "lights_out_timer"
+    )
+
+    def __init__(self):
+        self.door_left_closed = False
+        self.door_right_closed = False
+        self.light_on = True
+        self.cams_open = False
+        self.door_left_progress = 0.0   # 0 = open, 1 = closed
+        self.door_right_progress = 0.0
+        self.light_dim = 0.0             # darkness overlay
+        self.cam_flash = 0.0             # static flash
+        self.door_left_health = 100.0
+        self.door_right_health = 100.0
+        self.door_left_open_timer = 0.0
+        self.door_right_open_timer = 0.0
+        
+        # New features
+        self.flashlight_battery = 100.0
+        self.vent_system_active = True
+        self.barricade_left = 0  # 0-3 levels
+        self.barricade_right = 0
+        self.noise_maker_charges = 3
+        self.safe_mode_timer = 0.0
+        self.movement_noise_level = 0.0
+        self.lights_out_timer = 0.0  # Light killer: seconds until the lights can come back on
+
+    def reset(self):
+        self.door_left_closed = False
+        self.door_right_closed = False
+        self.light_on = True
+        self.cams_open = False
+        self.door_left_progress = 0.0
+        self.door_right_progress = 0.0
+        self.light_dim = 0.0
+        self.cam_flash = 0.0
+        self.door_left_health = 100.0
+        self.door_right_health = 100.0
+        self.door_left_open_timer = 0.0
+        self.door_right_open_timer = 0.0
+        self.vent_system_active = True
+        self.barricade_left = 0
+        self.barricade_right = 0
+        self.noise_maker_charges = 3
+        self.lights_out_timer = 0.0
+
+
+class CameraSystem:
+    """Camera switching system"""
+    __slots__ = ("cameras", "current_index", "jam_timer", "mimic_name", "mimic_room", "mimic_timer")
+
+    def __init__(self):
+        self.cameras = list(MAP.cameras)
+        self.reset()
+
+    def reset(self):
+        self.current_index = 0
+        self.jam_timer = 0.0  # Camera jammer: seconds of static left on every feed
+        self.mimic_name = None  # Mimic: who is faking a sighting, on which camera, for how long
+        self.mimic_room = None
+        self.mimic_timer = 0.0
+
+    def switch(self, index):
+        if 0 <= index < len(self.cameras):
+            self.current_index = index
+
+    def current_camera(self):
+        return self.cameras[self.current_index]
+
+
+class Jumpscare:
+    """Jumpscare event"""
+    __slots__ = ("active", "timer", "duration", "killer", "zoom", "fly_duration")
+
+    def __init__(self):
+        self.active = False
+        self.timer = 0
+        self.duration = 2.0
+        self.killer = "Mr Ingles"
+        self.zoom = 0.0
+        self.fly_duration = 0.6
+
+    def reset(self):
+        self.active = False
+        self.timer = 0
+        self.zoom = 0.0
+
+
+# =====================================================
+# ROOM GRAPH AND NAVIGATION
+# =====================================================
+
+# The building is loaded from maps/ (see building_map.py). ROOM_GRAPH and
+# ROOM_POSITIONS are the map's versioned tables, so the navigation tables in
+# room_graph() rebuild by themselves if anything edits them.
+MAP = load_map()
+ROOM_GRAPH = MAP.graph
+ROOM_POSITIONS = MAP.positions
+
+
+def use_map(building_map):
+    """Play on another BuildingMap (call before creating a Simulation)"""
+    global MAP, ROOM_GRAPH, ROOM_POSITIONS
+    MAP = building_map
+    ROOM_GRAPH = building_map.graph
+    ROOM_POSITIONS = building_map.positions
+
+
+def current_map():
+    """The BuildingMap being played"""
+    return MAP
+
+
+def room_position(room, width, height):
+    """Get the visual position of a room"""
+    if room in ROOM_POSITIONS:
+        return (width * ROOM_POSITIONS[room][0], height * ROOM_POSITIONS[room][1])
+    # Fallback to center if room not found
+    return (width * 0.5, height * 0.5)
+
+
+def get_neighbors(room):
+    """Get adjacent rooms"""
+    return ROOM_GRAPH.get(room, ())
+
+
+def room_graph():
+    """Precomputed distance/next-hop/door-side tables (rebuilt if the graph changes)"""
+    return analyze_room_graph(ROOM_GRAPH, ROOM_POSITIONS)
+
+
+# =====================================================
+# SIMULATION CLOCK
+# =====================================================
+
+class SimClock:
+    """Seconds of simulated time, advanced only by Simulation.step
+
+    Game rules read the time from here instead of time.time(), so pausing,
+    fast-forwarding, headless batches and replays all see the same clock.
+    """
+    __slots__ = ("now",)
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def reset(self, start=0.0):
+        """Restart the clock (the sim does this when a night starts playing)"""
+        self.now = start
+
+    def advance(self, dt):
+        """Move time forward by one step"""
+        self.now += dt
+
+
+# =====================================================
+# TIME-WINDOWED EVENT BUFFER
+# =====================================================
+
+class TimedWindow:
+    """Bounded buffer of timestamped events from the last `window` seconds
+
+    Appends are O(1); old entries are dropped from the front as time moves on,
+    so a long night costs no more memory or time than a short one. Per-key
+    counts for the entries still in the window, and running totals of
+    everything appended since clear(), are kept up to date as entries come
+    and go.
+    """
+    __slots__ = ("window", "capacity", "_entries", "counts", "totals")
+
+    def __init__(self, window, capacity):
+        self.window = window
+        self.capacity = capacity
+        self._entries = deque()  # (time, key, item), oldest first
+        self.counts = {}  # key -> entries currently in the window
+        self.totals = {}  # key -> entries appended since clear()
+
+    def append(self, now, item, key=None):
+        """Add an event at time now (evicting the oldest one if full)"""
+        self.expire(now)
+        if len(self._entries) >= self.capacity:
+            self._drop_oldest()
+        self._entries.append((now, key, item))
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.totals[key] = self.totals.get(key, 0) + 1
+
+    def expire(self, now):
+        """Drop everything that is window seconds old or older"""
+        entries = self._entries
+        while entries and now - entries[0][0] >= self.window:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        _, key, _ = self._entries.popleft()
+        self.counts[key] -= 1
+
+    def count(self, key):
+        """Entries with this key still in the window"""
+        return self.counts.get(key, 0)
+
+    def total(self, key=None):
+        """Entries appended since clear(), for one key or all of them"""
+        if key is None:
+            return sum(self.totals.values())
+        return self.totals.get(key, 0)
+
+    def latest(self, n):
+        """The n newest items, oldest first"""
+        return [entry[2] for entry in islice(reversed(self._entries), n)][::-1]
+
+    def clear(self):
+        """Forget everything, including the running totals"""
+        self._entries.clear()
+        self.counts = {}
+        self.totals = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return (entry[2] for entry in self._entries)
+
+
+# =====================================================
+# ROOM OCCUPANCY
+# =====================================================
+
+class RoomOccupancy:
+    """Room -> animatronics currently in it, kept current by Animatronic.move_to
+
+    Also keeps `weighted`, the sum of room_weights over every animatronic, up
+    to date as they move - the animatronic part of the threat level.
+    """
+    def __init__(self):
+        self.rooms = {}  # room -> {anim: None} (insertion-ordered set)
+        self.room_weights = {}  # room -> threat points per animatronic in it (see threat_weights)
+        self.weighted = 0
+
+    def reset(self, animatronics, room_weights=None):
+        """Rebuild the index for a fresh roster and attach it to each animatronic"""
+        if room_weights is not None:
+            self.room_weights = room_weights
+        self.rooms = {}
+        for anim in animatronics:
+            anim.occupancy = self
+            self.rooms.setdefault(anim.room, {})[anim] = None
+        self.reweigh()
+
+    def restore(self, rooms, room_weights):
+        """Replace the whole index (snapshot restore) and recount the weighted sum"""
+        self.rooms = rooms
+        self.room_weights = room_weights
+        self.reweigh()
+
+    def reweigh(self):
+        weights = self.room_weights
+        self.weighted = sum(weights.get(room, 0) * len(occupants) for room, occupants in self.rooms.items())
+
+    def relocate(self, anim, old_room, new_room):
+        """Move one animatronic between rooms (called only from Animatronic.move_to)"""
+        occupants = self.rooms.get(old_room)
+        if occupants is not None:
+            occupants.pop(anim, None)
+            if not occupants:
+                del self.rooms[old_room]
+            self.weighted -= self.room_weights.get(old_room, 0)
+        self.rooms.setdefault(new_room, {})[anim] = None
+        self.weighted += self.room_weights.get(new_room, 0)
+
+    def occupants(self, room):
+        """Animatronics in a room (a snapshot, safe to move them while iterating)"""
+        return tuple(self.rooms.get(room, ()))
+
+    def count(self, room):
+        """Number of animatronics in a room"""
+        return len(self.rooms.get(room, ()))
+
+    def occupied(self, room):
+        """True if anything is in the room"""
+        return room in self.rooms
+
+
+# =====================================================
+# THREAT ASSESSMENT
+# =====================================================
+
+THREAT_OFFICE = 30  # Per animatronic in the Office
+THREAT_DOORWAY = 15  # Per animatronic in an office-adjacent room (rules 0 gave them THREAT_NEAR)
+THREAT_NEAR = 8  # Per animatronic within 2 hops of the Office
+THREAT_POWER = ((20, 20), (50, 10))  # (below this much power, points), lowest first
+THREAT_DOOR_HEALTH = 30  # Average door health below this...
+THREAT_WEAK_DOORS = 15  # ...adds this
+THREAT_OPEN_DOORS = 10  # Both doors open
+THREAT_EMERGENCY = 30  # Running on backup power during an outage
+
+
+def threat_weights():
+    """Room -> threat points an animatronic standing in it adds (for RoomOccupancy)"""
+    graph = room_graph()
+    weights = {}
+    for room in dict.fromkeys([*graph.rooms, *graph.door_side]):
+        if room == "Office":
+            weights[room] = THREAT_OFFICE
+        elif graph.is_office_adjacent(room):
+            weights[room] = THREAT_DOORWAY
+        elif graph.distance_to_office(room) <= 2:
+            weights[room] = THREAT_NEAR
+    return weights
+
+
+class ThreatAssessment:
+    """Threat level 0-100, kept as its components and re-added only when one changes
+
+    The animatronic part comes from RoomOccupancy.weighted, power and door
+    health are re-banded with a couple of compares a tick, and door toggles
+    and emergency mode call mark() where they happen.
+    """
+    __slots__ = ("animatronics", "power", "doors", "open_doors", "emergency", "level", "dirty")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget every component so the next update recomputes all of them"""
+        self.animatronics = 0
+        self.power = 0
+        self.doors = 0
+        self.open_doors = 0
+        self.emergency = 0
+        self.level = 0
+        self.dirty = True
+
+    def mark(self):
+        """A door opened/closed or emergency mode changed"""
+        self.dirty = True
+
+    def breakdown(self):
+        """Component -> points, for the HUD"""
+        return {"animatronics": self.animatronics, "power": self.power, "doors": self.doors,
+                "open_doors": self.open_doors, "emergency": self.emergency}
+
+
+# =====================================================
+# BEHAVIOR TABLES
+# =====================================================
+# The AI runs on integer codes: moods index MOODS (mood_schedule.py) and
+# personalities index PERSONALITIES (below Animatronic), so per-tick
+# decisions are table reads instead of string compares.
+
+MOOD_CODES = {name: code for code, name in enumerate(MOODS)}
+NEUTRAL, CAUTIOUS, AGGRESSIVE, HUNTING = (MOOD_CODES[name] for name in ("neutral", "cautious", "aggressive", "hunting"))
+CHASES = tuple(name in ("aggressive", "hunting") for name in MOODS)  # mood -> heads for its target instead of patrolling
+CALM_DOWN = tuple(NEUTRAL if code == HUNTING else code for code in range(len(MOODS)))  # mood -> mood once a hunt ends
+ERRATIC_MOODS = (AGGRESSIVE, CAUTIOUS, NEUTRAL)  # What an erratic personality flips to
+
+
+# =====================================================
+# ANIMATRONIC
+# =====================================================
+
+class Animatronic:
+    """Animatronic character with deterministic AI"""
+    __slots__ = (
+        "name", "archetype", "_room", "occupancy", "clock", "base_aggro", "base_interval", "aggro",
+        "move_interval", "timer", "style", "attack_side", "rng", "size_multiplier", "display_width",
+        "display_height", "patrol_route", "patrol_index", "move_cooldown", "hallway_timer",
+        "attack_windup", "attack_windup_required", "start_delay_minutes", "hallway_entry_delay",
+        "aggression_ramp", "x", "y", "target_x", "target_y", "visible_on_cam", "mood_code", "mood_timer",
+        "player_action_memory", "target_player_room", "communication_cooldown", "hunting_mode",
+        "hunting_timer", "hunt_target_room", "investigating", "investigation_timer",
+        "adaptive_aggro", "last_blocked_time", "block_count", "retreat_timer", "retreat_target",
+        "last_room", "hallway_block_timer", "lod_pending_dt", "personality_code", "patience",
+        "curiosity", "persistence", "teamwork", "deception", "sound_sensitivity",
+        "camera_awareness", "is_decoy", "decoy_timer", "last_player_action_time", "stalking_mode",
+        "ambush_position", "fake_movement_cooldown", "ability_code", "ability_cooldown",
+        "plan_room", "plan_rollouts", "plan_scores"
+    )
+
+    def __init__(self, name, start_room, base_aggro, base_interval, style="teleport",
+                 attack_side="left", patrol_route=None, start_delay_minutes=0,
+                 hallway_entry_delay=2.0, aggression_ramp=0.25, rng=None, size_multiplier=1.0,
+                 display_width=1280, display_height=720):
+        self.name = name
+        self.archetype = name  # Which roster archetype this is (name can be "Librarian 2")
+        self._room = start_room
+        self.occupancy = None  # RoomOccupancy this animatronic is indexed in (set by the sim)
+        self.clock = None  # SimClock for timestamps (set by the sim)
+        self.base_aggro = base_aggro
+        self.base_interval = base_interval
+        self.aggro = base_aggro
+        self.move_interval = base_interval
+        self.timer = 0
+        self.style = style
+        self.attack_side = attack_side
+        self.rng = rng
+        self.size_multiplier = size_multiplier
+        self.display_width = display_width
+        self.display_height = display_height
+        route = patrol_route or [start_room]
+        if self.rng and len(route) > 1:
+            # Rotate route per run to keep patterns unique without breaking graph
+            offset = self.rng.randint(0, len(route) - 1)
+            route = route[offset:] + route[:offset]
+        self.patrol_route = route
+        self.patrol_index = 0
+        self.move_cooldown = base_interval
+        self.hallway_timer = 0.0
+        self.attack_windup = 0.0
+        self.attack_windup_required = 1.2
+        self.start_delay_minutes = start_delay_minutes
+        self.hallway_entry_delay = hallway_entry_delay
+        self.aggression_ramp = aggression_ramp
+        self.x, self.y = room_position(start_room, self.display_width, self.display_height)
+        self.target_x = self.x
+        self.target_y = self.y
+        self.visible_on_cam = True
+        
+        # Advanced AI features (deterministic)
+        self.mood_code = NEUTRAL  # Index into MOODS; .mood gives the name
+        self.mood_timer = 0
+        self.player_action_memory = TimedWindow(60.0, 32)  # blocks in the last minute, keyed by side
+        self.target_player_room = None  # predicted player location
+        self.communication_cooldown = 0
+        self.hunting_mode = False
+        self.hunting_timer = 0.0
+        self.hunt_target_room = None
+        self.investigating = False  # Track if reached investigation target
+        self.investigation_timer = 0.0  # Time spent investigating
+        self.adaptive_aggro = base_aggro  # adjusts based on learning
+        self.last_blocked_time = 0
+        self.block_count = 0
+        self.retreat_timer = 0.0
+        self.retreat_target = None
+        self.last_room = start_room
+        self.hallway_block_timer = 0.0
+        self.lod_pending_dt = 0.0  # Time banked while ticking at a lower AI level of detail
+        
+        # AI Personality System (randomized each night)
+        self.personality_code = PERSONALITY_CODES[self.assign_personality(rng)]  # .personality gives the name
+        self.patience = rng.uniform(0.5, 2.0)  # How long they wait before moving
+        self.curiosity = rng.uniform(0.3, 1.5)  # How likely to investigate player actions
+        self.persistence = rng.uniform(0.4, 1.8)  # How often they retry after being blocked
+        self.teamwork = rng.uniform(0.2, 1.3)  # How well they coordinate with others
+        self.deception = rng.uniform(0.1, 1.2)  # How likely to fake movements
+        self.sound_sensitivity = rng.uniform(0.5, 1.5)  # How much they react to sounds
+        self.camera_awareness = rng.uniform(0.3, 1.4)  # How they react to being watched
+        
+        # Behavior state
+        self.is_decoy = False
+        self.decoy_timer = 0.0
+        self.last_player_action_time = 0
+        self.stalking_mode = False
+        self.ambush_position = None
+        self.fake_movement_cooldown = 0.0
+        
+        # Special ability (see ABILITIES; used on the sim's effect tick)
+        self.ability_code = ABILITY_CODES[self.assign_special_ability(rng)]  # .special_ability gives the name
+        self.ability_cooldown = 0  # Effect ticks until the ability can be used again
+
+        # Look-ahead plan for the next move (see planner.py); stale once room != plan_room
+        self.plan_room = None
+        self.plan_rollouts = 0
+        self.plan_scores = {}  # candidate room -> summed rollout scores
+    
+    def assign_special_ability(self, rng):
+        """Assign a random special ability (see ABILITIES)"""
+        return rng.choice(ABILITY_NAMES) if rng else "speed_demon"
+    
+    def assign_personality(self, rng):
+        """Assign a random personality archetype (see PERSONALITIES)"""
+        return rng.choice(PERSONALITY_NAMES) if rng else "aggressive"
+
+    @property
+    def mood(self):
+        """Mood name (the AI itself works on mood_code)"""
+        return MOODS[self.mood_code]
+
+    @mood.setter
+    def mood(self, name):
+        self.mood_code = MOOD_CODES[name]
+
+    @property
+    def special_ability(self):
+        """Ability name (the effect tick works on ability_code)"""
+        return ABILITY_NAMES[self.ability_code]
+
+    @special_ability.setter
+    def special_ability(self, name):
+        self.ability_code = ABILITY_CODES[name]
+
+    @property
+    def personality(self):
+        """Personality name (the AI itself works on personality_code)"""
+        return PERSONALITY_NAMES[self.personality_code]
+
+    @personality.setter
+    def personality(self, name):
+        self.personality_code = PERSONALITY_CODES[name]
+
+    def update(self, dt, game_state=None, difficulty=1.0):
+        """Update animatronic with deterministic AI"""
+        self.timer += dt
+        self.mood_timer += dt
+
+        # Staggered activation to avoid instant dogpiles
+        minutes = game_state.minutes_elapsed if game_state else 0
+        if minutes < self.start_delay_minutes:
+            return
+
+        if self.retreat_timer > 0:
+            self.retreat_timer = max(0.0, self.retreat_timer - dt)
+            return
+        
+        # Handle investigation behavior (for noisemakers)
+        if self.investigating:
+            self.investigation_timer += dt
+            # Investigate for 2-4 seconds, then leave and return to patrol
+            investigation_duration = 2.0 + (self.curiosity * 1.5)  # 2-4 seconds based on curiosity
+            if self.investigation_timer >= investigation_duration:
+                self.investigating = False
+                self.investigation_timer = 0.0
+                self.hunting_mode = False
+                self.hunting_timer = 0.0
+                self.hunt_target_room = None
+                self.mood_code = CALM_DOWN[self.mood_code]
+                # Resume patrol - find nearest patrol point
+                min_dist = 999
+                best_idx = 0
+                for i, patrol_room in enumerate(self.patrol_route):
+                    dist = self._distance_to_room(self.room, patrol_room)
+                    if dist < min_dist:
+                        min_dist = dist
+                        best_idx = i
+                self.patrol_index = best_idx
+            return  # Don't move while investigating
+
+        if self.hunting_timer > 0:
+            self.hunting_timer -= dt
+            self.hunting_mode = True
+        else:
+            self.hunting_mode = False
+            # Clear temporary lure targets so they don't stick forever
+            if self.hunt_target_room and self.hunt_target_room != "Office":
+                self.hunt_target_room = None
+                self.mood_code = CALM_DOWN[self.mood_code]
+                # Resume patrol route when hunt expires
+                # This prevents getting stuck at noise maker locations
+                if self.room != self.patrol_route[self.patrol_index]:
+                    # Find closest patrol point and resume from there
+                    min_dist = 999
+                    best_idx = self.patrol_index
+                    for i, patrol_room in enumerate(self.patrol_route):
+                        dist = self._distance_to_room(self.room, patrol_room)
+                        if dist < min_dist:
+                            min_dist = dist
+                            best_idx = i
+                    self.patrol_index = best_idx
+
+        # Update mood state (affects behavior)
+        if self.mood_timer >= 2.0:
+            self.update_mood(game_state)
+            self.mood_timer = 0
+
+        # Adaptive aggression based on learning and time
+        night = game_state.night if game_state else 1
+        time_factor = (minutes / 360.0) * self.aggression_ramp
+        night_factor = (night - 1) * 0.12
+        self.adaptive_aggro = (self.base_aggro * difficulty) + (self.block_count * 0.05) + time_factor + night_factor
+        self.adaptive_aggro = min(self.adaptive_aggro, 2.0)
+        interval = max(0.7, (self.move_interval / max(0.6, difficulty)) / (1.0 + self.adaptive_aggro * 0.6))
+        self.move_cooldown -= dt
+
+        if self.move_cooldown <= 0:
+            self.move_cooldown += interval
+            if self.hunting_mode or CHASES[self.mood_code]:
+                self.move_toward_target(self.hunt_target_room or "Office")
+            else:
+                self.move_patrol()
+
+        # Smooth position toward target
+        speed = min(1.0, 4 * dt)
+        self.x += (self.target_x - self.x) * speed
+        self.y += (self.target_y - self.y) * speed
+        
+        # Communication cooldown
+        if self.communication_cooldown > 0:
+            self.communication_cooldown -= dt
+        
+        # Execute personality-specific behaviors
+        self.update_personality_behavior(dt, game_state)
+
+    def can_act(self, minutes):
+        """Awake, not retreating and not busy investigating a noise (abilities need this)"""
+        return minutes >= self.start_delay_minutes and self.retreat_timer <= 0 and not self.investigating
+
+    def next_event_in(self, game_state):
+        """Seconds until this animatronic's next timer fires (None if it waits on the clock)
+
+        Mood checks that would leave the mood as it is do not count.
+        """
+        if game_state.minutes_elapsed < self.start_delay_minutes:
+            return None  # Wakes up on a minute boundary
+        if self.retreat_timer > 0:
+            return self.retreat_timer
+        if self.investigating:
+            return 2.0 + (self.curiosity * 1.5) - self.investigation_timer
+        horizons = [self.move_cooldown, self.next_mood_change_in(game_state)]
+        for timer in (self.hunting_timer, self.communication_cooldown, self.decoy_timer):
+            if timer > 0:
+                horizons.append(timer)
+        if self.personality_code == TRICKSTER:
+            if self.fake_movement_cooldown > 0:
+                horizons.append(self.fake_movement_cooldown)
+            else:
+                horizons.append(TRICKSTER_MAX_JUMP)
+        return min(horizons)
+
+    def next_mood_change_in(self, game_state):
+        """Seconds until the first 2 s mood check that changes the mood
+
+        Checks run every 2 s, so the minute each one reads is known in advance.
+        One within a tick of a minute boundary may read either minute (that is
+        up to the ticks), so both have to keep the mood. The check after
+        MOOD_LOOKAHEAD_CHECKS counts as a change, to look again from there.
+        Erratic moods and a wearing-off lure can change at any check.
+        """
+        first = 2.0 - self.mood_timer
+        if self.personality_code == ERRATIC:
+            return first
+        if self.hunting_timer > 0:
+            return first if self.mood_code != HUNTING else 2.0 * MOOD_LOOKAHEAD_CHECKS  # Hunt end is its own event
+        if self.hunt_target_room and self.hunt_target_room != "Office":
+            return first  # The lure wears off on the next update and calms the mood
+        seconds_per_minute = max(0.01, game_state.seconds_per_hour / 60.0)
+        night, block_count = game_state.night, self.block_count
+        for check in range(MOOD_LOOKAHEAD_CHECKS):
+            offset = first + 2.0 * check
+            minutes, into = divmod(game_state.hour_timer + max(0.0, offset), seconds_per_minute)
+            minute = game_state.minutes_elapsed + int(minutes)
+            if MOOD_SCHEDULE.code(night, minute, block_count) != self.mood_code:
+                return offset
+            if into < FAST_FORWARD_FINE_DT and MOOD_SCHEDULE.code(night, minute - 1, block_count) != self.mood_code:
+                return offset
+            if seconds_per_minute - into < FAST_FORWARD_FINE_DT:
+                if MOOD_SCHEDULE.code(night, minute + 1, block_count) != self.mood_code:
+                    return offset
+        return first + 2.0 * MOOD_LOOKAHEAD_CHECKS
+
+    def skip_mood_checks(self, dt):
+        """Let a dt-long step pass over mood checks that keep the mood without losing their 2 s rhythm
+
+        Ticking resets mood_timer at each check, so one long step would make a
+        single check at its end and restart the rhythm from there.
+        """
+        if self.mood_timer + dt >= 2.0:
+            self.mood_timer = (self.mood_timer + dt) % 2.0 - dt
+
+    def update_personality_behavior(self, dt, game_state=None):
+        """Execute personality-specific behaviors"""
+        if not game_state:
+            return
+        
+        # Update decoy status
+        if self.decoy_timer > 0:
+            self.decoy_timer -= dt
+            if self.decoy_timer <= 0:
+                self.is_decoy = False
+        
+        if self.fake_movement_cooldown > 0:
+            self.fake_movement_cooldown -= dt
+        
+        # Personality-specific behaviors (a table read, see PERSONALITIES)
+        behavior = PERSONALITY_BEHAVIORS[self.personality_code]
+        if behavior is not None:
+            behavior(self, dt, game_state)
+
+    def behave_trickster(self, dt, game_state):
+        """Fake movement noises every so often"""
+        if self.fake_movement_cooldown <= 0:
+            if self.rng and self.rng.random() < (0.1 * self.deception * dt):
+                self.create_fake_movement(game_state)
+                self.fake_movement_cooldown = self.rng.uniform(8, 15)
+
+    def behave_stalker(self, dt, game_state):
+        """Track player patterns and predict movements"""
+        if self.player_action_memory.total() > 3:
+            self.stalking_mode = True
+            self.ambush_position = self.predict_player_weakness()
+
+    def behave_patient(self, dt, game_state):
+        """Wait longer before moving, but move with purpose"""
+        self.move_interval = self.base_interval * (1.5 * self.patience)
+
+    def behave_aggressive(self, dt, game_state):
+        """Increase move speed and aggression"""
+        self.adaptive_aggro = min(2.5, self.adaptive_aggro * 1.1)
+
+    def behave_erratic(self, dt, game_state):
+        """Randomize behavior to be unpredictable"""
+        # 5% per 60 Hz frame, scaled so longer catch-up steps keep the same rate
+        if self.rng and self.rng.random() < 1.0 - 0.95 ** (dt * 60):
+            self.mood_code = self.rng.choice(ERRATIC_MOODS)
+
+    def create_fake_movement(self, game_state):
+        """Create a fake movement sound/event"""
+        if hasattr(game_state, 'phantom_sounds'):
+            fake_location = self.rng.choice(MAP.rooms)
+            game_state.phantom_sounds.append(self.now(), {
+                'location': fake_location,
+                'type': 'fake_movement'
+            })
+    
+    def now(self):
+        """Current simulation time (0.0 when not attached to a simulation)"""
+        return self.clock.now if self.clock is not None else 0.0
+
+    def predict_player_weakness(self):
+        """Analyze player patterns to find weaknesses"""
+        if not self.player_action_memory.total():
+            return None
+        
+        # Count door usage patterns over the whole night
+        left_blocks = self.player_action_memory.total("left")
+        right_blocks = self.player_action_memory.total("right")
+        
+        # Attack the less-defended side
+        if left_blocks < right_blocks:
+            return "left"
+        elif right_blocks < left_blocks:
+            return "right"
+        return None
+    
+    def update_mood(self, game_state=None):
+        """Update mood based on situation - progressive hunting that scales with time and night
+
+        The night/minute/block-count schedule is data in mood_schedule.py.
+        """
+        if self.hunting_mode:
+            self.mood_code = HUNTING
+        elif game_state is None:
+            self.mood_code = MOOD_SCHEDULE.code(1, 0, self.block_count)
+        else:
+            self.mood_code = MOOD_SCHEDULE.code(game_state.night, game_state.minutes_elapsed, self.block_count)
+
+    def get_mood_multiplier(self):
+        """Get aggression multiplier based on mood"""
+        mood_map = {
+            "neutral": 0.9,      # Slower, calm patrol
+            "cautious": 0.7,     # Very slow, careful
+            "aggressive": 1.3,   # Faster movement
+            "hunting": 1.5,      # Actively seeking player (reduced from 1.6)
+            "retreating": 0.4    # Very slow, backing off
+        }
+        return mood_map.get(self.mood, 0.9)
+
+    @property
+    def room(self):
+        """Current room (read-only - use move_to so the occupancy index stays in sync)"""
+        return self._room
+
+    def move_to(self, room):
+        """The one place an animatronic changes room"""
+        old_room = self._room
+        if room == old_room:
+            return
+        self._room = room
+        if self.occupancy is not None:
+            self.occupancy.relocate(self, old_room, room)
+
+    def move_patrol(self):
+        """Move along a fixed patrol route"""
+        if not self.patrol_route:
+            return
+        self.patrol_index = (self.patrol_index + 1) % len(self.patrol_route)
+        next_room = self.patrol_route[self.patrol_index]
+        if next_room != self.room:
+            self.last_room = self.room
+            self.move_to(next_room)
+            self.target_x, self.target_y = room_position(self.room, self.display_width, self.display_height)
+
+    def move_toward_target(self, target_room):
+        """Move toward a specific target room"""
+        if not target_room or target_room == self.room:
+            # Reached target - if it's not Office, start investigating (noisemaker)
+            if target_room and target_room != "Office" and self.hunt_target_room == target_room:
+                self.investigating = True
+                self.investigation_timer = 0.0
+            return
+        
+        # Step along the precomputed shortest path (None if unreachable), unless
+        # a finished look-ahead plan found a better first step toward the Office
+        best_room = room_graph().next_hop(self.room, target_room)
+        if target_room == "Office" and self.plan_room == self.room:
+            best_room = planned_move(self, best_room) or best_room
+        
+        if best_room and best_room != self.room:
+            self.last_room = self.room
+            self.move_to(best_room)
+            self.target_x, self.target_y = room_position(self.room, self.display_width, self.display_height)
+
+    def _distance_to_room(self, from_room, to_room):
+        """Distance between rooms in hops (table lookup)"""
+        return room_graph().distance(from_room, to_room)
+
+    def try_attack(self, office):
+        """Try to attack if in office"""
+        if self.room == "Office":
+            if self.attack_side == "left":
+                return not office.door_left_closed
+            if self.attack_side == "right":
+                return not office.door_right_closed
+            if self.attack_side == "vent":
+                # Vent crawler only succeeds if at least one door is open
+                return not (office.door_left_closed and office.door_right_closed)
+        return False
+    
+    def get_blocked_side_preview(self, office):
+        """The side get_blocked_side would report, without reacting to it"""
+        if self.room == "Office":
+            if self.attack_side == "left" and office.door_left_closed:
+                return "left"
+            if self.attack_side == "right" and office.door_right_closed:
+                return "right"
+            if self.attack_side == "vent" and (office.door_left_closed and office.door_right_closed):
+                return "both"
+        return None
+
+    def get_blocked_side(self, office):
+        """Check which door is blocking this animatronic (if any)"""
+        side = self.get_blocked_side_preview(office)
+        if side:
+            self.handle_blocked(side)
+        return side
+
+    def handle_blocked(self, side):
+        """Handle being blocked - learning and mood change (more gradual)"""
+        self.block_count += 1
+        self.last_blocked_time = self.now()
+        
+        # Only become aggressive after multiple blocks
+        if self.block_count >= 3:
+            # Very frustrated - hunt for longer
+            self.hunting_timer = 15.0
+            self.hunt_target_room = "Office"
+            self.mood = "aggressive"
+        elif self.block_count >= 2:
+            # Getting frustrated - short hunt
+            self.hunting_timer = 8.0
+            self.hunt_target_room = "Office"
+            self.mood = "cautious"
+        else:
+            # First block - just retreat, stay in patrol mode
+            self.hunting_timer = 0.0  # Don't hunt on first block
+            self.mood = "cautious"  # Just be cautious
+        
+        # MUST leave the office - find a neighboring room and move there immediately
+        if self.room == "Office":
+            neighbors = get_neighbors(self.room)
+            if neighbors:
+                # Pick a deterministic neighbor (every way out of the Office is a doorway room)
+                self.last_room = self.room
+                self.move_to(neighbors[self.block_count % len(neighbors)])
+                self.target_x, self.target_y = room_position(self.room, 1280, 720)
+                self.x = self.target_x
+                self.y = self.target_y
+                self.retreat_timer = 4.0
+                self.retreat_target = self.room
+        # Record this memory for future behavior
+        self.player_action_memory.append(self.now(), {"action": "blocked", "side": side}, key=side)
+
+
+# Personality archetypes in code order: (name, per-tick behavior or None).
+# A new personality is a new row here, not a new branch in Animatronic.update.
+PERSONALITIES = (
+    ("aggressive", Animatronic.behave_aggressive),  # Moves fast, attacks often
+    ("patient", Animatronic.behave_patient),        # Waits for perfect opportunity
+    ("erratic", Animatronic.behave_erratic),        # Unpredictable movements
+    ("stalker", Animatronic.behave_stalker),        # Follows player patterns
+    ("team_player", None),                          # Coordinates with others
+    ("trickster", Animatronic.behave_trickster),    # Uses fake movements
+    ("cautious", None),                             # Retreats often, slow approach
+    ("relentless", None),                           # Never gives up, constant pressure
+)
+PERSONALITY_NAMES = tuple(name for name, _ in PERSONALITIES)
+PERSONALITY_CODES = {name: code for code, name in enumerate(PERSONALITY_NAMES)}
+PERSONALITY_BEHAVIORS = tuple(behavior for _, behavior in PERSONALITIES)
+TRICKSTER = PERSONALITY_CODES["trickster"]
+ERRATIC = PERSONALITY_CODES["erratic"]
+
+
+# =====================================================
+# ROSTER
+# =====================================================
+# Every animatronic the game knows lives in roster.json, compiled by roster.py
+# into flat columns indexed by archetype code (see ROSTER.code). The story
+# nights play ROSTER.story; custom nights can mix any of them.
+
+# Custom nights: up to MAX_CUSTOM_ANIMATRONICS active at once, each archetype
+# at an AI level from 0 (stays home) to CUSTOM_LEVEL_MAX; STORY_LEVEL plays
+# exactly like the story nights
+MAX_CUSTOM_ANIMATRONICS = 50
+CUSTOM_LEVEL_MAX = 20
+STORY_LEVEL = 10
+
+
+def custom_roster(roster):
+    """Validate [(archetype, count, level), ...] for a custom night; returns it as a list of tuples"""
+    entries = []
+    for name, count, level in roster:
+        if name not in ROSTER.code:
+            raise ValueError(f"unknown animatronic {name!r}")
+        if not 0 <= count <= MAX_CUSTOM_ANIMATRONICS or not 0 <= level <= CUSTOM_LEVEL_MAX:
+            raise ValueError(f"{name}: count {count} / level {level} out of range")
+        entries.append((name, int(count), int(level)))
+    active = sum(count for _, count, level in entries if level > 0)
+    if active > MAX_CUSTOM_ANIMATRONICS:
+        raise ValueError(f"{active} animatronics, at most {MAX_CUSTOM_ANIMATRONICS} can be active")
+    return entries
+
+
+# =====================================================
+# SIMULATION
+# =====================================================
+
+def new_run_seed():
+    """Fresh seed for a night nobody asked to reproduce"""
+    return int(time.time() * 1000) % 1000000
+
+
+# Named random streams, each seeded from (run_seed, name):
+#   ai     - roster, routes, personalities and everything animatronics decide
+#   events - environmental events and other world rules
+#   fx     - cosmetic randomness (particles, shake, glitches); never affects play
+# Look-ahead rollouts (planner.py) draw from the planner's own stream, reseeded
+# from (run_seed, tick) every tick they run, so it is never saved.
+RNG_STREAMS = ("ai", "events", "fx")
+
+
+def stream_seed(run_seed, name):
+    """Seed for one named stream of a run"""
+    return zlib.crc32(f"{run_seed}:{name}".encode("utf-8"))
+
+
+class Simulation:
+    """One night of game logic, advanced with step(dt, inputs)"""
+    def __init__(self, run_seed=None, difficulty=1.2, clock=None):
+        # Core models
+        self.game_state = GameState()
+        self.game_state.width = WINDOW_WIDTH
+        self.game_state.height = WINDOW_HEIGHT
+        self.power = PowerSystem()
+        self.office = Office()
+        self.cameras = CameraSystem()
+        self.jumpscare = Jumpscare()
+        self.animatronics = []
+        self.roster = None  # Custom night [(archetype, count, level), ...]; None for the story roster
+        self.occupancy = RoomOccupancy()  # room -> animatronics, for O(1) "who is in X"
+        self.threat = ThreatAssessment()  # Components of threat_level, updated on change
+        self.clock = clock or SimClock()  # Game-rule time; only step() advances it
+        self.timers = TimerWheel()  # Cooldowns/countdowns, advanced alongside the clock
+        self.timers.on_expire("safe_spot", self.leave_safe_spot)
+        self.timers.on_expire("combo", self.end_combo)
+        self.timers.on_expire("hallucination", self.end_hallucination)
+        self.timers.on_expire("backup_power", self.backup_power_depleted)
+
+        if run_seed is None:
+            run_seed = new_run_seed()
+        self.ai_rng = random.Random()
+        self.event_rng = random.Random()
+        self.fx_rng = random.Random()  # Renderers may draw from this as often as they like
+        self.seed_streams(run_seed)
+        self.difficulty = difficulty
+
+        # Observers get (event, data) for every sound/effect/result the sim emits
+        self.observers = []
+
+        self.noise_maker_rooms = list(MAP.noise_maker_rooms)
+
+        # Far-away AI thinks every N ticks (1 = every tick); see AI_LOD_FAR_INTERVAL
+        self.ai_lod_interval = AI_LOD_FAR_INTERVAL
+
+        # Look-ahead rollouts per tick for hunters on later nights (0 = off; see planner.py)
+        self.lookahead = 0
+        self.planner = LookaheadPlanner()
+        self.reset_night_state()
+
+    def reset_night_state(self):
+        """Reset everything that only lasts one night (timers, stats, anti-cheat)"""
+        # Running cooldowns and countdowns (see ENTRY_COOLDOWN_TIMERS, DOOR_JAM_TIMERS):
+        # entry cooldowns, door jams, jam/overload grace, pack-hunt cooldown,
+        # hallucinations, backup power, noise maker, safe spot and combo windows
+        self.timers.reset()
+        self.planner.habits.reset()
+
+        # Fairness caps
+        self.entry_cooldown_seconds = 6.0
+        self.max_office_attackers = 2
+        self.door_open_limit = 7.0
+        self.power_usage = {"base": 0.0, "doors": 0.0, "lights": 0.0, "cams": 0.0, "surge": 1.0}
+
+        # Environmental event system
+        self.phantom_sound_cooldown = 0
+        self.environmental_event_timer = 0
+        self.next_event_time = 30  # First event after 30 seconds
+        self.hallucination_mode = False
+
+        # Special abilities run every EFFECT_TICK seconds of this
+        self.effect_timer = 0.0
+
+        # Animatronic coordination
+        self.coordinated_attack_cooldown = 0
+        self.active_coordination = None
+
+        # Dynamic stats tracking
+        self.total_door_closes = 0
+        self.total_camera_checks = 0
+        self.perfect_blocks = 0
+        self.failed_blocks = 0
+        self.performance_score = 0
+
+        # Threat, hiding and combo tracking
+        self.threat_level = 0  # Real-time threat assessment 0-100 (self.threat has the breakdown)
+        self.threat.reset()
+        self.safe_spots_available = ["Closet", "Under Desk", "Vent"]
+        self.current_safe_spot = None
+        self.footstep_sounds = TimedWindow(3.0, 256)  # Animatronic movements heard in the last 3 seconds
+        self.combo_blocks = 0  # Consecutive perfect blocks
+
+        # Anti-cheat: reflex door spam detection
+        self.reflex_blocks = 0
+        self.last_reflex_time = 0.0
+        self.last_office_entry_time = {"left": -999.0, "right": -999.0, "vent": -999.0}
+        self.anti_cheat_active = False
+        self.anti_cheat_timer = 0.0
+        self.anti_cheat_pending = False
+
+        # Door spam prevention
+        self.door_toggle_history = {"left": TimedWindow(5.0, 16), "right": TimedWindow(5.0, 16)}  # Toggles in the last 5 seconds
+        self.door_spam_penalty = 0.0  # Accumulated penalty for spamming
+        self.flicker_phase = 0.0
+        self.tick_count = 0
+
+    # =====================================================
+    # OBSERVERS
+    # =====================================================
+
+    def add_observer(self, callback):
+        """Register callback(event, data) for everything the sim emits"""
+        self.observers.append(callback)
+
+    def emit(self, event, **data):
+        """Notify all observers of an event"""
+        for callback in self.observers:
+            callback(event, data)
+
+    def play_sound(self, name, loops=0):
+        """Ask observers to play a sound"""
+        self.emit("sound", name=name, loops=loops)
+
+    def emit_screen_shake(self, intensity, duration):
+        """Ask observers to shake the screen"""
+        self.emit("screen_shake", intensity=intensity, duration=duration)
+
+    def emit_color_overlay(self, color, duration):
+        """Ask observers to tint the screen (r, g, b, alpha)"""
+        self.emit("color_overlay", color=color, duration=duration)
+
+    def emit_particle_burst(self, x, y, count, color, speed_range=(1, 3)):
+        """Ask observers to spawn a particle burst"""
+        self.emit("particle_burst", x=x, y=y, count=count, color=color, speed_range=speed_range)
+
+    def seed_streams(self, run_seed):
+        """Reseed the ai/events/fx streams in place (observers may hold references)"""
+        self.run_seed = run_seed
+        for name, rng in zip(RNG_STREAMS, (self.ai_rng, self.event_rng, self.fx_rng)):
+            rng.seed(stream_seed(run_seed, name))
+
+    def clamp(self, x, a, b):
+        """Clamp value between a and b"""
+        return max(a, min(x, b))
+
+    # =====================================================
+    # NIGHT LIFECYCLE
+    # =====================================================
+
+    def start_night(self, night, run_seed=None, roster=None):
+        """Reset everything for a new night (state is left for the caller to set)
+
+        Passing run_seed reseeds the random streams, so the night depends only
+        on (run_seed, night, difficulty, seconds_per_hour, roster) and the
+        inputs. roster is a custom night's [(archetype, count, level), ...];
+        None plays the story roster.
+        """
+        self.roster = None if roster is None else custom_roster(roster)
+        if run_seed is not None:
+            self.seed_streams(run_seed)
+        self.game_state.night = self.clamp(night, 1, 5)
+        self.set_status("")
+
+        self.power.reset()
+        self.office.reset()
+        self.reset_animatronics()
+        self.jumpscare.reset()
+        self.cameras.reset()
+        # Reset time counters
+        self.game_state.hour = 12
+        self.game_state.hour_timer = 0
+        self.game_state.minutes_elapsed = 0
+        self.game_state.reset_environment()
+        # Safe spots, stats, event timers and anti-cheat all start fresh
+        self.reset_night_state()
+
+        # Apply adaptive difficulty based on previous performance
+        self.apply_adaptive_difficulty()
+        self.emit("night_started", night=self.game_state.night, run_seed=self.run_seed,
+                  difficulty=self.difficulty, seconds_per_hour=self.game_state.seconds_per_hour,
+                  roster=self.roster, lookahead=self.lookahead)
+
+    def begin_playing(self):
+        """Switch to the playing state and start the night clock"""
+        self.game_state.state = "playing"
+        self.game_state.start_time = time.time()  # Wall clock, only drives render animations
+        self.game_state.hour_timer = 0
+        self.game_state.minutes_elapsed = 0
+        self.tick_count = 0  # Input replays count ticks from here
+        self.clock.reset()
+        self.timers.reset()
+
+    # =====================================================
+    # STEP
+    # =====================================================
+
+    def apply_input(self, action):
+        """Apply one player action tuple, e.g. ("toggle_door", "left")"""
+        name, args = action[0], action[1:]
+        handler = {
+            "toggle_door": self.toggle_door,
+            "toggle_flashlight": self.toggle_flashlight,
+            "toggle_cameras": self.toggle_cameras,
+            "switch_camera": self.switch_camera,
+            "use_barricade": self.use_barricade,
+            "deploy_noise_maker": self.deploy_noise_maker,
+            "toggle_vent_system": self.toggle_vent_system,
+            "use_safe_spot": self.use_safe_spot,
+        }.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown input action: {name}")
+        # Recorders listen for this to capture the night as (tick, action) pairs
+        self.emit("input", tick=self.tick_count, action=tuple(action))
+        handler(*args)
+
+    def step(self, dt, inputs=()):
+        """Advance the simulation by dt seconds after applying the given inputs"""
+        self.tick_count += 1
+        self.clock.advance(dt)
+        self.timers.advance(dt)
+        for action in inputs:
+            if self.game_state.state != "playing":
+                break
+            self.apply_input(action)
+
+        if self.game_state.state == "anti_cheat":
+            self.anti_cheat_timer += dt
+            if self.anti_cheat_timer >= 2.0 and not self.anti_cheat_pending:
+                self.jumpscare.killer = "Mr Hall"
+                self.jumpscare.active = True
+                self.jumpscare.timer = 0
+                self.game_state.state = "jumpscare"
+                self.play_sound("jumpscare")
+                self.anti_cheat_pending = True
+            return
+
+        if self.game_state.state == "anti_cheat_message":
+            return
+
+        if self.game_state.state == "playing":
+            self.update_power(dt)
+            self.update_time(dt)
+            self.update_lookahead(dt)
+            self.update_animatronics(dt)
+            self.update_abilities(dt)
+            self.update_environmental_events(dt)
+            self.update_phantom_sounds(dt)
+            self.update_threat_assessment(dt)
+            self.update_audio_system(dt)
+        elif self.game_state.state == "jumpscare":
+            self.jumpscare.timer += dt
+            if self.jumpscare.timer > self.jumpscare.duration:
+                self.jumpscare.timer = self.jumpscare.duration
+                if self.anti_cheat_pending:
+                    self.game_state.state = "anti_cheat_message"
+
+        self.update_office_effects(dt)
+
+    # =====================================================
+    # FAST-FORWARD KERNEL
+    # =====================================================
+
+    def next_event_in(self):
+        """Seconds until the next scheduled state change (0.0 if something needs every tick)
+
+        Between events a night is just timers running down, door health
+        wearing and power draining at constant rates, so step() can cover the
+        whole stretch in one call. Flickering lights, door spam decay and an
+        animatronic that is about to be blocked need ordinary ticks.
+        """
+        if self.game_state.state != "playing":
+            return 0.0
+        if self.game_state.lights_flickering or self.door_spam_penalty > 0:
+            return 0.0
+
+        minutes = self.game_state.minutes_elapsed
+        seconds_per_minute = max(0.01, self.game_state.seconds_per_hour / 60.0)
+        boundary = minutes + 1
+        while not self.minute_matters(boundary):
+            boundary += 1
+        horizons = [
+            (boundary - minutes) * seconds_per_minute - self.game_state.hour_timer,
+            self.next_event_time - self.environmental_event_timer,
+        ]
+
+        office = self.office
+        graph = room_graph()
+        hunters = False
+        door_pressure = {"left": 0.0, "right": 0.0}
+        breaker_damage = {"left": 0.0, "right": 0.0}
+        drainer_rate = 0.0
+        for anim in self.animatronics:
+            horizon = anim.next_event_in(self.game_state)
+            if horizon is not None:
+                horizons.append(horizon)
+            hunters = hunters or anim.hunting_mode
+
+            # Office and door timers from the attack pass of update_animatronics
+            if anim.room == "Office":
+                if anim.get_blocked_side_preview(office):
+                    return 0.0  # Gets bounced out on the next tick
+                if anim.try_attack(office) and not self.current_safe_spot:
+                    required = max(0.45, (anim.attack_windup_required / max(0.8, self.difficulty)) - (self.game_state.night - 1) * 0.1)
+                    horizons.append(required - anim.attack_windup)
+                continue
+            side = graph.office_door_side(anim.room)
+            if side == "left" and office.door_left_closed or side == "right" and office.door_right_closed:
+                door_pressure[side] += 3.2 * self.difficulty
+                horizons.append(3.0 - anim.hallway_block_timer)
+            elif side and anim.hallway_timer < anim.hallway_entry_delay:
+                horizons.append(anim.hallway_entry_delay - anim.hallway_timer)
+
+        if hunters:
+            # Idle animatronics join a hunt when (block_count + whole seconds) is even
+            for anim in self.animatronics:
+                if not anim.hunting_mode and anim.communication_cooldown <= 0:
+                    if (anim.block_count + int(self.clock.now)) % 2 == 0:
+                        return 0.0
+                    horizons.append(math.floor(self.clock.now) + 1.0 - self.clock.now)
+
+        # Special abilities act on effect ticks: stop at the first one where any of
+        # them will (rooms and office state only change at events, so this holds).
+        # Power drainers and door breakers only drain at a constant rate, so the
+        # step's own effect ticks apply them and they go into the rates below
+        first_tick = EFFECT_TICK - self.effect_timer
+        watched = self.cameras.current_camera() if office.cams_open else None
+        for anim in self.animatronics:
+            if anim.can_act(minutes) and self.ability_triggered(anim, graph.distance_to_office(anim.room), watched):
+                if anim.ability_code == POWER_DRAINER:
+                    drainer_rate += POWER_DRAINER_RATE
+                elif anim.ability_code == DOOR_BREAKER:
+                    breaker_damage[graph.office_door_side(anim.room)] += DOOR_BREAKER_DAMAGE
+                else:
+                    horizons.append(first_tick + max(0, anim.ability_cooldown - 1) * EFFECT_TICK)
+        if office.lights_out_timer > 0:
+            horizons.append(first_tick + max(0.0, office.lights_out_timer - 2 * EFFECT_TICK))
+
+        at_office = self.occupancy.count("Office")
+        if at_office >= 2 and not self.timers.active("coordination") and minutes >= 60:
+            return 0.0
+        # Cooldowns, jams, backup power, safe spot, combo and hallucination timers
+        expiry = self.timers.next_expiry()
+        if expiry is not None:
+            horizons.append(expiry)
+
+        # Closed doors wear out at a constant rate (faster with something pushing on them):
+        # watch for them breaking and for average health dropping under 30 (fairness caps).
+        # Breakers hit once per effect tick, so allow for one hit landing early
+        wear_rate = 1.2 * self.difficulty
+        left_rate = wear_rate + door_pressure["left"] + breaker_damage["left"] if office.door_left_closed else 0.0
+        right_rate = wear_rate + door_pressure["right"] + breaker_damage["right"] if office.door_right_closed else 0.0
+        left_hit = breaker_damage["left"] * EFFECT_TICK
+        right_hit = breaker_damage["right"] * EFFECT_TICK
+        if left_rate:
+            horizons.append((office.door_left_health - left_hit) / left_rate)
+        if right_rate:
+            horizons.append((office.door_right_health - right_hit) / right_rate)
+        avg_health = (office.door_left_health + office.door_right_health) / 2.0
+        if left_rate + right_rate and avg_health > 30:
+            horizons.append((avg_health - 30 - (left_hit + right_hit) / 2.0) / ((left_rate + right_rate) / 2.0))
+
+        # Power runs out at a known time, and crosses the 50 / 20 thresholds the
+        # threat level and fairness caps look at on the way
+        if not self.power.outage:
+            rate = self.power_drain_rate() + drainer_rate
+            if rate > 0:
+                for level in (50, 20, 0):
+                    if self.power.current > level:
+                        horizons.append((self.power.current - level - drainer_rate * EFFECT_TICK) / rate)
+
+        return max(0.0, min(horizons))
+
+    def minute_matters(self, minute):
+        """Whether the clock reaching this minute changes anything by itself
+
+        Moves, mood checks, abilities and world events read the minute when
+        they happen, so only surges, wake-ups, the pack-hunt rule from 1 AM and
+        6 AM count.
+        """
+        if minute >= 6 * 60 or minute == 60 or power_surge(minute) != power_surge(minute - 1):
+            return True
+        return any(minute == anim.start_delay_minutes for anim in self.animatronics)
+
+    def fast_forward(self, seconds, inputs=(), fine_dt=FAST_FORWARD_FINE_DT):
+        """Advance up to `seconds` of game time, jumping straight from event to event
+
+        Each jump stops one ordinary tick short of the next event, and the
+        event itself happens inside an ordinary fine_dt tick, exactly as it
+        would in live play (an animatronic that moves, or wakes on a new
+        minute, only ever sees that tick's dt). inputs are applied on the
+        first step. Stops early if the night ends (win, jumpscare or
+        anti-cheat); returns the number of steps taken. Jumps are not fixed
+        ticks, so tick_count no longer lines up with replays - this is for
+        bulk headless runs.
+        """
+        lod_interval = self.ai_lod_interval
+        self.ai_lod_interval = 1  # Every animatronic has to see its own events on time
+        target = self.clock.now + seconds
+        steps = 0
+        try:
+            while self.game_state.state == "playing" and target - self.clock.now > 1e-9:
+                horizon = self.next_event_in()
+                dt = min(target - self.clock.now, max(fine_dt, horizon - fine_dt))
+                if dt > fine_dt:
+                    # Every mood check this jump passes over keeps the mood (next_event_in)
+                    minutes = self.game_state.minutes_elapsed
+                    for anim in self.animatronics:
+                        if anim.can_act(minutes):
+                            anim.skip_mood_checks(dt)
+                self.step(dt, inputs)
+                inputs = ()
+                steps += 1
+        finally:
+            self.ai_lod_interval = lod_interval
+        return steps
+
+    # =====================================================
+    # GAME LOGIC
+    # =====================================================
+
+    def set_status(self, msg=""):
+        """Set status message"""
+        self.game_state.status = msg or ""
+
+    def log_event(self, msg, add_personality_hint=False):
+        """Event log disabled"""
+        pass
+
+    def break_door(self, side):
+        """Force a door to jam open when its health is depleted"""
+        # Play door damage/break sound
+        self.play_sound("door_damage")
+        
+        if side == "left":
+            self.office.door_left_closed = False
+            self.set_status("Left door jammed open!")
+            self.log_event("Left door jammed")
+        elif side == "right":
+            self.office.door_right_closed = False
+            self.set_status("Right door jammed open!")
+            self.log_event("Right door jammed")
+        self.threat.mark()
+        self.timers.start(DOOR_JAM_TIMERS[side], DOOR_JAM_SECONDS)
+        self.timers.extend("jam_grace", 3.0)
+
+    def door_jammed(self, side):
+        """True while a broken door is stuck open"""
+        return self.timers.active(DOOR_JAM_TIMERS[side])
+
+    def check_reflex_cheat(self, side):
+        """Detect reflex door slams right after an animatronic enters."""
+        if self.anti_cheat_active:
+            return
+        entry_time = self.last_office_entry_time.get(side, -999.0)
+        if entry_time <= 0:
+            return
+        now = self.clock.now
+        # If the door is slammed within a very short window, count it
+        if now - entry_time <= 1.2:
+            # Decay the counter if it's been a while
+            if now - self.last_reflex_time > 20.0:
+                self.reflex_blocks = 0
+            self.reflex_blocks += 1
+            self.last_reflex_time = now
+            if self.reflex_blocks >= 1:
+                self.trigger_anti_cheat()
+
+    def trigger_anti_cheat(self):
+        """Trigger anti-cheat punishment sequence."""
+        if self.anti_cheat_active:
+            return
+        self.anti_cheat_active = True
+        self.anti_cheat_timer = 0.0
+        self.anti_cheat_pending = False
+        # Force office view and hide animatronics during the warning
+        self.office.cams_open = False
+        self.office.light_on = False
+        for anim in self.animatronics:
+            anim.move_to("Hidden")
+        self.emit("stop_music")
+        self.play_sound("nice_try")
+        self.set_status("")
+        self.game_state.state = "anti_cheat"
+
+    def reset_animatronics(self):
+        """Reset animatronics to starting positions"""
+        def jitter(base, spread):
+            return base + self.ai_rng.uniform(-spread, spread)
+        
+        # Get available rooms for animatronic starting positions
+        # (the map precomputes them: not the Office or a room next to it)
+        available_rooms = list(MAP.spawn_rooms)
+        
+        # Story nights: one of each at the story level; custom nights: the chosen mix
+        if self.roster is None:
+            lineup = [(code, STORY_LEVEL) for code in ROSTER.story]
+        else:
+            lineup = [(ROSTER.code[name], level) for name, count, level in self.roster
+                      if level > 0 for _ in range(count)]
+        count = len(lineup)
+
+        # Ensure we have enough rooms
+        if len(available_rooms) < 4:
+            available_rooms = list(MAP.rooms)
+        
+        # Randomly select starting rooms for each animatronic
+        start_rooms = self.ai_rng.sample(available_rooms, min(count, len(available_rooms)))
+        # Allow duplicates if we don't have enough unique rooms - animatronics can start in same location
+        if len(start_rooms) < count:
+            start_rooms.extend(self.ai_rng.choices(available_rooms, k=count-len(start_rooms)))
+        
+        # Generate patrol routes for each animatronic
+        def generate_patrol_route(start_room, length=4):
+            """Generate a patrol route starting from a room"""
+            route = [start_room]
+            current = start_room
+            visited = set([start_room])
+            
+            for _ in range(length - 1):
+                neighbors = [n for n in get_neighbors(current) if n not in ["Office"]]
+                if not neighbors:
+                    break
+                
+                # Prefer unvisited rooms
+                unvisited = [n for n in neighbors if n not in visited]
+                if unvisited:
+                    next_room = self.ai_rng.choice(unvisited)
+                else:
+                    next_room = self.ai_rng.choice(neighbors)
+                
+                route.append(next_room)
+                visited.add(next_room)
+                current = next_room
+            
+            # Add office-adjacent rooms to make them approach the office
+            # Walk the neighbor list, not a set: set order changes with the
+            # string hash seed, which would make the same run_seed differ per process
+            office_adjacent = get_neighbors("Office")
+            route_set = set(route)
+            for adj_room in office_adjacent:
+                if adj_room not in route_set and self.ai_rng.random() < 0.6:
+                    route.append(adj_room)
+                    route_set.add(adj_room)
+            
+            return route
+
+        self.animatronics = []
+        seen = {}
+        for start_room, (code, level) in zip(start_rooms, lineup):
+            name = ROSTER.names[code]
+            # Extra copies in a custom night are numbered: "Librarian 2", "Librarian 3", ...
+            seen[name] = seen.get(name, 0) + 1
+            label = name if seen[name] == 1 else f"{name} {seen[name]}"
+            # AI level scales aggression linearly and movement speed more gently.
+            # Draw order (aggro, interval, route, start delay, hallway, ramp) is
+            # part of the replay format - keep it.
+            anim = Animatronic(label, start_room,
+                               jitter(ROSTER.aggro_base[code], ROSTER.aggro_spread[code]) * (level / STORY_LEVEL),
+                               jitter(ROSTER.interval_base[code], ROSTER.interval_spread[code])
+                               * (2 * STORY_LEVEL / (level + STORY_LEVEL)),
+                               ROSTER.style[code],
+                               attack_side=ROSTER.attack_side[code],
+                               patrol_route=generate_patrol_route(start_room, ROSTER.route_length[code]),
+                               start_delay_minutes=self.ai_rng.randint(ROSTER.start_delay_min[code],
+                                                                       ROSTER.start_delay_max[code]),
+                               hallway_entry_delay=jitter(ROSTER.hallway_delay_base[code],
+                                                          ROSTER.hallway_delay_spread[code]),
+                               aggression_ramp=jitter(ROSTER.ramp_base[code], ROSTER.ramp_spread[code]),
+                               rng=self.ai_rng,
+                               size_multiplier=ROSTER.size[code],
+                               display_width=WINDOW_WIDTH,
+                               display_height=WINDOW_HEIGHT)
+            anim.archetype = name
+            self.animatronics.append(anim)
+        for anim in self.animatronics:
+            anim.clock = self.clock
+        self.occupancy.reset(self.animatronics, threat_weights())
+
+    def apply_adaptive_difficulty(self):
+        """Adjust animatronic difficulty based on player performance"""
+        if self.game_state.night < 2:
+            return
+        
+        # Base difficulty increases per night
+        night_factor = 0.15 * (self.game_state.night - 1)
+        
+        # Analyze player performance from previous nights (use door usage patterns)
+        successful_defenses = sum([a.block_count for a in self.animatronics]) / max(1, len(self.animatronics))
+        
+        # If player was very successful at blocking, make animatronics more aggressive
+        if successful_defenses > 5:
+            difficulty_boost = 0.2
+        elif successful_defenses > 2:
+            difficulty_boost = 0.1
+        else:
+            difficulty_boost = 0.0
+        
+        # Apply difficulty adjustments to animatronics
+        for anim in self.animatronics:
+            anim.base_aggro = anim.base_aggro * (1.0 + night_factor + difficulty_boost)
+            anim.aggro = anim.base_aggro
+            # Reset learning for new night but keep personality
+            anim.block_count = max(0, anim.block_count - 3)
+            anim.player_action_memory.clear()
+
+    def update_office_effects(self, dt):
+        """Update office visual effects"""
+        # Door animations
+        door_speed = min(1.0, 5 * dt)
+        left_target = 1 if self.office.door_left_closed else 0
+        right_target = 1 if self.office.door_right_closed else 0
+        self.office.door_left_progress += (left_target - self.office.door_left_progress) * door_speed
+        self.office.door_right_progress += (right_target - self.office.door_right_progress) * door_speed
+
+        # Light dimming
+        dim_target = 0 if self.office.light_on else 0.6
+        dim_speed = min(1.0, 3 * dt)
+        self.office.light_dim += (dim_target - self.office.light_dim) * dim_speed
+
+        # Camera flash fade
+        if self.office.cam_flash > 0:
+            self.office.cam_flash = max(0, self.office.cam_flash - dt * 2.8)
+
+        # Doors stay open/closed until player toggles them - no auto-close
+        # This gives players full control
+
+        # Door wear and passive recovery
+        wear_rate = (1.2 * self.difficulty) * dt
+        recover_rate = (0.6 / max(0.8, self.difficulty)) * dt
+        if self.office.door_left_closed:
+            self.office.door_left_health = max(0, self.office.door_left_health - wear_rate)
+        else:
+            self.office.door_left_health = 100.0
+        if self.office.door_right_closed:
+            self.office.door_right_health = max(0, self.office.door_right_health - wear_rate)
+        else:
+            self.office.door_right_health = 100.0
+
+        if self.office.door_left_closed and self.office.door_left_health <= 0 and not self.door_jammed("left"):
+            self.break_door("left")
+        if self.office.door_right_closed and self.office.door_right_health <= 0 and not self.door_jammed("right"):
+            self.break_door("right")
+
+        self.update_fairness_caps()
+
+    def update_fairness_caps(self):
+        """Compute real-time caps to prevent impossible states"""
+        doors_open = int(not self.office.door_left_closed) + int(not self.office.door_right_closed)
+        avg_health = (self.office.door_left_health + self.office.door_right_health) / 2.0
+        low_power = self.power.current < 20
+        cam_disabled = self.power.outage
+        jam_active = self.door_jammed("left") or self.door_jammed("right")
+
+        cap = 2
+        if doors_open >= 2:
+            cap = 1
+        if low_power or cam_disabled or avg_health < 30 or jam_active:
+            cap = 1
+        if self.timers.active("jam_grace") or self.timers.active("overload_grace"):
+            cap = 1
+
+        self.max_office_attackers = cap
+
+        # Entry cooldown scales with defensive weakness
+        cooldown = 6.0
+        if low_power:
+            cooldown += 2.0
+        if cam_disabled:
+            cooldown += 1.5
+        if avg_health < 30:
+            cooldown += 2.0
+        if doors_open >= 2:
+            cooldown += 1.0
+        self.entry_cooldown_seconds = max(6.0, min(12.0, cooldown))
+
+    def update_power(self, dt):
+        """Update power drain"""
+        if self.game_state.state != "playing":
+            return
+
+        # Creepy flickering when low power
+        if self.power.current < 30:
+            self.flicker_phase += dt * 6
+            flicker = (math.sin(self.flicker_phase * 3.0) * 0.5 + 0.5) * 0.3
+            self.office.light_dim += (flicker - 0.15)
+            self.office.light_dim = self.clamp(self.office.light_dim, 0, 0.8)
+
+        if self.power.current <= 0:
+            self.power.current = 0
+            if not self.power.outage:
+                # Play power outage sound
+                self.play_sound("power_out")
+                
+                self.power.outage = True
+                self.power.emergency_mode = True
+                self.timers.start("backup_power", 45.0)  # 45 seconds of emergency power
+                self.power.reserve_power = 15  # Hidden reserve
+                self.office.door_left_closed = False
+                self.office.door_right_closed = False
+                self.threat.mark()
+                self.office.light_on = False
+                self.office.cams_open = False
+                self.set_status("POWER OUTAGE - EMERGENCY MODE ACTIVE")
+                self.emit("power_outage")
+                self.log_event("EMERGENCY: Backup power engaged!")
+        
+        # Backup power holds until its timer runs out (backup_power_depleted)
+        if self.power.outage and self.power.emergency_mode:
+            return
+
+        drain = self.power_drain_rate()
+
+        # Apply door spam penalty
+        if self.door_spam_penalty > 0:
+            drain += self.door_spam_penalty * dt
+            self.door_spam_penalty = max(0, self.door_spam_penalty - dt * 2.0)  # Decay 2 per second
+
+        self.power.current -= drain * dt
+        if self.power.current < 0:
+            self.power.current = 0
+
+    def backup_power_depleted(self):
+        """The "backup_power" timer ran out: the office goes fully dark"""
+        self.power.emergency_mode = False
+        self.threat.mark()
+        self.set_status("BACKUP POWER DEPLETED")
+        # After emergency mode, animatronics get slightly more aggressive (not full hunt)
+        for anim in self.animatronics:
+            anim.mood = "aggressive"  # Changed from hunting
+            anim.hunting_mode = False  # Don't force hunting
+            anim.hunting_timer = 0  # No forced hunt timer
+            anim.adaptive_aggro += 0.2  # Slight boost (was 0.3)
+
+    def power_drain_rate(self):
+        """Power drained per second right now (also refreshes power_usage for the HUD)
+
+        Every term is constant between minute boundaries and player actions,
+        so drain over a longer step is exactly rate * dt.
+        """
+        # Camera power drain (no heat mechanic - cameras just drain power when open)
+        # Scale drain based on night length - gentler scaling
+        # Default is 60 seconds/hour, scale from 0.7 to 1.3 across the range
+        speed_ratio = self.game_state.seconds_per_hour / 60.0
+        speed_multiplier = 0.5 + (speed_ratio * 0.5)  # Ranges from 0.75 (at 15s) to 1.25 (at 180s)
+
+        # Deterministic power surges at fixed times
+        surge_multiplier = 1.35 if power_surge(self.game_state.minutes_elapsed) else 1.0
+        self.power_usage["surge"] = surge_multiplier
+        
+        diff_multiplier = self.difficulty
+        drain_base = self.power.base_drain * speed_multiplier * surge_multiplier * diff_multiplier
+        drain_doors = 0.0
+        drain_lights = 0.0
+        drain_cams = 0.0
+        drain = drain_base
+        if self.office.door_left_closed or self.office.door_right_closed:
+            drain_doors = self.power.door_drain * speed_multiplier * surge_multiplier * diff_multiplier
+            drain += drain_doors
+        if self.office.light_on:
+            drain_lights = self.power.light_drain * speed_multiplier * surge_multiplier * diff_multiplier
+            drain += drain_lights
+        if self.office.cams_open:
+            drain_cams = self.power.cam_drain * speed_multiplier * surge_multiplier * diff_multiplier
+            drain += drain_cams
+
+        self.power_usage["base"] = drain_base
+        self.power_usage["doors"] = drain_doors
+        self.power_usage["lights"] = drain_lights
+        self.power_usage["cams"] = drain_cams
+        return drain
+
+    def update_time(self, dt):
+        """Update in-game time"""
+        if self.game_state.state != "playing":
+            return
+        # advance time by minutes using configured seconds_per_hour
+        seconds_per_minute = max(0.01, self.game_state.seconds_per_hour / 60.0)
+        self.game_state.hour_timer += dt
+        # increment minutes as many as passed
+        while self.game_state.hour_timer >= seconds_per_minute:
+            self.game_state.hour_timer -= seconds_per_minute
+            self.game_state.minutes_elapsed += 1
+            
+            # Play hour chime when a new hour starts (every 60 minutes)
+            if self.game_state.minutes_elapsed % 60 == 0 and self.game_state.minutes_elapsed < 6 * 60:
+                self.play_sound("hour_chime")
+
+            # Win condition: reached 6 AM (6 hours after 12:00)
+            if self.game_state.minutes_elapsed >= 6 * 60:
+                self.calculate_performance_score()
+                self.game_state.state = "win"
+                self.determine_ending()
+                self.play_sound("bell_6am")
+                self.emit("stop_music")
+                # High scores and unlocks are persisted by whoever is observing
+                self.emit("night_won", night=self.game_state.night, score=self.performance_score)
+                break
+
+    def update_lookahead(self, dt):
+        """Spend this tick's look-ahead budget on the hunters about to move (see planner.py)"""
+        if not self.lookahead or self.game_state.night < LOOKAHEAD_NIGHT:
+            return
+        graph = room_graph()
+        threatened = {side for side in map(graph.office_door_side, self.occupancy.rooms) if side}
+        self.planner.habits.observe(self.office, self.cameras, threatened, dt)
+        minutes = self.game_state.minutes_elapsed
+        hunters = [anim for anim in self.animatronics
+                   if anim.move_cooldown <= PLAN_LEAD and anim.hunt_target_room in (None, "Office")
+                   and (anim.hunting_mode or CHASES[anim.mood_code]) and anim.can_act(minutes)]
+        if hunters:
+            jams = {side: self.timers.remaining(name) for side, name in DOOR_JAM_TIMERS.items()}
+            self.planner.plan(hunters, graph, self.office, jams, self.lookahead,
+                              self.run_seed * PLAN_SEED_STRIDE + self.tick_count)
+
+    def update_animatronics(self, dt):
+        """Update all animatronics with advanced AI coordination (optimized)"""
+        graph = room_graph()
+        # First pass: update each animatronic. Far, unwatched ones run at a lower
+        # level of detail (staggered so they don't all tick together) and catch up
+        # on the whole banked time, so skipping work never changes their timers
+        interval = self.ai_lod_interval
+        watched = self.cameras.current_camera() if self.office.cams_open else None
+        for i, anim in enumerate(self.animatronics):
+            anim.lod_pending_dt += dt
+            if (interval > 1 and (self.tick_count + i) % interval and anim.room != watched and
+                    graph.distance_to_office(anim.room) > AI_LOD_NEAR_DISTANCE):
+                continue
+            step_dt = anim.lod_pending_dt
+            anim.lod_pending_dt = 0.0
+            anim.update(step_dt, self.game_state, self.difficulty)
+        
+        # Second pass: AI coordination and communication
+        self.coordinate_animatronics(dt)
+        
+        # Third pass: check for attacks and blocked behaviors
+        for anim in self.animatronics:
+            # Which office door (if any) this room leads to - precomputed from room positions
+            door_side = graph.office_door_side(anim.room)
+            
+            if door_side:
+                if door_side == "left":
+                    door_closed = self.office.door_left_closed
+                    pressure_left = True
+                    pressure_right = False
+                else:
+                    door_closed = self.office.door_right_closed
+                    pressure_left = False
+                    pressure_right = True
+
+                if door_closed:
+                    anim.hallway_timer = 0.0
+                    anim.hallway_block_timer += dt
+                    pressure = 3.2 * self.difficulty
+                    
+                    if pressure_left:
+                        self.office.door_left_health = max(0.0, self.office.door_left_health - pressure * dt)
+                        if self.office.door_left_health <= 0 and not self.door_jammed("left"):
+                            self.break_door("left")
+                    if pressure_right:
+                        self.office.door_right_health = max(0.0, self.office.door_right_health - pressure * dt)
+                        if self.office.door_right_health <= 0 and not self.door_jammed("right"):
+                            self.break_door("right")
+                    
+                    # If blocked too long, they get frustrated and leave temporarily
+                    if anim.hallway_block_timer >= 3.0:
+                        neighbors = [r for r in get_neighbors(anim.room) if r != "Office"]
+                        if neighbors:
+                            anim.last_room = anim.room
+                            anim.move_to(neighbors[anim.block_count % len(neighbors)])
+                            anim.target_x, anim.target_y = room_position(anim.room, WINDOW_WIDTH, WINDOW_HEIGHT)
+                            anim.x = anim.target_x
+                            anim.y = anim.target_y
+                            anim.retreat_timer = 8.0  # Stay away for 8 seconds
+                            anim.retreat_target = anim.room
+                            anim.hallway_block_timer = 0.0
+                else:
+                    # Door is open, can try to enter
+                    anim.hallway_timer += dt
+                    anim.hallway_block_timer = 0.0
+                    side = anim.attack_side
+                    office_count = self.occupancy.count("Office")
+                    same_side_in_office = any(a.attack_side == side for a in self.occupancy.occupants("Office"))
+                    can_enter = (
+                        anim.hallway_timer >= anim.hallway_entry_delay and
+                        not self.timers.active(ENTRY_COOLDOWN_TIMERS[side]) and
+                        not same_side_in_office and
+                        office_count < self.max_office_attackers and
+                        not self.timers.active("jam_grace") and
+                        not self.timers.active("overload_grace")
+                    )
+                    if can_enter:
+                        anim.move_to("Office")
+                        anim.target_x, anim.target_y = room_position("Office", WINDOW_WIDTH, WINDOW_HEIGHT)
+                        anim.hallway_timer = 0.0
+                        anim.attack_windup = 0.0
+                        self.timers.start(ENTRY_COOLDOWN_TIMERS[side], self.entry_cooldown_seconds)
+                        self.last_office_entry_time[side] = self.clock.now
+                        self.log_event(f"{anim.name} entered Office")
+            else:
+                anim.hallway_timer = 0.0
+                anim.hallway_block_timer = 0.0
+
+            # Check if animatronic was blocked by a door
+            blocked_side = anim.get_blocked_side(self.office)
+            if blocked_side:
+                # Play door knock sound when animatronic is blocked
+                self.play_sound("door_knock")
+            # Check if animatronic should attack (windup required)
+            # But only if player isn't hiding!
+            if anim.room == "Office" and anim.try_attack(self.office) and not self.current_safe_spot:
+                anim.attack_windup += dt
+                required = max(0.45, (anim.attack_windup_required / max(0.8, self.difficulty)) - (self.game_state.night - 1) * 0.1)
+                if anim.attack_windup >= required:
+                    self.jumpscare.killer = anim.name
+                    self.jumpscare.active = True
+                    self.jumpscare.timer = 0
+                    self.game_state.state = "jumpscare"
+                    self.emit_screen_shake(15, 2.0)
+                    self.emit_color_overlay((255, 0, 0, 150), 2.0)
+                    # Each archetype can have its own scream (Freaky Temi's "faaah")
+                    code = ROSTER.code.get(anim.archetype)
+                    self.play_sound("jumpscare" if code is None else ROSTER.jumpscare_sound[code])
+                    self.emit("stop_music")
+                    self.log_event(f"{anim.name} attacked")
+                    break
+            else:
+                anim.attack_windup = 0.0
+
+    def coordinate_animatronics(self, dt):
+        """AI coordination: animatronics communicate and plan coordinated attacks"""
+        if len(self.animatronics) < 2:
+            return
+        
+        # Check if any animatronic is in hunting mode and communicate
+        hunters = [a for a in self.animatronics if a.hunting_mode]
+        
+        if hunters:
+            # Share intelligence: if one is hunting, spread the target
+            target_room = hunters[0].hunt_target_room
+            for anim in self.animatronics:
+                # Only 50% chance to join the coordination (not all will join)
+                if not anim.hunting_mode and anim.communication_cooldown <= 0:
+                    if (anim.block_count + int(self.clock.now)) % 2 == 0:  # 50% chance
+                        anim.hunting_mode = True
+                        anim.hunt_target_room = target_room
+                        anim.mood = "cautious"  # Changed from hunting
+                        anim.hunting_timer = 6.0  # Reduced from 10.0
+                        anim.communication_cooldown = 6.0
+        
+        # Predict player door preference and adapt strategy
+        for anim in self.animatronics:
+            memory = anim.player_action_memory
+            if memory.total():
+                memory.expire(self.clock.now)
+                if len(memory) > 2:
+                    # Player is blocking a specific side repeatedly
+                    blocked_sides = [a["side"] for a in memory.latest(5)]
+                    if blocked_sides.count("left") > blocked_sides.count("right"):
+                        if anim.attack_side != "vent":
+                            anim.attack_side = "right"  # Try to attack from other side
+                    elif blocked_sides.count("right") > blocked_sides.count("left"):
+                        if anim.attack_side != "vent":
+                            anim.attack_side = "left"
+        
+        # Pack hunting behavior: multiple animatronics moving together
+        at_office = self.occupancy.occupants("Office")
+        if len(at_office) >= 2 and not self.timers.active("coordination") and self.game_state.minutes_elapsed >= 60:
+            # Increase mood and aggression for coordinated attack
+            for anim in at_office:
+                anim.mood = "aggressive"
+                anim.adaptive_aggro += 0.10
+                anim.block_count += 1  # simulate frustration from failed attacks
+            self.timers.start("coordination", 12.0)
+
+    def update_environmental_events(self, dt):
+        """Trigger random environmental events to add variety and tension"""
+        self.environmental_event_timer += dt
+        
+        # Trigger events at random intervals
+        if self.environmental_event_timer >= self.next_event_time:
+            self.trigger_random_event()
+            self.environmental_event_timer = 0
+            self.next_event_time = self.event_rng.uniform(20, 45)  # Next event in 20-45 seconds
+        
+        # Update light flickering
+        if self.game_state.lights_flickering:
+            self.game_state.flicker_timer += dt
+            if self.game_state.flicker_timer >= self.event_rng.uniform(2, 4):
+                self.game_state.lights_flickering = False
+                self.game_state.flicker_timer = 0
+
+    def end_hallucination(self):
+        """The "hallucination" timer ran out"""
+        self.hallucination_mode = False
+
+    def trigger_random_event(self):
+        """Trigger a random environmental event"""
+        events = [
+            "lights_flicker",
+            "temperature_drop",
+            "phantom_sound",
+            "camera_glitch",
+            "ventilation_block",
+            "power_surge",
+            "hallucination",
+            "door_malfunction"
+        ]
+        
+        # Weight events based on night and current situation
+        night = self.game_state.night
+        minutes = self.game_state.minutes_elapsed
+        
+        # More intense events on later nights
+        if night >= 3:
+            events.extend(["power_drain", "system_overload"])
+        if night >= 4:
+            events.extend(["blackout_threat", "animatronic_rush"])
+        
+        event = self.event_rng.choice(events)
+        
+        if event == "lights_flicker":
+            self.game_state.lights_flickering = True
+            self.game_state.flicker_timer = 0
+            self.emit_screen_shake(3, 0.3)
+            self.emit_color_overlay((255, 255, 200, 80), 0.5)
+            self.log_event("Lights flickering...")
+        
+        elif event == "temperature_drop":
+            self.game_state.temperature -= self.event_rng.randint(5, 15)
+            self.emit_color_overlay((100, 150, 255, 60), 2.0)
+            if self.game_state.temperature < 50:
+                self.log_event("Temperature critical!")
+                # Cold affects animatronic behavior (slower but more aggressive)
+                for anim in self.animatronics:
+                    anim.move_interval *= 1.2
+                    anim.adaptive_aggro += 0.1
+            else:
+                self.log_event(f"Temperature dropped to {self.game_state.temperature}°F")
+        
+        elif event == "phantom_sound":
+            fake_room = self.event_rng.choice(MAP.phantom_sound_rooms)
+            self.game_state.phantom_sounds.append(self.clock.now, {
+                'location': fake_room,
+                'type': 'phantom'
+            })
+            self.log_event(f"Strange noise from {fake_room}")
+        
+        elif event == "camera_glitch":
+            if self.office.cams_open:
+                self.office.cam_flash = 1.5
+                self.emit_screen_shake(5, 0.4)
+                # Create static particles
+                for _ in range(15):
+                    x = self.fx_rng.randint(0, self.game_state.width)
+                    y = self.fx_rng.randint(0, self.game_state.height)
+                    self.emit_particle_burst(x, y, 3, (200, 200, 255), (0.5, 2))
+                self.log_event("Camera system glitching!")
+        
+        elif event == "ventilation_block":
+            if not self.game_state.ventilation_blocked:
+                self.game_state.ventilation_blocked = True
+                self.log_event("Ventilation blocked - power drain increased!")
+                self.power.base_drain *= 1.3
+        
+        elif event == "power_surge":
+            surge_amount = self.event_rng.uniform(5, 15)
+            self.power.current = max(0, self.power.current - surge_amount)
+            self.emit_screen_shake(8, 0.5)
+            self.emit_color_overlay((255, 255, 100, 120), 0.3)
+            # Electric sparks
+            for _ in range(20):
+                x = self.fx_rng.randint(0, self.game_state.width)
+                y = self.fx_rng.randint(0, 100)
+                self.emit_particle_burst(x, y, 5, (255, 255, 100), (2, 5))
+            self.log_event(f"Power surge! Lost {int(surge_amount)}% power")
+        
+        elif event == "hallucination":
+            if night >= 3:
+                self.hallucination_mode = True
+                self.timers.start("hallucination", self.event_rng.uniform(10, 20))
+                self.emit_color_overlay((180, 100, 255, 100), 15.0)
+                self.emit_screen_shake(2, 15.0)
+                self.log_event("You feel disoriented...")
+        
+        elif event == "door_malfunction":
+            if self.event_rng.random() < 0.5:
+                self.office.door_left_health = max(20, self.office.door_left_health - 25)
+                self.log_event("Left door malfunctioning!")
+            else:
+                self.office.door_right_health = max(20, self.office.door_right_health - 25)
+                self.log_event("Right door malfunctioning!")
+        
+        elif event == "power_drain" and night >= 3:
+            # Gradual power drain over time
+            drain_amount = self.event_rng.uniform(2, 5)
+            self.power.current = max(0, self.power.current - drain_amount)
+            self.log_event("Unusual power drain detected")
+        
+        elif event == "animatronic_rush" and night >= 4:
+            # SOME animatronics become more active temporarily (not all)
+            affected = self.event_rng.randint(1, 3)  # Only 1-3 animatronics affected
+            for i, anim in enumerate(self.animatronics):
+                if i < affected:
+                    anim.mood = "cautious"  # Make them cautious, not hunting
+                    anim.hunting_mode = False  # Don't force hunt mode
+                    anim.adaptive_aggro += 0.15  # Just slightly more aggressive
+            self.emit_screen_shake(4, 0.8)
+            self.emit_color_overlay((255, 100, 50, 80), 1.5)
+            self.log_event("Unusual activity detected...")
+
+    def update_phantom_sounds(self, dt):
+        """Update and clean up phantom sound events"""
+        self.game_state.phantom_sounds.expire(self.clock.now)
+
+    def calculate_performance_score(self):
+        """Calculate player performance score for the night"""
+        score = 1000  # Base score
+        
+        # Bonus for efficient power usage
+        power_efficiency = (self.power.current / self.power.max) * 100
+        score += int(power_efficiency * 2)
+        
+        # Penalty for excessive door usage
+        score -= (self.total_door_closes * 5)
+        
+        # Bonus for camera usage (awareness)
+        score += min(self.total_camera_checks * 10, 300)
+        
+        # Bonus for perfect blocks
+        score += (self.perfect_blocks * 50)
+        
+        # Penalty for failed blocks
+        score -= (self.failed_blocks * 30)
+        
+        # Night multiplier
+        score = int(score * (1.0 + (self.game_state.night - 1) * 0.25))
+        
+        # Difficulty multiplier
+        score = int(score * self.difficulty)
+        
+        self.performance_score = max(0, score)
+
+    def determine_ending(self):
+        """Determine the ending based on performance and night"""
+        night = self.game_state.night
+        score = self.performance_score
+        power_left = self.power.current
+        
+        if night == 5 and score >= 2000:
+            self.set_status("6 AM! PERFECT NIGHT - You've mastered survival!")
+            self.game_state.ending_type = "perfect"
+        elif night == 5:
+            self.set_status("6 AM! You survived all nights - VICTORY!")
+            self.game_state.ending_type = "victory"
+        elif power_left > 50 and score >= 1500:
+            self.set_status(f"6 AM! Flawless performance on Night {night}!")
+            self.game_state.ending_type = "flawless"
+        elif power_left < 10:
+            self.set_status(f"6 AM! You barely made it through Night {night}...")
+            self.game_state.ending_type = "barely"
+        else:
+            self.set_status(f"6 AM! You survived Night {night}!")
+            self.game_state.ending_type = "standard"
+
+    def update_threat_assessment(self, dt):
+        """Bring threat_level (0-100) up to date from whatever changed since last tick"""
+        threat = self.threat
+        changed = threat.dirty
+
+        # Animatronics in office, a doorway room or close by (summed as they move)
+        if threat.animatronics != self.occupancy.weighted:
+            threat.animatronics = self.occupancy.weighted
+            changed = True
+
+        # Low power = threat
+        power = 0
+        for below, points in THREAT_POWER:
+            if self.power.current < below:
+                power = points
+                break
+        if power != threat.power:
+            threat.power = power
+            changed = True
+
+        # Door health = threat
+        office = self.office
+        doors = THREAT_WEAK_DOORS if (office.door_left_health + office.door_right_health) / 2 < THREAT_DOOR_HEALTH else 0
+        if doors != threat.doors:
+            threat.doors = doors
+            changed = True
+
+        if threat.dirty:
+            # Both doors open = vulnerability; emergency mode = maximum threat
+            threat.open_doors = THREAT_OPEN_DOORS if not office.door_left_closed and not office.door_right_closed else 0
+            threat.emergency = THREAT_EMERGENCY if self.power.outage and self.power.emergency_mode else 0
+            threat.dirty = False
+
+        if changed:
+            threat.level = min(100, threat.animatronics + threat.power + threat.doors
+                               + threat.open_doors + threat.emergency)
+            self.threat_level = threat.level
+
+    def update_audio_system(self, dt):
+        """Update footstep sounds and audio cues"""
+        current_time = self.clock.now
+        
+        # Clean up old footsteps
+        self.footstep_sounds.expire(current_time)
+        
+        # Add footsteps for moving animatronics
+        for anim in self.animatronics:
+            if anim.room != anim.last_room:
+                # Animatronic moved!
+                if anim.ability_code != SILENT_STALKER:
+                    self.footstep_sounds.append(current_time, {
+                        'name': anim.name,
+                        'location': anim.room,
+                        'intensity': anim.adaptive_aggro
+                    })
+                    
+                    # Log if close enough
+                    graph = room_graph()
+                    if graph.distance_to_office(anim.room) <= 2:
+                        direction = "nearby" if graph.is_office_adjacent(anim.room) else anim.room
+                        self.log_event(f"Footsteps from {direction}", True)
+
+    # =====================================================
+    # SPECIAL ABILITIES
+    # =====================================================
+
+    def update_abilities(self, dt):
+        """Run the special-ability effect tick every EFFECT_TICK seconds (several on a long step)"""
+        self.effect_timer += dt
+        while self.effect_timer >= EFFECT_TICK:
+            self.effect_timer -= EFFECT_TICK
+            self.ability_tick()
+
+    def ability_tick(self):
+        """One effect tick: run effect timers down, let ready abilities act, apply what they queued"""
+        office = self.office
+        cameras = self.cameras
+        if office.lights_out_timer > 0:
+            office.lights_out_timer = max(0.0, office.lights_out_timer - EFFECT_TICK)
+            if office.lights_out_timer <= 0 and not self.power.outage:
+                office.light_on = True
+                self.log_event("The lights flicker back on")
+        if cameras.jam_timer > 0:
+            cameras.jam_timer = max(0.0, cameras.jam_timer - EFFECT_TICK)
+        if cameras.mimic_timer > 0:
+            cameras.mimic_timer = max(0.0, cameras.mimic_timer - EFFECT_TICK)
+            if cameras.mimic_timer <= 0:
+                cameras.mimic_name = cameras.mimic_room = None
+
+        graph = room_graph()
+        minutes = self.game_state.minutes_elapsed
+        watched = cameras.current_camera() if office.cams_open else None
+        effects = AbilityEffects()
+        for anim in self.animatronics:
+            if anim.ability_cooldown > 0:
+                anim.ability_cooldown -= 1
+                if anim.ability_cooldown:
+                    continue
+            if anim.can_act(minutes) and self.ability_triggered(anim, graph.distance_to_office(anim.room), watched):
+                code = anim.ability_code
+                ABILITY_EFFECTS[code](self, anim, effects)
+                anim.ability_cooldown = ABILITY_COOLDOWN_TICKS[code]
+        self.apply_ability_effects(effects)
+
+    def ability_triggered(self, anim, distance, watched):
+        """Whether anim's ability would act now, cooldown aside: in range and its condition holds"""
+        code = anim.ability_code
+        low, high = ABILITY_HOPS[code]
+        if ABILITY_EFFECTS[code] is None or not low <= distance <= high:
+            return False
+        need = ABILITY_NEEDS[code]
+        if need == "lights":
+            return self.office.light_on and not self.power.outage
+        if need == "power":
+            return not self.power.outage
+        if need == "closed_door":
+            side = room_graph().office_door_side(anim.room)
+            return side == "left" and self.office.door_left_closed or side == "right" and self.office.door_right_closed
+        if need == "watched":
+            return anim.room == watched
+        if need == "unwatched":
+            return watched is not None and anim.room != watched and self.cameras.mimic_timer <= 0
+        return True
+
+    def use_light_killer(self, anim, effects):
+        """Cuts the office lights for a few seconds"""
+        effects.lights_out = max(effects.lights_out, ABILITY_DURATIONS[anim.ability_code])
+
+    def use_camera_jammer(self, anim, effects):
+        """Fills every camera feed with static while the player is watching it"""
+        effects.camera_jam = max(effects.camera_jam, ABILITY_DURATIONS[anim.ability_code])
+
+    def use_power_drainer(self, anim, effects):
+        """Leeches power while close to the office"""
+        effects.power_drain += POWER_DRAINER_RATE * EFFECT_TICK
+
+    def use_speed_demon(self, anim, effects):
+        """Dashes: its next move comes SPEED_DEMON_DASH seconds early"""
+        anim.move_cooldown -= SPEED_DEMON_DASH
+
+    def use_door_breaker(self, anim, effects):
+        """Batters the closed door it is standing at"""
+        effects.door_damage[room_graph().office_door_side(anim.room)] += DOOR_BREAKER_DAMAGE * EFFECT_TICK
+
+    def use_mimic(self, anim, effects):
+        """Shows up on the camera the player is watching while it is somewhere else"""
+        if effects.mimic is None:
+            effects.mimic = (anim.name, self.cameras.current_camera(), ABILITY_DURATIONS[anim.ability_code])
+
+    def use_teleporter(self, anim, effects):
+        """Skips a room on its way to the office"""
+        graph = room_graph()
+        room = graph.next_hop(graph.next_hop(anim.room, "Office"), "Office")
+        anim.last_room = anim.room
+        anim.move_to(room)
+        anim.target_x, anim.target_y = room_position(room, WINDOW_WIDTH, WINDOW_HEIGHT)
+        anim.x, anim.y = anim.target_x, anim.target_y
+
+    def apply_ability_effects(self, effects):
+        """Apply one effect tick's queued effects to the power, the doors, the lights and the cameras"""
+        office = self.office
+        if effects.power_drain and not self.power.outage:
+            self.power.current = max(0, self.power.current - effects.power_drain)
+
+        if effects.door_damage["left"]:
+            office.door_left_health = max(0.0, office.door_left_health - effects.door_damage["left"])
+            if office.door_left_health <= 0 and not self.door_jammed("left"):
+                self.break_door("left")
+        if effects.door_damage["right"]:
+            office.door_right_health = max(0.0, office.door_right_health - effects.door_damage["right"])
+            if office.door_right_health <= 0 and not self.door_jammed("right"):
+                self.break_door("right")
+
+        if effects.lights_out:
+            office.light_on = False
+            office.lights_out_timer = max(office.lights_out_timer, effects.lights_out)
+            self.emit_color_overlay((0, 0, 0, 160), 0.4)
+            self.log_event("The lights cut out!")
+
+        if effects.camera_jam:
+            self.cameras.jam_timer = max(self.cameras.jam_timer, effects.camera_jam)
+            office.cam_flash = 1.0
+            self.log_event("Camera feed jammed!")
+
+        if effects.mimic is not None:
+            self.cameras.mimic_name, self.cameras.mimic_room, self.cameras.mimic_timer = effects.mimic
+
+    def end_combo(self):
+        """The "combo" timer ran out before the next perfect block"""
+        self.combo_blocks = 0
+
+    def toggle_door(self, side):
+        """Toggle a door with enhanced visual feedback"""
+        if self.power.outage:
+            return
+        
+        # Check for door spam (prevent rapid toggling exploit)
+        self.door_toggle_history[side].append(self.clock.now, side)
+        
+        # If more than 6 toggles in 5 seconds, it's spam
+        if len(self.door_toggle_history[side]) > 6:
+            self.door_spam_penalty += 8.0  # Extra power drain
+            self.set_status(f"Door mechanism stressed! Extra power drain!")
+            # Damage door more from stress
+            if side == "left":
+                self.office.door_left_health = max(0, self.office.door_left_health - 15)
+            else:
+                self.office.door_right_health = max(0, self.office.door_right_health - 15)
+
+        if side == "left":
+            if self.office.door_left_closed:
+                # Opening door
+                self.office.door_left_closed = False
+                self.threat.mark()
+                sound = "door_open"
+                self.emit("door_effect", side=side, kind="open")
+            else:
+                # Closing door - requires health and no jam
+                if self.door_jammed("left") or self.office.door_left_health <= 0:
+                    self.set_status("Left door jammed!")
+                    self.emit("door_effect", side=side, kind="jammed")
+                    return
+                self.office.door_left_closed = True
+                self.threat.mark()
+                self.office.door_left_health = max(0, self.office.door_left_health - 6)
+                sound = "door_close"
+                self.total_door_closes += 1
+                self.emit("door_effect", side=side, kind="slam")
+                # Check if this was a perfect block
+                if self.attacker_at_door("left"):
+                    self.perfect_blocks += 1
+                    self.combo_blocks += 1
+                    self.timers.start("combo", 5.0)  # 5 seconds to chain
+                    self.emit_screen_shake(2, 0.2)
+                    self.emit("door_effect", side=side, kind="perfect")
+                self.check_reflex_cheat("left")
+            self.play_sound(sound)
+        elif side == "right":
+            if self.office.door_right_closed:
+                # Opening door
+                self.office.door_right_closed = False
+                self.threat.mark()
+                sound = "door_open"
+                self.emit("door_effect", side=side, kind="open")
+            else:
+                # Closing door - requires health and no jam
+                if self.door_jammed("right") or self.office.door_right_health <= 0:
+                    self.set_status("Right door jammed!")
+                    self.emit("door_effect", side=side, kind="jammed")
+                    return
+                self.office.door_right_closed = True
+                self.threat.mark()
+                self.office.door_right_health = max(0, self.office.door_right_health - 6)
+                sound = "door_close"
+                self.total_door_closes += 1
+                self.emit("door_effect", side=side, kind="slam")
+                # Check if this was a perfect block
+                if self.attacker_at_door("right"):
+                    self.perfect_blocks += 1
+                    self.combo_blocks += 1
+                    self.timers.start("combo", 5.0)  # 5 seconds to chain
+                    self.emit_screen_shake(2, 0.2)
+                    self.emit("door_effect", side=side, kind="perfect")
+                self.check_reflex_cheat("right")
+            self.play_sound(sound)
+
+    def attacker_at_door(self, side):
+        """True if an animatronic that attacks through this door is in a doorway room
+
+        Under rules 0 this looked for a "Hallway" room that does not exist, so
+        no block was ever perfect and they never reached the score.
+        """
+        return any(anim.attack_side == side
+                   for room in MAP.graph[MAP.office] for anim in self.occupancy.occupants(room))
+
+    def toggle_flashlight(self):
+        """Toggle flashlight with particle effect"""
+        if self.power.outage:
+            return
+        if self.office.lights_out_timer > 0 and not self.office.light_on:
+            self.set_status("The lights won't come on...")
+            return
+        self.office.light_on = not self.office.light_on
+        self.play_sound("light_toggle")
+        
+        if self.office.light_on:
+            self.emit("flashlight_on")
+
+    def toggle_cameras(self):
+        """Toggle camera view with enhanced effects"""
+        if self.power.outage:
+            return
+        self.office.cams_open = not self.office.cams_open
+        if self.office.cams_open:
+            self.office.cam_flash = 1.0
+            self.total_camera_checks += 1
+        # Flash sound, static loop and VHS burst are handled by observers
+        self.emit("cameras_toggled", opened=self.office.cams_open)
+
+    def switch_camera(self, index):
+        """Switch to a specific camera with enhanced flash"""
+        if 0 <= index < len(self.cameras.cameras):
+            self.cameras.switch(index)
+            if self.office.cams_open:
+                self.office.cam_flash = 1.0
+                self.emit("camera_switched", index=index)
+
+    def use_barricade(self):
+        """Reinforce doors with barricades"""
+        if self.power.current < 15:
+            self.set_status("Not enough power for barricade!")
+            return
+        
+        # Toggle which side to barricade based on which door is weaker
+        if self.office.door_left_health < self.office.door_right_health:
+            if self.office.barricade_left < 3:
+                self.office.barricade_left += 1
+                self.office.door_left_health = min(100, self.office.door_left_health + 25)
+                self.power.current = max(0, self.power.current - 10)
+                self.log_event(f"Left door barricaded (Lvl {self.office.barricade_left})")
+                self.emit_screen_shake(3, 0.3)
+            else:
+                self.set_status("Left door fully barricaded!")
+        else:
+            if self.office.barricade_right < 3:
+                self.office.barricade_right += 1
+                self.office.door_right_health = min(100, self.office.door_right_health + 25)
+                self.power.current = max(0, self.power.current - 10)
+                self.log_event(f"Right door barricaded (Lvl {self.office.barricade_right})")
+                self.emit_screen_shake(3, 0.3)
+            else:
+                self.set_status("Right door fully barricaded!")
+
+    def deploy_noise_maker(self, room):
+        """Deploy noise maker to specific room to lure animatronics"""
+        if self.office.noise_maker_charges <= 0:
+            self.set_status("No noise makers left!")
+            return
+        
+        if self.timers.active("noise_maker"):
+            self.set_status(f"Noise maker cooling down: {int(self.timers.remaining('noise_maker'))}s")
+            return
+        
+        self.office.noise_maker_charges -= 1
+        self.timers.start("noise_maker", 15.0)
+        
+        # All animatronics head to the selected room thinking they heard something
+        lured = 0
+        for anim in self.animatronics:
+            # Set them to hunt the lure location
+            anim.hunt_target_room = room
+            # Each animatronic has different time based on their traits
+            # sound_sensitivity: 0.5-1.5, patience: 0.5-2.0 (from Animatronic.__init__)
+            # Formula: 6.0 + (sensitivity * 3.0) + (patience * 2.0) = 5.0-12.0 seconds
+            # More sensitive/patient animatronics stay distracted longer
+            base_duration = 6.0 + (anim.sound_sensitivity * 3.0) + (anim.patience * 2.0)
+            anim.hunting_timer = min(12.0, max(5.0, base_duration))
+            anim.hunting_mode = True
+            anim.mood = "hunting"
+            lured += 1
+        
+        if lured > 0:
+            self.set_status(f"Deployed noise maker in {room}! Lured {lured} animatronic(s)!")
+            self.emit_screen_shake(3, 0.8)
+            self.emit_color_overlay((100, 255, 100, 100), 1.2)
+            self.log_event(f"Noise maker deployed in {room}")
+        else:
+            self.set_status("No animatronics to lure!")
+
+    def toggle_vent_system(self):
+        """Toggle ventilation to reduce camera heat"""
+        if self.power.current < 5:
+            self.set_status("Not enough power for ventilation!")
+            return
+        
+        self.office.vent_system_active = not self.office.vent_system_active
+        
+        if self.office.vent_system_active:
+            self.log_event("Ventilation system ON")
+            self.power.base_drain += 0.05  # Small power cost
+        else:
+            self.log_event("Ventilation system OFF")
+            self.power.base_drain = max(0.16, self.power.base_drain - 0.05)
+
+    def leave_safe_spot(self):
+        """The "safe_spot" timer ran out: back to the desk"""
+        self.current_safe_spot = None
+
+    def use_safe_spot(self):
+        """Hide in a safe spot temporarily"""
+        if self.current_safe_spot:
+            self.set_status("Already in safe spot!")
+            return
+        
+        if not self.safe_spots_available:
+            self.set_status("No safe spots available!")
+            return
+        
+        # Can only use if threat is high enough
+        if self.threat_level < 50:
+            self.set_status("Not dangerous enough to hide!")
+            return
+        
+        # Choose random safe spot
+        spot = self.event_rng.choice(self.safe_spots_available)
+        self.current_safe_spot = spot
+        self.timers.start("safe_spot", 8.0)  # 8 seconds of safety
+        self.safe_spots_available.remove(spot)
+        
+        self.log_event(f"Hiding in {spot}!")
+        self.emit_color_overlay((50, 50, 50, 200), 8.0)
+        
+        # Animatronics lose track temporarily (pushed out to the doorway on their
+        # attack side; rules 0 sent them to a "Hallway" that was on no map)
+        for anim in self.occupancy.occupants("Office"):
+            doorway = (MAP.doorways.get(anim.attack_side) or MAP.graph[MAP.office])[0]
+            anim.move_to(doorway)
+            anim.target_x, anim.target_y = room_position(doorway, WINDOW_WIDTH, WINDOW_HEIGHT)
+
+
+# =====================================================
+# SPECIAL ABILITIES
+# =====================================================
+
+class AbilityEffects:
+    """Everything the abilities queued during one effect tick, applied together"""
+    __slots__ = ("power_drain", "door_damage", "lights_out", "camera_jam", "mimic")
+
+    def __init__(self):
+        self.power_drain = 0.0
+        self.door_damage = {"left": 0.0, "right": 0.0}
+        self.lights_out = 0.0  # Seconds the lights stay off
+        self.camera_jam = 0.0  # Seconds of static
+        self.mimic = None  # (name, camera room, seconds)
+
+
+# Special abilities in code order: (name, cooldown s, effect s, (min, max) hops
+# from the Office, condition, effect or None). An ability acts on an effect tick
+# when its owner can act, is in range and the condition holds; a cooldown of 0
+# acts on every such tick. Animatronic draws its ability from this order, which
+# replays depend on - append new ones at the end.
+ABILITIES = (
+    ("light_killer", 45.0, 6.0, (1, 2), "lights", Simulation.use_light_killer),
+    ("camera_jammer", 30.0, 4.0, (1, UNREACHABLE), "watched", Simulation.use_camera_jammer),
+    ("power_drainer", 0.0, 0.0, (1, 3), "power", Simulation.use_power_drainer),
+    ("speed_demon", 12.0, 0.0, (2, UNREACHABLE), None, Simulation.use_speed_demon),
+    ("door_breaker", 0.0, 0.0, (1, 1), "closed_door", Simulation.use_door_breaker),
+    ("silent_stalker", 0.0, 0.0, (0, 0), None, None),  # Passive: its moves make no footsteps
+    ("mimic", 20.0, 6.0, (2, UNREACHABLE), "unwatched", Simulation.use_mimic),
+    ("teleporter", 35.0, 0.0, (3, UNREACHABLE), None, Simulation.use_teleporter),
+)
+ABILITY_NAMES = tuple(row[0] for row in ABILITIES)
+ABILITY_CODES = {name: code for code, name in enumerate(ABILITY_NAMES)}
+ABILITY_COOLDOWN_TICKS = tuple(int(round(row[1] / EFFECT_TICK)) for row in ABILITIES)
+ABILITY_DURATIONS = tuple(row[2] for row in ABILITIES)
+ABILITY_HOPS = tuple(row[3] for row in ABILITIES)
+ABILITY_NEEDS = tuple(row[4] for row in ABILITIES)
+ABILITY_EFFECTS = tuple(row[5] for row in ABILITIES)
+SILENT_STALKER = ABILITY_CODES["silent_stalker"]
+POWER_DRAINER = ABILITY_CODES["power_drainer"]
+DOOR_BREAKER = ABILITY_CODES["door_breaker"]
@@ -0,0 +1,492 @@
+"""
+Binary snapshots of a running night for Five Nights at Mr Ingles's.
+
+take(sim) packs everything that decides how a night plays out - the
+Simulation's own timers, stats and custom-night roster, GameState,
+PowerSystem, Office, cameras, Jumpscare, the look-ahead player habits, every
+Animatronic, the time-windowed memories, room occupancy order and all three
+random streams - into a few KB of bytes, and restore(sim, data) puts a
+Simulation back in exactly that state. Stepping the restored sim with the
+same inputs gives the same night, tick for tick.
+
+    header   b"FNMISNP" + format version byte + layout checksum (uint32)
+    strings  uint32 count + uint32 byte length + NUL-separated UTF-8
+    map      building map name (string id) + checksum (uint32)
+    body     each section's fields in LAYOUTS order
+
+A snapshot only restores on the building map it was taken on (same
+checksum, see building_map.map_checksum).
+
+The sim's timer wheel is saved as its time plus {timer name: deadline} in
+start order and rebuilt on restore. The occupancy threat sum and the threat
+breakdown are derived, so restore recomputes them instead of reading them.
+
+Every string (rooms, moods, names, states...) is stored once in the string
+table and referenced by id, with id 0 meaning None. Plain fields of each
+class are packed with one precompiled struct, so taking or restoring a
+snapshot is a handful of struct calls rather than a walk over object dicts.
+The layout checksum changes whenever a layout below does, so snapshots from
+another build are refused instead of restored wrong.
+
+The classes use __slots__, and every slot must be listed in a layout (or in
+its "not saved" references) - adding an attribute without saying how to
+snapshot it fails at import time.
+
+    data = snapshot.take(sim)     # e.g. at the start of every in-game hour
+    ...
+    snapshot.restore(sim, data)   # retry from there
+    branch = snapshot.clone(sim)  # independent copy to simulate ahead with
+"""
+
+import struct
+import zlib
+from collections import Counter
+from itertools import repeat
+from operator import attrgetter
+
+from simulation import (Simulation, GameState, PowerSystem, Office, CameraSystem, Jumpscare,
+                        Animatronic, TimedWindow, threat_weights, current_map)
+from planner import PlayerHabits
+
+MAGIC = b"FNMISNP"
+FORMAT_VERSION = 2
+
+
+class SnapshotError(ValueError):
+    """Raised for data that is not a snapshot, is damaged or comes from another build"""
+
+
+# Field kinds:
+#   d float   q int   ? bool   s string or None (string table id)
+#   S list of strings   f {string: float}
+#   w:ITEM TimedWindow of ITEM-shaped items   W:ITEM {string: TimedWindow}
+#   r custom night roster [(string, int, int)] or None
+# Plain kinds (d q ? s) go through the class's struct; the rest follow in order.
+LAYOUTS = {
+    Simulation: (
+        "run_seed q", "difficulty d", "ai_lod_interval q", "tick_count q", "noise_maker_rooms S",
+        "entry_cooldown_seconds d", "max_office_attackers q", "door_open_limit d", "power_usage f",
+        "phantom_sound_cooldown d", "environmental_event_timer d", "next_event_time d", "effect_timer d",
+        "hallucination_mode ?", "coordinated_attack_cooldown d", "active_coordination s",
+        "total_door_closes q", "total_camera_checks q", "perfect_blocks q", "failed_blocks q",
+        "performance_score q", "threat_level d", "safe_spots_available S", "current_safe_spot s",
+        "footstep_sounds w:name=s,location=s,intensity=d", "combo_blocks q",
+        "reflex_blocks q", "last_reflex_time d", "last_office_entry_time f", "anti_cheat_active ?",
+        "anti_cheat_timer d", "anti_cheat_pending ?", "door_toggle_history W:s", "door_spam_penalty d",
+        "flicker_phase d", "lookahead q", "roster r",
+    ),
+    GameState: (
+        "state s", "night q", "max_night_unlocked q", "hour q", "hour_timer d", "seconds_per_hour d",
+        "minutes_elapsed q", "width q", "height q", "status s", "start_time d", "ending_type s",
+        "active_events S", "event_cooldown d", "lights_flickering ?", "flicker_timer d", "hallway_darkness d",
+        "temperature q", "ventilation_blocked ?", "phantom_sounds w:location=s,type=s", "chromatic_aberration d",
+        "screen_distortion d", "vhs_effect d", "glow_intensity d", "scan_line_offset d",
+    ),
+    PowerSystem: (
+        "max d", "current d", "base_drain d", "door_drain d", "light_drain d", "cam_drain d", "outage ?",
+        "emergency_mode ?", "reserve_power d",
+    ),
+    Office: (
+        "door_left_closed ?", "door_right_closed ?", "light_on ?", "cams_open ?", "door_left_progress d",
+        "door_right_progress d", "light_dim d", "cam_flash d", "door_left_health d", "door_right_health d",
+        "door_left_open_timer d", "door_right_open_timer d",
+        "flashlight_battery d", "vent_system_active ?", "barricade_left q", "barricade_right q",
+        "noise_maker_charges q", "safe_mode_timer d", "movement_noise_level d", "lights_out_timer d",
+    ),
+    CameraSystem: ("cameras S", "current_index q", "jam_timer d", "mimic_name s", "mimic_room s", "mimic_timer d"),
+    Jumpscare: ("active ?", "timer d", "duration d", "killer s", "zoom d", "fly_duration d"),
+    Animatronic: (
+        "name s", "archetype s", "_room s", "base_aggro d", "base_interval d", "aggro d", "move_interval d", "timer d",
+        "style s", "attack_side s", "size_multiplier d", "display_width q", "display_height q",
+        "patrol_route S", "patrol_index q", "move_cooldown d", "hallway_timer d", "attack_windup d",
+        "attack_windup_required d", "start_delay_minutes q", "hallway_entry_delay d", "aggression_ramp d",
+        "x d", "y d", "target_x d", "target_y d", "visible_on_cam ?", "mood_code q", "mood_timer d",
+        "player_action_memory w:action=s,side=s", "target_player_room s", "communication_cooldown d", "hunting_mode ?",
+        "hunting_timer d", "hunt_target_room s", "investigating ?", "investigation_timer d",
+        "adaptive_aggro d", "last_blocked_time d", "block_count q", "retreat_timer d", "retreat_target s",
+        "last_room s", "hallway_block_timer d", "lod_pending_dt d", "personality_code q", "patience d",
+        "curiosity d", "persistence d", "teamwork d", "deception d", "sound_sensitivity d",
+        "camera_awareness d", "is_decoy ?", "decoy_timer d", "last_player_action_time d", "stalking_mode ?",
+        "ambush_position s", "fake_movement_cooldown d", "ability_code q", "ability_cooldown q",
+        "plan_room s", "plan_rollouts q", "plan_scores f",
+    ),
+    PlayerHabits: ("door_left d", "door_right d", "watch_time f", "observed d"),
+}
+
+# Slots that point at shared objects; restore re-attaches them to the target sim
+NOT_SAVED = {
+    Animatronic: {"occupancy", "clock", "rng"},
+}
+
+PLAIN_KINDS = "dq?s"
+STRUCT_CODES = {"d": "d", "q": "q", "?": "?", "s": "I"}
+RNG_STATE = struct.Struct("<B625I?d")
+HEADER = struct.Struct(f"<{len(MAGIC)}sBI")
+U16 = struct.Struct("<H")
+STRING_TABLE = struct.Struct("<II")
+WINDOW_HEAD = struct.Struct("<dqH")
+CLOCK = struct.Struct("<d")
+ROOM_HEAD = struct.Struct("<IH")
+MAP_HEAD = struct.Struct("<II")
+
+
+# =====================================================
+# WRITING / READING HELPERS
+# =====================================================
+
+class _Writer:
+    """Output chunks plus the string table being built"""
+    def __init__(self):
+        self.chunks = []
+        self.ids = {None: 0}
+
+    def intern(self, text):
+        index = self.ids.get(text)
+        if index is None:
+            index = self.ids[text] = len(self.ids)
+        return index
+
+    def intern_all(self, texts):
+        """String table ids for a list of strings (or Nones)"""
+        ids = self.ids
+        for text in dict.fromkeys(texts):
+            if text not in ids:
+                ids[text] = len(ids)
+        return list(map(ids.__getitem__, texts))
+
+    def pack(self, code, values):
+        """Append a count-prefixed array of one struct code"""
+        self.chunks.append(struct.pack(f"<H{len(values)}{code}", len(values), *values))
+
+    def getvalue(self):
+        strings = [text for text in self.ids if text is not None]
+        blob = "\0".join(strings).encode("utf-8")
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, LAYOUT_CHECKSUM) + STRING_TABLE.pack(len(strings), len(blob))
+        return b"".join([header, blob] + self.chunks)
+
+
+class _Reader:
+    """Cursor over a snapshot, with its string table decoded"""
+    def __init__(self, data):
+        if len(data) < HEADER.size + STRING_TABLE.size:
+            raise SnapshotError("snapshot is truncated")
+        magic, version, checksum = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise SnapshotError("not a Mr Ingles snapshot")
+        if version != FORMAT_VERSION or checksum != LAYOUT_CHECKSUM:
+            raise SnapshotError("snapshot was taken by a different version of the game")
+        count, length = STRING_TABLE.unpack_from(data, HEADER.size)
+        self.pos = HEADER.size + STRING_TABLE.size
+        blob = bytes(data[self.pos:self.pos + length]).decode("utf-8")
+        self.strings = [None] + (blob.split("\0") if count else [])
+        self.pos += length
+        self.data = data
+
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.data, self.pos)
+        self.pos += fmt.size
+        return values
+
+    def array(self, code, count):
+        """count values of one struct code (strings resolved through the table)"""
+        fmt = f"<{count}{STRUCT_CODES[code]}"
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        if code == "s":
+            return list(map(self.strings.__getitem__, values))
+        return values
+
+    def counted(self, code):
+        """A count-prefixed array written by _Writer.pack"""
+        return self.array(code, self.unpack(U16)[0])
+
+
+def _put_strings(out, values):
+    out.pack("I", out.intern_all(values))
+
+
+def _get_strings(reader):
+    return list(reader.counted("s"))
+
+
+def _put_floats(out, table):
+    out.pack("I", out.intern_all(list(table)))
+    out.chunks.append(struct.pack(f"<{len(table)}d", *table.values()))
+
+
+def _get_floats(reader):
+    keys = reader.counted("s")
+    return dict(zip(keys, reader.array("d", len(keys))))
+
+
+class _WindowCodec:
+    """TimedWindow whose items all have one declared shape, stored column by column
+
+    item_spec is a single kind for bare items ("s") or "name=kind,..." for
+    dict items, e.g. "location=s,type=s".
+    """
+    def __init__(self, item_spec):
+        if "=" in item_spec:
+            self.fields = [tuple(field.split("=")) for field in item_spec.split(",")]
+        else:
+            self.fields = [(None, item_spec)]
+        self.names = [name for name, _ in self.fields]
+
+    def put(self, out, window):
+        entries = window._entries
+        count = len(entries)
+        out.chunks.append(WINDOW_HEAD.pack(window.window, window.capacity, count))
+        if count:
+            items = [entry[2] for entry in entries]
+            columns = [("d", [entry[0] for entry in entries]), ("s", [entry[1] for entry in entries])]
+            for name, kind in self.fields:
+                columns.append((kind, items if name is None else [item[name] for item in items]))
+            for kind, column in columns:
+                if kind == "s":
+                    column = out.intern_all(column)
+                out.chunks.append(struct.pack(f"<{count}{STRUCT_CODES[kind]}", *column))
+        out.pack("I", out.intern_all(list(window.totals)))
+        out.chunks.append(struct.pack(f"<{len(window.totals)}q", *window.totals.values()))
+
+    def get(self, reader):
+        seconds, capacity, count = reader.unpack(WINDOW_HEAD)
+        window = TimedWindow(seconds, capacity)
+        if count:
+            times = reader.array("d", count)
+            keys = reader.array("s", count)
+            columns = [reader.array(kind, count) for _, kind in self.fields]
+            if self.names[0] is None:
+                items = columns[0]
+            else:
+                items = map(dict, map(zip, repeat(self.names), zip(*columns)))
+            window._entries.extend(zip(times, keys, items))
+            window.counts = dict(Counter(keys))
+        keys = reader.counted("s")
+        window.totals = dict(zip(keys, reader.array("q", len(keys))))
+        return window
+
+    def put_all(self, out, windows):
+        out.pack("I", out.intern_all(list(windows)))
+        for window in windows.values():
+            self.put(out, window)
+
+    def get_all(self, reader):
+        return {key: self.get(reader) for key in reader.counted("s")}
+
+
+def _put_roster(out, roster):
+    # Entry count + 1, so 0 can stand for the story roster (None)
+    out.chunks.append(U16.pack(0 if roster is None else len(roster) + 1))
+    if roster is not None:
+        out.pack("I", out.intern_all([name for name, _, _ in roster]))
+        out.pack("q", [count for _, count, _ in roster])
+        out.pack("q", [level for _, _, level in roster])
+
+
+def _get_roster(reader):
+    if not reader.unpack(U16)[0]:
+        return None
+    return list(zip(reader.counted("s"), reader.counted("q"), reader.counted("q")))
+
+
+def _extra_codec(kind):
+    """(put, get) for the non-struct field kinds"""
+    if kind == "r":
+        return _put_roster, _get_roster
+    if kind == "S":
+        return _put_strings, _get_strings
+    if kind == "f":
+        return _put_floats, _get_floats
+    codec = _WindowCodec(kind[2:])
+    if kind.startswith("w:"):
+        return codec.put, codec.get
+    if kind.startswith("W:"):
+        return codec.put_all, codec.get_all
+    raise TypeError(f"unknown snapshot field kind {kind!r}")
+
+
+# =====================================================
+# PER-CLASS LAYOUTS
+# =====================================================
+
+class _Layout:
+    """Precompiled struct + attribute getter for one class's fields"""
+    def __init__(self, cls, spec):
+        fields = [item.split() for item in spec]
+        plain = [(name, kind) for name, kind in fields if kind in PLAIN_KINDS]
+        self.names = [name for name, _ in plain]
+        self.string_slots = [i for i, (_, kind) in enumerate(plain) if kind == "s"]
+        self.struct = struct.Struct("<" + "".join("I" if kind == "s" else kind for _, kind in plain))
+        getter = attrgetter(*self.names)
+        # attrgetter returns a bare value, not a tuple, for a single name
+        self.get = getter if len(self.names) > 1 else (lambda obj: (getter(obj),))
+        self.extra = [(name, _extra_codec(kind)) for name, kind in fields if kind not in PLAIN_KINDS]
+
+        slots = getattr(cls, "__slots__", None)
+        if slots is not None:
+            covered = {name for name, _ in fields} | NOT_SAVED.get(cls, set())
+            missing = set(slots) - covered
+            if missing:
+                raise TypeError(f"{cls.__name__} slots missing from the snapshot layout: {sorted(missing)}")
+
+    def put(self, out, obj):
+        values = list(self.get(obj))
+        for i in self.string_slots:
+            values[i] = out.intern(values[i])
+        try:
+            out.chunks.append(self.struct.pack(*values))
+        except struct.error as e:
+            raise SnapshotError(f"can't pack {type(obj).__name__}: {e}") from e
+        for name, (put, _) in self.extra:
+            put(out, getattr(obj, name))
+
+    def get_into(self, reader, obj):
+        values = list(reader.unpack(self.struct))
+        strings = reader.strings
+        for i in self.string_slots:
+            values[i] = strings[values[i]]
+        for name, value in zip(self.names, values):
+            setattr(obj, name, value)
+        for name, (_, get) in self.extra:
+            setattr(obj, name, get(reader))
+
+
+_LAYOUTS = {cls: _Layout(cls, spec) for cls, spec in LAYOUTS.items()}
+LAYOUT_CHECKSUM = zlib.crc32(repr(sorted((cls.__name__, spec) for cls, spec in LAYOUTS.items())).encode("utf-8"))
+
+SIM, GAME_STATE, POWER, OFFICE, CAMERAS, JUMPSCARE, ANIMATRONIC, HABITS = (
+    _LAYOUTS[cls] for cls in (Simulation, GameState, PowerSystem, Office, CameraSystem, Jumpscare, Animatronic,
+                              PlayerHabits))
+
+
+def _put_rng(out, rng):
+    version, state, gauss = rng.getstate()
+    out.chunks.append(RNG_STATE.pack(version, *state, gauss is not None, gauss or 0.0))
+
+
+def _get_rng(reader, rng):
+    values = reader.unpack(RNG_STATE)
+    rng.setstate((values[0], values[1:626], values[627] if values[626] else None))
+
+
+# =====================================================
+# SNAPSHOT / RESTORE
+# =====================================================
+
+def take(sim):
+    """Pack the whole state of a Simulation into bytes"""
+    out = _Writer()
+    building_map = current_map()
+    out.chunks.append(MAP_HEAD.pack(out.intern(building_map.name), building_map.checksum))
+    SIM.put(out, sim)
+    out.chunks.append(CLOCK.pack(sim.clock.now))
+    out.chunks.append(CLOCK.pack(sim.timers.now))
+    _put_floats(out, sim.timers.deadlines)
+    GAME_STATE.put(out, sim.game_state)
+    POWER.put(out, sim.power)
+    OFFICE.put(out, sim.office)
+    CAMERAS.put(out, sim.cameras)
+    JUMPSCARE.put(out, sim.jumpscare)
+    HABITS.put(out, sim.planner.habits)
+
+    out.chunks.append(U16.pack(len(sim.animatronics)))
+    for anim in sim.animatronics:
+        ANIMATRONIC.put(out, anim)
+
+    # Occupancy order decides who "occupants" lists first, so keep it exactly
+    index = {anim: i for i, anim in enumerate(sim.animatronics)}
+    out.chunks.append(U16.pack(len(sim.occupancy.rooms)))
+    for room, occupants in sim.occupancy.rooms.items():
+        members = [index[anim] for anim in occupants]
+        out.chunks.append(struct.pack(f"<IH{len(members)}H", out.intern(room), len(members), *members))
+
+    for rng in (sim.ai_rng, sim.event_rng, sim.fx_rng):
+        _put_rng(out, rng)
+    return out.getvalue()
+
+
+def restore(sim, data):
+    """Put a Simulation back into the state a snapshot was taken in (observers are kept)"""
+    reader = _Reader(data)
+    try:
+        name, checksum = reader.unpack(MAP_HEAD)
+        name = reader.strings[name]
+    except (struct.error, IndexError) as e:
+        raise SnapshotError(f"snapshot is damaged: {e}") from e
+    building_map = current_map()
+    if checksum != building_map.checksum:
+        raise SnapshotError(f"snapshot was taken on map {name!r} ({checksum:08x}), "
+                            f"not {building_map.name!r} ({building_map.checksum:08x})")
+    try:
+        SIM.get_into(reader, sim)
+        sim.clock.now = reader.unpack(CLOCK)[0]
+        sim.timers.restore(reader.unpack(CLOCK)[0], _get_floats(reader))
+        GAME_STATE.get_into(reader, sim.game_state)
+        POWER.get_into(reader, sim.power)
+        OFFICE.get_into(reader, sim.office)
+        CAMERAS.get_into(reader, sim.cameras)
+        JUMPSCARE.get_into(reader, sim.jumpscare)
+        HABITS.get_into(reader, sim.planner.habits)
+
+        count = reader.unpack(U16)[0]
+        if len(sim.animatronics) != count:
+            sim.animatronics = [Animatronic.__new__(Animatronic) for _ in range(count)]
+        for anim in sim.animatronics:
+            ANIMATRONIC.get_into(reader, anim)
+            anim.clock = sim.clock
+            anim.rng = sim.ai_rng
+            anim.occupancy = sim.occupancy
+
+        rooms = {}
+        for _ in range(reader.unpack(U16)[0]):
+            room, size = reader.unpack(ROOM_HEAD)
+            members = reader.unpack(struct.Struct(f"<{size}H"))
+            rooms[reader.strings[room]] = {sim.animatronics[i]: None for i in members}
+        sim.occupancy.restore(rooms, threat_weights())
+        sim.threat.reset()
+
+        for rng in (sim.ai_rng, sim.event_rng, sim.fx_rng):
+            _get_rng(reader, rng)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise SnapshotError(f"snapshot is damaged: {e}") from e
+    return sim
+
+
+def clone(sim):
+    """Independent copy of a Simulation (without its observers), e.g. to simulate ahead"""
+    return restore(Simulation(run_seed=sim.run_seed, difficulty=sim.difficulty), take(sim))
+
+
+# =====================================================
+# HOURLY CHECKPOINTS
+# =====================================================
+
+class HourCheckpoints:
+    """A snapshot at the start of every in-game hour, for "retry from this hour" """
+    def __init__(self):
+        self.snapshots = {}  # hour index (0 = 12 AM) -> snapshot bytes
+
+    def clear(self):
+        self.snapshots = {}
+
+    def update(self, sim):
+        """Call after each step while playing; snapshots the first tick of a new hour"""
+        hour = sim.game_state.minutes_elapsed // 60
+        if hour not in self.snapshots and sim.game_state.state == "playing":
+            self.snapshots[hour] = take(sim)
+
+    def latest(self):
+        """(hour, snapshot) of the most recent hour reached, or None"""
+        if not self.snapshots:
+            return None
+        hour = max(self.snapshots)
+        return hour, self.snapshots[hour]
+
+    def retry(self, sim):
+        """Restore sim to the latest checkpoint; returns its hour, or None if there is none"""
+        latest = self.latest()
+        if latest is None:
+            return None
+        hour, data = latest
+        restore(sim, data)
+        return hour
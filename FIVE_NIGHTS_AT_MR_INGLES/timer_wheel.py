@@ -0,0 +1,205 @@
+"""
+Timer wheel for Five Nights at Mr Ingles's.
+
+Cooldowns and countdowns (door jams, entry cooldowns, combo windows, backup
+power, screen shake, ambient sound scheduling, ...) are named timers on a
+TimerWheel instead of floats that every frame decrements by hand. A timer
+stores the time it runs out; remaining() works that out on demand for the
+HUD, and advance() only touches the wheel slots time has moved past, so a
+frame costs the same whether two timers are running or two hundred. The
+callback registered for a name runs when its timer runs out.
+
+    timers = TimerWheel()
+    timers.on_expire("combo", reset_combo)
+    timers.start("combo", 5.0)
+    ...
+    timers.advance(dt)            # once per tick, fires whatever ran out
+    timers.remaining("combo")     # seconds left (0.0 when not running)
+
+Deadlines are bucketed into WHEEL_LEVELS levels of WHEEL_SLOTS slots: level 0
+has one slot per TIMER_RESOLUTION tick, each level above covers WHEEL_SLOTS
+times more, and a slot is moved down a level when time reaches it. Timers
+further out than the top level wait in an overflow list. Expiry itself is
+exact - a timer fires on the first advance() at or after its deadline, never
+rounded to a slot - and timers that run out together fire in the order they
+were started, so a wheel driven by the sim clock is as deterministic as the
+rest of the sim.
+"""
+
+TIMER_RESOLUTION = 1.0 / 60.0  # Seconds per level-0 slot (one tick at 60 FPS)
+WHEEL_BITS = 6
+WHEEL_SLOTS = 1 << WHEEL_BITS  # 64 slots per level
+WHEEL_LEVELS = 3  # 64 ticks ~ 1 s, 4096 ticks ~ 68 s, 262144 ticks ~ 73 min
+_MASK = WHEEL_SLOTS - 1
+
+
+class TimerWheel:
+    """Named countdowns on a hierarchical timing wheel"""
+    __slots__ = ("resolution", "now", "deadlines", "_handlers", "_armed", "_seq", "_tick",
+                 "_levels", "_counts", "_overflow", "_current")
+
+    def __init__(self, resolution=TIMER_RESOLUTION):
+        self.resolution = resolution
+        self._handlers = {}
+        self.reset()
+
+    def reset(self, now=0.0):
+        """Cancel every timer and restart time at `now` (handlers stay registered)"""
+        self.now = now
+        self.deadlines = {}  # name -> time it runs out, in start order
+        self._armed = {}  # name -> sequence number of its live wheel entry
+        self._seq = 0
+        self._tick = self._slot_of(now)
+        self._levels = [[[] for _ in range(WHEEL_SLOTS)] for _ in range(WHEEL_LEVELS)]
+        self._counts = [0] * WHEEL_LEVELS
+        self._overflow = []
+        self._current = []  # Entries whose slot time has been reached but not their deadline
+
+    def on_expire(self, name, callback):
+        """Call callback() whenever the timer called `name` runs out"""
+        self._handlers[name] = callback
+
+    # =====================================================
+    # TIMERS
+    # =====================================================
+
+    def start(self, name, seconds):
+        """(Re)start a timer to run out `seconds` from now; 0 or less cancels it"""
+        if seconds <= 0:
+            self.cancel(name)
+            return
+        deadline = self.now + seconds
+        self.deadlines.pop(name, None)  # Re-insert so deadlines stays in start order
+        self.deadlines[name] = deadline
+        self._seq += 1
+        self._armed[name] = self._seq
+        self._place((deadline, self._seq, name))
+
+    def extend(self, name, seconds):
+        """Make a timer last at least `seconds` more (never shortens it)"""
+        if self.now + seconds > self.deadlines.get(name, self.now):
+            self.start(name, seconds)
+
+    def cancel(self, name):
+        """Stop a timer without running its callback"""
+        if self.deadlines.pop(name, None) is not None:
+            del self._armed[name]
+
+    def active(self, name):
+        return name in self.deadlines
+
+    def remaining(self, name):
+        """Seconds until the timer runs out (0.0 if it is not running)"""
+        deadline = self.deadlines.get(name)
+        return 0.0 if deadline is None else deadline - self.now
+
+    def deadline(self, name, default=0.0):
+        """Time the timer runs out at, or `default` if it is not running"""
+        return self.deadlines.get(name, default)
+
+    def next_expiry(self):
+        """Seconds until the soonest timer runs out, or None if none are running"""
+        if not self.deadlines:
+            return None
+        return min(self.deadlines.values()) - self.now
+
+    def restore(self, now, deadlines):
+        """Rebuild the wheel from a saved time and {name: deadline} (in start order)"""
+        self.reset(now)
+        for name, deadline in deadlines.items():
+            self.deadlines[name] = deadline
+            self._seq += 1
+            self._armed[name] = self._seq
+            self._place((deadline, self._seq, name))
+
+    # =====================================================
+    # ADVANCING
+    # =====================================================
+
+    def advance(self, dt):
+        """Move time forward and run the callbacks of every timer that ran out"""
+        self.now += dt
+        target = int(self.now // self.resolution)
+        if not self.deadlines:
+            # Nothing running: whatever is left in the slots was cancelled or restarted
+            self._tick = target
+            self._current = []
+            return
+        if target > self._tick:
+            self._turn(target)
+        if not self._current:
+            return
+
+        now = self.now
+        armed = self._armed
+        due = []
+        waiting = []
+        for entry in self._current:
+            if armed.get(entry[2]) != entry[1]:
+                continue  # Cancelled or restarted since it was placed
+            (due if entry[0] <= now else waiting).append(entry)
+        self._current = waiting
+        due.sort()
+        for _, seq, name in due:
+            if armed.get(name) != seq:
+                continue  # An earlier callback restarted or cancelled it
+            del armed[name]
+            del self.deadlines[name]
+            callback = self._handlers.get(name)
+            if callback is not None:
+                callback()
+
+    def _slot_of(self, when):
+        return int(when // self.resolution)
+
+    def _place(self, entry):
+        """Put an entry in the slot its deadline falls in, relative to the current tick"""
+        tick = self._slot_of(entry[0])
+        if tick <= self._tick:
+            self._current.append(entry)
+            return
+        for level in range(WHEEL_LEVELS):
+            shift = WHEEL_BITS * level
+            if (tick >> shift) - (self._tick >> shift) < WHEEL_SLOTS:
+                self._levels[level][(tick >> shift) & _MASK].append(entry)
+                self._counts[level] += 1
+                return
+        self._overflow.append(entry)
+
+    def _turn(self, target):
+        """Move the wheel to tick `target`, collecting every slot passed on the way"""
+        levels = self._levels
+        counts = self._counts
+        while self._tick < target:
+            # Skip straight past stretches where the lower levels are empty
+            level = 0
+            while level < WHEEL_LEVELS and not counts[level]:
+                level += 1
+            span = 1 << (WHEEL_BITS * level)
+            tick = min(target, (self._tick // span + 1) * span)
+            self._tick = tick
+
+            if not tick & _MASK:
+                self._cascade(tick)
+
+            slot = levels[0][tick & _MASK]
+            if slot:
+                counts[0] -= len(slot)
+                self._current.extend(slot)
+                slot.clear()
+
+    def _cascade(self, tick):
+        """Reaching the start of a higher level's slot moves its timers down a level"""
+        for upper in range(WHEEL_LEVELS, 0, -1):
+            shift = WHEEL_BITS * upper
+            if tick & ((1 << shift) - 1):
+                continue
+            if upper == WHEEL_LEVELS:
+                entries, self._overflow = self._overflow, []
+            else:
+                slot = self._levels[upper][(tick >> shift) & _MASK]
+                entries = slot[:]
+                slot.clear()
+                self._counts[upper] -= len(entries)
+            for entry in entries:
+                self._place(entry)